@@ -3,6 +3,8 @@ import typing as t
 
 from google.protobuf.compiler.plugin_pb2 import CodeGeneratorRequest, CodeGeneratorResponse
 
+from pyprotostuben.pool.abc import Pool
+from pyprotostuben.protobuf.context import CodeGeneratorContext
 from pyprotostuben.protobuf.file import ProtoFile
 
 
@@ -12,6 +14,14 @@ class ProtocPlugin(metaclass=abc.ABCMeta):
         raise NotImplementedError
 
 
+class ContextProtocPlugin(ProtocPlugin, metaclass=abc.ABCMeta):
+    """Protoc plugin that can generate code from a prebuilt context in the given pool (e.g. shared by plugins)."""
+
+    @abc.abstractmethod
+    def generate(self, context: CodeGeneratorContext, pool: Pool) -> CodeGeneratorResponse:
+        raise NotImplementedError
+
+
 class ProtoFileGenerator(metaclass=abc.ABCMeta):
     @abc.abstractmethod
     def run(self, file: ProtoFile) -> t.Sequence[CodeGeneratorResponse.File]:
@@ -0,0 +1,227 @@
+import argparse
+import sys
+import typing as t
+from contextlib import ExitStack, suppress
+from pathlib import Path
+
+from google.protobuf.compiler.plugin_pb2 import CodeGeneratorRequest
+from google.protobuf.descriptor_pb2 import FileDescriptorProto, FileDescriptorSet
+
+from pyprotostuben.codegen.abc import ContextProtocPlugin
+from pyprotostuben.codegen.output import DirectoryOutputWriter, OutputResult
+from pyprotostuben.codegen.plugins import PLUGINS
+from pyprotostuben.logging import LoggerMixin
+from pyprotostuben.pool.abc import Pool
+from pyprotostuben.pool.process import MultiProcessPool, SingleProcessPool
+from pyprotostuben.protobuf.context import CodeGeneratorContext, ContextBuilder
+from pyprotostuben.protobuf.parser import ParameterParser
+
+
+class BatchGenerationError(Exception):
+    pass
+
+
+class BatchGenerator(LoggerMixin):
+    """
+    Runs protoc plugins in the current process and writes generated files to the directory.
+
+    Plugins share the registry built once per request and the pool, that is kept by the generator between runs.
+    """
+
+    def __init__(
+        self,
+        plugins: t.Sequence[ContextProtocPlugin],
+        out_dir: Path,
+        pool: t.Optional[Pool] = None,
+    ) -> None:
+        self.__plugins = plugins
+        self.__out_dir = out_dir
+        self.__pool = pool if pool is not None else SingleProcessPool()
+
+    def run(
+        self,
+        request: CodeGeneratorRequest,
+        removed_sources: t.Collection[str] = (),
+    ) -> t.Sequence[OutputResult]:
+        """
+        Run plugins & write generated files.
+
+        Previously generated files of `file_to_generate` of the request and of `removed_sources` are replaced.
+        """
+
+        return self.generate(ContextBuilder().build(request), removed_sources)
+
+    def generate(
+        self,
+        context: CodeGeneratorContext,
+        removed_sources: t.Collection[str] = (),
+    ) -> t.Sequence[OutputResult]:
+        """Same as `run`, but uses the prebuilt context (e.g. to reuse its registry)."""
+
+        request = context.request
+
+        log = self._log.bind_details(out_dir=self.__out_dir, file_to_generate_len=len(request.file_to_generate))
+        log.debug("started")
+
+        results: list[OutputResult] = []
+
+        for plugin in self.__plugins:
+            response = plugin.generate(context, self.__pool)
+            if response.error:
+                msg = "plugin error"
+                raise BatchGenerationError(msg, plugin, response.error)
+
+            name = type(plugin).__name__
+            results.append(
+                DirectoryOutputWriter(self.__out_dir, name).write(
+                    response.file,
+                    sources=request.file_to_generate,
+                    removed_sources=removed_sources,
+                ),
+            )
+
+        log.info("finished")
+
+        return results
+
+
+def load_descriptor_sets(paths: t.Sequence[Path]) -> t.Sequence[FileDescriptorProto]:
+    """Load files from descriptor sets (files with the same name are loaded once) in dependency order."""
+
+    files: dict[str, FileDescriptorProto] = {}
+
+    for path in paths:
+        descriptor_set = FileDescriptorSet.FromString(path.read_bytes())
+
+        for file in descriptor_set.file:
+            files.setdefault(file.name, file)
+
+    return _sort_by_dependencies(files)
+
+
+def build_request(
+    files: t.Sequence[FileDescriptorProto],
+    file_to_generate: t.Optional[t.Sequence[str]] = None,
+    parameter: str = "",
+) -> CodeGeneratorRequest:
+    names = {file.name for file in files}
+
+    missing = [name for name in file_to_generate or () if name not in names]
+    if missing:
+        msg = "files to generate are not found in descriptor sets"
+        raise BatchGenerationError(msg, missing)
+
+    return CodeGeneratorRequest(
+        file_to_generate=file_to_generate if file_to_generate else [file.name for file in files],
+        parameter=parameter,
+        proto_file=files,
+    )
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="pyprotostuben-gen",
+        description="Generate code from descriptor sets (`protoc --descriptor_set_out` or `buf build -o`) in a single "
+        "process, without protoc.",
+    )
+    parser.add_argument("descriptor_sets", nargs="+", type=Path, help="paths to FileDescriptorSet files")
+    parser.add_argument(
+        "--plugin",
+        dest="plugins",
+        action="append",
+        choices=sorted(PLUGINS),
+        help="plugin to run, can be set multiple times (default = mypy-stub)",
+    )
+    parser.add_argument(
+        "-f",
+        "--file",
+        dest="files",
+        action="append",
+        help="proto file to generate code for, can be set multiple times (default = all files from descriptor sets)",
+    )
+    parser.add_argument("--parameter", default="", help="plugin parameter")
+    parser.add_argument("-o", "--out-dir", type=Path, required=True, help="directory to write generated files to")
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="watch descriptor sets and regenerate only affected files on changes",
+    )
+    parser.add_argument(
+        "--watch-dir",
+        dest="watch_dirs",
+        action="append",
+        type=Path,
+        help="proto source directory to watch for `--rebuild-cmd`, can be set multiple times",
+    )
+    parser.add_argument("--rebuild-cmd", default=None, help="command to rebuild descriptor sets on proto changes")
+    parser.add_argument("--interval", type=float, default=0.5, help="watch poll interval in seconds")
+
+    return parser
+
+
+def main(argv: t.Optional[t.Sequence[str]] = None) -> None:
+    args = build_arg_parser().parse_args(argv)
+
+    with ExitStack() as cm_stack:
+        params = ParameterParser().parse(args.parameter)
+        pool = (
+            SingleProcessPool()
+            if params.has_flag("no-parallel") or params.has_flag("debug")
+            else cm_stack.enter_context(MultiProcessPool.setup(ordered=True))
+        )
+
+        _run(args, BatchGenerator([PLUGINS[name]() for name in args.plugins or ["mypy-stub"]], args.out_dir, pool))
+
+
+def _run(args: argparse.Namespace, generator: BatchGenerator) -> None:
+    if args.watch:
+        # NOTE: watch module depends on this module.
+        from pyprotostuben.codegen.watch import IncrementalGenerator, watch
+
+        with suppress(KeyboardInterrupt):
+            watch(
+                load=lambda: load_descriptor_sets(args.descriptor_sets),
+                generator=IncrementalGenerator(generator, args.files, args.parameter),
+                descriptor_sets=args.descriptor_sets,
+                watch_paths=args.watch_dirs or (),
+                rebuild_cmd=args.rebuild_cmd,
+                interval=args.interval,
+            )
+
+        return
+
+    try:
+        results = generator.run(build_request(load_descriptor_sets(args.descriptor_sets), args.files, args.parameter))
+
+    except BatchGenerationError as err:
+        sys.stderr.write(f"{err}\n")
+        sys.exit(1)
+
+    for result in results:
+        sys.stderr.write(
+            f"written: {len(result.written)}, unchanged: {len(result.unchanged)}, removed: {len(result.removed)}\n"
+        )
+
+
+def _sort_by_dependencies(files: t.Mapping[str, FileDescriptorProto]) -> t.Sequence[FileDescriptorProto]:
+    result: list[FileDescriptorProto] = []
+    visited: set[str] = set()
+
+    # NOTE: iterative DFS, import chains can be deep in big repositories.
+    for name in files:
+        stack = [(name, False)]
+
+        while stack:
+            current, deps_added = stack.pop()
+            if current in visited or current not in files:
+                continue
+
+            if deps_added:
+                visited.add(current)
+                result.append(files[current])
+                continue
+
+            stack.append((current, True))
+            stack.extend((dep, False) for dep in reversed(files[current].dependency) if dep not in visited)
+
+    return result
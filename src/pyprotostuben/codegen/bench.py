@@ -0,0 +1,192 @@
+import argparse
+import json
+import sys
+import time
+import typing as t
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from google.protobuf.compiler.plugin_pb2 import CodeGeneratorRequest
+from google.protobuf.json_format import Parse
+
+from pyprotostuben.codegen.plugins import PLUGINS
+from pyprotostuben.logging import LoggerMixin
+from pyprotostuben.protobuf.parser import ParameterParser
+from pyprotostuben.stats import PhaseStats, PhaseStatsCollector, get_peak_rss, use_stats_collector
+
+POOL_MODES: t.Sequence[str] = ("request", "single", "multi")
+REQUEST_FORMATS: t.Sequence[str] = ("raw", "binary", "json")
+
+_SINGLE_PROCESS_FLAGS: t.Final[t.Collection[str]] = {"no-parallel", "debug"}
+
+
+@dataclass(frozen=True)
+class BenchmarkResult:
+    plugin: str
+    requests: int
+    runs: int
+    files: int
+    wall: float
+    phases: t.Mapping[str, PhaseStats]
+    counters: t.Mapping[str, int]
+    peak_rss: t.Optional[int]
+    peak_children_rss: t.Optional[int]
+
+    @property
+    def files_per_second(self) -> float:
+        return self.files / self.wall if self.wall > 0 else 0.0
+
+
+class PluginBenchmark(LoggerMixin):
+    def __init__(self, name: str, parameter: t.Optional[str] = None, pool: str = "request") -> None:
+        if pool not in POOL_MODES:
+            msg = "unsupported pool mode"
+            raise ValueError(msg, pool)
+
+        self.__name = name
+        self.__plugin = PLUGINS[name]()
+        self.__parameter = parameter
+        self.__pool = pool
+
+    def run(self, contents: t.Sequence[bytes], repeat: int) -> BenchmarkResult:
+        if repeat < 1:
+            msg = "repeat must be a positive number"
+            raise ValueError(msg, repeat)
+
+        log = self._log.bind_details(plugin=self.__name, requests=len(contents), repeat=repeat)
+        log.debug("started")
+
+        files = 0
+
+        with use_stats_collector(PhaseStatsCollector()) as stats:
+            assert isinstance(stats, PhaseStatsCollector)
+
+            start = time.perf_counter()
+
+            for _ in range(repeat):
+                for content in contents:
+                    with stats.measure("parse"):
+                        request = CodeGeneratorRequest.FromString(content)
+
+                    request.parameter = self.build_parameter(request.parameter)
+                    files += len(request.file_to_generate)
+
+                    with stats.measure("run"):
+                        response = self.__plugin.run(request)
+
+                    with stats.measure("serialize"):
+                        response.SerializeToString()
+
+            wall = time.perf_counter() - start
+
+        result = BenchmarkResult(
+            plugin=self.__name,
+            requests=len(contents),
+            runs=repeat,
+            files=files,
+            wall=wall,
+            phases=dict(stats.phases),
+            counters=dict(stats.counters),
+            peak_rss=get_peak_rss(children=False),
+            peak_children_rss=get_peak_rss(children=True),
+        )
+
+        log.info("finished", wall=wall, files=files)
+
+        return result
+
+    def build_parameter(self, origin: str) -> str:
+        parameter = self.__parameter if self.__parameter is not None else origin
+        if self.__pool == "request":
+            return parameter
+
+        items = [
+            str(param.value) if param.name is None else f"{param.name}={param.value}"
+            for param in ParameterParser().iter_parse(parameter)
+            if param.name is not None or param.value not in _SINGLE_PROCESS_FLAGS
+        ]
+        if self.__pool == "single":
+            items.append("no-parallel")
+
+        return ",".join(items)
+
+
+def load_request_content(path: Path, format_: t.Optional[str] = None) -> bytes:
+    """Load request saved by `protoc-gen-echo` and return its binary content."""
+
+    if format_ is None:
+        format_ = "json" if path.suffix == ".json" else "binary"
+
+    if format_ in {"raw", "binary"}:
+        return path.read_bytes()
+
+    elif format_ == "json":
+        return Parse(path.read_text(), CodeGeneratorRequest()).SerializeToString()
+
+    else:
+        msg = "unsupported format"
+        raise ValueError(msg, format_)
+
+
+def format_result(result: BenchmarkResult) -> str:
+    lines = [
+        f"plugin: {result.plugin}, requests: {result.requests}, runs: {result.runs}, files: {result.files}",
+        f"{'phase':<12}{'calls':>10}{'wall, s':>14}{'cpu, s':>14}{'wall/run, ms':>16}",
+        *(
+            f"{name:<12}{stats.calls:>10}{stats.wall:>14.4f}{stats.cpu:>14.4f}{stats.wall / result.runs * 1000:>16.2f}"
+            for name, stats in result.phases.items()
+        ),
+        ", ".join(f"{name}: {value}" for name, value in result.counters.items()),
+        f"total wall: {result.wall:.4f} s, throughput: {result.files_per_second:.2f} files/s",
+        f"peak rss: {_format_size(result.peak_rss)}, children peak rss: {_format_size(result.peak_children_rss)}",
+    ]
+
+    return "\n".join(lines)
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="pyprotostuben-bench",
+        description="Replay code generator requests saved by protoc-gen-echo and measure plugin performance.",
+    )
+    parser.add_argument("requests", nargs="+", type=Path, help="paths to saved requests")
+    parser.add_argument("--plugin", choices=sorted(PLUGINS), default="mypy-stub")
+    parser.add_argument("--format", choices=REQUEST_FORMATS, default=None, help="saved request format")
+    parser.add_argument("--parameter", default=None, help="override plugin parameter from requests")
+    parser.add_argument("--pool", choices=POOL_MODES, default="request", help="plugin pool mode")
+    parser.add_argument("-n", "--repeat", type=_parse_positive_int, default=1, help="number of runs")
+    parser.add_argument("--output", type=Path, default=None, help="write benchmark result as JSON to the file")
+
+    return parser
+
+
+def main(argv: t.Optional[t.Sequence[str]] = None) -> None:
+    args = build_arg_parser().parse_args(argv)
+
+    contents = [load_request_content(path, args.format) for path in args.requests]
+    result = PluginBenchmark(args.plugin, args.parameter, args.pool).run(contents, args.repeat)
+
+    sys.stdout.write(f"{format_result(result)}\n")
+
+    if args.output is not None:
+        with args.output.open("w") as fd:
+            json.dump(asdict(result), fd, indent=2)
+
+
+def _parse_positive_int(value: str) -> int:
+    try:
+        number = int(value)
+
+    except ValueError as err:
+        msg = f"invalid int value: {value!r}"
+        raise argparse.ArgumentTypeError(msg) from err
+
+    if number < 1:
+        msg = f"must be a positive number: {value!r}"
+        raise argparse.ArgumentTypeError(msg)
+
+    return number
+
+
+def _format_size(value: t.Optional[int]) -> str:
+    return f"{value / (1 << 20):.1f} MiB" if value is not None else "n/a"
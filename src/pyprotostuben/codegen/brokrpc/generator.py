@@ -7,6 +7,7 @@ from itertools import chain
 
 # NOTE: brokrpc supports python 3.12 or higher
 if sys.version_info >= (3, 12):
+    from brokrpc.spec.v1.amqp_pb2 import ArgumentValue as AmqpArgumentValue
     from brokrpc.spec.v1.amqp_pb2 import ExchangeOptions as AmqpExchangeOptions
     from brokrpc.spec.v1.amqp_pb2 import ExchangeType as AmqpExchangeType
     from brokrpc.spec.v1.amqp_pb2 import QueueOptions as AmqpQueueOptions
@@ -20,6 +21,7 @@ if sys.version_info >= (3, 12):
     from brokrpc.spec.v1.consumer_pb2 import Void as AmqpConsumerVoid
 
 else:
+    AmqpArgumentValue = t.Any
     AmqpExchangeType = t.Any
     AmqpExchangeOptions = t.Any
     AmqpQueueOptions = t.Any
@@ -27,6 +29,22 @@ else:
     amqp_pb2_queue_ext = t.Any
     AmqpConsumerVoid = t.Any
 
+from pyprotostuben.codegen.brokrpc.helpers import (
+    AS_COMPLETED_HELPER,
+    BATCH_CONSUMER_HELPER,
+    COALESCING_CALLER_HELPER,
+    GATHER_HELPER,
+    ITERATE_HELPER,
+    LOOPBACK_CALLER_HELPER,
+    LOOPBACK_PUBLISHER_HELPER,
+    OBSERVE_CLIENT_HELPER,
+    OBSERVE_HELPER,
+    OBSERVE_SERVER_HELPER,
+    OBSERVED_CLIENT_HELPER,
+    OBSERVER_PROTOCOL,
+    BrokRPCHelperBuilder,
+    BrokRPCRefs,
+)
 from pyprotostuben.codegen.module_ast import ModuleAstContext
 from pyprotostuben.logging import LoggerMixin
 from pyprotostuben.protobuf.extension import get_extension
@@ -46,9 +64,54 @@ from pyprotostuben.protobuf.visitor.model import (
     ServiceContext,
 )
 from pyprotostuben.python.ast_builder import ASTBuilder, FuncArgInfo, ModuleDependencyResolver, TypeRef
-from pyprotostuben.python.info import ModuleInfo, PackageInfo, TypeInfo
+from pyprotostuben.python.info import ModuleInfo, TypeInfo
+from pyprotostuben.stats import get_stats_collector
 from pyprotostuben.string_case import camel2snake
 
+_DEFAULT_MAX_CONCURRENCY: t.Final[int] = 64
+_DEFAULT_BATCH_MAX_DELAY: t.Final[float] = 0.1
+_DEFAULT_CACHE_MAX_SIZE: t.Final[int] = 1024
+
+# NOTE: brokrpc proto spec has no QOS options, so prefetch count is read from `arguments` of exchange (service level)
+# & queue (method level) options. It limits the number of unacked messages (i.e. concurrently run handlers) per method
+# consumer, so slow handlers don't starve the others.
+_PREFETCH_COUNT_ARGUMENT: t.Final[str] = "prefetch_count"
+
+# NOTE: consumer methods are batched when `batch_max_size` argument is set in queue (method level) options. Messages are
+# buffered by generated consumer until the batch is full or `batch_max_delay` seconds passed since its first message.
+_BATCH_MAX_SIZE_ARGUMENT: t.Final[str] = "batch_max_size"
+_BATCH_MAX_DELAY_ARGUMENT: t.Final[str] = "batch_max_delay"
+
+# NOTE: client makes a single call for concurrent identical requests of a method when `coalesce` argument is set in
+# queue (method level) options. Responses are also cached by client when `cache_ttl` argument is set.
+_COALESCE_ARGUMENT: t.Final[str] = "coalesce"
+_CACHE_TTL_ARGUMENT: t.Final[str] = "cache_ttl"
+_CACHE_MAX_SIZE_ARGUMENT: t.Final[str] = "cache_max_size"
+
+# NOTE: codegen arguments configure generated code only, the other arguments are passed to the broker.
+_CODEGEN_ARGUMENTS: t.Final[t.Collection[str]] = frozenset(
+    {
+        _PREFETCH_COUNT_ARGUMENT,
+        _BATCH_MAX_SIZE_ARGUMENT,
+        _BATCH_MAX_DELAY_ARGUMENT,
+        _COALESCE_ARGUMENT,
+        _CACHE_TTL_ARGUMENT,
+        _CACHE_MAX_SIZE_ARGUMENT,
+    }
+)
+
+
+@dataclass(frozen=True)
+class BatchInfo:
+    max_size: int
+    max_delay: float
+
+
+@dataclass(frozen=True)
+class CoalesceInfo:
+    cache_ttl: float
+    cache_max_size: int
+
 
 @dataclass(frozen=True)
 class _BaseMethodInfo:
@@ -56,19 +119,19 @@ class _BaseMethodInfo:
     qualname: str
     doc: t.Optional[str]
     server_input: TypeRef
-    server_input_streaming: bool
     amqp_queue_options: t.Optional[AmqpQueueOptions]
 
 
 @dataclass(frozen=True)
 class VoidMethodInfo(_BaseMethodInfo):
-    pass
+    batch: t.Optional[BatchInfo] = None
+    client_streaming: bool = False
 
 
 @dataclass(frozen=True)
 class ReplyingMethodInfo(_BaseMethodInfo):
     server_output: TypeRef
-    server_output_streaming: bool
+    coalesce: t.Optional[CoalesceInfo] = None
 
 
 MethodInfo = t.Union[VoidMethodInfo, ReplyingMethodInfo]
@@ -80,12 +143,16 @@ class ServiceInfo:
     service_registrator: ast.stmt
     client: ast.stmt
     client_factory: ast.stmt
+    loopback_client_factory: t.Optional[ast.stmt] = None
 
 
 @dataclass()
 class BrokRPCContext(ModuleAstContext):
     _module: t.Optional[ModuleInfo] = None
     _builder: t.Optional[ASTBuilder] = None
+    helpers: t.MutableMapping[str, ast.stmt] = field(default_factory=dict)
+    constants: t.MutableMapping[str, ast.stmt] = field(default_factory=dict)
+    constant_names: t.MutableMapping[str, str] = field(default_factory=dict)
     services: t.MutableSequence[ServiceInfo] = field(default_factory=list)
     methods: t.MutableSequence[MethodInfo] = field(default_factory=list)
 
@@ -103,8 +170,24 @@ class BrokRPCContext(ModuleAstContext):
 
 
 class BrokRPCModuleGenerator(ProtoVisitorDecorator[BrokRPCContext], LoggerMixin):
-    def __init__(self, registry: TypeRegistry) -> None:
+    def __init__(
+        self,
+        registry: TypeRegistry,
+        *,
+        lazy_client: bool = False,
+        loopback: bool = False,
+        instrument: bool = False,
+    ) -> None:
+        if lazy_client and loopback:
+            msg = "loopback client can't be created in lazy client mode"
+            raise ValueError(msg)
+
         self.__registry = registry
+        self.__lazy_client = lazy_client
+        self.__loopback = loopback
+        self.__instrument = instrument
+        self.__refs = BrokRPCRefs()
+        self.__helpers = BrokRPCHelperBuilder(self.__refs)
 
     def enter_file(self, context: FileContext[BrokRPCContext]) -> None:
         context.meta = self.__create_root_context(context)
@@ -113,24 +196,30 @@ class BrokRPCModuleGenerator(ProtoVisitorDecorator[BrokRPCContext], LoggerMixin)
         scope = context.meta
 
         if scope.services:
-            context.meta.generated_modules.update(
-                {
-                    context.meta.module.file: context.meta.builder.build_module(
-                        doc=f"Source: {context.file.proto_path}",
-                        body=list(
-                            chain.from_iterable(
-                                (
+            with get_stats_collector().measure("ast"):
+                module_ast = scope.builder.build_module(
+                    doc=f"Source: {context.file.proto_path}",
+                    body=[
+                        *scope.helpers.values(),
+                        *scope.constants.values(),
+                        *chain.from_iterable(
+                            (
+                                stmt
+                                for stmt in (
                                     service.service,
                                     service.service_registrator,
                                     service.client,
                                     service.client_factory,
+                                    service.loopback_client_factory,
                                 )
-                                for service in scope.services
+                                if stmt is not None
                             )
+                            for service in scope.services
                         ),
-                    ),
-                }
-            )
+                    ],
+                )
+
+            scope.generated_modules[scope.module.file] = module_ast
 
     def enter_enum(self, context: EnumContext[BrokRPCContext]) -> None:
         pass
@@ -174,6 +263,8 @@ class BrokRPCModuleGenerator(ProtoVisitorDecorator[BrokRPCContext], LoggerMixin)
         service_name = proto.name
         client_name = f"{service_name}Client"
 
+        self.__register_helpers(scope.builder, parent.helpers, scope.methods)
+
         parent.services.append(
             ServiceInfo(
                 service=self.__build_service_def(context, service_name, scope.methods),
@@ -183,7 +274,12 @@ class BrokRPCModuleGenerator(ProtoVisitorDecorator[BrokRPCContext], LoggerMixin)
                     amqp_exchange_options=amqp_exchange_options,
                     methods=scope.methods,
                 ),
-                client=self.__build_client_def(context, client_name, scope.methods),
+                client=self.__build_client_def(
+                    context=context,
+                    client_name=client_name,
+                    amqp_exchange_options=amqp_exchange_options,
+                    methods=scope.methods,
+                ),
                 client_factory=self.__build_client_factory_def(
                     context=context,
                     service_name=service_name,
@@ -191,6 +287,14 @@ class BrokRPCModuleGenerator(ProtoVisitorDecorator[BrokRPCContext], LoggerMixin)
                     amqp_exchange_options=amqp_exchange_options,
                     methods=scope.methods,
                 ),
+                loopback_client_factory=self.__build_loopback_client_factory_def(
+                    context=context,
+                    service_name=service_name,
+                    client_name=client_name,
+                    methods=scope.methods,
+                )
+                if self.__loopback
+                else None,
             ),
         )
 
@@ -203,32 +307,52 @@ class BrokRPCModuleGenerator(ProtoVisitorDecorator[BrokRPCContext], LoggerMixin)
 
         name = camel2snake(proto.name)
         qualname = f"/{context.root.proto.package}/{context.parent.name}/{proto.name}"
+
         doc = build_docstring(context.location)
         server_input = self.__registry.resolve_proto_method_client_input(proto)
         server_output = self.__registry.resolve_proto_method_server_output(proto)
         amqp_queue_options = get_extension(proto, amqp_pb2_queue_ext)
+        batch = _get_batch_info(amqp_queue_options)
+        coalesce = _get_coalesce_info(amqp_queue_options)
+
+        is_void = server_output == self.__brokrpc_consumer_void
+        client_streaming = is_void and proto.client_streaming and not proto.server_streaming
+
+        if (proto.client_streaming or proto.server_streaming) and not client_streaming:
+            # NOTE: brokrpc has no streaming calls (only single request / response messages). Client streaming to a
+            # consumer is a stream of published messages, the other streaming methods are generated as unary methods.
+            self._log.warning("streaming method is not supported, generated as unary method", qualname=qualname)
 
         method: MethodInfo
-        if server_output == self.__brokrpc_consumer_void:
+        if is_void:
+            if coalesce is not None:
+                # NOTE: consumer methods have no response to share between identical requests.
+                msg = "coalescing is supported only for methods with response"
+                raise ValueError(msg, qualname)
+
             method = VoidMethodInfo(
                 name=name,
                 qualname=qualname,
                 doc=doc,
                 server_input=server_input,
-                server_input_streaming=proto.client_streaming,
                 amqp_queue_options=amqp_queue_options,
+                batch=batch,
+                client_streaming=client_streaming,
             )
 
+        elif batch is not None:
+            msg = "batching is supported only for consumer methods without response (brokrpc.spec.v1.Void)"
+            raise ValueError(msg, qualname)
+
         else:
             method = ReplyingMethodInfo(
                 name=name,
                 qualname=qualname,
                 doc=doc,
                 server_input=server_input,
-                server_input_streaming=proto.client_streaming,
                 server_output=server_output,
-                server_output_streaming=proto.server_streaming,
                 amqp_queue_options=amqp_queue_options,
+                coalesce=coalesce,
             )
 
         parent.methods.append(method)
@@ -271,16 +395,32 @@ class BrokRPCModuleGenerator(ProtoVisitorDecorator[BrokRPCContext], LoggerMixin)
         )
 
     def __build_service_method_def(self, builder: ASTBuilder, method: MethodInfo) -> ast.stmt:
-        if isinstance(method, VoidMethodInfo):
+        if isinstance(method, VoidMethodInfo) and method.batch is not None:
+            return builder.build_abstract_method_def(
+                name=f"{method.name}_batch",
+                args=[
+                    builder.build_pos_arg(
+                        name="messages",
+                        annotation=builder.build_sequence_ref(
+                            builder.build_generic_ref(self.__refs.brokrpc_message, method.server_input),
+                        ),
+                    ),
+                ],
+                returns=builder.build_sequence_ref(self.__refs.brokrpc_consumer_result),
+                is_async=True,
+                doc=method.doc,
+            )
+
+        elif isinstance(method, VoidMethodInfo):
             return builder.build_abstract_method_def(
                 name=method.name,
                 args=[
                     builder.build_pos_arg(
                         name="message",
-                        annotation=builder.build_generic_ref(self.__brokrpc_message, method.server_input),
+                        annotation=builder.build_generic_ref(self.__refs.brokrpc_message, method.server_input),
                     ),
                 ],
-                returns=self.__brokrpc_consumer_result,
+                returns=self.__refs.brokrpc_consumer_result,
                 is_async=True,
                 doc=method.doc,
             )
@@ -291,7 +431,7 @@ class BrokRPCModuleGenerator(ProtoVisitorDecorator[BrokRPCContext], LoggerMixin)
                 args=[
                     builder.build_pos_arg(
                         name="request",
-                        annotation=builder.build_generic_ref(self.__brokrpc_request, method.server_input),
+                        annotation=builder.build_generic_ref(self.__refs.brokrpc_request, method.server_input),
                     ),
                 ],
                 returns=method.server_output,
@@ -320,27 +460,61 @@ class BrokRPCModuleGenerator(ProtoVisitorDecorator[BrokRPCContext], LoggerMixin)
                 ),
                 builder.build_pos_arg(
                     name="server",
-                    annotation=builder.build_ref(self.__brokrpc_server),
+                    annotation=builder.build_ref(self.__refs.brokrpc_server),
                 ),
+                *self.__build_observer_args(builder),
             ],
             returns=builder.build_none_ref(),
             body=[
-                self.__build_service_registrator_method_call(builder, method, amqp_exchange_options)
+                self.__build_service_registrator_method_call(
+                    context.parent.meta,
+                    service_name,
+                    method,
+                    amqp_exchange_options,
+                )
                 for method in methods
             ],
         )
 
     def __build_service_registrator_method_call(
         self,
-        builder: ASTBuilder,
+        scope: BrokRPCContext,
+        service_name: str,
         method: MethodInfo,
         amqp_exchange_options: t.Optional[AmqpExchangeOptions],
     ) -> ast.stmt:
-        func = builder.build_name("service", method.name)
+        builder = scope.builder
+
+        func = self.__build_service_func(builder, method, is_callable=self.__instrument)
+        if self.__instrument:
+            func = builder.build_call(
+                func=builder.build_name(OBSERVE_SERVER_HELPER),
+                args=[builder.build_const(method.qualname), func, builder.build_name("observer")],
+            )
+
         routing_key = builder.build_const(method.qualname)
-        serializer = self.__build_serializer(builder, method)
-        exchange = self.__build_exchange_options(builder, amqp_exchange_options)
-        queue = self.__build_queue_options(builder, method.qualname, method.amqp_queue_options)
+        serializer = self.__build_serializer(scope, method)
+        exchange = self.__build_exchange_options(scope, service_name, amqp_exchange_options)
+
+        prefetch_count = _get_prefetch_count(method.amqp_queue_options)
+        if prefetch_count is None:
+            prefetch_count = _get_prefetch_count(amqp_exchange_options)
+
+        # NOTE: broker doesn't deliver more than prefetch count unacked messages, so a bigger batch is never full.
+        if (
+            isinstance(method, VoidMethodInfo)
+            and method.batch is not None
+            and prefetch_count is not None
+            and prefetch_count < method.batch.max_size
+        ):
+            msg = "batch max size can't be greater than consumer prefetch count"
+            raise ValueError(msg, method.qualname)
+
+        queue = self.__build_constant(
+            scope,
+            f"{camel2snake(service_name)}_{method.name}_queue_options",
+            self.__build_queue_options(builder, method.qualname, method.amqp_queue_options, prefetch_count),
+        )
 
         if isinstance(method, VoidMethodInfo):
             return builder.build_call_stmt(
@@ -369,10 +543,26 @@ class BrokRPCModuleGenerator(ProtoVisitorDecorator[BrokRPCContext], LoggerMixin)
         else:
             t.assert_never(method)
 
+    def __build_service_func(self, builder: ASTBuilder, method: MethodInfo, *, is_callable: bool = False) -> ast.expr:
+        if not isinstance(method, VoidMethodInfo) or method.batch is None:
+            return builder.build_name("service", method.name)
+
+        consumer = builder.build_call(
+            func=builder.build_name(BATCH_CONSUMER_HELPER),
+            args=[builder.build_name("service", f"{method.name}_batch")],
+            kwargs={
+                "max_size": builder.build_const(method.batch.max_size),
+                "max_delay": builder.build_const(method.batch.max_delay),
+            },
+        )
+
+        return ast.Attribute(value=consumer, attr="consume") if is_callable else consumer
+
     def __build_client_def(
         self,
         context: ServiceContext[BrokRPCContext],
         client_name: str,
+        amqp_exchange_options: t.Optional[AmqpExchangeOptions],
         methods: t.Sequence[MethodInfo],
     ) -> ast.stmt:
         builder = context.meta.builder
@@ -381,14 +571,21 @@ class BrokRPCModuleGenerator(ProtoVisitorDecorator[BrokRPCContext], LoggerMixin)
             name=client_name,
             doc=build_docstring(context.location),
             body=(
-                self.__build_client_init(builder, methods),
-                *(self.__build_client_method_def(builder, method) for method in methods),
+                self.__build_lazy_client_init(builder, methods)
+                if self.__lazy_client
+                else self.__build_client_init(builder, methods),
+                *chain.from_iterable(
+                    self.__build_client_method_defs(context, amqp_exchange_options, method) for method in methods
+                ),
             ),
         )
 
     def __build_client_init(self, builder: ASTBuilder, methods: t.Sequence[MethodInfo]) -> ast.stmt:
         return builder.build_init_def(
-            args=[self.__build_client_init_arg(builder, method) for method in methods],
+            args=[
+                builder.build_pos_arg(name=method.name, annotation=self.__build_client_caller_ref(builder, method))
+                for method in methods
+            ],
             body=[
                 builder.build_attr_assign(
                     "self",
@@ -399,68 +596,152 @@ class BrokRPCModuleGenerator(ProtoVisitorDecorator[BrokRPCContext], LoggerMixin)
             ],
         )
 
-    def __build_client_init_arg(self, builder: ASTBuilder, method: MethodInfo) -> FuncArgInfo:
-        if isinstance(method, VoidMethodInfo):
-            return builder.build_pos_arg(
-                name=method.name,
-                annotation=builder.build_generic_ref(
-                    self.__brokrpc_publisher,
-                    method.server_input,
-                    self.__brokrpc_publisher_result,
-                ),
-            )
+    def __build_lazy_client_init(self, builder: ASTBuilder, methods: t.Sequence[MethodInfo]) -> ast.stmt:
+        args = [
+            builder.build_pos_arg(name="client", annotation=self.__refs.brokrpc_client),
+            builder.build_pos_arg(name="stack", annotation=self.__build_async_exit_stack(builder)),
+        ]
+        body = [
+            builder.build_attr_assign("self", "__client", value=builder.build_name("client")),
+            builder.build_attr_assign("self", "__stack", value=builder.build_name("stack")),
+            builder.build_attr_assign(
+                "self",
+                "__lock",
+                value=builder.build_call(func=TypeInfo.build(self.__refs.asyncio, "Lock")),
+            ),
+        ]
 
-        elif isinstance(method, ReplyingMethodInfo):
-            return builder.build_pos_arg(
-                name=method.name,
-                annotation=builder.build_generic_ref(
-                    self.__brokrpc_caller,
-                    method.server_input,
-                    method.server_output,
+        if self.__instrument:
+            args.append(builder.build_pos_arg(name="observer", annotation=self.__helpers.build_observer_ref(builder)))
+            body.append(builder.build_attr_assign("self", "__observer", value=builder.build_name("observer")))
+
+        return builder.build_init_def(
+            args=args,
+            body=[
+                *body,
+                *(
+                    builder.build_attr_assign(
+                        "self",
+                        f"__{method.name}",
+                        value=builder.build_none_ref(),
+                        annotation=builder.build_optional_ref(self.__build_client_caller_ref(builder, method)),
+                    )
+                    for method in methods
                 ),
-            )
+            ],
+        )
 
-        else:
-            t.assert_never(method)
+    def __build_client_method_prefix(
+        self,
+        context: ServiceContext[BrokRPCContext],
+        amqp_exchange_options: t.Optional[AmqpExchangeOptions],
+        method: MethodInfo,
+    ) -> t.Sequence[ast.stmt]:
+        if not self.__lazy_client:
+            return []
 
-    def __build_client_method_def(self, builder: ASTBuilder, method: MethodInfo) -> ast.stmt:
-        if isinstance(method, VoidMethodInfo):
-            return builder.build_method_def(
-                name=method.name,
-                args=[
-                    builder.build_pos_arg(
-                        name="message",
-                        annotation=method.server_input,
-                    ),
-                ],
-                returns=builder.build_none_ref(),
-                doc=method.doc,
+        builder = context.meta.builder
+
+        attr = builder.build_name("self", f"__{method.name}")
+
+        # NOTE: publisher / caller is checked again under the lock, so concurrent first calls open it once, the lock is
+        # not acquired after it's opened.
+        return [
+            builder.build_if_stmt(
+                test=builder.build_is_none_expr(attr),
                 body=[
-                    builder.build_call_stmt(
-                        func=builder.build_name("self", f"__{method.name}", "publish"),
-                        args=[builder.build_name("message")],
+                    builder.build_with_stmt(
                         is_async=True,
+                        items=[(None, builder.build_name("self", "__lock"))],
+                        body=[
+                            builder.build_if_stmt(
+                                test=builder.build_is_none_expr(attr),
+                                body=[
+                                    builder.build_attr_assign(
+                                        "self",
+                                        f"__{method.name}",
+                                        value=self.__build_client_caller_wrapper(
+                                            builder=builder,
+                                            method=method,
+                                            caller=builder.build_call(
+                                                func=builder.build_name("self", "__stack", "enter_async_context"),
+                                                args=[
+                                                    self.__build_client_caller_factory(
+                                                        context=context,
+                                                        client=builder.build_name("self", "__client"),
+                                                        amqp_exchange_options=amqp_exchange_options,
+                                                        method=method,
+                                                    ),
+                                                ],
+                                                is_async=True,
+                                            ),
+                                            observer=builder.build_name("self", "__observer"),
+                                        ),
+                                    ),
+                                ],
+                            ),
+                        ],
                     ),
                 ],
-                is_async=True,
+            ),
+        ]
+
+    def __build_client_caller_ref(self, builder: ASTBuilder, method: MethodInfo) -> ast.expr:
+        if isinstance(method, VoidMethodInfo):
+            return builder.build_generic_ref(
+                self.__refs.brokrpc_publisher,
+                method.server_input,
+                self.__refs.brokrpc_publisher_result,
             )
 
         elif isinstance(method, ReplyingMethodInfo):
-            return builder.build_method_def(
-                name=method.name,
+            return builder.build_generic_ref(
+                self.__refs.brokrpc_caller,
+                method.server_input,
+                method.server_output,
+            )
+
+        else:
+            t.assert_never(method)
+
+    def __build_client_method_defs(
+        self,
+        context: ServiceContext[BrokRPCContext],
+        amqp_exchange_options: t.Optional[AmqpExchangeOptions],
+        method: MethodInfo,
+    ) -> t.Sequence[ast.stmt]:
+        builder = context.meta.builder
+
+        if isinstance(method, VoidMethodInfo):
+            many_def = builder.build_method_def(
+                # NOTE: client streaming method publishes a stream of messages, so it's the only client method.
+                name=method.name if method.client_streaming else f"{method.name}_many",
                 args=[
                     builder.build_pos_arg(
-                        name="request",
-                        annotation=method.server_input,
+                        name="messages",
+                        annotation=builder.build_union_ref(
+                            builder.build_iterable_ref(method.server_input),
+                            builder.build_iterable_ref(method.server_input, is_async=True),
+                        ),
+                    ),
+                    builder.build_kw_arg(
+                        name="max_in_flight",
+                        annotation=builder.build_int_ref(),
+                        default=builder.build_const(_DEFAULT_MAX_CONCURRENCY),
                     ),
                 ],
-                returns=builder.build_generic_ref(self.__brokrpc_response, method.server_output),
+                returns=builder.build_sequence_ref(self.__refs.brokrpc_publisher_result),
                 doc=method.doc,
                 body=[
+                    *self.__build_client_method_prefix(context, amqp_exchange_options, method),
                     builder.build_return_stmt(
                         builder.build_call(
-                            func=builder.build_name("self", f"__{method.name}", "invoke"),
-                            args=[builder.build_name("request")],
+                            func=builder.build_name(GATHER_HELPER),
+                            args=[
+                                builder.build_name("self", f"__{method.name}", "publish"),
+                                builder.build_name("messages"),
+                                builder.build_name("max_in_flight"),
+                            ],
                             is_async=True,
                         )
                     ),
@@ -468,9 +749,195 @@ class BrokRPCModuleGenerator(ProtoVisitorDecorator[BrokRPCContext], LoggerMixin)
                 is_async=True,
             )
 
+            if method.client_streaming:
+                return [many_def]
+
+            return [
+                builder.build_method_def(
+                    name=method.name,
+                    args=[
+                        builder.build_pos_arg(
+                            name="message",
+                            annotation=method.server_input,
+                        ),
+                    ],
+                    returns=builder.build_none_ref(),
+                    doc=method.doc,
+                    body=[
+                        *self.__build_client_method_prefix(context, amqp_exchange_options, method),
+                        builder.build_call_stmt(
+                            func=builder.build_name("self", f"__{method.name}", "publish"),
+                            args=[builder.build_name("message")],
+                            is_async=True,
+                        ),
+                    ],
+                    is_async=True,
+                ),
+                many_def,
+            ]
+
+        elif isinstance(method, ReplyingMethodInfo):
+            response_ref = builder.build_generic_ref(self.__refs.brokrpc_response, method.server_output)
+            many_args = [
+                builder.build_pos_arg(
+                    name="requests",
+                    annotation=builder.build_union_ref(
+                        builder.build_iterable_ref(method.server_input),
+                        builder.build_iterable_ref(method.server_input, is_async=True),
+                    ),
+                ),
+                builder.build_kw_arg(
+                    name="max_concurrency",
+                    annotation=builder.build_int_ref(),
+                    default=builder.build_const(_DEFAULT_MAX_CONCURRENCY),
+                ),
+            ]
+            many_call_args = [
+                builder.build_name("self", f"__{method.name}", "invoke"),
+                builder.build_name("requests"),
+                builder.build_name("max_concurrency"),
+            ]
+
+            return [
+                builder.build_method_def(
+                    name=method.name,
+                    args=[
+                        builder.build_pos_arg(
+                            name="request",
+                            annotation=method.server_input,
+                        ),
+                    ],
+                    returns=response_ref,
+                    doc=method.doc,
+                    body=[
+                        *self.__build_client_method_prefix(context, amqp_exchange_options, method),
+                        builder.build_return_stmt(
+                            builder.build_call(
+                                func=builder.build_name("self", f"__{method.name}", "invoke"),
+                                args=[builder.build_name("request")],
+                                is_async=True,
+                            )
+                        ),
+                    ],
+                    is_async=True,
+                ),
+                builder.build_method_def(
+                    name=f"{method.name}_gather",
+                    args=many_args,
+                    returns=builder.build_sequence_ref(response_ref),
+                    doc=method.doc,
+                    body=[
+                        *self.__build_client_method_prefix(context, amqp_exchange_options, method),
+                        builder.build_return_stmt(
+                            builder.build_call(
+                                func=builder.build_name(GATHER_HELPER),
+                                args=many_call_args,
+                                is_async=True,
+                            )
+                        ),
+                    ],
+                    is_async=True,
+                ),
+                builder.build_method_def(
+                    name=f"{method.name}_as_completed",
+                    args=many_args,
+                    returns=builder.build_iterator_ref(response_ref, is_async=True),
+                    doc=method.doc,
+                    body=[
+                        *self.__build_client_method_prefix(context, amqp_exchange_options, method),
+                        builder.build_for_stmt(
+                            target="response",
+                            items=builder.build_call(func=builder.build_name(AS_COMPLETED_HELPER), args=many_call_args),
+                            body=[builder.build_yield_stmt(builder.build_name("response"))],
+                            is_async=True,
+                        ),
+                    ],
+                    is_async=True,
+                ),
+            ]
+
         else:
             t.assert_never(method)
 
+    def __register_helpers(
+        self,
+        builder: ASTBuilder,
+        helpers: t.MutableMapping[str, ast.stmt],
+        methods: t.Sequence[MethodInfo],
+    ) -> None:
+        if methods and GATHER_HELPER not in helpers:
+            helpers[ITERATE_HELPER] = self.__helpers.build_iterate_def(builder)
+            helpers[GATHER_HELPER] = self.__helpers.build_gather_def(builder)
+
+        if any(isinstance(method, ReplyingMethodInfo) for method in methods) and AS_COMPLETED_HELPER not in helpers:
+            helpers[AS_COMPLETED_HELPER] = self.__helpers.build_as_completed_def(builder)
+
+        if (
+            any(isinstance(method, VoidMethodInfo) and method.batch is not None for method in methods)
+            and BATCH_CONSUMER_HELPER not in helpers
+        ):
+            helpers[BATCH_CONSUMER_HELPER] = self.__helpers.build_batch_consumer_def(builder)
+
+        if (
+            any(isinstance(method, ReplyingMethodInfo) and method.coalesce is not None for method in methods)
+            and COALESCING_CALLER_HELPER not in helpers
+        ):
+            helpers[COALESCING_CALLER_HELPER] = self.__helpers.build_coalescing_caller_def(builder)
+
+        if self.__instrument and methods and OBSERVE_HELPER not in helpers:
+            helpers[OBSERVER_PROTOCOL] = self.__helpers.build_observer_protocol_def(builder)
+            helpers[OBSERVE_HELPER] = self.__helpers.build_observe_def(builder)
+            helpers[OBSERVE_SERVER_HELPER] = self.__helpers.build_observe_server_def(builder)
+            helpers[OBSERVED_CLIENT_HELPER] = self.__helpers.build_observed_client_def(builder)
+            helpers[OBSERVE_CLIENT_HELPER] = self.__helpers.build_observe_client_def(builder)
+
+        if not self.__loopback:
+            return
+
+        if any(isinstance(method, VoidMethodInfo) for method in methods) and LOOPBACK_PUBLISHER_HELPER not in helpers:
+            helpers[LOOPBACK_PUBLISHER_HELPER] = self.__helpers.build_loopback_publisher_def(builder)
+
+        if any(isinstance(method, ReplyingMethodInfo) for method in methods) and LOOPBACK_CALLER_HELPER not in helpers:
+            helpers[LOOPBACK_CALLER_HELPER] = self.__helpers.build_loopback_caller_def(builder)
+
+    def __build_client_caller_wrapper(
+        self,
+        builder: ASTBuilder,
+        method: MethodInfo,
+        caller: ast.expr,
+        observer: ast.expr,
+    ) -> ast.expr:
+        if isinstance(method, ReplyingMethodInfo) and method.coalesce is not None:
+            caller = builder.build_call(
+                func=builder.build_name(COALESCING_CALLER_HELPER),
+                args=[caller],
+                kwargs={
+                    "cache_ttl": builder.build_const(method.coalesce.cache_ttl),
+                    "cache_max_size": builder.build_const(method.coalesce.cache_max_size),
+                },
+            )
+
+        # NOTE: observer wraps coalescing caller, so it sees calls as client does (e.g. fast cache hits).
+        if self.__instrument:
+            caller = builder.build_call(
+                func=builder.build_name(OBSERVE_CLIENT_HELPER),
+                args=[builder.build_const(method.qualname), caller, observer],
+            )
+
+        return caller
+
+    def __build_observer_args(self, builder: ASTBuilder) -> t.Sequence[FuncArgInfo]:
+        if not self.__instrument:
+            return []
+
+        return [
+            builder.build_kw_arg(
+                name="observer",
+                annotation=self.__helpers.build_observer_ref(builder),
+                default=builder.build_none_ref(),
+            ),
+        ]
+
     def __build_client_factory_def(
         self,
         context: ServiceContext[BrokRPCContext],
@@ -481,35 +948,120 @@ class BrokRPCModuleGenerator(ProtoVisitorDecorator[BrokRPCContext], LoggerMixin)
     ) -> ast.stmt:
         builder = context.meta.builder
 
+        if self.__lazy_client:
+            # NOTE: publishers & callers are opened by client on first use and closed with the stack.
+            body = builder.build_with_stmt(
+                is_async=True,
+                items=[("stack", builder.build_call(func=self.__build_async_exit_stack(builder)))],
+                body=[
+                    builder.build_yield_stmt(
+                        builder.build_call(
+                            func=builder.build_name(client_name),
+                            kwargs={
+                                "client": builder.build_name("client"),
+                                "stack": builder.build_name("stack"),
+                                **({"observer": builder.build_name("observer")} if self.__instrument else {}),
+                            },
+                        )
+                    )
+                ],
+            )
+
+        else:
+            body = builder.build_with_stmt(
+                is_async=True,
+                items=[
+                    (
+                        method.name,
+                        self.__build_client_caller_factory(
+                            context=context,
+                            client=builder.build_name("client"),
+                            amqp_exchange_options=amqp_exchange_options,
+                            method=method,
+                        ),
+                    )
+                    for method in methods
+                ],
+                body=[
+                    builder.build_yield_stmt(
+                        builder.build_call(
+                            func=builder.build_name(client_name),
+                            kwargs={
+                                method.name: self.__build_client_caller_wrapper(
+                                    builder=builder,
+                                    method=method,
+                                    caller=builder.build_name(method.name),
+                                    observer=builder.build_name("observer"),
+                                )
+                                for method in methods
+                            },
+                        )
+                    )
+                ],
+            )
+
         return builder.build_func_def(
             name=f"create_{camel2snake(service_name)}_client",
             args=[
                 builder.build_pos_arg(
                     name="client",
-                    annotation=builder.build_ref(self.__brokrpc_client),
+                    annotation=builder.build_ref(self.__refs.brokrpc_client),
                 ),
+                *self.__build_observer_args(builder),
             ],
             returns=builder.build_name(client_name),
             is_async=True,
             is_context_manager=True,
+            body=[body],
+        )
+
+    def __build_loopback_client_factory_def(
+        self,
+        context: ServiceContext[BrokRPCContext],
+        service_name: str,
+        client_name: str,
+        methods: t.Sequence[MethodInfo],
+    ) -> ast.stmt:
+        builder = context.meta.builder
+
+        return builder.build_func_def(
+            name=f"create_{camel2snake(service_name)}_loopback_client",
+            args=[
+                builder.build_pos_arg(
+                    name="service",
+                    annotation=builder.build_name(service_name),
+                ),
+                *self.__build_observer_args(builder),
+            ],
+            returns=builder.build_name(client_name),
+            doc="Create client that calls the service in-process through the same serializers (no broker).",
+            is_async=True,
+            is_context_manager=True,
             body=[
-                builder.build_with_stmt(
-                    is_async=True,
-                    items=[
-                        (
-                            method.name,
-                            self.__build_client_caller_factory(context, amqp_exchange_options, method),
-                        )
-                        for method in methods
-                    ],
-                    body=[
-                        builder.build_yield_stmt(
-                            builder.build_call(
-                                func=builder.build_name(client_name),
-                                kwargs={method.name: builder.build_name(method.name) for method in methods},
+                builder.build_yield_stmt(
+                    builder.build_call(
+                        func=builder.build_name(client_name),
+                        kwargs={
+                            method.name: self.__build_client_caller_wrapper(
+                                builder=builder,
+                                method=method,
+                                caller=builder.build_call(
+                                    func=builder.build_name(
+                                        LOOPBACK_PUBLISHER_HELPER
+                                        if isinstance(method, VoidMethodInfo)
+                                        else LOOPBACK_CALLER_HELPER
+                                    ),
+                                    args=[
+                                        builder.build_const(method.qualname),
+                                        self.__build_serializer(context.parent.meta, method),
+                                        self.__build_service_func(builder, method, is_callable=True),
+                                    ],
+                                ),
+                                observer=builder.build_name("observer"),
                             )
-                        )
-                    ],
+                            for method in methods
+                        },
+                    )
                 ),
             ],
         )
@@ -517,18 +1069,19 @@ class BrokRPCModuleGenerator(ProtoVisitorDecorator[BrokRPCContext], LoggerMixin)
     def __build_client_caller_factory(
         self,
         context: ServiceContext[BrokRPCContext],
+        client: ast.expr,
         amqp_exchange_options: t.Optional[AmqpExchangeOptions],
         method: MethodInfo,
     ) -> ast.expr:
         builder = context.meta.builder
 
         routing_key = builder.build_const(method.qualname)
-        serializer = self.__build_serializer(builder, method)
-        exchange = self.__build_exchange_options(builder, amqp_exchange_options)
+        serializer = self.__build_serializer(context.parent.meta, method)
+        exchange = self.__build_exchange_options(context.parent.meta, context.name, amqp_exchange_options)
 
         if isinstance(method, VoidMethodInfo):
             return builder.build_call(
-                func=builder.build_name("client", "publisher"),
+                func=ast.Attribute(value=client, attr="publisher"),
                 kwargs={
                     "routing_key": routing_key,
                     "serializer": serializer,
@@ -538,7 +1091,7 @@ class BrokRPCModuleGenerator(ProtoVisitorDecorator[BrokRPCContext], LoggerMixin)
 
         elif isinstance(method, ReplyingMethodInfo):
             return builder.build_call(
-                func=builder.build_name("client", "unary_unary_caller"),
+                func=ast.Attribute(value=client, attr="unary_unary_caller"),
                 kwargs={
                     "routing_key": routing_key,
                     "serializer": serializer,
@@ -549,17 +1102,49 @@ class BrokRPCModuleGenerator(ProtoVisitorDecorator[BrokRPCContext], LoggerMixin)
         else:
             t.assert_never(method)
 
-    def __build_serializer(self, builder: ASTBuilder, method: MethodInfo) -> ast.expr:
+    def __build_async_exit_stack(self, builder: ASTBuilder) -> ast.expr:
+        return builder.build_ref(TypeInfo.build(builder.contextlib_module, "AsyncExitStack"))
+
+    def __build_constant(self, scope: BrokRPCContext, name: str, value: ast.expr) -> ast.expr:
+        """Get module level constant with the value, constants are deduplicated by value."""
+
+        builder = scope.builder
+        key = ast.dump(value)
+
+        const_name = scope.constant_names.get(key)
+        if const_name is None:
+            const_name = base_name = f"_{name.upper()}"
+            index = 1
+            while const_name in scope.constants:
+                const_name = f"{base_name}_{index}"
+                index += 1
+
+            scope.constants[const_name] = builder.build_attr_assign(const_name, value=value)
+            scope.constant_names[key] = const_name
+
+        return builder.build_name(const_name)
+
+    def __build_serializer(self, scope: BrokRPCContext, method: MethodInfo) -> ast.expr:
+        builder = scope.builder
+
         if isinstance(method, VoidMethodInfo):
-            return builder.build_call(
-                func=builder.build_ref(self.__brokrpc_serializer),
-                args=[method.server_input],
+            return self.__build_constant(
+                scope,
+                f"{_get_ref_name(method.server_input)}_serializer",
+                builder.build_call(
+                    func=builder.build_ref(self.__refs.brokrpc_serializer),
+                    args=[method.server_input],
+                ),
             )
 
         elif isinstance(method, ReplyingMethodInfo):
-            return builder.build_call(
-                func=builder.build_ref(self.__brokrpc_rpc_serializer),
-                args=[method.server_input, method.server_output],
+            return self.__build_constant(
+                scope,
+                f"{_get_ref_name(method.server_input)}_{_get_ref_name(method.server_output)}_serializer",
+                builder.build_call(
+                    func=builder.build_ref(self.__refs.brokrpc_rpc_serializer),
+                    args=[method.server_input, method.server_output],
+                ),
             )
 
         else:
@@ -567,30 +1152,38 @@ class BrokRPCModuleGenerator(ProtoVisitorDecorator[BrokRPCContext], LoggerMixin)
 
     def __build_exchange_options(
         self,
-        builder: ASTBuilder,
+        scope: BrokRPCContext,
+        service_name: str,
         amqp_exchange_options: t.Optional[AmqpExchangeOptions],
     ) -> ast.expr:
+        builder = scope.builder
+
         if amqp_exchange_options is None:
             return builder.build_none_ref()
 
-        return builder.build_call(
-            func=builder.build_ref(self.__brokrpc_exchange_options),
-            kwargs={
-                "name": builder.build_const(
-                    amqp_exchange_options.name if amqp_exchange_options.HasField("name") else None
-                ),
-                "type": builder.build_const(
-                    self.__brokrpc_exchange_type_map[amqp_exchange_options.type]
-                    if amqp_exchange_options.HasField("type")
-                    else None
-                ),
-                "durable": builder.build_const(
-                    amqp_exchange_options.durable if amqp_exchange_options.HasField("durable") else None
-                ),
-                "auto_delete": builder.build_const(
-                    amqp_exchange_options.auto_delete if amqp_exchange_options.HasField("auto_delete") else None
-                ),
-            },
+        return self.__build_constant(
+            scope,
+            f"{camel2snake(service_name)}_exchange_options",
+            builder.build_call(
+                func=builder.build_ref(self.__refs.brokrpc_exchange_options),
+                kwargs={
+                    "name": builder.build_const(
+                        amqp_exchange_options.name if amqp_exchange_options.HasField("name") else None
+                    ),
+                    "type": builder.build_const(
+                        self.__brokrpc_exchange_type_map[amqp_exchange_options.type]
+                        if amqp_exchange_options.HasField("type")
+                        else None
+                    ),
+                    "durable": builder.build_const(
+                        amqp_exchange_options.durable if amqp_exchange_options.HasField("durable") else None
+                    ),
+                    "auto_delete": builder.build_const(
+                        amqp_exchange_options.auto_delete if amqp_exchange_options.HasField("auto_delete") else None
+                    ),
+                    **self.__build_broker_arguments(builder, amqp_exchange_options),
+                },
+            ),
         )
 
     def __build_queue_options(
@@ -598,98 +1191,79 @@ class BrokRPCModuleGenerator(ProtoVisitorDecorator[BrokRPCContext], LoggerMixin)
         builder: ASTBuilder,
         method_qualname: str,
         amqp_queue_options: t.Optional[AmqpQueueOptions],
+        prefetch_count: t.Optional[int],
     ) -> ast.expr:
-        return builder.build_call(
-            func=builder.build_ref(self.__brokrpc_queue_options),
-            kwargs={
-                "name": builder.build_const(
-                    amqp_queue_options.name
-                    if amqp_queue_options is not None and amqp_queue_options.HasField("name")
-                    else method_qualname
-                ),
-                "durable": builder.build_const(
-                    amqp_queue_options.durable
-                    if amqp_queue_options is not None and amqp_queue_options.HasField("durable")
-                    else None
-                ),
-                "exclusive": builder.build_const(
-                    amqp_queue_options.exclusive
-                    if amqp_queue_options is not None and amqp_queue_options.HasField("exclusive")
-                    else None
-                ),
-                "auto_delete": builder.build_const(
-                    amqp_queue_options.auto_delete
-                    if amqp_queue_options is not None and amqp_queue_options.HasField("auto_delete")
-                    else None
-                ),
-            },
-        )
-
-    @cached_property
-    def __brokrpc(self) -> PackageInfo:
-        return PackageInfo(None, "brokrpc")
-
-    @cached_property
-    def __brokrpc_rpc(self) -> PackageInfo:
-        return PackageInfo(self.__brokrpc, "rpc")
-
-    @cached_property
-    def __brokrpc_consumer(self) -> TypeInfo:
-        return TypeInfo.build(ModuleInfo(self.__brokrpc, "abc"), "Consumer")
-
-    @cached_property
-    def __brokrpc_consumer_result(self) -> TypeInfo:
-        return TypeInfo.build(ModuleInfo(self.__brokrpc, "model"), "ConsumerResult")
-
-    @cached_property
-    def __brokrpc_publisher(self) -> TypeInfo:
-        return TypeInfo.build(ModuleInfo(self.__brokrpc, "abc"), "Publisher")
-
-    @cached_property
-    def __brokrpc_publisher_result(self) -> TypeInfo:
-        return TypeInfo.build(ModuleInfo(self.__brokrpc, "model"), "PublisherResult")
+        kwargs: dict[str, ast.expr] = {
+            "name": builder.build_const(
+                amqp_queue_options.name
+                if amqp_queue_options is not None and amqp_queue_options.HasField("name")
+                else method_qualname
+            ),
+            "durable": builder.build_const(
+                amqp_queue_options.durable
+                if amqp_queue_options is not None and amqp_queue_options.HasField("durable")
+                else None
+            ),
+            "exclusive": builder.build_const(
+                amqp_queue_options.exclusive
+                if amqp_queue_options is not None and amqp_queue_options.HasField("exclusive")
+                else None
+            ),
+            "auto_delete": builder.build_const(
+                amqp_queue_options.auto_delete
+                if amqp_queue_options is not None and amqp_queue_options.HasField("auto_delete")
+                else None
+            ),
+        }
 
-    @cached_property
-    def __brokrpc_server(self) -> TypeInfo:
-        return TypeInfo.build(ModuleInfo(self.__brokrpc_rpc, "server"), "Server")
+        # NOTE: `prefetch_count` is set only when it's configured, so generated code works with brokrpc versions
+        # without this queue option.
+        if prefetch_count is not None:
+            kwargs["prefetch_count"] = builder.build_const(prefetch_count)
 
-    @cached_property
-    def __brokrpc_client(self) -> TypeInfo:
-        return TypeInfo.build(ModuleInfo(self.__brokrpc_rpc, "client"), "Client")
+        kwargs.update(self.__build_broker_arguments(builder, amqp_queue_options))
 
-    @cached_property
-    def __brokrpc_caller(self) -> TypeInfo:
-        return TypeInfo.build(ModuleInfo(self.__brokrpc_rpc, "abc"), "Caller")
+        return builder.build_call(func=builder.build_ref(self.__refs.brokrpc_queue_options), kwargs=kwargs)
 
-    @cached_property
-    def __brokrpc_message(self) -> TypeInfo:
-        return TypeInfo.build(ModuleInfo(self.__brokrpc, "message"), "Message")
+    def __build_broker_arguments(
+        self,
+        builder: ASTBuilder,
+        options: t.Union[AmqpExchangeOptions, AmqpQueueOptions, None],
+    ) -> t.Mapping[str, ast.expr]:
+        arguments = (
+            [(key, value) for key, value in sorted(options.arguments.items()) if key not in _CODEGEN_ARGUMENTS]
+            if options is not None
+            else []
+        )
+        if not arguments:
+            return {}
 
-    @cached_property
-    def __brokrpc_request(self) -> TypeInfo:
-        return TypeInfo.build(ModuleInfo(self.__brokrpc_rpc, "model"), "Request")
+        return {
+            "arguments": builder.build_dict_expr(
+                *((builder.build_const(key), self.__build_argument_value(builder, value)) for key, value in arguments)
+            ),
+        }
 
-    @cached_property
-    def __brokrpc_response(self) -> TypeInfo:
-        return TypeInfo.build(ModuleInfo(self.__brokrpc_rpc, "model"), "Response")
+    def __build_argument_value(self, builder: ASTBuilder, value: AmqpArgumentValue) -> ast.expr:
+        kind = value.WhichOneof("value")
 
-    @cached_property
-    def __brokrpc_serializer(self) -> TypeInfo:
-        return TypeInfo.build(ModuleInfo(PackageInfo(self.__brokrpc, "serializer"), "protobuf"), "ProtobufSerializer")
+        if kind == "list_value":
+            return builder.build_list_expr(
+                *(self.__build_argument_value(builder, item) for item in value.list_value.items)
+            )
 
-    @cached_property
-    def __brokrpc_rpc_serializer(self) -> TypeInfo:
-        return TypeInfo.build(
-            ModuleInfo(PackageInfo(self.__brokrpc, "serializer"), "protobuf"), "RPCProtobufSerializer"
-        )
+        if kind == "map_value":
+            return builder.build_dict_expr(
+                *(
+                    (builder.build_const(key), self.__build_argument_value(builder, item))
+                    for key, item in sorted(value.map_value.items.items())
+                )
+            )
 
-    @cached_property
-    def __brokrpc_exchange_options(self) -> TypeInfo:
-        return TypeInfo.build(ModuleInfo(self.__brokrpc, "options"), "ExchangeOptions")
+        if kind is None or kind == "null_value":
+            return builder.build_none_ref()
 
-    @cached_property
-    def __brokrpc_queue_options(self) -> TypeInfo:
-        return TypeInfo.build(ModuleInfo(self.__brokrpc, "options"), "QueueOptions")
+        return builder.build_const(getattr(value, kind))
 
     @cached_property
     def __brokrpc_exchange_type_map(self) -> t.Mapping[int, t.Optional[str]]:
@@ -704,3 +1278,108 @@ class BrokRPCModuleGenerator(ProtoVisitorDecorator[BrokRPCContext], LoggerMixin)
     @cached_property
     def __brokrpc_consumer_void(self) -> MessageInfo:
         return MessageInfo.from_type(AmqpConsumerVoid)
+
+
+def _get_prefetch_count(options: t.Union[AmqpExchangeOptions, AmqpQueueOptions, None]) -> t.Optional[int]:
+    if options is None or _PREFETCH_COUNT_ARGUMENT not in options.arguments:
+        return None
+
+    value = options.arguments[_PREFETCH_COUNT_ARGUMENT]
+    if value.WhichOneof("value") != "int_value" or value.int_value < 0:
+        msg = "prefetch count must be a non negative int value"
+        raise ValueError(msg, value)
+
+    return int(value.int_value)
+
+
+def _get_batch_info(options: t.Optional[AmqpQueueOptions]) -> t.Optional[BatchInfo]:
+    if options is None or _BATCH_MAX_SIZE_ARGUMENT not in options.arguments:
+        if options is not None and _BATCH_MAX_DELAY_ARGUMENT in options.arguments:
+            msg = "batch max delay can't be set without batch max size"
+            raise ValueError(msg, options)
+
+        return None
+
+    max_size = options.arguments[_BATCH_MAX_SIZE_ARGUMENT]
+    if max_size.WhichOneof("value") != "int_value" or max_size.int_value <= 0:
+        msg = "batch max size must be a positive int value"
+        raise ValueError(msg, max_size)
+
+    if _BATCH_MAX_DELAY_ARGUMENT not in options.arguments:
+        return BatchInfo(max_size=int(max_size.int_value), max_delay=_DEFAULT_BATCH_MAX_DELAY)
+
+    max_delay = options.arguments[_BATCH_MAX_DELAY_ARGUMENT]
+    value = _get_number(max_delay)
+    if value is None or value < 0:
+        msg = "batch max delay must be a non negative number of seconds"
+        raise ValueError(msg, max_delay)
+
+    return BatchInfo(max_size=int(max_size.int_value), max_delay=value)
+
+
+def _get_coalesce_info(options: t.Optional[AmqpQueueOptions]) -> t.Optional[CoalesceInfo]:
+    if options is None:
+        return None
+
+    arguments = options.arguments
+    has_cache = _CACHE_TTL_ARGUMENT in arguments or _CACHE_MAX_SIZE_ARGUMENT in arguments
+
+    if _COALESCE_ARGUMENT in arguments:
+        coalesce = arguments[_COALESCE_ARGUMENT]
+        if coalesce.WhichOneof("value") != "bool_value":
+            msg = "coalesce must be a bool value"
+            raise ValueError(msg, coalesce)
+
+        if not coalesce.bool_value and has_cache:
+            msg = "response cache can't be used without coalescing"
+            raise ValueError(msg, options)
+
+        if not coalesce.bool_value:
+            return None
+
+    elif not has_cache:
+        return None
+
+    return _get_cache_info(options)
+
+
+def _get_cache_info(options: AmqpQueueOptions) -> CoalesceInfo:
+    arguments = options.arguments
+
+    if _CACHE_TTL_ARGUMENT not in arguments:
+        if _CACHE_MAX_SIZE_ARGUMENT in arguments:
+            msg = "cache max size can't be set without cache ttl"
+            raise ValueError(msg, options)
+
+        return CoalesceInfo(cache_ttl=0.0, cache_max_size=0)
+
+    cache_ttl = _get_number(arguments[_CACHE_TTL_ARGUMENT])
+    if cache_ttl is None or cache_ttl <= 0:
+        msg = "cache ttl must be a positive number of seconds"
+        raise ValueError(msg, arguments[_CACHE_TTL_ARGUMENT])
+
+    if _CACHE_MAX_SIZE_ARGUMENT not in arguments:
+        return CoalesceInfo(cache_ttl=cache_ttl, cache_max_size=_DEFAULT_CACHE_MAX_SIZE)
+
+    cache_max_size = arguments[_CACHE_MAX_SIZE_ARGUMENT]
+    if cache_max_size.WhichOneof("value") != "int_value" or cache_max_size.int_value <= 0:
+        msg = "cache max size must be a positive int value"
+        raise ValueError(msg, cache_max_size)
+
+    return CoalesceInfo(cache_ttl=cache_ttl, cache_max_size=int(cache_max_size.int_value))
+
+
+def _get_number(value: AmqpArgumentValue) -> t.Optional[float]:
+    kind = value.WhichOneof("value")
+    if kind == "int_value":
+        return float(value.int_value)
+
+    if kind == "float_value":
+        return float(value.float_value)
+
+    return None
+
+
+def _get_ref_name(ref: TypeRef) -> str:
+    name = ref.ns[-1] if isinstance(ref, TypeInfo) else ast.unparse(ref).rsplit(".", maxsplit=1)[-1]
+    return camel2snake(name)
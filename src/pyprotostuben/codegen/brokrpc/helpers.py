@@ -0,0 +1,1197 @@
+"""
+AST builders of helpers (functions & classes) that are added to generated brokrpc modules on demand.
+
+Generated modules don't depend on pyprotostuben at runtime, so helpers are built into each module that needs them.
+"""
+
+import ast
+import typing as t
+from functools import cached_property
+
+from pyprotostuben.python.ast_builder import ASTBuilder, FuncArgInfo
+from pyprotostuben.python.info import ModuleInfo, PackageInfo, TypeInfo
+
+ITERATE_HELPER: t.Final[str] = "_iterate"
+GATHER_HELPER: t.Final[str] = "_gather"
+AS_COMPLETED_HELPER: t.Final[str] = "_as_completed"
+LOOPBACK_PUBLISHER_HELPER: t.Final[str] = "_LoopbackPublisher"
+LOOPBACK_CALLER_HELPER: t.Final[str] = "_LoopbackCaller"
+BATCH_CONSUMER_HELPER: t.Final[str] = "_BatchConsumer"
+OBSERVER_PROTOCOL: t.Final[str] = "RPCObserver"
+OBSERVE_HELPER: t.Final[str] = "_observe"
+OBSERVE_SERVER_HELPER: t.Final[str] = "_observe_server"
+OBSERVE_CLIENT_HELPER: t.Final[str] = "_observe_client"
+OBSERVED_CLIENT_HELPER: t.Final[str] = "_ObservedClient"
+COALESCING_CALLER_HELPER: t.Final[str] = "_CoalescingCaller"
+
+
+class BrokRPCRefs:
+    """Refs to stdlib & brokrpc objects used in generated modules."""
+
+    @cached_property
+    def asyncio(self) -> ModuleInfo:
+        return ModuleInfo(None, "asyncio")
+
+    @cached_property
+    def time(self) -> ModuleInfo:
+        return ModuleInfo(None, "time")
+
+    @cached_property
+    def asyncio_task(self) -> TypeInfo:
+        return TypeInfo.build(self.asyncio, "Task")
+
+    @cached_property
+    def brokrpc(self) -> PackageInfo:
+        return PackageInfo(None, "brokrpc")
+
+    @cached_property
+    def brokrpc_rpc(self) -> PackageInfo:
+        return PackageInfo(self.brokrpc, "rpc")
+
+    @cached_property
+    def brokrpc_consumer(self) -> TypeInfo:
+        return TypeInfo.build(ModuleInfo(self.brokrpc, "abc"), "Consumer")
+
+    @cached_property
+    def brokrpc_consumer_result(self) -> TypeInfo:
+        return TypeInfo.build(ModuleInfo(self.brokrpc, "model"), "ConsumerResult")
+
+    @cached_property
+    def brokrpc_publisher(self) -> TypeInfo:
+        return TypeInfo.build(ModuleInfo(self.brokrpc, "abc"), "Publisher")
+
+    @cached_property
+    def brokrpc_publisher_result(self) -> TypeInfo:
+        return TypeInfo.build(ModuleInfo(self.brokrpc, "model"), "PublisherResult")
+
+    @cached_property
+    def brokrpc_server(self) -> TypeInfo:
+        return TypeInfo.build(ModuleInfo(self.brokrpc_rpc, "server"), "Server")
+
+    @cached_property
+    def brokrpc_client(self) -> TypeInfo:
+        return TypeInfo.build(ModuleInfo(self.brokrpc_rpc, "client"), "Client")
+
+    @cached_property
+    def brokrpc_caller(self) -> TypeInfo:
+        return TypeInfo.build(ModuleInfo(self.brokrpc_rpc, "abc"), "Caller")
+
+    @cached_property
+    def brokrpc_message(self) -> TypeInfo:
+        return TypeInfo.build(ModuleInfo(self.brokrpc, "message"), "Message")
+
+    @cached_property
+    def brokrpc_app_message(self) -> TypeInfo:
+        return TypeInfo.build(ModuleInfo(self.brokrpc, "message"), "AppMessage")
+
+    @cached_property
+    def brokrpc_abc_serializer(self) -> TypeInfo:
+        return TypeInfo.build(ModuleInfo(self.brokrpc, "abc"), "Serializer")
+
+    @cached_property
+    def brokrpc_abc_rpc_serializer(self) -> TypeInfo:
+        return TypeInfo.build(ModuleInfo(self.brokrpc_rpc, "abc"), "RPCSerializer")
+
+    @cached_property
+    def brokrpc_request(self) -> TypeInfo:
+        return TypeInfo.build(ModuleInfo(self.brokrpc_rpc, "model"), "Request")
+
+    @cached_property
+    def brokrpc_response(self) -> TypeInfo:
+        return TypeInfo.build(ModuleInfo(self.brokrpc_rpc, "model"), "Response")
+
+    @cached_property
+    def brokrpc_serializer(self) -> TypeInfo:
+        return TypeInfo.build(ModuleInfo(PackageInfo(self.brokrpc, "serializer"), "protobuf"), "ProtobufSerializer")
+
+    @cached_property
+    def brokrpc_rpc_serializer(self) -> TypeInfo:
+        return TypeInfo.build(ModuleInfo(PackageInfo(self.brokrpc, "serializer"), "protobuf"), "RPCProtobufSerializer")
+
+    @cached_property
+    def brokrpc_exchange_options(self) -> TypeInfo:
+        return TypeInfo.build(ModuleInfo(self.brokrpc, "options"), "ExchangeOptions")
+
+    @cached_property
+    def brokrpc_queue_options(self) -> TypeInfo:
+        return TypeInfo.build(ModuleInfo(self.brokrpc, "options"), "QueueOptions")
+
+
+class BrokRPCHelperBuilder:
+    def __init__(self, refs: BrokRPCRefs) -> None:
+        self.__refs = refs
+
+    def build_iterate_def(self, builder: ASTBuilder) -> ast.stmt:
+        any_ref = self.__build_any_ref(builder)
+
+        return builder.build_func_def(
+            name=ITERATE_HELPER,
+            args=[builder.build_pos_arg(name="items", annotation=self.__build_items_ref(builder))],
+            returns=builder.build_iterator_ref(any_ref, is_async=True),
+            body=[
+                builder.build_if_stmt(
+                    test=builder.build_call(
+                        func=TypeInfo.build(builder.builtins_module, "isinstance"),
+                        args=[builder.build_name("items"), TypeInfo.build(builder.typing_module, "AsyncIterable")],
+                    ),
+                    body=[
+                        builder.build_for_stmt(
+                            target="item",
+                            items=builder.build_name("items"),
+                            body=[builder.build_yield_stmt(builder.build_name("item"))],
+                            is_async=True,
+                        ),
+                    ],
+                    orelse=[
+                        builder.build_for_stmt(
+                            target="item",
+                            items=builder.build_name("items"),
+                            body=[builder.build_yield_stmt(builder.build_name("item"))],
+                        ),
+                    ],
+                ),
+            ],
+            is_async=True,
+        )
+
+    def build_gather_def(self, builder: ASTBuilder) -> ast.stmt:
+        task_ref = builder.build_generic_ref(self.__refs.asyncio_task, self.__build_any_ref(builder))
+
+        # NOTE: next item is taken when a call slot is released, so async iterables (e.g. streams) are consumed
+        # lazily. Calls are run in a task group, so the first failed call cancels the others. Task group raises errors
+        # in exception group, the single error is raised as is, so callers can catch it with `except`.
+        return builder.build_func_def(
+            name=GATHER_HELPER,
+            args=self.__build_helper_args(builder),
+            returns=builder.build_sequence_ref(self.__build_any_ref(builder)),
+            doc=(
+                "Call `func` for each item (up to `max_concurrency` at once), return results in items order, raise the "
+                "error of the first failed call (exception group if several calls failed at once)."
+            ),
+            body=[
+                builder.build_attr_assign(
+                    "limit",
+                    value=builder.build_call(
+                        func=TypeInfo.build(self.__refs.asyncio, "Semaphore"),
+                        args=[builder.build_name("max_concurrency")],
+                    ),
+                ),
+                builder.build_attr_assign(
+                    "tasks",
+                    value=builder.build_list_expr(),
+                    annotation=builder.build_sequence_ref(task_ref, mutable=True),
+                ),
+                builder.build_func_def(
+                    name="release",
+                    args=[builder.build_pos_arg(name="_", annotation=task_ref)],
+                    returns=builder.build_none_ref(),
+                    body=[builder.build_call_stmt(func=builder.build_name("limit", "release"))],
+                ),
+                builder.build_try_stmt(
+                    body=[
+                        builder.build_with_stmt(
+                            is_async=True,
+                            items=[
+                                ("group", builder.build_call(func=TypeInfo.build(self.__refs.asyncio, "TaskGroup")))
+                            ],
+                            body=[
+                                builder.build_for_stmt(
+                                    target="item",
+                                    items=builder.build_call(
+                                        func=builder.build_name(ITERATE_HELPER),
+                                        args=[builder.build_name("items")],
+                                    ),
+                                    body=[
+                                        builder.build_call_stmt(
+                                            func=builder.build_name("limit", "acquire"), is_async=True
+                                        ),
+                                        builder.build_attr_assign(
+                                            "task",
+                                            value=builder.build_call(
+                                                func=builder.build_name("group", "create_task"),
+                                                args=[
+                                                    builder.build_call(
+                                                        func=builder.build_name("func"),
+                                                        args=[builder.build_name("item")],
+                                                    ),
+                                                ],
+                                            ),
+                                        ),
+                                        builder.build_call_stmt(
+                                            func=builder.build_name("task", "add_done_callback"),
+                                            args=[builder.build_name("release")],
+                                        ),
+                                        builder.build_call_stmt(
+                                            func=builder.build_name("tasks", "append"),
+                                            args=[builder.build_name("task")],
+                                        ),
+                                    ],
+                                    is_async=True,
+                                ),
+                            ],
+                        ),
+                    ],
+                    handlers=[
+                        builder.build_except_handler(
+                            types=TypeInfo.build(builder.builtins_module, "BaseExceptionGroup"),
+                            name="err",
+                            body=[
+                                builder.build_if_stmt(
+                                    test=builder.build_compare_expr(
+                                        left=builder.build_call(
+                                            func=TypeInfo.build(builder.builtins_module, "len"),
+                                            args=[builder.build_name("err", "exceptions")],
+                                        ),
+                                        op=ast.Eq(),
+                                        right=builder.build_const(1),
+                                    ),
+                                    body=[
+                                        builder.build_raise_stmt(
+                                            builder.build_subscript_expr(
+                                                builder.build_name("err", "exceptions"),
+                                                builder.build_const(0),
+                                            ),
+                                            cause=builder.build_none_ref(),
+                                        ),
+                                    ],
+                                ),
+                                builder.build_reraise_stmt(),
+                            ],
+                        ),
+                    ],
+                ),
+                builder.build_return_stmt(
+                    builder.build_call(
+                        func=TypeInfo.build(self.__refs.asyncio, "gather"),
+                        args=[builder.build_starred_expr(builder.build_name("tasks"))],
+                        is_async=True,
+                    )
+                ),
+            ],
+            is_async=True,
+        )
+
+    def build_as_completed_def(self, builder: ASTBuilder) -> ast.stmt:
+        any_ref = self.__build_any_ref(builder)
+        wait_stmt = builder.build_attr_assign(
+            builder.build_tuple_expr(builder.build_name("done"), builder.build_name("pending")),
+            value=builder.build_call(
+                func=TypeInfo.build(self.__refs.asyncio, "wait"),
+                args=[builder.build_name("pending")],
+                kwargs={"return_when": TypeInfo.build(self.__refs.asyncio, "FIRST_COMPLETED")},
+                is_async=True,
+            ),
+        )
+        yield_done_stmt = builder.build_for_stmt(
+            target="task",
+            items=builder.build_name("done"),
+            body=[
+                builder.build_yield_stmt(builder.build_call(func=builder.build_name("task", "result"))),
+            ],
+        )
+
+        # NOTE: pending calls are cancelled if the caller stops iteration before all results are yielded.
+        return builder.build_func_def(
+            name=AS_COMPLETED_HELPER,
+            args=self.__build_helper_args(builder),
+            returns=builder.build_iterator_ref(any_ref, is_async=True),
+            doc="Call `func` for each item (up to `max_concurrency` at once), yield results as completed.",
+            body=[
+                builder.build_attr_assign(
+                    "pending",
+                    value=builder.build_call(func=TypeInfo.build(builder.builtins_module, "set")),
+                    annotation=builder.build_generic_ref(
+                        TypeInfo.build(builder.typing_module, "Set"),
+                        builder.build_generic_ref(self.__refs.asyncio_task, any_ref),
+                    ),
+                ),
+                builder.build_try_stmt(
+                    body=[
+                        builder.build_for_stmt(
+                            target="item",
+                            items=builder.build_call(
+                                func=builder.build_name(ITERATE_HELPER),
+                                args=[builder.build_name("items")],
+                            ),
+                            body=[
+                                builder.build_if_stmt(
+                                    test=builder.build_compare_expr(
+                                        left=builder.build_call(
+                                            func=TypeInfo.build(builder.builtins_module, "len"),
+                                            args=[builder.build_name("pending")],
+                                        ),
+                                        op=ast.GtE(),
+                                        right=builder.build_name("max_concurrency"),
+                                    ),
+                                    body=[wait_stmt, yield_done_stmt],
+                                ),
+                                builder.build_call_stmt(
+                                    func=builder.build_name("pending", "add"),
+                                    args=[
+                                        builder.build_call(
+                                            func=TypeInfo.build(self.__refs.asyncio, "ensure_future"),
+                                            args=[
+                                                builder.build_call(
+                                                    func=builder.build_name("func"),
+                                                    args=[builder.build_name("item")],
+                                                ),
+                                            ],
+                                        ),
+                                    ],
+                                ),
+                            ],
+                            is_async=True,
+                        ),
+                        builder.build_while_stmt(
+                            test=builder.build_name("pending"),
+                            body=[wait_stmt, yield_done_stmt],
+                        ),
+                    ],
+                    finalbody=[
+                        builder.build_for_stmt(
+                            target="task",
+                            items=builder.build_name("pending"),
+                            body=[builder.build_call_stmt(func=builder.build_name("task", "cancel"))],
+                        ),
+                    ],
+                ),
+            ],
+            is_async=True,
+        )
+
+    def build_batch_consumer_def(self, builder: ASTBuilder) -> ast.stmt:
+        message_ref = builder.build_generic_ref(self.__refs.brokrpc_message, self.__build_any_ref(builder))
+        results_ref = builder.build_sequence_ref(self.__refs.brokrpc_consumer_result)
+        event_ref = builder.build_ref(TypeInfo.build(self.__refs.asyncio, "Event"))
+
+        # NOTE: all consumers of a batch wait for a single task, it waits for the batch to be full (or for the max
+        # delay) & passes the batch to `func`. The task is shielded, so a cancelled consumer doesn't cancel the batch.
+        return builder.build_class_def(
+            name=BATCH_CONSUMER_HELPER,
+            bases=[
+                builder.build_generic_ref(
+                    self.__refs.brokrpc_consumer, message_ref, self.__refs.brokrpc_consumer_result
+                )
+            ],
+            doc="Consumer that passes messages to `func` in batches of up to `max_size` messages, a batch is passed "
+            "when it's full or `max_delay` seconds passed since its first message. `func` must return a result for "
+            "each message, its error is raised for each message of the batch.",
+            body=[
+                builder.build_init_def(
+                    args=[
+                        builder.build_pos_arg(
+                            name="func",
+                            annotation=builder.build_generic_ref(
+                                TypeInfo.build(builder.typing_module, "Callable"),
+                                builder.build_list_expr(builder.build_sequence_ref(message_ref)),
+                                builder.build_generic_ref(
+                                    TypeInfo.build(builder.typing_module, "Awaitable"),
+                                    results_ref,
+                                ),
+                            ),
+                        ),
+                        builder.build_kw_arg(name="max_size", annotation=builder.build_int_ref()),
+                        builder.build_kw_arg(name="max_delay", annotation=builder.build_float_ref()),
+                    ],
+                    body=[
+                        builder.build_attr_assign("self", "__func", value=builder.build_name("func")),
+                        builder.build_attr_assign("self", "__max_size", value=builder.build_name("max_size")),
+                        builder.build_attr_assign("self", "__max_delay", value=builder.build_name("max_delay")),
+                        builder.build_attr_assign(
+                            "self",
+                            "__messages",
+                            value=builder.build_list_expr(),
+                            annotation=builder.build_sequence_ref(message_ref, mutable=True),
+                        ),
+                        builder.build_attr_assign("self", "__full", value=builder.build_call(func=event_ref)),
+                        builder.build_attr_assign(
+                            "self",
+                            "__batch",
+                            value=builder.build_none_ref(),
+                            annotation=builder.build_optional_ref(
+                                builder.build_generic_ref(self.__refs.asyncio_task, results_ref)
+                            ),
+                        ),
+                    ],
+                ),
+                builder.build_method_def(
+                    name="consume",
+                    args=[builder.build_pos_arg(name="message", annotation=message_ref)],
+                    returns=self.__refs.brokrpc_consumer_result,
+                    body=[
+                        builder.build_if_stmt(
+                            test=builder.build_is_none_expr(builder.build_name("self", "__batch")),
+                            body=[
+                                builder.build_attr_assign("self", "__messages", value=builder.build_list_expr()),
+                                builder.build_attr_assign("self", "__full", value=builder.build_call(func=event_ref)),
+                                builder.build_attr_assign(
+                                    "self",
+                                    "__batch",
+                                    value=builder.build_call(
+                                        func=TypeInfo.build(self.__refs.asyncio, "create_task"),
+                                        args=[
+                                            builder.build_call(
+                                                func=builder.build_name("self", "__flush"),
+                                                args=[
+                                                    builder.build_name("self", "__messages"),
+                                                    builder.build_name("self", "__full"),
+                                                ],
+                                            ),
+                                        ],
+                                    ),
+                                ),
+                            ],
+                        ),
+                        builder.build_attr_assign("batch", value=builder.build_name("self", "__batch")),
+                        builder.build_attr_assign(
+                            "index",
+                            value=builder.build_call(
+                                func=TypeInfo.build(builder.builtins_module, "len"),
+                                args=[builder.build_name("self", "__messages")],
+                            ),
+                        ),
+                        builder.build_call_stmt(
+                            func=builder.build_name("self", "__messages", "append"),
+                            args=[builder.build_name("message")],
+                        ),
+                        builder.build_if_stmt(
+                            test=builder.build_compare_expr(
+                                left=builder.build_call(
+                                    func=TypeInfo.build(builder.builtins_module, "len"),
+                                    args=[builder.build_name("self", "__messages")],
+                                ),
+                                op=ast.GtE(),
+                                right=builder.build_name("self", "__max_size"),
+                            ),
+                            body=[
+                                builder.build_call_stmt(func=builder.build_name("self", "__full", "set")),
+                                builder.build_attr_assign("self", "__batch", value=builder.build_none_ref()),
+                            ],
+                        ),
+                        builder.build_attr_assign(
+                            "results",
+                            value=builder.build_call(
+                                func=TypeInfo.build(self.__refs.asyncio, "shield"),
+                                args=[builder.build_name("batch")],
+                                is_async=True,
+                            ),
+                        ),
+                        builder.build_return_stmt(
+                            builder.build_subscript_expr(builder.build_name("results"), builder.build_name("index"))
+                        ),
+                    ],
+                    is_async=True,
+                ),
+                builder.build_method_def(
+                    name="__flush",
+                    args=[
+                        builder.build_pos_arg(name="messages", annotation=builder.build_sequence_ref(message_ref)),
+                        builder.build_pos_arg(name="full", annotation=event_ref),
+                    ],
+                    returns=results_ref,
+                    body=[
+                        builder.build_with_stmt(
+                            items=[
+                                (
+                                    None,
+                                    builder.build_call(
+                                        func=TypeInfo.build(builder.contextlib_module, "suppress"),
+                                        args=[TypeInfo.build(builder.builtins_module, "TimeoutError")],
+                                    ),
+                                ),
+                            ],
+                            body=[
+                                builder.build_call_stmt(
+                                    func=TypeInfo.build(self.__refs.asyncio, "wait_for"),
+                                    args=[
+                                        builder.build_call(func=builder.build_name("full", "wait")),
+                                        builder.build_name("self", "__max_delay"),
+                                    ],
+                                    is_async=True,
+                                ),
+                            ],
+                        ),
+                        # NOTE: batch is detached on max delay, unless it was detached by consumer when it got full.
+                        builder.build_if_stmt(
+                            test=builder.build_compare_expr(
+                                left=builder.build_name("self", "__messages"),
+                                op=ast.Is(),
+                                right=builder.build_name("messages"),
+                            ),
+                            body=[builder.build_attr_assign("self", "__batch", value=builder.build_none_ref())],
+                        ),
+                        builder.build_attr_assign(
+                            "results",
+                            value=builder.build_call(
+                                func=builder.build_name("self", "__func"),
+                                args=[builder.build_name("messages")],
+                                is_async=True,
+                            ),
+                        ),
+                        # NOTE: each consumer gets a result by its message index, a clear error is better than
+                        # `IndexError` in some of the consumers.
+                        builder.build_if_stmt(
+                            test=builder.build_compare_expr(
+                                left=builder.build_call(
+                                    func=TypeInfo.build(builder.builtins_module, "len"),
+                                    args=[builder.build_name("results")],
+                                ),
+                                op=ast.NotEq(),
+                                right=builder.build_call(
+                                    func=TypeInfo.build(builder.builtins_module, "len"),
+                                    args=[builder.build_name("messages")],
+                                ),
+                            ),
+                            body=[
+                                builder.build_raise_stmt(
+                                    builder.build_call(
+                                        func=TypeInfo.build(builder.builtins_module, "ValueError"),
+                                        args=[
+                                            builder.build_const("batch function must return a result for each message"),
+                                            builder.build_call(
+                                                func=TypeInfo.build(builder.builtins_module, "len"),
+                                                args=[builder.build_name("messages")],
+                                            ),
+                                            builder.build_call(
+                                                func=TypeInfo.build(builder.builtins_module, "len"),
+                                                args=[builder.build_name("results")],
+                                            ),
+                                        ],
+                                    ),
+                                ),
+                            ],
+                        ),
+                        builder.build_return_stmt(builder.build_name("results")),
+                    ],
+                    is_async=True,
+                ),
+            ],
+        )
+
+    def build_coalescing_caller_def(self, builder: ASTBuilder) -> ast.stmt:
+        any_ref = self.__build_any_ref(builder)
+        response_ref = builder.build_generic_ref(self.__refs.brokrpc_response, any_ref)
+        bytes_ref = TypeInfo.build(builder.builtins_module, "bytes")
+        ordered_dict = TypeInfo.build(ModuleInfo(None, "collections"), "OrderedDict")
+        monotonic = TypeInfo.build(self.__refs.time, "monotonic")
+
+        # NOTE: a single call is made for identical requests until it's done, the call is shielded, so a cancelled
+        # caller doesn't cancel the others. Cached responses are shared between callers, they shouldn't be modified.
+        return builder.build_class_def(
+            name=COALESCING_CALLER_HELPER,
+            bases=[builder.build_generic_ref(self.__refs.brokrpc_caller, any_ref, any_ref)],
+            doc="Caller that makes a single call for concurrent identical requests (by serialized request), responses "
+            "are cached for `cache_ttl` seconds (up to `cache_max_size` least recently used ones).",
+            body=[
+                builder.build_init_def(
+                    args=[
+                        builder.build_pos_arg(
+                            name="inner",
+                            annotation=builder.build_generic_ref(self.__refs.brokrpc_caller, any_ref, any_ref),
+                        ),
+                        builder.build_kw_arg(name="cache_ttl", annotation=builder.build_float_ref()),
+                        builder.build_kw_arg(name="cache_max_size", annotation=builder.build_int_ref()),
+                    ],
+                    body=[
+                        builder.build_attr_assign("self", "__inner", value=builder.build_name("inner")),
+                        builder.build_attr_assign("self", "__cache_ttl", value=builder.build_name("cache_ttl")),
+                        builder.build_attr_assign(
+                            "self",
+                            "__cache_max_size",
+                            value=builder.build_name("cache_max_size"),
+                        ),
+                        builder.build_attr_assign(
+                            "self",
+                            "__calls",
+                            value=ast.Dict(keys=[], values=[]),
+                            annotation=builder.build_mapping_ref(
+                                bytes_ref,
+                                builder.build_generic_ref(self.__refs.asyncio_task, response_ref),
+                                mutable=True,
+                            ),
+                        ),
+                        builder.build_attr_assign(
+                            "self",
+                            "__cache",
+                            value=builder.build_call(func=ordered_dict),
+                            annotation=builder.build_generic_ref(
+                                ordered_dict,
+                                bytes_ref,
+                                builder.build_tuple_ref(builder.build_float_ref(), response_ref),
+                            ),
+                        ),
+                    ],
+                ),
+                builder.build_method_def(
+                    name="invoke",
+                    args=[builder.build_pos_arg(name="request", annotation=any_ref)],
+                    returns=response_ref,
+                    body=[
+                        builder.build_attr_assign(
+                            "key",
+                            value=builder.build_call(
+                                func=builder.build_name("request", "SerializeToString"),
+                                kwargs={"deterministic": builder.build_const(value=True)},
+                            ),
+                            annotation=bytes_ref,
+                        ),
+                        builder.build_attr_assign(
+                            "cached",
+                            value=builder.build_call(
+                                func=builder.build_name("self", "__cache", "get"),
+                                args=[builder.build_name("key")],
+                            ),
+                        ),
+                        builder.build_if_stmt(
+                            test=ast.BoolOp(
+                                op=ast.And(),
+                                values=[
+                                    builder.build_compare_expr(
+                                        left=builder.build_name("cached"),
+                                        op=ast.IsNot(),
+                                        right=builder.build_none_ref(),
+                                    ),
+                                    builder.build_compare_expr(
+                                        left=builder.build_subscript_expr(
+                                            builder.build_name("cached"),
+                                            builder.build_const(0),
+                                        ),
+                                        op=ast.Gt(),
+                                        right=builder.build_call(func=monotonic),
+                                    ),
+                                ],
+                            ),
+                            body=[
+                                builder.build_call_stmt(
+                                    func=builder.build_name("self", "__cache", "move_to_end"),
+                                    args=[builder.build_name("key")],
+                                ),
+                                builder.build_return_stmt(
+                                    builder.build_subscript_expr(builder.build_name("cached"), builder.build_const(1))
+                                ),
+                            ],
+                        ),
+                        builder.build_attr_assign(
+                            "call",
+                            value=builder.build_call(
+                                func=builder.build_name("self", "__calls", "get"),
+                                args=[builder.build_name("key")],
+                            ),
+                        ),
+                        builder.build_if_stmt(
+                            test=builder.build_is_none_expr(builder.build_name("call")),
+                            body=[
+                                builder.build_attr_assign(
+                                    "call",
+                                    value=builder.build_call(
+                                        func=TypeInfo.build(self.__refs.asyncio, "create_task"),
+                                        args=[
+                                            builder.build_call(
+                                                func=builder.build_name("self", "__invoke"),
+                                                args=[builder.build_name("key"), builder.build_name("request")],
+                                            ),
+                                        ],
+                                    ),
+                                ),
+                                builder.build_attr_assign(
+                                    builder.build_subscript_expr(
+                                        builder.build_name("self", "__calls"),
+                                        builder.build_name("key"),
+                                    ),
+                                    value=builder.build_name("call"),
+                                ),
+                            ],
+                        ),
+                        builder.build_return_stmt(
+                            builder.build_call(
+                                func=TypeInfo.build(self.__refs.asyncio, "shield"),
+                                args=[builder.build_name("call")],
+                                is_async=True,
+                            )
+                        ),
+                    ],
+                    is_async=True,
+                ),
+                builder.build_method_def(
+                    name="__invoke",
+                    args=[
+                        builder.build_pos_arg(name="key", annotation=bytes_ref),
+                        builder.build_pos_arg(name="request", annotation=any_ref),
+                    ],
+                    returns=response_ref,
+                    body=[
+                        builder.build_try_stmt(
+                            body=[
+                                builder.build_attr_assign(
+                                    "response",
+                                    value=builder.build_call(
+                                        func=builder.build_name("self", "__inner", "invoke"),
+                                        args=[builder.build_name("request")],
+                                        is_async=True,
+                                    ),
+                                ),
+                            ],
+                            finalbody=[
+                                builder.build_call_stmt(
+                                    func=builder.build_name("self", "__calls", "pop"),
+                                    args=[builder.build_name("key")],
+                                ),
+                            ],
+                        ),
+                        builder.build_if_stmt(
+                            test=builder.build_compare_expr(
+                                left=builder.build_name("self", "__cache_max_size"),
+                                op=ast.Gt(),
+                                right=builder.build_const(0),
+                            ),
+                            body=[
+                                builder.build_attr_assign(
+                                    builder.build_subscript_expr(
+                                        builder.build_name("self", "__cache"),
+                                        builder.build_name("key"),
+                                    ),
+                                    value=builder.build_tuple_expr(
+                                        ast.BinOp(
+                                            left=builder.build_call(func=monotonic),
+                                            op=ast.Add(),
+                                            right=builder.build_name("self", "__cache_ttl"),
+                                        ),
+                                        builder.build_name("response"),
+                                    ),
+                                ),
+                                builder.build_call_stmt(
+                                    func=builder.build_name("self", "__cache", "move_to_end"),
+                                    args=[builder.build_name("key")],
+                                ),
+                                builder.build_if_stmt(
+                                    test=builder.build_compare_expr(
+                                        left=builder.build_call(
+                                            func=TypeInfo.build(builder.builtins_module, "len"),
+                                            args=[builder.build_name("self", "__cache")],
+                                        ),
+                                        op=ast.Gt(),
+                                        right=builder.build_name("self", "__cache_max_size"),
+                                    ),
+                                    body=[
+                                        builder.build_call_stmt(
+                                            func=builder.build_name("self", "__cache", "popitem"),
+                                            kwargs={"last": builder.build_const(value=False)},
+                                        ),
+                                    ],
+                                ),
+                            ],
+                        ),
+                        builder.build_return_stmt(builder.build_name("response")),
+                    ],
+                    is_async=True,
+                ),
+            ],
+        )
+
+    def build_observer_protocol_def(self, builder: ASTBuilder) -> ast.stmt:
+        return builder.build_class_def(
+            name=OBSERVER_PROTOCOL,
+            bases=[TypeInfo.build(builder.typing_module, "Protocol")],
+            doc="Observer of client calls & server consumers / handlers, e.g. to measure latency & error rate.",
+            body=[
+                builder.build_method_stub(
+                    name="on_start",
+                    args=[
+                        builder.build_pos_arg(name="qualname", annotation=builder.build_str_ref()),
+                        builder.build_pos_arg(name="size", annotation=builder.build_int_ref()),
+                    ],
+                    returns=builder.build_none_ref(),
+                    doc="Call is started, `size` is the serialized size of the payload.",
+                ),
+                builder.build_method_stub(
+                    name="on_end",
+                    args=[
+                        builder.build_pos_arg(name="qualname", annotation=builder.build_str_ref()),
+                        builder.build_pos_arg(name="duration", annotation=builder.build_float_ref()),
+                        builder.build_pos_arg(
+                            name="error",
+                            annotation=builder.build_optional_ref(
+                                TypeInfo.build(builder.builtins_module, "BaseException")
+                            ),
+                        ),
+                    ],
+                    returns=builder.build_none_ref(),
+                    doc="Call is ended in `duration` seconds, `error` is set if the call failed.",
+                ),
+            ],
+        )
+
+    def build_observe_def(self, builder: ASTBuilder) -> ast.stmt:
+        any_ref = self.__build_any_ref(builder)
+
+        def build_on_end(error: ast.expr) -> ast.stmt:
+            return builder.build_call_stmt(
+                func=builder.build_name("observer", "on_end"),
+                args=[
+                    builder.build_name("qualname"),
+                    ast.BinOp(
+                        left=builder.build_call(func=TypeInfo.build(self.__refs.time, "perf_counter")),
+                        op=ast.Sub(),
+                        right=builder.build_name("start"),
+                    ),
+                    error,
+                ],
+            )
+
+        return builder.build_func_def(
+            name=OBSERVE_HELPER,
+            args=[
+                builder.build_pos_arg(name="observer", annotation=builder.build_name(OBSERVER_PROTOCOL)),
+                builder.build_pos_arg(name="qualname", annotation=builder.build_str_ref()),
+                builder.build_pos_arg(name="func", annotation=self.__build_async_func_ref(builder)),
+                builder.build_pos_arg(name="payload", annotation=any_ref),
+                builder.build_pos_arg(name="size", annotation=builder.build_int_ref()),
+            ],
+            returns=any_ref,
+            doc="Call `func` with the payload & notify the observer when the call starts & ends.",
+            body=[
+                builder.build_call_stmt(
+                    func=builder.build_name("observer", "on_start"),
+                    args=[builder.build_name("qualname"), builder.build_name("size")],
+                ),
+                builder.build_attr_assign(
+                    "start",
+                    value=builder.build_call(func=TypeInfo.build(self.__refs.time, "perf_counter")),
+                ),
+                builder.build_try_stmt(
+                    body=[
+                        builder.build_attr_assign(
+                            "result",
+                            value=builder.build_call(
+                                func=builder.build_name("func"),
+                                args=[builder.build_name("payload")],
+                                is_async=True,
+                            ),
+                        ),
+                    ],
+                    handlers=[
+                        builder.build_except_handler(
+                            types=TypeInfo.build(builder.builtins_module, "BaseException"),
+                            name="err",
+                            body=[build_on_end(builder.build_name("err")), builder.build_reraise_stmt()],
+                        ),
+                    ],
+                ),
+                build_on_end(builder.build_none_ref()),
+                builder.build_return_stmt(builder.build_name("result")),
+            ],
+            is_async=True,
+        )
+
+    def build_observe_server_def(self, builder: ASTBuilder) -> ast.stmt:
+        any_ref = self.__build_any_ref(builder)
+        func_ref = self.__build_async_func_ref(builder)
+
+        # NOTE: server consumers & handlers are not wrapped without observer, so there is no overhead.
+        return builder.build_func_def(
+            name=OBSERVE_SERVER_HELPER,
+            args=[
+                builder.build_pos_arg(name="qualname", annotation=builder.build_str_ref()),
+                builder.build_pos_arg(name="func", annotation=func_ref),
+                builder.build_pos_arg(name="observer", annotation=self.build_observer_ref(builder)),
+            ],
+            returns=func_ref,
+            body=[
+                builder.build_if_stmt(
+                    test=builder.build_is_none_expr(builder.build_name("observer")),
+                    body=[builder.build_return_stmt(builder.build_name("func"))],
+                ),
+                builder.build_func_def(
+                    name="observed",
+                    args=[builder.build_pos_arg(name="message", annotation=any_ref)],
+                    returns=any_ref,
+                    body=[
+                        builder.build_return_stmt(
+                            builder.build_call(
+                                func=builder.build_name(OBSERVE_HELPER),
+                                args=[
+                                    builder.build_name("observer"),
+                                    builder.build_name("qualname"),
+                                    builder.build_name("func"),
+                                    builder.build_name("message"),
+                                    builder.build_call(func=builder.build_name("message", "body", "ByteSize")),
+                                ],
+                                is_async=True,
+                            )
+                        ),
+                    ],
+                    is_async=True,
+                ),
+                builder.build_return_stmt(builder.build_name("observed")),
+            ],
+        )
+
+    def build_observed_client_def(self, builder: ASTBuilder) -> ast.stmt:
+        any_ref = self.__build_any_ref(builder)
+
+        def build_observed_method(name: str, arg: str) -> ast.stmt:
+            return builder.build_method_def(
+                name=name,
+                args=[builder.build_pos_arg(name=arg, annotation=any_ref)],
+                returns=any_ref,
+                body=[
+                    builder.build_return_stmt(
+                        builder.build_call(
+                            func=builder.build_name(OBSERVE_HELPER),
+                            args=[
+                                builder.build_name("self", "__observer"),
+                                builder.build_name("self", "__qualname"),
+                                builder.build_name("self", "__inner", name),
+                                builder.build_name(arg),
+                                builder.build_call(func=builder.build_name(arg, "ByteSize")),
+                            ],
+                            is_async=True,
+                        )
+                    ),
+                ],
+                is_async=True,
+            )
+
+        return builder.build_class_def(
+            name=OBSERVED_CLIENT_HELPER,
+            bases=[
+                builder.build_generic_ref(self.__refs.brokrpc_publisher, any_ref, any_ref),
+                builder.build_generic_ref(self.__refs.brokrpc_caller, any_ref, any_ref),
+            ],
+            doc="Publisher / caller that notifies the observer about each publish / call of the inner one.",
+            body=[
+                builder.build_init_def(
+                    args=[
+                        builder.build_pos_arg(name="qualname", annotation=builder.build_str_ref()),
+                        builder.build_pos_arg(name="inner", annotation=any_ref),
+                        builder.build_pos_arg(name="observer", annotation=builder.build_name(OBSERVER_PROTOCOL)),
+                    ],
+                    body=[
+                        builder.build_attr_assign("self", f"__{name}", value=builder.build_name(name))
+                        for name in ("qualname", "inner", "observer")
+                    ],
+                ),
+                build_observed_method("publish", "message"),
+                build_observed_method("invoke", "request"),
+            ],
+        )
+
+    def build_observe_client_def(self, builder: ASTBuilder) -> ast.stmt:
+        any_ref = self.__build_any_ref(builder)
+
+        # NOTE: client publishers & callers are not wrapped without observer, so there is no overhead.
+        return builder.build_func_def(
+            name=OBSERVE_CLIENT_HELPER,
+            args=[
+                builder.build_pos_arg(name="qualname", annotation=builder.build_str_ref()),
+                builder.build_pos_arg(name="inner", annotation=any_ref),
+                builder.build_pos_arg(name="observer", annotation=self.build_observer_ref(builder)),
+            ],
+            returns=any_ref,
+            body=[
+                builder.build_if_stmt(
+                    test=builder.build_is_none_expr(builder.build_name("observer")),
+                    body=[builder.build_return_stmt(builder.build_name("inner"))],
+                ),
+                builder.build_return_stmt(
+                    builder.build_call(
+                        func=builder.build_name(OBSERVED_CLIENT_HELPER),
+                        args=[
+                            builder.build_name("qualname"),
+                            builder.build_name("inner"),
+                            builder.build_name("observer"),
+                        ],
+                    )
+                ),
+            ],
+        )
+
+    def build_observer_ref(self, builder: ASTBuilder) -> ast.expr:
+        return builder.build_optional_ref(builder.build_name(OBSERVER_PROTOCOL))
+
+    def __build_async_func_ref(self, builder: ASTBuilder) -> ast.expr:
+        any_ref = self.__build_any_ref(builder)
+
+        return builder.build_generic_ref(
+            TypeInfo.build(builder.typing_module, "Callable"),
+            builder.build_list_expr(any_ref),
+            builder.build_generic_ref(TypeInfo.build(builder.typing_module, "Awaitable"), any_ref),
+        )
+
+    def build_loopback_publisher_def(self, builder: ASTBuilder) -> ast.stmt:
+        any_ref = self.__build_any_ref(builder)
+        message_ref = builder.build_generic_ref(self.__refs.brokrpc_message, any_ref)
+
+        return builder.build_class_def(
+            name=LOOPBACK_PUBLISHER_HELPER,
+            bases=[
+                builder.build_generic_ref(self.__refs.brokrpc_publisher, any_ref, self.__refs.brokrpc_publisher_result)
+            ],
+            doc="Publisher that passes messages through the serializer directly to the consumer (no broker).",
+            body=[
+                self.__build_loopback_init(
+                    builder,
+                    serializer=builder.build_generic_ref(
+                        self.__refs.brokrpc_abc_serializer,
+                        message_ref,
+                        builder.build_generic_ref(
+                            self.__refs.brokrpc_message, TypeInfo.build(builder.builtins_module, "bytes")
+                        ),
+                    ),
+                    func_name="consumer",
+                    func=builder.build_generic_ref(
+                        TypeInfo.build(builder.typing_module, "Callable"),
+                        builder.build_list_expr(message_ref),
+                        builder.build_generic_ref(
+                            TypeInfo.build(builder.typing_module, "Awaitable"),
+                            self.__refs.brokrpc_consumer_result,
+                        ),
+                    ),
+                ),
+                builder.build_method_def(
+                    name="publish",
+                    args=[builder.build_pos_arg(name="message", annotation=any_ref)],
+                    returns=self.__refs.brokrpc_publisher_result,
+                    body=[
+                        builder.build_attr_assign(
+                            "packed",
+                            value=builder.build_call(
+                                func=builder.build_name("self", "__serializer", "dump_message"),
+                                args=[self.__build_loopback_message(builder, builder.build_name("message"))],
+                            ),
+                        ),
+                        builder.build_call_stmt(
+                            func=builder.build_name("self", "__consumer"),
+                            args=[
+                                builder.build_call(
+                                    func=builder.build_name("self", "__serializer", "load_message"),
+                                    args=[builder.build_name("packed")],
+                                ),
+                            ],
+                            is_async=True,
+                        ),
+                        builder.build_return_stmt(builder.build_const(value=True)),
+                    ],
+                    is_async=True,
+                ),
+            ],
+        )
+
+    def build_loopback_caller_def(self, builder: ASTBuilder) -> ast.stmt:
+        any_ref = self.__build_any_ref(builder)
+
+        return builder.build_class_def(
+            name=LOOPBACK_CALLER_HELPER,
+            bases=[builder.build_generic_ref(self.__refs.brokrpc_caller, any_ref, any_ref)],
+            doc="Caller that passes requests & responses through the serializer directly to the handler (no broker).",
+            body=[
+                self.__build_loopback_init(
+                    builder,
+                    serializer=builder.build_generic_ref(self.__refs.brokrpc_abc_rpc_serializer, any_ref, any_ref),
+                    func_name="handler",
+                    func=builder.build_generic_ref(
+                        TypeInfo.build(builder.typing_module, "Callable"),
+                        builder.build_list_expr(builder.build_generic_ref(self.__refs.brokrpc_request, any_ref)),
+                        builder.build_generic_ref(TypeInfo.build(builder.typing_module, "Awaitable"), any_ref),
+                    ),
+                ),
+                builder.build_method_def(
+                    name="invoke",
+                    args=[builder.build_pos_arg(name="request", annotation=any_ref)],
+                    returns=builder.build_generic_ref(self.__refs.brokrpc_response, any_ref),
+                    body=[
+                        builder.build_attr_assign(
+                            "packed_request",
+                            value=builder.build_call(
+                                func=builder.build_name("self", "__serializer", "dump_unary_request"),
+                                args=[self.__build_loopback_message(builder, builder.build_name("request"))],
+                            ),
+                        ),
+                        builder.build_attr_assign(
+                            "response",
+                            value=builder.build_call(
+                                func=builder.build_name("self", "__handler"),
+                                args=[
+                                    builder.build_call(
+                                        func=builder.build_name("self", "__serializer", "load_unary_request"),
+                                        args=[builder.build_name("packed_request")],
+                                    ),
+                                ],
+                                is_async=True,
+                            ),
+                        ),
+                        builder.build_attr_assign(
+                            "packed_response",
+                            value=builder.build_call(
+                                func=builder.build_name("self", "__serializer", "dump_unary_response"),
+                                args=[self.__build_loopback_message(builder, builder.build_name("response"))],
+                            ),
+                        ),
+                        builder.build_return_stmt(
+                            builder.build_call(
+                                func=builder.build_name("self", "__serializer", "load_unary_response"),
+                                args=[builder.build_name("packed_response")],
+                            )
+                        ),
+                    ],
+                    is_async=True,
+                ),
+            ],
+        )
+
+    def __build_loopback_init(
+        self,
+        builder: ASTBuilder,
+        serializer: ast.expr,
+        func_name: str,
+        func: ast.expr,
+    ) -> ast.stmt:
+        return builder.build_init_def(
+            args=[
+                builder.build_pos_arg(name="routing_key", annotation=builder.build_str_ref()),
+                builder.build_pos_arg(name="serializer", annotation=serializer),
+                builder.build_pos_arg(name=func_name, annotation=func),
+            ],
+            body=[
+                builder.build_attr_assign("self", f"__{name}", value=builder.build_name(name))
+                for name in ("routing_key", "serializer", func_name)
+            ],
+        )
+
+    def __build_loopback_message(self, builder: ASTBuilder, body: ast.expr) -> ast.expr:
+        return builder.build_call(
+            func=builder.build_ref(self.__refs.brokrpc_app_message),
+            kwargs={"body": body, "routing_key": builder.build_name("self", "__routing_key")},
+        )
+
+    def __build_helper_args(self, builder: ASTBuilder) -> t.Sequence[FuncArgInfo]:
+        any_ref = self.__build_any_ref(builder)
+
+        return [
+            builder.build_pos_arg(
+                name="func",
+                annotation=builder.build_generic_ref(
+                    TypeInfo.build(builder.typing_module, "Callable"),
+                    builder.build_list_expr(any_ref),
+                    builder.build_generic_ref(
+                        TypeInfo.build(builder.typing_module, "Coroutine"),
+                        any_ref,
+                        any_ref,
+                        any_ref,
+                    ),
+                ),
+            ),
+            builder.build_pos_arg(name="items", annotation=self.__build_items_ref(builder)),
+            builder.build_pos_arg(name="max_concurrency", annotation=builder.build_int_ref()),
+        ]
+
+    def __build_items_ref(self, builder: ASTBuilder) -> ast.expr:
+        any_ref = self.__build_any_ref(builder)
+
+        return builder.build_union_ref(
+            builder.build_iterable_ref(any_ref),
+            builder.build_iterable_ref(any_ref, is_async=True),
+        )
+
+    def __build_any_ref(self, builder: ASTBuilder) -> ast.expr:
+        return builder.build_ref(TypeInfo.build(builder.typing_module, "Any"))
@@ -1,45 +1,47 @@
 import typing as t
 from pathlib import Path
 
-from google.protobuf.compiler.plugin_pb2 import CodeGeneratorRequest, CodeGeneratorResponse
+from google.protobuf.compiler.plugin_pb2 import CodeGeneratorResponse
 from google.protobuf.json_format import MessageToJson
 
 from pyprotostuben.logging import LoggerMixin
 from pyprotostuben.protobuf.parser import ParameterParser
+from pyprotostuben.protobuf.request import map_stream, parse_request, read_request_parameter
 
 
 class RequestEchoProtocPlugin(LoggerMixin):
     def run(self, input_: t.IO[bytes], output: t.IO[bytes]) -> None:
-        input_content = input_.read()
-        request = CodeGeneratorRequest.FromString(input_content)
+        # NOTE: input is spooled to a temporary file (unless it is a file already), so `raw` format is written to
+        # destination without keeping the whole request in memory.
+        with map_stream(input_, spool=True) as buffer:
+            parser = ParameterParser()
+            params = parser.parse(read_request_parameter(buffer))
 
-        log = self._log.bind_details(request_file_to_generate=request.file_to_generate)
-        log.debug("request received")
+            format_ = params.get_raw_by_name("format", "raw")
+            dest = Path(params.get_raw_by_name("dest", "request.bin"))
 
-        parser = ParameterParser()
-        params = parser.parse(request.parameter)
+            log = self._log.bind_details(format_=format_, dest=dest)
+            log.debug("request received")
 
-        format_ = params.get_raw_by_name("format", "raw")
-        dest = Path(params.get_raw_by_name("dest", "request.bin"))
+            content: t.Union[bytes, memoryview]
+            if format_ == "raw":
+                content = buffer
 
-        content: bytes
-        if format_ == "raw":
-            content = input_content
+            elif format_ == "binary":
+                content = parse_request(buffer).SerializeToString()
 
-        elif format_ == "binary":
-            content = request.SerializeToString()
+            elif format_ == "json":
+                request = parse_request(buffer)
+                content = MessageToJson(request, preserving_proto_field_name=True, sort_keys=True).encode()
 
-        elif format_ == "json":
-            content = MessageToJson(request, preserving_proto_field_name=True, sort_keys=True).encode()
+            else:
+                msg = "unsupported format"
+                raise ValueError(msg, format_)
 
-        else:
-            msg = "unsupported format"
-            raise ValueError(msg, format_)
+            with dest.open("wb") as fd:
+                fd.write(content)
 
-        with dest.open("wb") as fd:
-            fd.write(content)
-
-        log.info("request handled", dest=dest)
+        log.info("request handled")
 
         output.write(
             CodeGeneratorResponse(
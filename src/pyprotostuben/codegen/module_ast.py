@@ -4,13 +4,14 @@ from dataclasses import dataclass, field
 from pathlib import Path
 
 from google.protobuf.compiler.plugin_pb2 import CodeGeneratorResponse
-from google.protobuf.descriptor_pb2 import GeneratedCodeInfo
+from google.protobuf.descriptor_pb2 import FileDescriptorProto, GeneratedCodeInfo
 
 from pyprotostuben.codegen.abc import ProtoFileGenerator
 from pyprotostuben.logging import LoggerMixin
 from pyprotostuben.protobuf.file import ProtoFile
 from pyprotostuben.protobuf.visitor.abc import ProtoVisitorDecorator
 from pyprotostuben.protobuf.visitor.walker import Walker
+from pyprotostuben.stats import StatsCollector, get_stats_collector
 
 
 @dataclass()
@@ -27,11 +28,18 @@ class ModuleAstProtoFileGenerator(t.Generic[T], ProtoFileGenerator, LoggerMixin)
         self.__walker = Walker(visitor)
 
     def run(self, file: ProtoFile) -> t.Sequence[CodeGeneratorResponse.File]:
+        stats = get_stats_collector()
+
+        with stats.measure("generate", file=str(file.proto_path)):
+            return self.__generate(stats, file)
+
+    def __generate(self, stats: StatsCollector, file: ProtoFile) -> t.Sequence[CodeGeneratorResponse.File]:
         log = self._log.bind_details(file_name=file.name)
         log.debug("proto file received")
 
         context = self.__context_factory(file)
-        self.__walker.walk(file.proto, meta=context)
+        with stats.measure("walk"):
+            self.__walker.walk(file.proto, meta=context)
         log.debug("proto file visited", context=context)
 
         info = GeneratedCodeInfo(
@@ -41,16 +49,46 @@ class ModuleAstProtoFileGenerator(t.Generic[T], ProtoFileGenerator, LoggerMixin)
                 ),
             ],
         )
-        files = [
-            CodeGeneratorResponse.File(
-                name=str(path),
-                content=ast.unparse(module_ast),
-                generated_code_info=info,
+        files: list[CodeGeneratorResponse.File] = []
+        for path, module_ast in context.generated_modules.items():
+            if not module_ast.body:
+                continue
+
+            with stats.measure("unparse"):
+                content = ast.unparse(module_ast)
+
+            files.append(
+                CodeGeneratorResponse.File(
+                    name=str(path),
+                    content=content,
+                    generated_code_info=info,
+                )
             )
-            for path, module_ast in context.generated_modules.items()
-            if module_ast.body
-        ]
+
+        if stats.enabled:
+            _count_definitions(stats, file.proto)
+            stats.count("modules", len(files))
 
         log.info("modules generated", files_len=len(files))
 
         return files
+
+
+def _count_definitions(stats: StatsCollector, proto: FileDescriptorProto) -> None:
+    types = len(proto.enum_type)
+    fields = 0
+    methods = sum(len(service.method) for service in proto.service)
+
+    messages = list(proto.message_type)
+    while messages:
+        message = messages.pop()
+        messages.extend(message.nested_type)
+
+        if not message.options.map_entry:
+            types += 1 + len(message.enum_type)
+            fields += len(message.field)
+
+    stats.count("files")
+    stats.count("types", types)
+    stats.count("fields", fields)
+    stats.count("methods", methods)
@@ -18,11 +18,13 @@ class Pb2AstBuilder:
         mutable: bool,
         all_init_args_optional: bool,
         include_descriptors: bool,
+        compact: bool = False,
     ) -> None:
         self.__inner = inner
         self.__mutable = mutable
         self.__all_init_args_optional = all_init_args_optional
         self.__include_descriptors = include_descriptors
+        self.__compact = compact
 
     def build_enum_def(self, path: t.Sequence[str], doc: t.Optional[str], scope: ScopeInfo) -> ast.stmt:
         # TODO: actual type is not fully compatible with IntEnum.
@@ -30,7 +32,7 @@ class Pb2AstBuilder:
         return self.__inner.build_class_def(
             name=path[-1],
             bases=[self.__protobuf_enum_ref],
-            doc=doc,
+            doc=self.__build_doc(doc),
             # TODO: add EnumDescriptor & base enum wrapper methods: Name, Value, ValueType, items, keys, values
             body=list(chain.from_iterable(value.body for value in scope.enum_values)),
         )
@@ -45,7 +47,7 @@ class Pb2AstBuilder:
             ),
         ]
 
-        if doc:
+        if doc and not self.__compact:
             result.append(self.__inner.build_docstring(doc))
 
         return result
@@ -54,7 +56,7 @@ class Pb2AstBuilder:
         return self.__inner.build_class_def(
             name=path[-1],
             bases=[self.__protobuf_message_ref],
-            doc=doc,
+            doc=self.__build_doc(doc),
             body=list(
                 chain(
                     self.__build_message_nested_body(scope),
@@ -127,7 +129,21 @@ class Pb2AstBuilder:
             ],
         )
 
+    def __build_doc(self, doc: t.Optional[str]) -> t.Optional[str]:
+        return doc if not self.__compact else None
+
     def __build_message_field_stubs(self, scope: ScopeInfo) -> t.Iterable[ast.stmt]:
+        if self.__compact:
+            # NOTE: read only property is the same as final attribute for type checkers, but the stub is much smaller.
+            return (
+                self.__inner.build_attr_stub(
+                    name=field.name,
+                    annotation=field.annotation,
+                    is_final=not self.__mutable,
+                )
+                for field in scope.fields
+            )
+
         return chain.from_iterable(
             (
                 self.__inner.build_property_getter_stub(name=field.name, annotation=field.annotation, doc=field.doc),
@@ -244,11 +260,13 @@ class Pb2GrpcAstBuilder:
         is_sync: bool,
         skip_servicer: bool,
         skip_stub: bool,
+        compact: bool = False,
     ) -> None:
         self.__inner = inner
         self.__is_sync = is_sync
         self.__skip_servicer = skip_servicer
         self.__skip_stub = skip_stub
+        self.__compact = compact
 
     def build_servicer_def(self, name: str, doc: t.Optional[str], scope: ScopeInfo) -> t.Sequence[ast.stmt]:
         if self.__skip_servicer:
@@ -257,7 +275,7 @@ class Pb2GrpcAstBuilder:
         return [
             self.__inner.build_abstract_class_def(
                 name=f"{name}Servicer",
-                doc=doc,
+                doc=self.__build_doc(doc),
                 body=[self.__build_servicer_method_def(method) for method in scope.methods],
             ),
         ]
@@ -290,7 +308,7 @@ class Pb2GrpcAstBuilder:
         return [
             self.__inner.build_class_def(
                 name=f"{name}Stub",
-                doc=doc,
+                doc=self.__build_doc(doc),
                 body=list(
                     chain(
                         (self.__build_stub_init_def(),),
@@ -308,6 +326,9 @@ class Pb2GrpcAstBuilder:
         )
         return self.__inner.build_module(None, body)
 
+    def __build_doc(self, doc: t.Optional[str]) -> t.Optional[str]:
+        return doc if not self.__compact else None
+
     @cached_property
     def __grpc_streaming_generic(self) -> TypeInfo:
         return TypeInfo.build(ModuleInfo(None, "typing"), "Iterator" if self.__is_sync else "AsyncIterator")
@@ -378,7 +399,7 @@ class Pb2GrpcAstBuilder:
                 ),
             ],
             returns=response,
-            doc=method.doc,
+            doc=self.__build_doc(method.doc),
             is_async=not self.__is_sync,
         )
 
@@ -426,7 +447,7 @@ class Pb2GrpcAstBuilder:
                 ),
             ],
             returns=response,
-            doc=info.doc,
+            doc=self.__build_doc(info.doc),
         )
 
     def __build_servicer_method_inout_refs(self, info: MethodInfo) -> tuple[ast.expr, ast.expr]:
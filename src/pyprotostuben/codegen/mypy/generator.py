@@ -31,6 +31,7 @@ from pyprotostuben.protobuf.visitor.model import (
     ServiceContext,
 )
 from pyprotostuben.python.info import ModuleInfo
+from pyprotostuben.stats import get_stats_collector
 
 
 @dataclass()
@@ -94,8 +95,9 @@ class MypyStubAstGenerator(ProtoVisitorDecorator[MypyStubContext], LoggerMixin):
     def leave_file(self, context: FileContext[MypyStubContext]) -> None:
         scope = context.meta
 
-        pb2_module_ast = scope.pb2_builder.build_module(scope)
-        pb2_grpc_module_ast = scope.pb2_grpc_builder.build_module(scope)
+        with get_stats_collector().measure("ast"):
+            pb2_module_ast = scope.pb2_builder.build_module(scope)
+            pb2_grpc_module_ast = scope.pb2_grpc_builder.build_module(scope)
 
         context.meta.generated_modules.update(
             {
@@ -3,14 +3,14 @@ from itertools import chain
 
 from google.protobuf.compiler.plugin_pb2 import CodeGeneratorRequest, CodeGeneratorResponse
 
-from pyprotostuben.codegen.abc import ProtocPlugin, ProtoFileGenerator
+from pyprotostuben.codegen.abc import ContextProtocPlugin, ProtoFileGenerator
 from pyprotostuben.codegen.module_ast import ModuleAstProtoFileGenerator
 from pyprotostuben.codegen.mypy.builder import Pb2AstBuilder, Pb2GrpcAstBuilder
 from pyprotostuben.codegen.mypy.generator import MypyStubAstGenerator, MypyStubContext, MypyStubTrait
 from pyprotostuben.logging import LoggerMixin
 from pyprotostuben.pool.abc import Pool
 from pyprotostuben.pool.process import MultiProcessPool, SingleProcessPool
-from pyprotostuben.protobuf.context import ContextBuilder
+from pyprotostuben.protobuf.context import CodeGeneratorContext, ContextBuilder
 from pyprotostuben.protobuf.file import ProtoFile
 from pyprotostuben.protobuf.parser import CodeGeneratorParameters
 from pyprotostuben.protobuf.registry import TypeRegistry
@@ -18,27 +18,27 @@ from pyprotostuben.python.ast_builder import ASTBuilder, ModuleDependencyResolve
 from pyprotostuben.python.info import ModuleInfo
 
 
-class MypyStubProtocPlugin(ProtocPlugin, LoggerMixin):
+class MypyStubProtocPlugin(ContextProtocPlugin, LoggerMixin):
     def run(self, request: CodeGeneratorRequest) -> CodeGeneratorResponse:
         log = self._log.bind_details(request_file_to_generate=request.file_to_generate)
         log.debug("request received")
 
         with ExitStack() as cm_stack:
             context = ContextBuilder().build(request)
-            factory = MypyStubFactory(context.params, context.registry)
-
-            pool = factory.create_pool(cm_stack)
-            gen = factory.create_generator()
-
-            resp = CodeGeneratorResponse(
-                supported_features=CodeGeneratorResponse.Feature.FEATURE_PROTO3_OPTIONAL,
-                file=chain.from_iterable(pool.run(gen.run, context.files)),
-            )
+            resp = self.generate(context, MypyStubFactory(context.params, context.registry).create_pool(cm_stack))
 
         log.info("request handled")
 
         return resp
 
+    def generate(self, context: CodeGeneratorContext, pool: Pool) -> CodeGeneratorResponse:
+        gen = MypyStubFactory(context.params, context.registry).create_generator()
+
+        return CodeGeneratorResponse(
+            supported_features=CodeGeneratorResponse.Feature.FEATURE_PROTO3_OPTIONAL,
+            file=chain.from_iterable(pool.run(gen.run, context.files)),
+        )
+
 
 class MypyStubFactory(MypyStubTrait):
     """
@@ -65,7 +65,7 @@ class MypyStubFactory(MypyStubTrait):
         return (
             SingleProcessPool()
             if self.__params.has_flag("no-parallel") or self.__params.has_flag("debug")
-            else cm_stack.enter_context(MultiProcessPool.setup())
+            else cm_stack.enter_context(MultiProcessPool.setup(ordered=True))
         )
 
     def create_pb2_module(self, file: ProtoFile) -> ModuleInfo:
@@ -77,6 +77,7 @@ class MypyStubFactory(MypyStubTrait):
             mutable=self.__params.has_flag("message-mutable"),
             all_init_args_optional=self.__params.has_flag("message-all-init-args-optional"),
             include_descriptors=self.__params.has_flag("include-descriptors"),
+            compact=self.__params.has_flag("stub-compact"),
         )
 
     def create_pb2_grpc_module(self, file: ProtoFile) -> ModuleInfo:
@@ -88,6 +89,7 @@ class MypyStubFactory(MypyStubTrait):
             is_sync=self.__params.has_flag("grpc-sync"),
             skip_servicer=self.__params.has_flag("grpc-skip-servicer"),
             skip_stub=self.__params.has_flag("grpc-skip-stub"),
+            compact=self.__params.has_flag("stub-compact"),
         )
 
     # NOTE: this method must be picklable, thus it is public
@@ -0,0 +1,157 @@
+import hashlib
+import json
+import os
+import tempfile
+import typing as t
+from dataclasses import dataclass
+from pathlib import Path
+
+from google.protobuf.compiler.plugin_pb2 import CodeGeneratorResponse
+
+from pyprotostuben.logging import LoggerMixin
+
+# NOTE: temporary files are created with 0600 mode, generated files should be readable by others (as protoc writes).
+_FILE_MODE: t.Final[int] = 0o644
+
+
+@dataclass(frozen=True)
+class OutputResult:
+    written: t.Sequence[str]
+    unchanged: t.Sequence[str]
+    removed: t.Sequence[str]
+
+
+class _ManifestEntry(t.TypedDict):
+    digest: str
+    source: str
+
+
+class _Manifest(t.TypedDict):
+    files: dict[str, _ManifestEntry]
+    runs: dict[str, list[str]]
+
+
+class DirectoryOutputWriter(LoggerMixin):
+    """
+    Writes generated files to the directory instead of sending them back to protoc.
+
+    Only files with changed content are written (atomically), so mtimes of unchanged files are kept and caches of
+    downstream tools (e.g. mypy incremental cache) stay valid. Written files are tracked in a manifest (with their
+    source proto files), so files that are not generated anymore are removed.
+
+    Several protoc / buf runs may write to the same directory (e.g. buf `strategy: directory`), so only files of source
+    protos of the current run are replaced, files of the other sources are kept as is. Sources of each run are tracked
+    by run key as well, so files of sources that are gone since the previous run with the same key are removed.
+    """
+
+    def __init__(self, root: Path, name: str) -> None:
+        self.__root = root
+        self.__manifest_path = root / f".{name}.manifest.json"
+
+    def write(
+        self,
+        files: t.Iterable[CodeGeneratorResponse.File],
+        sources: t.Collection[str],
+        removed_sources: t.Collection[str] = (),
+        run: t.Optional[str] = None,
+    ) -> OutputResult:
+        """
+        Write generated files.
+
+        Files from the manifest that were generated from `sources` (e.g. `file_to_generate` of the request) or from
+        `removed_sources` (proto files that don't exist anymore) are replaced, other files are kept as is. When `run`
+        key is set, sources of the previous run with the same key that are not in `sources` are removed too.
+        """
+
+        log = self._log.bind_details(root=self.__root, run=run)
+        log.debug("started")
+
+        prev_manifest = self.__load_manifest()
+        runs = dict(prev_manifest["runs"])
+        replaced = {*sources, *removed_sources}
+
+        if run is not None:
+            replaced.update(runs.get(run, ()))
+            runs[run] = sorted(sources)
+
+        entries: dict[str, _ManifestEntry] = {
+            name: entry for name, entry in prev_manifest["files"].items() if entry["source"] not in replaced
+        }
+        written: list[str] = []
+        unchanged: list[str] = []
+
+        for file in files:
+            content = file.content.encode()
+            digest = hashlib.sha256(content).hexdigest()
+            path = self.__root / file.name
+
+            if _get_digest(path) == digest:
+                unchanged.append(file.name)
+
+            else:
+                _write_atomic(path, content)
+                written.append(file.name)
+
+            entries[file.name] = {"digest": digest, "source": _get_source(file)}
+
+        removed = [name for name in prev_manifest["files"] if name not in entries]
+        for name in removed:
+            (self.__root / name).unlink(missing_ok=True)
+
+        manifest: _Manifest = {"files": entries, "runs": runs}
+
+        if manifest != prev_manifest:
+            _write_atomic(self.__manifest_path, json.dumps(manifest, indent=2, sort_keys=True).encode())
+
+        log.info("written", written=len(written), unchanged=len(unchanged), removed=len(removed))
+
+        return OutputResult(written=written, unchanged=unchanged, removed=removed)
+
+    def __load_manifest(self) -> _Manifest:
+        try:
+            with self.__manifest_path.open("r") as fd:
+                manifest = json.load(fd)
+
+        except FileNotFoundError:
+            return {"files": {}, "runs": {}}
+
+        if (
+            not isinstance(manifest, dict)
+            or not isinstance(manifest.get("files"), dict)
+            or not isinstance(manifest.get("runs"), dict)
+        ):
+            msg = "invalid manifest"
+            raise TypeError(msg, self.__manifest_path)
+
+        return t.cast(_Manifest, manifest)
+
+
+def _get_source(file: CodeGeneratorResponse.File) -> str:
+    annotations = file.generated_code_info.annotation
+    return annotations[0].source_file if annotations else ""
+
+
+def _get_digest(path: Path) -> t.Optional[str]:
+    try:
+        with path.open("rb") as fd:
+            return hashlib.sha256(fd.read()).hexdigest()
+
+    except FileNotFoundError:
+        return None
+
+
+def _write_atomic(path: Path, content: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as tmp:
+            tmp.write(content)
+
+        tmp_path = Path(tmp_name)
+        tmp_path.chmod(_FILE_MODE)
+        tmp_path.replace(path)
+
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
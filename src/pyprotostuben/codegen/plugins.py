@@ -0,0 +1,10 @@
+import typing as t
+
+from pyprotostuben.codegen.abc import ContextProtocPlugin
+from pyprotostuben.codegen.brokrpc.plugin import BrokRPCProtocPlugin
+from pyprotostuben.codegen.mypy.plugin import MypyStubProtocPlugin
+
+PLUGINS: t.Mapping[str, t.Callable[[], ContextProtocPlugin]] = {
+    "mypy-stub": MypyStubProtocPlugin,
+    "brokrpc": BrokRPCProtocPlugin,
+}
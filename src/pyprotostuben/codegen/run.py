@@ -1,10 +1,24 @@
+import posixpath
 import sys
 import typing as t
+from pathlib import Path
 
-from google.protobuf.compiler.plugin_pb2 import CodeGeneratorRequest, CodeGeneratorResponse
+from google.protobuf.compiler.plugin_pb2 import CodeGeneratorResponse
 
 from pyprotostuben.codegen.abc import ProtocPlugin
+from pyprotostuben.codegen.output import DirectoryOutputWriter
 from pyprotostuben.logging import Logger
+from pyprotostuben.profiling import ProfilingOptions, finish_profiling, profile_process
+from pyprotostuben.protobuf.parser import CodeGeneratorParameters, ParameterParser
+from pyprotostuben.protobuf.request import map_stream, parse_request, read_request_parameter
+from pyprotostuben.stats import (
+    PhaseStatsCollector,
+    dump_stats,
+    dump_trace,
+    format_stats,
+    get_stats_collector,
+    use_stats_collector,
+)
 
 
 def run_codegen(
@@ -14,21 +28,113 @@ def run_codegen(
 ) -> None:
     log = Logger.get(__name__)
 
-    request = CodeGeneratorRequest.FromString(input_.read())
+    with map_stream(input_) as buffer:
+        params = ParameterParser().parse(read_request_parameter(buffer))
+        stats_dest = _get_stats_dest(params)
+        trace_dest = params.get_raw_by_name("trace", "") or None
+        stats = (
+            PhaseStatsCollector(tracing=trace_dest is not None)
+            if stats_dest is not None or trace_dest is not None
+            else get_stats_collector()
+        )
+        profiling = ProfilingOptions.from_params(params)
+        out_dir = params.get_raw_by_name("out-dir", "") or None
+
+        with profile_process(profiling), stats.measure("parse"):
+            request = parse_request(buffer)
 
     log.debug("started", gen=gen)
-    try:
-        response = gen.run(request)
 
-    except Exception as err:
-        log.exception("generator error occurred", exc_info=err)
+    with use_stats_collector(stats), profile_process(profiling):
+        try:
+            with stats.measure("run"):
+                response = gen.run(request)
 
-        response = CodeGeneratorResponse(
-            error=repr(err),
-        )
+            if out_dir is not None and not response.error:
+                response = _write_output(
+                    DirectoryOutputWriter(Path(out_dir), type(gen).__name__),
+                    response,
+                    request.file_to_generate,
+                )
+
+        except Exception as err:
+            log.exception("generator error occurred", exc_info=err)
+
+            response = CodeGeneratorResponse(
+                error=repr(err),
+            )
+
+        log.debug("finished", gen=gen)
+
+        with stats.measure("serialize"):
+            content = response.SerializeToString()
 
-    log.debug("finished", gen=gen)
+        with stats.measure("write"):
+            output.write(content)
 
-    output.write(response.SerializeToString())
+        stats.count("output_bytes", len(content))
+
+    if stats_dest is not None and isinstance(stats, PhaseStatsCollector):
+        _report_stats(stats, stats_dest)
+
+    if trace_dest is not None and isinstance(stats, PhaseStatsCollector):
+        with Path(trace_dest).open("w") as fd:
+            dump_trace(stats.snapshot(), fd)
+
+    if profiling.enabled:
+        finish_profiling(profiling)
 
     log.info("run", gen=gen)
+
+
+def _write_output(
+    writer: DirectoryOutputWriter,
+    response: CodeGeneratorResponse,
+    sources: t.Collection[str],
+) -> CodeGeneratorResponse:
+    stats = get_stats_collector()
+
+    with stats.measure("output"):
+        result = writer.write(response.file, sources, run=_get_run_key(sources))
+
+    stats.count("written_files", len(result.written))
+    stats.count("unchanged_files", len(result.unchanged))
+    stats.count("removed_files", len(result.removed))
+
+    # NOTE: files are written already, so protoc gets no files to write.
+    return CodeGeneratorResponse(supported_features=response.supported_features)
+
+
+def _get_run_key(sources: t.Collection[str]) -> str:
+    """
+    Get output run key from the sources of plugin run.
+
+    Runs of the same directories (e.g. repeated protoc run of a project or buf `strategy: directory` run of a directory)
+    get the same key, so files of protos removed since the previous run are removed from the output directory.
+    """
+
+    return ",".join(sorted({posixpath.dirname(source) for source in sources}))
+
+
+def _get_stats_dest(params: CodeGeneratorParameters) -> t.Optional[str]:
+    """
+    Get stats destination from plugin parameters.
+
+    `stats` flag means stderr, `stats=path.json` means JSON file, no stats are collected by default.
+    """
+
+    if params.has_flag("stats"):
+        return "-"
+
+    return params.get_raw_by_name("stats", "") or None
+
+
+def _report_stats(stats: PhaseStatsCollector, dest: str) -> None:
+    snapshot = stats.snapshot()
+
+    if dest == "-":
+        sys.stderr.write(f"{format_stats(snapshot)}\n")
+        return
+
+    with Path(dest).open("w") as fd:
+        dump_stats(snapshot, fd)
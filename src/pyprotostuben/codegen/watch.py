@@ -0,0 +1,167 @@
+import hashlib
+import shlex
+import subprocess
+import threading
+import typing as t
+from dataclasses import replace
+from pathlib import Path
+
+from google.protobuf.compiler.plugin_pb2 import CodeGeneratorRequest
+from google.protobuf.descriptor_pb2 import FileDescriptorProto
+
+from pyprotostuben.codegen.batch import BatchGenerator, build_request
+from pyprotostuben.logging import Logger, LoggerMixin
+from pyprotostuben.protobuf.context import ContextBuilder
+
+if t.TYPE_CHECKING:
+    from pyprotostuben.protobuf.registry import EnumInfo, MessageInfo
+
+
+class IncrementalGenerator(LoggerMixin):
+    """
+    Regenerates only affected files on each update of proto files.
+
+    Files are affected if their content changed or if they reference a type which module path or kind changed (e.g.
+    type moved to another file or package).
+    """
+
+    def __init__(
+        self,
+        generator: BatchGenerator,
+        file_to_generate: t.Optional[t.Collection[str]] = None,
+        parameter: str = "",
+    ) -> None:
+        self.__generator = generator
+        self.__file_to_generate = file_to_generate
+        self.__parameter = parameter
+        self.__hashes: t.Mapping[str, str] = {}
+        self.__types: t.Mapping[str, t.Union[EnumInfo, MessageInfo]] = {}
+
+    def update(self, files: t.Sequence[FileDescriptorProto]) -> t.Sequence[str]:
+        """Regenerate affected files and return names of them."""
+
+        log = self._log.bind_details(files_len=len(files))
+        log.debug("started")
+
+        hashes = {file.name: _get_hash(file) for file in files}
+        targets = (
+            [name for name in hashes if name in self.__file_to_generate]
+            if self.__file_to_generate is not None
+            else list(hashes)
+        )
+
+        # NOTE: the registry is built once, it is used to find affected files and then it is shared by plugins.
+        context = ContextBuilder().build(build_request(files, targets, self.__parameter))
+        registry = context.registry
+        types = registry.get_user_types()
+
+        changed = {name for name, value in hashes.items() if self.__hashes.get(name) != value}
+        removed = {name for name in self.__hashes if name not in hashes}
+        moved_types = {
+            qualname
+            for qualname in self.__types.keys() | types.keys()
+            if self.__types.get(qualname) != types.get(qualname)
+        }
+
+        affected = changed | {name for qualname in moved_types for name in registry.get_type_dependents(qualname)}
+        file_to_generate = [name for name in targets if name in affected]
+
+        if file_to_generate or removed:
+            self.__generator.generate(
+                context=replace(
+                    context,
+                    request=CodeGeneratorRequest(
+                        file_to_generate=file_to_generate,
+                        parameter=self.__parameter,
+                        proto_file=files,
+                    ),
+                    files=[file for file in context.files if file.proto.name in file_to_generate],
+                ),
+                removed_sources=removed,
+            )
+
+        self.__hashes = hashes
+        self.__types = types
+
+        log.info("updated", file_to_generate=file_to_generate, removed=removed)
+
+        return file_to_generate
+
+
+class PathWatcher:
+    """Polls modification times of files (directories are scanned recursively for files matching the pattern)."""
+
+    def __init__(self, paths: t.Sequence[Path], pattern: str = "*.proto") -> None:
+        self.__paths = paths
+        self.__pattern = pattern
+        self.__state: t.Mapping[Path, tuple[int, int]] = {}
+
+    def poll(self) -> bool:
+        """Check if any of the files was changed, added or removed since the last poll."""
+
+        state = dict(self.__iter_state())
+        changed = state != self.__state
+        self.__state = state
+
+        return changed
+
+    def __iter_state(self) -> t.Iterable[tuple[Path, tuple[int, int]]]:
+        for path in self.__paths:
+            for file in sorted(path.rglob(self.__pattern)) if path.is_dir() else [path]:
+                try:
+                    stat = file.stat()
+
+                except FileNotFoundError:
+                    continue
+
+                yield file, (stat.st_mtime_ns, stat.st_size)
+
+
+# NOTE: watch loop has many settings, no need to add extra class.
+def watch(  # noqa: PLR0913
+    load: t.Callable[[], t.Sequence[FileDescriptorProto]],
+    generator: IncrementalGenerator,
+    descriptor_sets: t.Sequence[Path],
+    watch_paths: t.Sequence[Path] = (),
+    rebuild_cmd: t.Optional[str] = None,
+    interval: float = 0.5,
+    stop: t.Optional[threading.Event] = None,
+) -> None:
+    """
+    Regenerate code on changes of descriptor sets until `stop` is set (forever by default).
+
+    If `rebuild_cmd` is set, it is run on changes of `watch_paths` (e.g. proto source directories) to rebuild the
+    descriptor sets.
+    """
+
+    log = Logger.get(__name__)
+
+    source_watcher = PathWatcher(watch_paths)
+    descriptor_watcher = PathWatcher(descriptor_sets)
+
+    # NOTE: the first poll just remembers the current state of sources, descriptor sets are loaded on the first poll.
+    source_watcher.poll()
+
+    stop = stop if stop is not None else threading.Event()
+
+    while not stop.is_set():
+        if rebuild_cmd is not None and source_watcher.poll():
+            result = subprocess.run(shlex.split(rebuild_cmd), check=False)  # noqa: S603
+            if result.returncode != 0:
+                log.warning("rebuild command failed", rebuild_cmd=rebuild_cmd, returncode=result.returncode)
+                stop.wait(interval)
+                continue
+
+        if descriptor_watcher.poll():
+            try:
+                generator.update(load())
+
+            # NOTE: keep watching, the error may be fixed with the next change of proto files.
+            except Exception as err:
+                log.exception("generation failed", exc_info=err)
+
+        stop.wait(interval)
+
+
+def _get_hash(file: FileDescriptorProto) -> str:
+    return hashlib.sha256(file.SerializeToString(deterministic=True)).hexdigest()
@@ -4,6 +4,8 @@ from multiprocessing.pool import Pool as _PoolImpl
 
 from pyprotostuben.logging import LoggerMixin
 from pyprotostuben.pool.abc import Pool
+from pyprotostuben.profiling import ProfiledFunc, get_profiling_options
+from pyprotostuben.stats import MeasuredFunc, get_stats_collector
 
 U_contra = t.TypeVar("U_contra", contravariant=True)
 V_co = t.TypeVar("V_co", covariant=True)
@@ -21,21 +23,46 @@ class SingleProcessPool(Pool, LoggerMixin):
 
 
 class MultiProcessPool(Pool, LoggerMixin):
+    """
+    Runs the function in worker processes.
+
+    Results are returned as ready by default. If `ordered` is set, results are returned in the order of args (results
+    that are ready ahead of time are buffered), so output doesn't depend on worker timings.
+    """
+
     @classmethod
     @contextmanager
-    def setup(cls) -> t.Iterator["MultiProcessPool"]:
+    def setup(cls, *, ordered: bool = False) -> t.Iterator["MultiProcessPool"]:
         with _PoolImpl() as pool:
-            yield cls(pool)
+            yield cls(pool, ordered=ordered)
 
-    def __init__(self, impl: _PoolImpl) -> None:
+    def __init__(self, impl: _PoolImpl, *, ordered: bool = False) -> None:
         self.__impl = impl
+        self.__ordered = ordered
 
     def run(self, func: t.Callable[[U_contra], V_co], args: t.Iterable[U_contra]) -> t.Iterable[V_co]:
         log = self._log.bind_details(func=func)
         log.debug("started")
 
-        for result in self.__impl.imap_unordered(func=func, iterable=args):
-            self._log.debug("result received")
-            yield result
+        stats = get_stats_collector()
+        profiling = get_profiling_options()
+
+        task = func if profiling is None else ProfiledFunc(func, profiling)
+        # NOTE: `imap` is a streaming reorder buffer: each result is yielded as soon as all previous results are ready.
+        imap = self.__impl.imap if self.__ordered else self.__impl.imap_unordered
+
+        if stats.enabled:
+            # NOTE: workers don't share stats collector with parent process, so stats are sent back with results.
+            measured_task = MeasuredFunc(task, tracing=stats.tracing)
+
+            for result, snapshot in imap(measured_task, args):
+                self._log.debug("result received")
+                stats.merge(snapshot)
+                yield result
+
+        else:
+            for result in imap(task, args):
+                self._log.debug("result received")
+                yield result
 
         log.info("run")
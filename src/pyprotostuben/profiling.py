@@ -0,0 +1,202 @@
+import cProfile
+import os
+import pstats
+import tracemalloc
+import typing as t
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+
+from pyprotostuben.logging import LoggerMixin
+from pyprotostuben.protobuf.parser import CodeGeneratorParameters
+
+U_contra = t.TypeVar("U_contra", contravariant=True)
+V_co = t.TypeVar("V_co", covariant=True)
+
+PROFILE_ENV: t.Final[str] = "PYPROTOSTUBEN_PROFILE"
+TRACEMALLOC_ENV: t.Final[str] = "PYPROTOSTUBEN_TRACEMALLOC"
+SUMMARY_NAME: t.Final[str] = "summary.txt"
+
+
+@dataclass(frozen=True)
+class ProfilingOptions:
+    profile_dir: t.Optional[Path] = None
+    tracemalloc_dir: t.Optional[Path] = None
+    top: int = 30
+    tracemalloc_frames: int = 1
+
+    @classmethod
+    def from_params(cls, params: CodeGeneratorParameters) -> "ProfilingOptions":
+        """Get options from `profile=<dir>` & `tracemalloc=<dir>` plugin parameters or from env variables."""
+
+        profile_dir = params.get_raw_by_name("profile", "") or os.getenv(PROFILE_ENV, "")
+        tracemalloc_dir = params.get_raw_by_name("tracemalloc", "") or os.getenv(TRACEMALLOC_ENV, "")
+
+        return cls(
+            profile_dir=Path(profile_dir) if profile_dir else None,
+            tracemalloc_dir=Path(tracemalloc_dir) if tracemalloc_dir else None,
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.profile_dir is not None or self.tracemalloc_dir is not None
+
+
+class ProcessProfiler(LoggerMixin):
+    """
+    Collects cProfile stats & tracemalloc snapshots of the current process.
+
+    Stats are accumulated over all `profile` sessions of the process and saved to per process files after each
+    session, so nothing is lost when pool workers are terminated.
+    """
+
+    def __init__(self, options: ProfilingOptions, run_id: int, role: str) -> None:
+        self.__options = options
+        self.__pid = os.getpid()
+        self.__name = f"{run_id}-{role}-{self.__pid}"
+        self.__profile = cProfile.Profile() if options.profile_dir is not None else None
+        self.__active = False
+
+    @property
+    def options(self) -> ProfilingOptions:
+        return self.__options
+
+    @property
+    def pid(self) -> int:
+        return self.__pid
+
+    @property
+    def active(self) -> bool:
+        return self.__active
+
+    @contextmanager
+    def profile(self) -> t.Iterator[None]:
+        if self.__active:
+            yield
+            return
+
+        self.__start()
+        try:
+            yield
+
+        finally:
+            self.__stop()
+            self.__dump()
+
+    def discard(self) -> None:
+        """Stop profiling without saving stats, e.g. when profiler is inherited by a forked process."""
+
+        if self.__active and self.__profile is not None:
+            self.__profile.disable()
+
+        self.__active = False
+
+    def __start(self) -> None:
+        # NOTE: tracing is never stopped, because `tracemalloc.stop` clears traces from previous sessions.
+        if self.__options.tracemalloc_dir is not None and not tracemalloc.is_tracing():
+            tracemalloc.start(self.__options.tracemalloc_frames)
+
+        if self.__profile is not None:
+            self.__profile.enable()
+
+        self.__active = True
+
+    def __stop(self) -> None:
+        if self.__profile is not None:
+            self.__profile.disable()
+
+        self.__active = False
+
+    def __dump(self) -> None:
+        profile_dir = self.__options.profile_dir
+        if profile_dir is not None and self.__profile is not None:
+            profile_dir.mkdir(parents=True, exist_ok=True)
+            self.__profile.dump_stats(profile_dir / f"{self.__name}.prof")
+
+        tracemalloc_dir = self.__options.tracemalloc_dir
+        if tracemalloc_dir is not None and tracemalloc.is_tracing():
+            tracemalloc_dir.mkdir(parents=True, exist_ok=True)
+
+            snapshot = tracemalloc.take_snapshot().filter_traces(
+                [tracemalloc.Filter(inclusive=False, filename_pattern=tracemalloc.__file__)]
+            )
+            snapshot.dump(str(tracemalloc_dir / f"{self.__name}.tracemalloc"))
+
+            with (tracemalloc_dir / f"{self.__name}.txt").open("w") as fd:
+                for stat in snapshot.statistics("lineno")[: self.__options.top]:
+                    fd.write(f"{stat}\n")
+
+        self._log.debug("dumped", name=self.__name)
+
+
+class ProfiledFunc(t.Generic[U_contra, V_co]):
+    """Picklable wrapper that profiles the function in `MultiProcessPool` workers."""
+
+    def __init__(self, func: t.Callable[[U_contra], V_co], options: ProfilingOptions) -> None:
+        self.__func = func
+        self.__options = options
+
+    def __call__(self, arg: U_contra) -> V_co:
+        with profile_process(self.__options, role="worker"):
+            return self.__func(arg)
+
+
+_PROFILER: t.Optional[ProcessProfiler] = None
+
+
+def get_profiling_options() -> t.Optional[ProfilingOptions]:
+    """Get options of the profiler that is running in the current process."""
+
+    return _PROFILER.options if _PROFILER is not None and _PROFILER.pid == os.getpid() and _PROFILER.active else None
+
+
+@contextmanager
+def profile_process(options: ProfilingOptions, role: str = "main") -> t.Iterator[None]:
+    global _PROFILER  # noqa: PLW0603
+
+    if not options.enabled:
+        yield
+        return
+
+    if _PROFILER is not None and _PROFILER.pid != os.getpid():
+        # NOTE: forked pool worker inherits profiler of the parent process.
+        _PROFILER.discard()
+        _PROFILER = None
+
+    if _PROFILER is None or _PROFILER.options != options:
+        _PROFILER = ProcessProfiler(options, os.getpid() if role == "main" else os.getppid(), role)
+
+    with _PROFILER.profile():
+        yield
+
+
+def finish_profiling(options: ProfilingOptions) -> None:
+    """Stop profiling of the current process and merge its stats with stats of pool workers into summary files."""
+
+    global _PROFILER  # noqa: PLW0603
+
+    _PROFILER = None
+    if options.tracemalloc_dir is not None:
+        tracemalloc.stop()
+
+    run_id = os.getpid()
+
+    if options.profile_dir is not None:
+        paths = sorted(options.profile_dir.glob(f"{run_id}-*.prof"))
+        if paths:
+            with (options.profile_dir / SUMMARY_NAME).open("w") as fd:
+                pstats.Stats(*(str(path) for path in paths), stream=fd).sort_stats(
+                    pstats.SortKey.CUMULATIVE,
+                ).print_stats(options.top)
+
+    if options.tracemalloc_dir is not None:
+        sizes: dict[str, tuple[int, int]] = {}
+        for path in sorted(options.tracemalloc_dir.glob(f"{run_id}-*.tracemalloc")):
+            for stat in tracemalloc.Snapshot.load(str(path)).statistics("lineno"):
+                key = str(stat.traceback)
+                size, count = sizes.get(key, (0, 0))
+                sizes[key] = (size + stat.size, count + stat.count)
+
+        with (options.tracemalloc_dir / SUMMARY_NAME).open("w") as fd:
+            for key, (size, count) in sorted(sizes.items(), key=lambda item: item[1][0], reverse=True)[: options.top]:
+                fd.write(f"{key}: size={size / 1024:.1f} KiB, count={count}\n")
@@ -1,4 +1,5 @@
 import typing as t
+from collections import defaultdict
 from dataclasses import dataclass, field
 
 from google.protobuf.compiler.plugin_pb2 import CodeGeneratorRequest
@@ -28,6 +29,7 @@ from pyprotostuben.protobuf.visitor.model import (
 )
 from pyprotostuben.protobuf.visitor.walker import Walker
 from pyprotostuben.python.info import ModuleInfo
+from pyprotostuben.stats import get_stats_collector
 
 
 @dataclass(frozen=True)
@@ -43,11 +45,17 @@ class BuildContext:
     files: dict[str, ProtoFile] = field(default_factory=dict)
     types: dict[str, t.Union[EnumInfo, MessageInfo]] = field(default_factory=dict)
     map_entries: dict[str, MapEntryPlaceholder] = field(default_factory=dict)
+    type_dependents: defaultdict[str, set[str]] = field(default_factory=lambda: defaultdict(set))
+    file_dependents: defaultdict[str, set[str]] = field(default_factory=lambda: defaultdict(set))
 
 
 class ContextBuilder(ProtoVisitor[BuildContext], LoggerMixin):
+    def __init__(self, *, index_dependents: bool = True) -> None:
+        self.__index_dependents = index_dependents
+
     def visit_file(self, context: FileContext[BuildContext]) -> None:
         self.__register_file(context)
+        self.__register_dependents(context, (), context.proto.extension)
         self._log.debug("visited", file=context.file)
 
     def visit_enum(self, context: EnumContext[BuildContext]) -> None:
@@ -69,19 +77,29 @@ class ContextBuilder(ProtoVisitor[BuildContext], LoggerMixin):
         else:
             self.__register_message(context)
 
+        self.__register_dependents(context, proto.field, proto.extension)
+
     def visit_oneof(self, _: OneofContext[BuildContext]) -> None:
         pass
 
     def visit_field(self, _: FieldContext[BuildContext]) -> None:
         pass
 
-    def visit_service(self, _: ServiceContext[BuildContext]) -> None:
-        pass
+    def visit_service(self, context: ServiceContext[BuildContext]) -> None:
+        if not self.__index_dependents:
+            return
+
+        dependents = context.meta.type_dependents
+        name = context.root.proto.name
+
+        for method in context.proto.method:
+            dependents[method.input_type].add(name)
+            dependents[method.output_type].add(name)
 
     def visit_method(self, _: MethodContext[BuildContext]) -> None:
         pass
 
-    def visit_extension(self, context: ExtensionContext[BuildContext]) -> None:
+    def visit_extension(self, _: ExtensionContext[BuildContext]) -> None:
         pass
 
     # TODO: speed up with multiprocessing by files
@@ -91,18 +109,52 @@ class ContextBuilder(ProtoVisitor[BuildContext], LoggerMixin):
 
         context = BuildContext()
 
-        walker.walk(*request.proto_file, meta=context)
+        with get_stats_collector().measure("registry"):
+            walker.walk(*request.proto_file, meta=context)
 
         return CodeGeneratorContext(
             request=request,
             params=parser.parse(request.parameter),
             files=[context.files[name] for name in request.file_to_generate],
-            registry=TypeRegistry(context.types, context.map_entries),
+            registry=TypeRegistry(
+                user_types=context.types,
+                map_entries=context.map_entries,
+                type_dependents=context.type_dependents,
+                file_dependents=context.file_dependents,
+            ),
         )
 
     def __register_file(self, context: FileContext[BuildContext]) -> None:
         context.meta.files[context.proto.name] = context.file
 
+        if self.__index_dependents:
+            for dependency in context.proto.dependency:
+                context.meta.file_dependents[dependency].add(context.proto.name)
+
+    # NOTE: references are registered once per file / message rather than in `visit_field`, it's a few times cheaper.
+    def __register_dependents(
+        self,
+        context: t.Union[FileContext[BuildContext], DescriptorContext[BuildContext]],
+        fields: t.Sequence[FieldDescriptorProto],
+        extensions: t.Sequence[FieldDescriptorProto],
+    ) -> None:
+        if not self.__index_dependents:
+            return
+
+        dependents = context.meta.type_dependents
+        name = context.proto.name if isinstance(context, FileContext) else context.root.proto.name
+
+        refs = {proto.type_name for proto in fields}
+        if extensions:
+            refs.update(proto.type_name for proto in extensions)
+            refs.update(proto.extendee for proto in extensions)
+
+        # NOTE: scalar fields have no type name.
+        refs.discard("")
+
+        for ref in refs:
+            dependents[ref].add(name)
+
     def __register_enum(self, context: EnumContext[BuildContext]) -> None:
         qualname, module, ns = self.__build_type(context.root, context)
         type_ = context.meta.types[qualname] = EnumInfo(module, ns)
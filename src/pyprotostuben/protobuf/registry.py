@@ -63,6 +63,8 @@ class TypeRegistry:
         self,
         user_types: t.Mapping[str, t.Union[EnumInfo, MessageInfo]],
         map_entries: t.Mapping[str, MapEntryPlaceholder],
+        type_dependents: t.Optional[t.Mapping[str, t.Collection[str]]] = None,
+        file_dependents: t.Optional[t.Mapping[str, t.Collection[str]]] = None,
     ) -> None:
         self.__scalars: t.Mapping[FieldDescriptorProto.Type.ValueType, ScalarInfo] = self.__build_scalars()
         self.__message_types = {
@@ -72,10 +74,12 @@ class TypeRegistry:
 
         self.__user_types = user_types
         self.__map_entries = map_entries
+        self.__type_dependents: t.Mapping[str, t.Collection[str]] = type_dependents or {}
+        self.__file_dependents: t.Mapping[str, t.Collection[str]] = file_dependents or {}
 
-        assert not (
-            set(self.__iter_field_type_enum()) - (self.__scalars.keys() | self.__message_types)
-        ), "not all possible field types are covered"
+        assert not (set(self.__iter_field_type_enum()) - (self.__scalars.keys() | self.__message_types)), (
+            "not all possible field types are covered"
+        )
         assert not (self.__scalars.keys() & self.__message_types), "field type should be either scalar or message"
 
     def resolve_proto_field(self, field: FieldDescriptorProto) -> ProtoInfo:
@@ -127,6 +131,26 @@ class TypeRegistry:
 
         return MapEntryInfo(map_entry.module, key, value)
 
+    def get_user_types(self) -> t.Mapping[str, t.Union[EnumInfo, MessageInfo]]:
+        return self.__user_types
+
+    def get_map_entries(self) -> t.Mapping[str, MapEntryPlaceholder]:
+        return self.__map_entries
+
+    def get_all_type_dependents(self) -> t.Mapping[str, t.Collection[str]]:
+        return self.__type_dependents
+
+    def get_all_file_dependents(self) -> t.Mapping[str, t.Collection[str]]:
+        return self.__file_dependents
+
+    def get_type_dependents(self, ref: str) -> t.Collection[str]:
+        """Get names of files which fields, map entries, methods or extensions reference the type."""
+        return self.__type_dependents.get(ref, ())
+
+    def get_file_dependents(self, name: str) -> t.Collection[str]:
+        """Get names of files which directly import the file."""
+        return self.__file_dependents.get(name, ())
+
     @classmethod
     def __build_scalars(cls) -> t.Mapping[FieldDescriptorProto.Type.ValueType, ScalarInfo]:
         builtins_module = ModuleInfo(None, "builtins")
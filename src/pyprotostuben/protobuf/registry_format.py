@@ -0,0 +1,327 @@
+"""
+Compact binary format for `TypeRegistry`.
+
+Layout (all integers are little endian, every section is 4 bytes aligned):
+
+* header -- magic, format version and the size of each section
+* string table -- offsets array followed by a single UTF-8 blob, every string is referenced by its index
+* packages -- `(parent index, name index)` records, parents always precede their children
+* modules -- `(package index, name index)` records
+* namespaces -- flat array of string indexes, sliced by user type records
+* user types -- `(kind, qualname index, module index, ns start, ns length)` records
+* map entries -- `(qualname index, module index, key field, value field)` records
+* dependent items -- flat array of file name string indexes, sliced by dependents records
+* type dependents -- `(qualname index, items start, items length)` records
+* file dependents -- `(file name index, items start, items length)` records
+
+Package and module infos are stored once and referenced by index, so loaded registry shares the same info objects
+between all types of one module. `load` accepts any buffer (`bytes`, `mmap`, ...) and reads records in place, thus
+`load_path` does not read the whole file into memory.
+"""
+
+import mmap
+import os
+import struct
+import typing as t
+from pathlib import Path
+
+from google.protobuf.descriptor_pb2 import FieldDescriptorProto
+
+from pyprotostuben.protobuf.registry import (
+    EnumInfo,
+    MapEntryPlaceholder,
+    MessageInfo,
+    RegistryError,
+    TypeRegistry,
+)
+from pyprotostuben.python.info import ModuleInfo, PackageInfo
+
+MAGIC: t.Final[bytes] = b"PPSR"
+VERSION: t.Final[int] = 2
+
+_NONE: t.Final[int] = -1
+_KIND_ENUM: t.Final[int] = 0
+_KIND_MESSAGE: t.Final[int] = 1
+
+_HEADER = struct.Struct("<4sHH10I")
+_OFFSET = struct.Struct("<I")
+_PACKAGE = struct.Struct("<iI")
+_MODULE = struct.Struct("<iI")
+_NS_ITEM = struct.Struct("<I")
+_USER_TYPE = struct.Struct("<IIiII")
+# qualname, module, then `name, number, label, type, type_name` for key & value fields.
+_MAP_ENTRY = struct.Struct("<Ii" + "IIIIi" * 2)
+_DEPENDENT_ITEM = struct.Struct("<I")
+_DEPENDENTS = struct.Struct("<III")
+
+
+class InvalidRegistryFormatError(RegistryError):
+    pass
+
+
+def dumps(registry: TypeRegistry) -> bytes:
+    return _Encoder().encode(registry)
+
+
+def dump(registry: TypeRegistry, fd: t.IO[bytes]) -> None:
+    fd.write(dumps(registry))
+
+
+def load(buffer: t.Union[bytes, bytearray, memoryview, mmap.mmap]) -> TypeRegistry:
+    with memoryview(buffer) as view:
+        try:
+            return _Decoder(view).decode()
+
+        except InvalidRegistryFormatError as err:
+            # NOTE: traceback frames hold views of the buffer, drop them, so the buffer (e.g. mmap) can be released.
+            raise err.with_traceback(None) from None
+
+
+def load_path(path: Path) -> TypeRegistry:
+    with path.open("rb") as fd:
+        # NOTE: empty file can't be mapped.
+        if os.fstat(fd.fileno()).st_size == 0:
+            msg = "empty file"
+            raise InvalidRegistryFormatError(msg, path)
+
+        with mmap.mmap(fd.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            return load(buffer)
+
+
+class _Encoder:
+    def __init__(self) -> None:
+        self.__strings: dict[str, int] = {}
+        self.__packages: dict[PackageInfo, int] = {}
+        self.__package_records: list[tuple[int, int]] = []
+        self.__modules: dict[ModuleInfo, int] = {}
+        self.__module_records: list[tuple[int, int]] = []
+        self.__ns_items: list[int] = []
+        self.__dependent_items: list[int] = []
+
+    def encode(self, registry: TypeRegistry) -> bytes:
+        user_types = [
+            (
+                _KIND_ENUM if isinstance(info, EnumInfo) else _KIND_MESSAGE,
+                self.__add_str(qualname),
+                self.__add_module(info.module),
+                *self.__add_ns(info.ns),
+            )
+            for qualname, info in registry.get_user_types().items()
+        ]
+        map_entries = [
+            (
+                self.__add_str(qualname),
+                self.__add_module(placeholder.module),
+                *self.__add_field(placeholder.key),
+                *self.__add_field(placeholder.value),
+            )
+            for qualname, placeholder in registry.get_map_entries().items()
+        ]
+        type_dependents = [
+            self.__add_dependents(qualname, names) for qualname, names in registry.get_all_type_dependents().items()
+        ]
+        file_dependents = [
+            self.__add_dependents(name, names) for name, names in registry.get_all_file_dependents().items()
+        ]
+
+        blob = b"".join(value.encode() for value in self.__strings)
+        offsets = [0]
+        for value in self.__strings:
+            offsets.append(offsets[-1] + len(value.encode()))
+
+        return b"".join(
+            (
+                _HEADER.pack(
+                    MAGIC,
+                    VERSION,
+                    0,
+                    len(self.__strings),
+                    len(blob),
+                    len(self.__package_records),
+                    len(self.__module_records),
+                    len(self.__ns_items),
+                    len(user_types),
+                    len(map_entries),
+                    len(self.__dependent_items),
+                    len(type_dependents),
+                    len(file_dependents),
+                ),
+                b"".join(_OFFSET.pack(offset) for offset in offsets),
+                blob,
+                bytes(_padding(len(blob))),
+                b"".join(_PACKAGE.pack(*record) for record in self.__package_records),
+                b"".join(_MODULE.pack(*record) for record in self.__module_records),
+                b"".join(_NS_ITEM.pack(item) for item in self.__ns_items),
+                b"".join(_USER_TYPE.pack(*record) for record in user_types),
+                b"".join(_MAP_ENTRY.pack(*record) for record in map_entries),
+                b"".join(_DEPENDENT_ITEM.pack(item) for item in self.__dependent_items),
+                b"".join(_DEPENDENTS.pack(*record) for record in type_dependents),
+                b"".join(_DEPENDENTS.pack(*record) for record in file_dependents),
+            )
+        )
+
+    def __add_str(self, value: str) -> int:
+        return self.__strings.setdefault(value, len(self.__strings))
+
+    def __add_package(self, info: t.Optional[PackageInfo]) -> int:
+        if info is None:
+            return _NONE
+
+        idx = self.__packages.get(info)
+        if idx is None:
+            record = (self.__add_package(info.parent), self.__add_str(info.name))
+            idx = self.__packages[info] = len(self.__package_records)
+            self.__package_records.append(record)
+
+        return idx
+
+    def __add_module(self, info: t.Optional[ModuleInfo]) -> int:
+        if info is None:
+            return _NONE
+
+        idx = self.__modules.get(info)
+        if idx is None:
+            record = (self.__add_package(info.parent), self.__add_str(info.name))
+            idx = self.__modules[info] = len(self.__module_records)
+            self.__module_records.append(record)
+
+        return idx
+
+    def __add_ns(self, ns: t.Sequence[str]) -> tuple[int, int]:
+        start = len(self.__ns_items)
+        self.__ns_items.extend(self.__add_str(part) for part in ns)
+
+        return start, len(ns)
+
+    def __add_dependents(self, key: str, names: t.Collection[str]) -> tuple[int, int, int]:
+        start = len(self.__dependent_items)
+        # NOTE: dependents are collected in sets, sort them to get the same output for the same registry.
+        self.__dependent_items.extend(self.__add_str(name) for name in sorted(names))
+
+        return self.__add_str(key), start, len(names)
+
+    def __add_field(self, field: FieldDescriptorProto) -> tuple[int, int, int, int, int]:
+        return (
+            self.__add_str(field.name),
+            field.number,
+            field.label,
+            field.type,
+            self.__add_str(field.type_name) if field.HasField("type_name") else _NONE,
+        )
+
+
+class _Decoder:
+    def __init__(self, view: memoryview) -> None:
+        self.__view = view
+        self.__offset = 0
+
+    def decode(self) -> TypeRegistry:
+        (
+            magic,
+            version,
+            _,
+            strings_len,
+            blob_len,
+            packages_len,
+            modules_len,
+            ns_items_len,
+            user_types_len,
+            map_entries_len,
+            dependent_items_len,
+            type_dependents_len,
+            file_dependents_len,
+        ) = self.__read(_HEADER)
+
+        if magic != MAGIC:
+            msg = "invalid magic"
+            raise InvalidRegistryFormatError(msg, magic)
+
+        if version != VERSION:
+            msg = "unsupported version"
+            raise InvalidRegistryFormatError(msg, version)
+
+        offsets = [offset for (offset,) in self.__iter_read(_OFFSET, strings_len + 1)]
+        blob = self.__read_bytes(blob_len + _padding(blob_len))
+        strings = [str(blob[start:end], "utf-8") for start, end in zip(offsets, offsets[1:])]
+
+        packages: list[PackageInfo] = []
+        for parent, name in self.__iter_read(_PACKAGE, packages_len):
+            packages.append(PackageInfo(packages[parent] if parent != _NONE else None, strings[name]))
+
+        modules = [
+            ModuleInfo(packages[package] if package != _NONE else None, strings[name])
+            for package, name in self.__iter_read(_MODULE, modules_len)
+        ]
+        ns_items = [strings[idx] for (idx,) in self.__iter_read(_NS_ITEM, ns_items_len)]
+
+        user_types: dict[str, t.Union[EnumInfo, MessageInfo]] = {}
+        for kind, qualname, module, ns_start, ns_len in self.__iter_read(_USER_TYPE, user_types_len):
+            info_type = EnumInfo if kind == _KIND_ENUM else MessageInfo
+            user_types[strings[qualname]] = info_type(
+                modules[module] if module != _NONE else None,
+                ns_items[ns_start : ns_start + ns_len],
+            )
+
+        map_entries: dict[str, MapEntryPlaceholder] = {}
+        for qualname, module, *fields in self.__iter_read(_MAP_ENTRY, map_entries_len):
+            map_entries[strings[qualname]] = MapEntryPlaceholder(
+                module=modules[module],
+                key=self.__build_field(strings, *fields[:5]),
+                value=self.__build_field(strings, *fields[5:]),
+            )
+
+        dependent_items = [strings[idx] for (idx,) in self.__iter_read(_DEPENDENT_ITEM, dependent_items_len)]
+        type_dependents = self.__read_dependents(strings, dependent_items, type_dependents_len)
+        file_dependents = self.__read_dependents(strings, dependent_items, file_dependents_len)
+
+        return TypeRegistry(user_types, map_entries, type_dependents, file_dependents)
+
+    def __read_dependents(
+        self,
+        strings: t.Sequence[str],
+        items: t.Sequence[str],
+        count: int,
+    ) -> t.Mapping[str, t.Collection[str]]:
+        return {
+            strings[key]: tuple(items[start : start + length])
+            for key, start, length in self.__iter_read(_DEPENDENTS, count)
+        }
+
+    def __read_bytes(self, size: int) -> memoryview:
+        end = self.__offset + size
+        if end > len(self.__view):
+            msg = "unexpected end of buffer"
+            raise InvalidRegistryFormatError(msg, end, len(self.__view))
+
+        chunk = self.__view[self.__offset : end]
+        self.__offset = end
+
+        return chunk
+
+    def __read(self, record: struct.Struct) -> tuple[t.Any, ...]:
+        return record.unpack(self.__read_bytes(record.size))
+
+    def __iter_read(self, record: struct.Struct, count: int) -> t.Iterator[tuple[t.Any, ...]]:
+        return record.iter_unpack(self.__read_bytes(record.size * count))
+
+    # NOTE: field descriptor parts are packed in a single record, so there are many args.
+    def __build_field(  # noqa: PLR0913
+        self,
+        strings: t.Sequence[str],
+        name: int,
+        number: int,
+        label: int,
+        type_: int,
+        type_name: int,
+    ) -> FieldDescriptorProto:
+        return FieldDescriptorProto(
+            name=strings[name],
+            number=number,
+            label=t.cast(FieldDescriptorProto.Label.ValueType, label),
+            type=t.cast(FieldDescriptorProto.Type.ValueType, type_),
+            type_name=strings[type_name] if type_name != _NONE else None,
+        )
+
+
+def _padding(size: int) -> int:
+    return -size % 4
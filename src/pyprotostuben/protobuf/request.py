@@ -0,0 +1,139 @@
+import io
+import mmap
+import os
+import shutil
+import stat
+import tempfile
+import typing as t
+from contextlib import contextmanager
+
+from google.protobuf.compiler.plugin_pb2 import CodeGeneratorRequest
+
+_CHUNK_SIZE: t.Final[int] = 1 << 20
+
+_WIRE_VARINT: t.Final[int] = 0
+_WIRE_I64: t.Final[int] = 1
+_WIRE_LEN: t.Final[int] = 2
+_WIRE_I32: t.Final[int] = 5
+
+
+class InvalidRequestBufferError(ValueError):
+    pass
+
+
+@contextmanager
+def map_stream(input_: t.IO[bytes], *, spool: bool = False) -> t.Iterator[memoryview]:
+    """
+    Provide the whole stream content as a memoryview without extra copies.
+
+    Regular files are memory mapped. Other streams (e.g. pipes) are read chunk by chunk into a single buffer, or into
+    a temporary file which is memory mapped then, if `spool` is set.
+    """
+
+    fileno = _get_fileno(input_)
+
+    if fileno is not None and stat.S_ISREG(os.fstat(fileno).st_mode) and input_.tell() == 0:
+        with _map_file(fileno) as view:
+            yield view
+
+    elif spool:
+        with tempfile.TemporaryFile() as spooled:
+            shutil.copyfileobj(input_, spooled, _CHUNK_SIZE)
+            spooled.flush()
+
+            with _map_file(spooled.fileno()) as view:
+                yield view
+
+    else:
+        buffer = bytearray()
+        while chunk := input_.read(_CHUNK_SIZE):
+            buffer += chunk
+
+        with memoryview(buffer) as view:
+            yield view
+
+
+def read_request(input_: t.IO[bytes]) -> CodeGeneratorRequest:
+    with map_stream(input_) as buffer:
+        return parse_request(buffer)
+
+
+def parse_request(buffer: memoryview) -> CodeGeneratorRequest:
+    # NOTE: protobuf parses any bytes-like object, but stubs accept `bytes` only.
+    return CodeGeneratorRequest.FromString(t.cast(bytes, buffer))
+
+
+def read_request_parameter(buffer: memoryview) -> str:
+    """Get `CodeGeneratorRequest.parameter` value from serialized request without parsing the whole message."""
+
+    value = b""
+    pos = 0
+
+    while pos < len(buffer):
+        tag, pos = _read_varint(buffer, pos)
+        field_number, wire_type = tag >> 3, tag & 0x7
+
+        if wire_type == _WIRE_VARINT:
+            _, pos = _read_varint(buffer, pos)
+
+        elif wire_type == _WIRE_I64:
+            pos += 8
+
+        elif wire_type == _WIRE_I32:
+            pos += 4
+
+        elif wire_type == _WIRE_LEN:
+            size, pos = _read_varint(buffer, pos)
+            if field_number == CodeGeneratorRequest.PARAMETER_FIELD_NUMBER:
+                value = bytes(buffer[pos : pos + size])
+
+            pos += size
+
+        else:
+            msg = "unsupported wire type"
+            raise InvalidRequestBufferError(msg, wire_type, pos)
+
+    if pos != len(buffer):
+        msg = "unexpected end of buffer"
+        raise InvalidRequestBufferError(msg, pos, len(buffer))
+
+    return value.decode()
+
+
+def _get_fileno(input_: t.IO[bytes]) -> t.Optional[int]:
+    try:
+        return input_.fileno()
+
+    except (io.UnsupportedOperation, AttributeError, ValueError):
+        return None
+
+
+@contextmanager
+def _map_file(fileno: int) -> t.Iterator[memoryview]:
+    # NOTE: empty file can't be memory mapped.
+    if os.fstat(fileno).st_size == 0:
+        with memoryview(b"") as view:
+            yield view
+
+        return
+
+    with mmap.mmap(fileno, 0, access=mmap.ACCESS_READ) as mapped, memoryview(mapped) as view:
+        yield view
+
+
+def _read_varint(buffer: memoryview, pos: int) -> tuple[int, int]:
+    result = 0
+    shift = 0
+
+    while pos < len(buffer):
+        byte = buffer[pos]
+        pos += 1
+
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, pos
+
+        shift += 7
+
+    msg = "unexpected end of buffer"
+    raise InvalidRequestBufferError(msg, pos)
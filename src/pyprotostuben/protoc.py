@@ -23,3 +23,17 @@ def echo() -> None:
 
     Logger.configure()
     RequestEchoProtocPlugin().run(sys.stdin.buffer, sys.stdout.buffer)
+
+
+def bench() -> None:
+    from pyprotostuben.codegen.bench import main
+
+    Logger.configure()
+    main()
+
+
+def gen() -> None:
+    from pyprotostuben.codegen.batch import main
+
+    Logger.configure()
+    main()
@@ -444,14 +444,42 @@ class ASTBuilder:
         return self.build_init_def(args=args, body=self._build_stub_body(doc), doc=doc)
 
     @t.overload
-    def build_attr_assign(self, head: TypeRef, *, value: TypeRef) -> ast.stmt: ...
+    def build_attr_assign(
+        self,
+        head: TypeRef,
+        *,
+        value: TypeRef,
+        annotation: t.Optional[TypeRef] = None,
+    ) -> ast.stmt: ...
 
     @t.overload
-    def build_attr_assign(self, head: str, *tail: str, value: TypeRef) -> ast.stmt: ...
+    def build_attr_assign(
+        self,
+        head: str,
+        *tail: str,
+        value: TypeRef,
+        annotation: t.Optional[TypeRef] = None,
+    ) -> ast.stmt: ...
+
+    def build_attr_assign(
+        self,
+        head: t.Union[str, TypeRef],
+        *tail: str,
+        value: TypeRef,
+        annotation: t.Optional[TypeRef] = None,
+    ) -> ast.stmt:
+        target = self.build_ref(head) if isinstance(head, (ast.expr, TypeInfo)) else self.build_name(head, *tail)
+
+        if annotation is not None and isinstance(target, (ast.Name, ast.Attribute, ast.Subscript)):
+            return ast.AnnAssign(
+                target=target,
+                annotation=self.build_ref(annotation),
+                value=self.build_ref(value),
+                simple=int(isinstance(target, ast.Name)),
+            )
 
-    def build_attr_assign(self, head: t.Union[str, TypeRef], *tail: str, value: TypeRef) -> ast.stmt:
         return ast.Assign(
-            targets=[self.build_ref(head) if isinstance(head, (ast.expr, TypeInfo)) else self.build_name(head, *tail)],
+            targets=[target],
             value=self.build_ref(value),
             # NOTE: Seems like it is allowed to pass `None`, but ast typing says it's not.
             lineno=t.cast(int, None),
@@ -508,14 +536,14 @@ class ASTBuilder:
     def build_with_stmt(
         self,
         *,
-        items: t.Sequence[tuple[str, TypeRef]],
+        items: t.Sequence[tuple[t.Optional[str], TypeRef]],
         body: t.Sequence[ast.stmt],
         is_async: bool = False,
     ) -> t.Union[ast.With, ast.AsyncWith]:
         with_items = [
             ast.withitem(
                 context_expr=self.build_ref(expr),
-                optional_vars=ast.Name(id=name),
+                optional_vars=ast.Name(id=name) if name is not None else None,
             )
             for name, expr in items
         ]
@@ -536,6 +564,88 @@ class ASTBuilder:
             )
         )
 
+    def build_if_stmt(
+        self,
+        *,
+        test: TypeRef,
+        body: t.Sequence[ast.stmt],
+        orelse: t.Optional[t.Sequence[ast.stmt]] = None,
+    ) -> ast.If:
+        return ast.If(test=self.build_ref(test), body=list(body), orelse=list(orelse or ()))
+
+    def build_is_none_expr(self, value: TypeRef) -> ast.expr:
+        return self.build_compare_expr(left=value, op=ast.Is(), right=self.build_none_ref())
+
+    def build_for_stmt(
+        self,
+        *,
+        target: str,
+        items: TypeRef,
+        body: t.Sequence[ast.stmt],
+        is_async: bool = False,
+    ) -> t.Union[ast.For, ast.AsyncFor]:
+        return (
+            ast.AsyncFor(
+                target=ast.Name(id=target),
+                iter=self.build_ref(items),
+                body=list(body),
+                orelse=[],
+                # NOTE: Seems like it is allowed to pass `None`, but ast typing says it's not.
+                lineno=t.cast(int, None),
+            )
+            if is_async
+            else ast.For(
+                target=ast.Name(id=target),
+                iter=self.build_ref(items),
+                body=list(body),
+                orelse=[],
+                # NOTE: Seems like it is allowed to pass `None`, but ast typing says it's not.
+                lineno=t.cast(int, None),
+            )
+        )
+
+    def build_while_stmt(self, *, test: TypeRef, body: t.Sequence[ast.stmt]) -> ast.While:
+        return ast.While(test=self.build_ref(test), body=list(body), orelse=[])
+
+    def build_try_stmt(
+        self,
+        *,
+        body: t.Sequence[ast.stmt],
+        handlers: t.Optional[t.Sequence[ast.ExceptHandler]] = None,
+        finalbody: t.Optional[t.Sequence[ast.stmt]] = None,
+    ) -> ast.Try:
+        return ast.Try(body=list(body), handlers=list(handlers or ()), orelse=[], finalbody=list(finalbody or ()))
+
+    def build_except_handler(
+        self,
+        *,
+        types: TypeRef,
+        name: t.Optional[str] = None,
+        body: t.Sequence[ast.stmt],
+    ) -> ast.ExceptHandler:
+        return ast.ExceptHandler(type=self.build_ref(types), name=name, body=list(body))
+
+    def build_compare_expr(self, *, left: TypeRef, op: ast.cmpop, right: TypeRef) -> ast.expr:
+        return ast.Compare(left=self.build_ref(left), ops=[op], comparators=[self.build_ref(right)])
+
+    def build_tuple_expr(self, *items: TypeRef) -> ast.expr:
+        return ast.Tuple(elts=[self.build_ref(item) for item in items])
+
+    def build_list_expr(self, *items: TypeRef) -> ast.expr:
+        return ast.List(elts=[self.build_ref(item) for item in items])
+
+    def build_dict_expr(self, *items: tuple[TypeRef, TypeRef]) -> ast.expr:
+        return ast.Dict(
+            keys=[self.build_ref(key) for key, _ in items],
+            values=[self.build_ref(value) for _, value in items],
+        )
+
+    def build_subscript_expr(self, value: TypeRef, index: TypeRef) -> ast.expr:
+        return ast.Subscript(value=self.build_ref(value), slice=self.build_ref(index))
+
+    def build_starred_expr(self, value: TypeRef) -> ast.expr:
+        return ast.Starred(value=self.build_ref(value))
+
     def build_yield_stmt(self, value: ast.expr) -> ast.stmt:
         return ast.Expr(value=ast.Yield(value=value))
 
@@ -550,6 +660,12 @@ class ASTBuilder:
             TypeInfo.build(self.contextlib_module, "asynccontextmanager" if is_async else "contextmanager")
         )
 
+    def build_reraise_stmt(self) -> ast.Raise:
+        return ast.Raise(exc=None, cause=None)
+
+    def build_raise_stmt(self, exc: ast.expr, cause: t.Optional[TypeRef] = None) -> ast.Raise:
+        return ast.Raise(exc=exc, cause=self.build_ref(cause) if cause is not None else None)
+
     def build_raise_not_implemented_error(self) -> ast.Raise:
         return ast.Raise(exc=ast.Name(id="NotImplementedError"), cause=None)
 
@@ -602,6 +718,12 @@ class ASTBuilder:
             inner,
         )
 
+    def build_iterable_ref(self, inner: TypeRef, *, is_async: bool = False) -> ast.expr:
+        return self.build_generic_ref(
+            TypeInfo.build(self.typing_module, "AsyncIterable" if is_async else "Iterable"),
+            inner,
+        )
+
     def build_iterator_ref(self, inner: TypeRef, *, is_async: bool = False) -> ast.expr:
         return self.build_generic_ref(
             TypeInfo.build(self.typing_module, "AsyncIterator" if is_async else "Iterator"),
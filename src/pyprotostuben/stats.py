@@ -0,0 +1,267 @@
+import abc
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import time
+import typing as t
+from contextlib import contextmanager, nullcontext
+from dataclasses import asdict, dataclass, field
+
+U_contra = t.TypeVar("U_contra", contravariant=True)
+V_co = t.TypeVar("V_co", covariant=True)
+
+
+@dataclass()
+class PhaseStats:
+    calls: int = 0
+    wall: float = 0.0
+    cpu: float = 0.0
+
+
+@dataclass(frozen=True)
+class Span:
+    name: str
+    start: float
+    duration: float
+    pid: int
+    tid: int
+    worker: str
+    details: t.Mapping[str, str]
+
+
+@dataclass(frozen=True)
+class StatsSnapshot:
+    phases: t.Mapping[str, PhaseStats] = field(default_factory=dict)
+    counters: t.Mapping[str, int] = field(default_factory=dict)
+    spans: t.Sequence[Span] = ()
+
+
+class StatsCollector(metaclass=abc.ABCMeta):
+    @property
+    @abc.abstractmethod
+    def enabled(self) -> bool:
+        raise NotImplementedError
+
+    @property
+    @abc.abstractmethod
+    def tracing(self) -> bool:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def measure(self, phase: str, **details: str) -> t.ContextManager[None]:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def count(self, name: str, value: int = 1) -> None:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def merge(self, snapshot: StatsSnapshot) -> None:
+        raise NotImplementedError
+
+
+class NoStatsCollector(StatsCollector):
+    """Default collector, measures nothing."""
+
+    def __init__(self) -> None:
+        self.__noop = nullcontext()
+
+    @property
+    def enabled(self) -> bool:
+        return False
+
+    @property
+    def tracing(self) -> bool:
+        return False
+
+    def measure(self, phase: str, **details: str) -> t.ContextManager[None]:  # noqa: ARG002
+        return self.__noop
+
+    def count(self, name: str, value: int = 1) -> None:
+        pass
+
+    def merge(self, snapshot: StatsSnapshot) -> None:
+        pass
+
+
+class PhaseStatsCollector(StatsCollector):
+    def __init__(self, *, tracing: bool = False) -> None:
+        self.__phases: dict[str, PhaseStats] = {}
+        self.__counters: dict[str, int] = {}
+        self.__spans: t.Optional[list[Span]] = [] if tracing else None
+
+    @property
+    def enabled(self) -> bool:
+        return True
+
+    @property
+    def tracing(self) -> bool:
+        return self.__spans is not None
+
+    @property
+    def phases(self) -> t.Mapping[str, PhaseStats]:
+        return self.__phases
+
+    @property
+    def counters(self) -> t.Mapping[str, int]:
+        return self.__counters
+
+    @property
+    def spans(self) -> t.Sequence[Span]:
+        return self.__spans or ()
+
+    @contextmanager
+    def measure(self, phase: str, **details: str) -> t.Iterator[None]:
+        # NOTE: wall clock is used for spans, because span timestamps from different processes are compared.
+        span_start = time.time() if self.__spans is not None else 0.0
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+
+        try:
+            yield
+
+        finally:
+            wall = time.perf_counter() - wall_start
+            self.__add_phase(phase, 1, wall, time.process_time() - cpu_start)
+
+            if self.__spans is not None:
+                self.__spans.append(
+                    Span(
+                        name=phase,
+                        start=span_start,
+                        duration=wall,
+                        pid=os.getpid(),
+                        tid=threading.get_ident(),
+                        worker=multiprocessing.current_process().name,
+                        details=details,
+                    )
+                )
+
+    def count(self, name: str, value: int = 1) -> None:
+        self.__counters[name] = self.__counters.get(name, 0) + value
+
+    def merge(self, snapshot: StatsSnapshot) -> None:
+        for name, stats in snapshot.phases.items():
+            self.__add_phase(name, stats.calls, stats.wall, stats.cpu)
+
+        for name, value in snapshot.counters.items():
+            self.count(name, value)
+
+        if self.__spans is not None:
+            self.__spans.extend(snapshot.spans)
+
+    def snapshot(self) -> StatsSnapshot:
+        return StatsSnapshot(
+            phases={name: PhaseStats(stats.calls, stats.wall, stats.cpu) for name, stats in self.__phases.items()},
+            counters=dict(self.__counters),
+            spans=tuple(self.spans),
+        )
+
+    def __add_phase(self, name: str, calls: int, wall: float, cpu: float) -> None:
+        stats = self.__phases.get(name)
+        if stats is None:
+            stats = self.__phases[name] = PhaseStats()
+
+        stats.calls += calls
+        stats.wall += wall
+        stats.cpu += cpu
+
+
+class MeasuredFunc(t.Generic[U_contra, V_co]):
+    """
+    Run the function with a separate stats collector and return its result with the collected stats.
+
+    It is picklable (if the wrapped function is), so stats can be collected in `MultiProcessPool` workers and merged
+    in the parent process.
+    """
+
+    def __init__(self, func: t.Callable[[U_contra], V_co], *, tracing: bool = False) -> None:
+        self.__func = func
+        self.__tracing = tracing
+
+    def __call__(self, arg: U_contra) -> tuple[V_co, StatsSnapshot]:
+        collector = PhaseStatsCollector(tracing=self.__tracing)
+
+        with use_stats_collector(collector):
+            result = self.__func(arg)
+
+        return result, collector.snapshot()
+
+
+_COLLECTOR: StatsCollector = NoStatsCollector()
+
+
+def get_stats_collector() -> StatsCollector:
+    return _COLLECTOR
+
+
+@contextmanager
+def use_stats_collector(collector: StatsCollector) -> t.Iterator[StatsCollector]:
+    global _COLLECTOR  # noqa: PLW0603
+
+    prev, _COLLECTOR = _COLLECTOR, collector
+    try:
+        yield collector
+
+    finally:
+        _COLLECTOR = prev
+
+
+def dump_stats(snapshot: StatsSnapshot, fd: t.IO[str]) -> None:
+    json.dump({"phases": snapshot.phases, "counters": snapshot.counters}, fd, indent=2, default=asdict)
+
+
+def dump_trace(snapshot: StatsSnapshot, fd: t.IO[str]) -> None:
+    """Write spans in Chrome trace event format, it can be opened in `chrome://tracing` or Perfetto UI."""
+
+    workers = {span.pid: span.worker for span in snapshot.spans}
+    events: list[dict[str, object]] = [
+        {"name": "process_name", "ph": "M", "pid": pid, "args": {"name": worker}} for pid, worker in workers.items()
+    ]
+    events.extend(
+        {
+            "name": span.name,
+            "cat": "phase",
+            "ph": "X",
+            "ts": span.start * 1_000_000,
+            "dur": span.duration * 1_000_000,
+            "pid": span.pid,
+            "tid": span.tid,
+            "args": {"worker": span.worker, **span.details},
+        }
+        for span in snapshot.spans
+    )
+
+    json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, fd)
+
+
+def get_peak_rss(*, children: bool = False) -> t.Optional[int]:
+    """Get peak RSS (in bytes) of the current process or of its biggest terminated child process."""
+
+    try:
+        import resource
+
+    except ImportError:  # pragma: no cover
+        return None
+
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF)
+
+    # NOTE: max RSS is in bytes on macOS and in kilobytes on other platforms.
+    return usage.ru_maxrss if sys.platform == "darwin" else usage.ru_maxrss * 1024
+
+
+def format_stats(snapshot: StatsSnapshot) -> str:
+    lines = [
+        f"{'phase':<12}{'calls':>10}{'wall, s':>14}{'cpu, s':>14}",
+        *(
+            f"{name:<12}{stats.calls:>10}{stats.wall:>14.4f}{stats.cpu:>14.4f}"
+            for name, stats in snapshot.phases.items()
+        ),
+    ]
+
+    if snapshot.counters:
+        lines.append(", ".join(f"{name}: {value}" for name, value in snapshot.counters.items()))
+
+    return "\n".join(lines)
@@ -0,0 +1,139 @@
+"""
+In-memory stand-in for a message broker to run generated brokrpc code without RabbitMQ.
+
+Messages are routed to bound consumers by binding keys (exchanges are ignored). Each publisher open & consumer bind
+waits for `latency` seconds to simulate broker round trips (channel open, queue declare & bind), each publish waits for
+`publish_latency` seconds to simulate publisher confirms.
+"""
+
+import asyncio
+import sys
+import typing as t
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+
+# NOTE: brokrpc supports python 3.12 or higher
+assert sys.version_info >= (3, 12)
+
+from brokrpc.abc import BinaryConsumer, BinaryPublisher, BoundConsumer, BrokerDriver, Publisher  # noqa: E402
+from brokrpc.message import BinaryMessage  # noqa: E402
+from brokrpc.model import PublisherResult  # noqa: E402
+from brokrpc.options import BindingOptions, PublisherOptions  # noqa: E402
+
+
+@dataclass(frozen=True)
+class BrokerStats:
+    publishers_opened: int = 0
+    consumers_bound: int = 0
+    messages_published: int = 0
+    max_open_resources: int = 0
+
+    @property
+    def resources_opened(self) -> int:
+        return self.publishers_opened + self.consumers_bound
+
+
+class InMemoryBrokerDriver(BrokerDriver):
+    def __init__(self, latency: float = 0.0, publish_latency: float = 0.0) -> None:
+        self.__latency = latency
+        self.__publish_latency = publish_latency
+        self.__consumers: list[_InMemoryBoundConsumer] = []
+        self.__tasks: set[asyncio.Task[object]] = set()
+        self.__publishers_opened = 0
+        self.__consumers_bound = 0
+        self.__messages_published = 0
+        self.__open_resources = 0
+        self.__max_open_resources = 0
+
+    @property
+    def stats(self) -> BrokerStats:
+        return BrokerStats(
+            publishers_opened=self.__publishers_opened,
+            consumers_bound=self.__consumers_bound,
+            messages_published=self.__messages_published,
+            max_open_resources=self.__max_open_resources,
+        )
+
+    @asynccontextmanager
+    async def connect(self) -> t.AsyncIterator[BrokerDriver]:
+        try:
+            yield self
+
+        finally:
+            await asyncio.gather(*self.__tasks, return_exceptions=True)
+
+    @asynccontextmanager
+    async def provide_publisher(
+        self,
+        options: t.Optional[PublisherOptions] = None,  # noqa: ARG002
+    ) -> t.AsyncIterator[BinaryPublisher]:
+        async with self.__open_resource():
+            self.__publishers_opened += 1
+            yield _InMemoryPublisher(self)
+
+    @asynccontextmanager
+    async def bind_consumer(self, consumer: BinaryConsumer, options: BindingOptions) -> t.AsyncIterator[BoundConsumer]:
+        async with self.__open_resource():
+            bound = _InMemoryBoundConsumer(consumer, options)
+            self.__consumers_bound += 1
+            self.__consumers.append(bound)
+
+            try:
+                yield bound
+
+            finally:
+                self.__consumers.remove(bound)
+
+    async def publish(self, message: BinaryMessage) -> PublisherResult:
+        if self.__publish_latency > 0:
+            await asyncio.sleep(self.__publish_latency)
+
+        self.__messages_published += 1
+        consumers = [consumer for consumer in self.__consumers if consumer.is_bound_to(message.routing_key)]
+
+        # NOTE: consumers are run in separate tasks as in real broker, e.g. caller waits for response after publish.
+        for consumer in consumers:
+            task: asyncio.Task[object] = asyncio.create_task(consumer.consume(message))
+            self.__tasks.add(task)
+            task.add_done_callback(self.__tasks.discard)
+
+        return bool(consumers)
+
+    @asynccontextmanager
+    async def __open_resource(self) -> t.AsyncIterator[None]:
+        if self.__latency > 0:
+            await asyncio.sleep(self.__latency)
+
+        self.__open_resources += 1
+        self.__max_open_resources = max(self.__max_open_resources, self.__open_resources)
+        try:
+            yield
+
+        finally:
+            self.__open_resources -= 1
+
+
+class _InMemoryPublisher(Publisher[BinaryMessage, PublisherResult]):
+    def __init__(self, driver: InMemoryBrokerDriver) -> None:
+        self.__driver = driver
+
+    async def publish(self, message: BinaryMessage) -> PublisherResult:
+        return await self.__driver.publish(message)
+
+
+class _InMemoryBoundConsumer(BoundConsumer):
+    def __init__(self, consumer: BinaryConsumer, options: BindingOptions) -> None:
+        self.__consumer = consumer
+        self.__options = options
+
+    def is_alive(self) -> bool:
+        return True
+
+    def get_options(self) -> BindingOptions:
+        return self.__options
+
+    def is_bound_to(self, routing_key: str) -> bool:
+        return routing_key in self.__options.binding_keys
+
+    async def consume(self, message: BinaryMessage) -> object:
+        return await self.__consumer.consume(message)
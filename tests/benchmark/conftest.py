@@ -0,0 +1,40 @@
+import typing as t
+from pathlib import Path
+
+import pytest
+from _pytest.config.argparsing import Parser
+from _pytest.fixtures import SubRequest
+
+
+def pytest_addoption(parser: Parser) -> None:
+    parser.addoption(
+        "--benchmark-output",
+        type=Path,
+        default=None,
+        help="directory to save benchmark results to (results are not saved by default)",
+    )
+    parser.addoption(
+        "--benchmark-update-baseline",
+        action="store_true",
+        default=False,
+        help="overwrite checked in baselines with current results instead of comparing with them",
+    )
+
+
+@pytest.fixture
+def benchmark_output(request: SubRequest) -> t.Optional[Path]:
+    value = request.config.getoption("--benchmark-output")
+    assert value is None or isinstance(value, Path)
+
+    if value is not None:
+        value.mkdir(parents=True, exist_ok=True)
+
+    return value
+
+
+@pytest.fixture
+def benchmark_update_baseline(request: SubRequest) -> bool:
+    value = request.config.getoption("--benchmark-update-baseline")
+    assert isinstance(value, bool)
+
+    return value
@@ -0,0 +1,182 @@
+"""
+Memory footprint measurements of protoc plugins.
+
+Each measurement is run in a fresh python process (see `measure_in_subprocess`), so peak RSS and traced allocations
+are not affected by the test process. Run as `python -m tests.benchmark.memory {plugin} {traced|rss}`.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tracemalloc
+import typing as t
+from pathlib import Path
+
+from google.protobuf.compiler.plugin_pb2 import CodeGeneratorRequest
+
+from pyprotostuben.codegen.plugins import PLUGINS
+from pyprotostuben.pool.abc import Pool
+from pyprotostuben.pool.process import MultiProcessPool
+from pyprotostuben.protobuf.context import ContextBuilder
+from pyprotostuben.stats import get_peak_rss
+from tests.corpus import CorpusConfig, build_request
+
+U = t.TypeVar("U")
+V = t.TypeVar("V")
+
+MODES: t.Final[t.Sequence[str]] = ("traced", "rss")
+
+CONFIG = CorpusConfig(
+    files=64,
+    messages=8,
+    fields=8,
+    depth=1,
+    enums=2,
+    services=1,
+    methods=4,
+    imports=4,
+    map_ratio=0.1,
+    oneof_ratio=0.1,
+    enum_ratio=0.2,
+    message_ratio=0.3,
+    repeated_ratio=0.2,
+    comment_ratio=0.5,
+)
+
+# NOTE: allocations are grouped by the file of the allocating frame. Protobuf messages are allocated by upb (not
+# traced), so registry allocations are either made by pyprotostuben code or by stdlib (e.g. dataclasses).
+_PACKAGE_PATTERN: t.Final[str] = "/pyprotostuben/"
+
+
+def measure_traced(plugin_name: str) -> dict[str, int]:
+    """Measure size of registry (by package), generation peak (contexts & ASTs) and outputs in a single process."""
+
+    plugin = PLUGINS[plugin_name]()
+    content = build_request(CONFIG).SerializeToString()
+
+    tracemalloc.start()
+
+    # NOTE: protobuf messages are allocated by upb (not traced), so serialized request size is reported instead.
+    request = CodeGeneratorRequest.FromString(content)
+    request.parameter = "no-parallel"
+
+    start, _ = tracemalloc.get_traced_memory()
+    context = ContextBuilder().build(request)
+    registry_size = tracemalloc.get_traced_memory()[0] - start
+    registry_stats = tracemalloc.take_snapshot().statistics("filename")
+    del context
+
+    tracemalloc.reset_peak()
+    start, _ = tracemalloc.get_traced_memory()
+    response = plugin.run(request)
+    _, peak = tracemalloc.get_traced_memory()
+
+    tracemalloc.stop()
+
+    result = {
+        "request_bytes": len(content),
+        "registry_bytes": registry_size,
+        "registry_allocations": sum(stat.count for stat in registry_stats),
+        "generate_peak_bytes": peak - start,
+        "response_bytes": sum(len(file.content) for file in response.file),
+    }
+    result["registry_pyprotostuben_bytes"] = sum(
+        stat.size for stat in registry_stats if _PACKAGE_PATTERN in stat.traceback[0].filename
+    )
+    result["registry_other_bytes"] = result["registry_bytes"] - result["registry_pyprotostuben_bytes"]
+
+    return result
+
+
+def measure_rss(plugin_name: str) -> dict[str, int]:
+    """Measure peak RSS of the parent process & of each pool worker in parallel mode."""
+
+    plugin = PLUGINS[plugin_name]()
+    context = ContextBuilder().build(build_request(CONFIG))
+
+    with MultiProcessPool.setup(ordered=True) as inner:
+        pool = PeakRssPool(inner)
+        plugin.generate(context, pool)
+
+    worker_peaks = pool.peaks.values()
+
+    return {
+        "parent_peak_rss": get_peak_rss() or 0,
+        "workers": len(worker_peaks),
+        "worker_peak_rss_max": max(worker_peaks, default=0),
+        "worker_peak_rss_sum": sum(worker_peaks),
+    }
+
+
+class PeakRssPool(Pool):
+    """Collects peak RSS of each worker process that ran a task (workers report it with each result)."""
+
+    def __init__(self, inner: Pool) -> None:
+        self.peaks: dict[int, int] = {}
+        self.__inner = inner
+
+    def run(self, func: t.Callable[[U], V], args: t.Iterable[U]) -> t.Iterable[V]:
+        for result, pid, peak_rss in self.__inner.run(_PeakRssFunc(func), args):
+            self.peaks[pid] = max(self.peaks.get(pid, 0), peak_rss)
+            yield result
+
+
+class _PeakRssFunc(t.Generic[U, V]):
+    def __init__(self, func: t.Callable[[U], V]) -> None:
+        self.__func = func
+
+    def __call__(self, arg: U) -> tuple[V, int, int]:
+        result = self.__func(arg)
+        return result, os.getpid(), get_peak_rss() or 0
+
+
+def measure_in_subprocess(plugin_name: str, mode: str) -> dict[str, int]:
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-m", __name__, plugin_name, mode],
+        cwd=Path(__file__).parent.parent.parent,
+        env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+
+    value = json.loads(result.stdout)
+    assert isinstance(value, dict)
+
+    return value
+
+
+def format_diff(baseline: t.Mapping[str, int], current: t.Mapping[str, int]) -> str:
+    lines = [f"{'metric':<24}{'baseline':>14}{'current':>14}{'change':>10}"]
+
+    for name in sorted(baseline.keys() | current.keys()):
+        prev = baseline.get(name)
+        value = current.get(name)
+        change = f"{(value - prev) / prev:+.1%}" if prev and value is not None else "n/a"
+        lines.append(f"{name:<24}{_format_value(prev):>14}{_format_value(value):>14}{change:>10}")
+
+    return "\n".join(lines)
+
+
+def _format_value(value: t.Optional[int]) -> str:
+    return str(value) if value is not None else "-"
+
+
+def main(argv: t.Sequence[str]) -> None:
+    plugin_name, mode = argv
+
+    if mode == "traced":
+        result = measure_traced(plugin_name)
+
+    elif mode == "rss":
+        result = measure_rss(plugin_name)
+
+    else:
+        raise ValueError(mode)
+
+    json.dump(result, sys.stdout)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
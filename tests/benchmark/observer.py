@@ -0,0 +1,113 @@
+"""
+In-memory observer for generated brokrpc code with `instrument` option.
+
+Collects per method (by qualname) call & error counts, payload sizes and a latency histogram, so benchmarks can report
+latency quantiles of clients & servers without external metrics libraries.
+"""
+
+import bisect
+import math
+import typing as t
+from dataclasses import dataclass
+
+# NOTE: upper bounds (in seconds) of latency histogram buckets, the last bucket takes all the slower calls.
+DEFAULT_BUCKETS: t.Final[t.Sequence[float]] = (
+    0.00001,
+    0.000025,
+    0.00005,
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    math.inf,
+)
+
+
+@dataclass(frozen=True)
+class MethodStats:
+    calls: int
+    errors: int
+    payload_bytes: int
+    total_duration: float
+    buckets: t.Sequence[float]
+    counts: t.Sequence[int]
+
+    def quantile(self, q: float) -> float:
+        """Get upper bound of the bucket that contains `q` quantile of call latencies."""
+
+        if not 0.0 <= q <= 1.0:
+            msg = "quantile must be in [0, 1] range"
+            raise ValueError(msg, q)
+
+        rank = q * self.calls
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            if total >= rank and total > 0:
+                return bound
+
+        return math.nan
+
+
+@dataclass()
+class _MethodHistogram:
+    counts: t.MutableSequence[int]
+    started: int = 0
+    calls: int = 0
+    errors: int = 0
+    payload_bytes: int = 0
+    total_duration: float = 0.0
+
+
+class HistogramObserver:
+    def __init__(self, buckets: t.Sequence[float] = DEFAULT_BUCKETS) -> None:
+        if not buckets or list(buckets) != sorted(buckets) or buckets[-1] != math.inf:
+            msg = "buckets must be sorted & the last one must be infinite"
+            raise ValueError(msg, buckets)
+
+        self.__buckets = tuple(buckets)
+        self.__methods: dict[str, _MethodHistogram] = {}
+
+    @property
+    def stats(self) -> t.Mapping[str, MethodStats]:
+        return {
+            qualname: MethodStats(
+                calls=method.calls,
+                errors=method.errors,
+                payload_bytes=method.payload_bytes,
+                total_duration=method.total_duration,
+                buckets=self.__buckets,
+                counts=tuple(method.counts),
+            )
+            for qualname, method in self.__methods.items()
+        }
+
+    def on_start(self, qualname: str, size: int) -> None:
+        method = self.__get_method(qualname)
+        method.started += 1
+        method.payload_bytes += size
+
+    def on_end(self, qualname: str, duration: float, error: t.Optional[BaseException]) -> None:
+        method = self.__get_method(qualname)
+        method.calls += 1
+        method.total_duration += duration
+        method.counts[bisect.bisect_left(self.__buckets, duration)] += 1
+
+        if error is not None:
+            method.errors += 1
+
+    def __get_method(self, qualname: str) -> _MethodHistogram:
+        method = self.__methods.get(qualname)
+        if method is None:
+            method = self.__methods[qualname] = _MethodHistogram(counts=[0] * len(self.__buckets))
+
+        return method
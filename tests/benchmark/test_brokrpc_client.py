@@ -0,0 +1,773 @@
+import ast
+import asyncio
+import json
+import math
+import sys
+import time
+import types
+import typing as t
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from pathlib import Path
+
+import pytest
+from google.protobuf.compiler.plugin_pb2 import CodeGeneratorRequest
+from google.protobuf.descriptor_pb2 import (
+    DescriptorProto,
+    FieldDescriptorProto,
+    FileDescriptorProto,
+    MethodDescriptorProto,
+    MethodOptions,
+    ServiceDescriptorProto,
+)
+from google.protobuf.descriptor_pool import DescriptorPool
+from google.protobuf.message_factory import GetMessageClass
+
+# NOTE: brokrpc supports python 3.12 or higher
+pytest.importorskip("brokrpc")
+assert sys.version_info >= (3, 12)
+
+from brokrpc.broker import Broker  # noqa: E402
+from brokrpc.rpc.client import Client  # noqa: E402
+from brokrpc.rpc.server import Server  # noqa: E402
+from brokrpc.spec.v1 import amqp_pb2, consumer_pb2  # noqa: E402
+
+from pyprotostuben.codegen.brokrpc.plugin import BrokRPCProtocPlugin  # noqa: E402
+from tests.benchmark.broker import BrokerStats, InMemoryBrokerDriver  # noqa: E402
+from tests.benchmark.observer import HistogramObserver  # noqa: E402
+
+# NOTE: eager client factory enters all publishers & callers in a single `async with` statement, CPython limits it to
+# 20 nested blocks.
+METHODS: t.Final[int] = 16
+
+# NOTE: each publisher open & consumer bind takes a broker round trip, 1ms is a fast local RabbitMQ.
+LATENCY: t.Final[float] = 0.001
+
+MESSAGES: t.Final[int] = 500
+
+# NOTE: pipelined publishes & calls should be at least this times faster than one by one ones (with 16+ in flight).
+MIN_PUBLISH_MANY_SPEEDUP: t.Final[float] = 4.0
+
+# NOTE: services registered per tenant should be at least this times faster with module level serializers & options.
+MIN_REGISTRATION_SPEEDUP: t.Final[float] = 1.1
+
+REGISTRATIONS: t.Final[int] = 200
+ROUNDS: t.Final[int] = 20
+
+# NOTE: batch consumer writes a batch to the storage in a single round trip, so it should be at least this times faster
+# than a consumer that writes each message separately.
+MIN_BATCH_SPEEDUP: t.Final[float] = 3.0
+BATCH_MAX_DELAY: t.Final[float] = 0.01
+
+# NOTE: instrumented clients without observer call publishers & callers directly, so they should be as fast as clients
+# generated without `instrument` option (up to measurement noise).
+MAX_DISABLED_INSTRUMENTATION_OVERHEAD: t.Final[float] = 1.15
+
+# NOTE: a storm of identical requests (a few distinct keys) should be at least this times faster with coalescing, when
+# the service handles one request at once (e.g. a single storage connection).
+MIN_COALESCE_SPEEDUP: t.Final[float] = 10.0
+STORM_KEYS: t.Final[int] = 10
+CACHE_TTL: t.Final[float] = 60.0
+
+
+@dataclass(frozen=True)
+class SessionResult:
+    setup: float
+    total: float
+    stats: BrokerStats
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("used", [1, METHODS // 4, METHODS])
+def test_lazy_client_setup_cost(
+    monkeypatch: pytest.MonkeyPatch,
+    benchmark_output: t.Optional[Path],
+    used: int,
+) -> None:
+    request = build_request(METHODS)
+    eager = asyncio.run(run_session(load_module(monkeypatch, request, "no-parallel"), used))
+    lazy = asyncio.run(run_session(load_module(monkeypatch, request, "no-parallel,lazy-client"), used))
+
+    if benchmark_output is not None:
+        with (benchmark_output / f"brokrpc-client-used-{used}.json").open("w") as fd:
+            json.dump(
+                {
+                    "methods": METHODS,
+                    "used": used,
+                    "latency": LATENCY,
+                    **{
+                        name: {
+                            "setup": result.setup,
+                            "total": result.total,
+                            "resources_opened": result.stats.resources_opened,
+                            "max_open_resources": result.stats.max_open_resources,
+                        }
+                        for name, result in (("eager", eager), ("lazy", lazy))
+                    },
+                },
+                fd,
+            )
+
+    assert eager.stats.resources_opened == count_resources(METHODS)
+    assert lazy.stats.resources_opened == count_resources(used)
+    assert lazy.setup < eager.setup
+
+    if used < METHODS:
+        assert lazy.total < eager.total
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("max_in_flight", [1, 16, 64])
+def test_publish_many_throughput(
+    monkeypatch: pytest.MonkeyPatch,
+    benchmark_output: t.Optional[Path],
+    max_in_flight: int,
+) -> None:
+    module = load_module(monkeypatch, build_request(METHODS), "no-parallel")
+    result = asyncio.run(run_publish(module, max_in_flight))
+
+    if benchmark_output is not None:
+        with (benchmark_output / f"brokrpc-publish-many-in-flight-{max_in_flight}.json").open("w") as fd:
+            json.dump(
+                {
+                    "messages": MESSAGES,
+                    "max_in_flight": max_in_flight,
+                    "publish_latency": LATENCY,
+                    **{f"{name}_per_second": MESSAGES / elapsed for name, elapsed in result.items()},
+                },
+                fd,
+            )
+
+    if max_in_flight > 1:
+        assert result["one_by_one"] / result["many"] >= MIN_PUBLISH_MANY_SPEEDUP, result
+        assert result["one_by_one"] / result["many_async"] >= MIN_PUBLISH_MANY_SPEEDUP, result
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("max_concurrency", [1, 16, 64])
+def test_gather_throughput(
+    monkeypatch: pytest.MonkeyPatch,
+    benchmark_output: t.Optional[Path],
+    max_concurrency: int,
+) -> None:
+    module = load_module(monkeypatch, build_request(METHODS), "no-parallel")
+    result = asyncio.run(run_gather(module, max_concurrency))
+
+    if benchmark_output is not None:
+        with (benchmark_output / f"brokrpc-gather-concurrency-{max_concurrency}.json").open("w") as fd:
+            json.dump(
+                {
+                    "requests": MESSAGES,
+                    "max_concurrency": max_concurrency,
+                    "publish_latency": LATENCY,
+                    **{f"{name}_per_second": MESSAGES / elapsed for name, elapsed in result.items()},
+                },
+                fd,
+            )
+
+    if max_concurrency > 1:
+        assert result["one_by_one"] / result["gather"] >= MIN_PUBLISH_MANY_SPEEDUP, result
+        assert result["one_by_one"] / result["as_completed"] >= MIN_PUBLISH_MANY_SPEEDUP, result
+
+
+@pytest.mark.benchmark
+def test_module_constants_registration_cost(
+    monkeypatch: pytest.MonkeyPatch,
+    benchmark_output: t.Optional[Path],
+) -> None:
+    source = generate_source(monkeypatch, build_request(METHODS), "no-parallel")
+    sources = {"module_constants": source, "inline": inline_module_constants(source)}
+
+    import_times: dict[str, float] = {}
+    modules: dict[str, types.ModuleType] = {}
+    for name, value in sources.items():
+        start = time.perf_counter()
+        modules[name] = exec_module(value)
+        import_times[name] = time.perf_counter() - start
+
+    registration_times = measure_registration(modules)
+
+    if benchmark_output is not None:
+        with (benchmark_output / "brokrpc-registration.json").open("w") as fd:
+            json.dump(
+                {
+                    "methods": METHODS,
+                    "registrations": REGISTRATIONS,
+                    "rounds": ROUNDS,
+                    **{
+                        name: {"import": import_times[name], "registration": registration_times[name]}
+                        for name in sources
+                    },
+                },
+                fd,
+            )
+
+    assert registration_times["inline"] / registration_times["module_constants"] >= MIN_REGISTRATION_SPEEDUP, (
+        registration_times
+    )
+
+
+@pytest.mark.benchmark
+def test_loopback_client_call_overhead(monkeypatch: pytest.MonkeyPatch, benchmark_output: t.Optional[Path]) -> None:
+    module = load_module(monkeypatch, build_request(METHODS), "no-parallel,loopback")
+    result = asyncio.run(run_loopback(module))
+
+    if benchmark_output is not None:
+        with (benchmark_output / "brokrpc-loopback.json").open("w") as fd:
+            json.dump(
+                {
+                    "requests": MESSAGES,
+                    **{f"{name}_per_second": MESSAGES / elapsed for name, elapsed in result.items()},
+                },
+                fd,
+            )
+
+    # NOTE: loopback client has serialization & dispatch overhead only, no broker round trips & response waiters.
+    assert result["loopback"] < result["broker"], result
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("batch_max_size", [16, 64])
+def test_batch_consumer_throughput(
+    monkeypatch: pytest.MonkeyPatch,
+    benchmark_output: t.Optional[Path],
+    batch_max_size: int,
+) -> None:
+    # NOTE: each module is run right after it's loaded, because the module uses `bench_pb2` message types of its load.
+    result = {
+        name: asyncio.run(run_batch(load_module(monkeypatch, build_request(METHODS, size), "no-parallel")))
+        for name, size in (("one_by_one", None), ("batch", batch_max_size))
+    }
+
+    if benchmark_output is not None:
+        with (benchmark_output / f"brokrpc-batch-size-{batch_max_size}.json").open("w") as fd:
+            json.dump(
+                {
+                    "messages": MESSAGES,
+                    "batch_max_size": batch_max_size,
+                    "batch_max_delay": BATCH_MAX_DELAY,
+                    "write_latency": LATENCY,
+                    **{f"{name}_per_second": MESSAGES / elapsed for name, elapsed in result.items()},
+                },
+                fd,
+            )
+
+    assert result["one_by_one"] / result["batch"] >= MIN_BATCH_SPEEDUP, result
+
+
+@pytest.mark.benchmark
+def test_instrumentation_overhead(monkeypatch: pytest.MonkeyPatch, benchmark_output: t.Optional[Path]) -> None:
+    request = build_request(METHODS)
+    modules = {
+        "plain": load_module(monkeypatch, request, "no-parallel,loopback"),
+        "instrument": load_module(monkeypatch, request, "no-parallel,loopback,instrument"),
+    }
+    observer = HistogramObserver()
+    result = asyncio.run(run_instrumented(modules, observer))
+    stats = observer.stats
+
+    if benchmark_output is not None:
+        with (benchmark_output / "brokrpc-instrument.json").open("w") as fd:
+            json.dump(
+                {
+                    "calls": MESSAGES * 2,
+                    "rounds": ROUNDS,
+                    **{f"{name}_per_second": MESSAGES * 2 / elapsed for name, elapsed in result.items()},
+                    **{
+                        qualname: {
+                            "calls": method.calls,
+                            "payload_bytes": method.payload_bytes,
+                            "p50": method.quantile(0.5),
+                            "p99": method.quantile(0.99),
+                        }
+                        for qualname, method in stats.items()
+                    },
+                },
+                fd,
+            )
+
+    assert {qualname: (method.calls, method.errors) for qualname, method in stats.items()} == {
+        "/bench/Bench/Method0": (MESSAGES * ROUNDS, 0),
+        "/bench/Bench/Method1": (MESSAGES * ROUNDS, 0),
+    }
+    assert result["disabled"] / result["plain"] <= MAX_DISABLED_INSTRUMENTATION_OVERHEAD, result
+
+
+@pytest.mark.benchmark
+def test_coalesce_request_storm(monkeypatch: pytest.MonkeyPatch, benchmark_output: t.Optional[Path]) -> None:
+    # NOTE: each module is run right after it's loaded, because the module uses `bench_pb2` message types of its load.
+    result = {
+        name: asyncio.run(run_storm(load_module(monkeypatch, build_request(METHODS, **kwargs), "no-parallel,loopback")))
+        for name, kwargs in (
+            ("plain", {}),
+            ("coalesce", {"coalesce": True}),
+            ("cache", {"coalesce": True, "cache_ttl": CACHE_TTL}),
+        )
+    }
+
+    if benchmark_output is not None:
+        with (benchmark_output / "brokrpc-coalesce.json").open("w") as fd:
+            json.dump(
+                {
+                    "requests": MESSAGES,
+                    "keys": STORM_KEYS,
+                    "handle_latency": LATENCY,
+                    **{
+                        name: {
+                            "requests_per_second": [MESSAGES / elapsed for elapsed, _ in storms],
+                            "handler_calls": [calls for _, calls in storms],
+                        }
+                        for name, storms in result.items()
+                    },
+                },
+                fd,
+            )
+
+    # NOTE: the second storm is served from the response cache only.
+    assert {name: [calls for _, calls in storms] for name, storms in result.items()} == {
+        "plain": [MESSAGES, MESSAGES],
+        "coalesce": [STORM_KEYS, STORM_KEYS],
+        "cache": [STORM_KEYS, 0],
+    }
+    assert result["plain"][0][0] / result["coalesce"][0][0] >= MIN_COALESCE_SPEEDUP, result
+
+
+def build_request(
+    methods: int,
+    batch_max_size: t.Optional[int] = None,
+    *,
+    coalesce: bool = False,
+    cache_ttl: t.Optional[float] = None,
+) -> CodeGeneratorRequest:
+    """Build a service where even methods are publishers (void) and odd methods are callers."""
+
+    descriptor_file = FileDescriptorProto()
+    consumer_pb2.DESCRIPTOR.dependencies[0].CopyToProto(descriptor_file)
+
+    consumer_file = FileDescriptorProto()
+    consumer_pb2.DESCRIPTOR.CopyToProto(consumer_file)
+
+    amqp_file = FileDescriptorProto()
+    amqp_pb2.DESCRIPTOR.CopyToProto(amqp_file)
+
+    # NOTE: publishers (void methods) are batched when batch max size is set.
+    void_options = MethodOptions()
+    if batch_max_size is not None:
+        void_options.Extensions[t.cast(t.Any, amqp_pb2.queue)].CopyFrom(
+            amqp_pb2.QueueOptions(
+                arguments={
+                    "batch_max_size": amqp_pb2.ArgumentValue(int_value=batch_max_size),
+                    "batch_max_delay": amqp_pb2.ArgumentValue(float_value=BATCH_MAX_DELAY),
+                },
+            ),
+        )
+
+    # NOTE: callers (methods with response) coalesce identical requests when coalesce is set.
+    caller_options = MethodOptions()
+    if coalesce:
+        caller_arguments = {"coalesce": amqp_pb2.ArgumentValue(bool_value=True)}
+        if cache_ttl is not None:
+            caller_arguments["cache_ttl"] = amqp_pb2.ArgumentValue(float_value=cache_ttl)
+
+        caller_options.Extensions[t.cast(t.Any, amqp_pb2.queue)].CopyFrom(
+            amqp_pb2.QueueOptions(arguments=caller_arguments),
+        )
+
+    bench_file = FileDescriptorProto(
+        name="bench.proto",
+        package="bench",
+        syntax="proto3",
+        dependency=[consumer_file.name, amqp_file.name],
+        message_type=[
+            DescriptorProto(
+                name="Payload",
+                field=[
+                    FieldDescriptorProto(
+                        name="value",
+                        number=1,
+                        type=FieldDescriptorProto.Type.TYPE_STRING,
+                        label=FieldDescriptorProto.Label.LABEL_OPTIONAL,
+                    ),
+                ],
+            ),
+        ],
+        service=[
+            ServiceDescriptorProto(
+                name="Bench",
+                method=[
+                    MethodDescriptorProto(
+                        name=f"Method{i}",
+                        input_type=".bench.Payload",
+                        output_type=".brokrpc.spec.v1.Void" if i % 2 == 0 else ".bench.Payload",
+                        options=void_options if i % 2 == 0 else caller_options,
+                    )
+                    for i in range(methods)
+                ],
+            ),
+        ],
+    )
+
+    return CodeGeneratorRequest(
+        file_to_generate=[bench_file.name],
+        proto_file=[descriptor_file, consumer_file, amqp_file, bench_file],
+    )
+
+
+def count_resources(used: int) -> int:
+    # NOTE: publisher opens a single publisher, caller opens a publisher & binds a response consumer.
+    return sum(1 if i % 2 == 0 else 2 for i in range(used))
+
+
+def load_module(monkeypatch: pytest.MonkeyPatch, request: CodeGeneratorRequest, parameter: str) -> types.ModuleType:
+    return exec_module(generate_source(monkeypatch, request, parameter))
+
+
+def generate_source(monkeypatch: pytest.MonkeyPatch, request: CodeGeneratorRequest, parameter: str) -> str:
+    pool = DescriptorPool()
+    for proto in request.proto_file:
+        pool.Add(proto)
+
+    pb2 = types.ModuleType("bench_pb2")
+    pb2.Payload = GetMessageClass(pool.FindMessageTypeByName("bench.Payload"))  # type: ignore[attr-defined]
+    monkeypatch.setitem(sys.modules, pb2.__name__, pb2)
+
+    gen_request = CodeGeneratorRequest()
+    gen_request.CopyFrom(request)
+    gen_request.parameter = parameter
+
+    (file,) = BrokRPCProtocPlugin().run(gen_request).file
+
+    return file.content
+
+
+def exec_module(source: str) -> types.ModuleType:
+    module = types.ModuleType("bench_brokrpc")
+    exec(compile(source, f"{module.__name__}.py", "exec"), module.__dict__)  # noqa: S102
+
+    return module
+
+
+def inline_module_constants(source: str) -> str:
+    """Put values of module level constants back to the places where they are used (as it was generated before)."""
+
+    module = ast.parse(source)
+    constants = {
+        stmt.targets[0].id: stmt.value
+        for stmt in module.body
+        if isinstance(stmt, ast.Assign) and isinstance(stmt.targets[0], ast.Name) and stmt.targets[0].id.isupper()
+    }
+
+    class Inliner(ast.NodeTransformer):
+        def visit_Name(self, node: ast.Name) -> ast.expr:  # noqa: N802
+            return constants.get(node.id, node)
+
+    module.body = [
+        stmt for stmt in module.body if not (isinstance(stmt, ast.Assign) and ast.unparse(stmt.targets[0]) in constants)
+    ]
+
+    return ast.unparse(Inliner().visit(module))
+
+
+def measure_registration(modules: t.Mapping[str, types.ModuleType]) -> t.Mapping[str, float]:
+    """Measure the best time to register the bench service of each module to a server (e.g. per tenant)."""
+
+    async def handle(_: object, __: object) -> None:
+        pass
+
+    broker = Broker(InMemoryBrokerDriver().connect())
+    services = {
+        name: type("BenchService", (module.Bench,), {f"method{i}": handle for i in range(METHODS)})()
+        for name, module in modules.items()
+    }
+    result = {name: float("inf") for name in modules}
+
+    # NOTE: modules are measured in turns & the best round is taken, so GC pauses & other noise affect all of them the
+    # same way. Servers are created before the round, so only registration is measured.
+    for _ in range(ROUNDS):
+        for name, module in modules.items():
+            servers = [Server(broker) for _ in range(REGISTRATIONS)]
+
+            start = time.perf_counter()
+            for server in servers:
+                module.add_bench_to_server(services[name], server)
+            result[name] = min(result[name], (time.perf_counter() - start) / REGISTRATIONS)
+
+    return result
+
+
+def build_service(module: types.ModuleType, overrides: t.Optional[t.Mapping[str, object]] = None) -> object:
+    """Build the bench service, consumers accept all messages & handlers reply with request payload."""
+
+    async def consume(_: object, __: object) -> bool:
+        return True
+
+    async def consume_batch(_: object, messages: t.Sequence[object]) -> t.Sequence[bool]:
+        return [True] * len(messages)
+
+    async def handle(_: object, request: t.Any) -> object:
+        return request.body
+
+    service = type(
+        "BenchService",
+        (module.Bench,),
+        {
+            **{f"method{i}": consume if i % 2 == 0 else handle for i in range(METHODS)},
+            **{f"method{i}_batch": consume_batch for i in range(0, METHODS, 2)},
+            **(overrides or {}),
+        },
+    )
+
+    return service()
+
+
+@asynccontextmanager
+async def serve(module: types.ModuleType, driver: InMemoryBrokerDriver) -> t.AsyncIterator[Broker]:
+    """Run the bench service server."""
+
+    async with Broker(driver.connect()) as broker:
+        server = Server(broker)
+        module.add_bench_to_server(build_service(module), server)
+
+        async with server.run():
+            yield broker
+
+
+async def run_session(module: types.ModuleType, used: int) -> SessionResult:
+    """Measure time to create a client, time to create it & call `used` methods once and close it."""
+
+    payload_type = sys.modules["bench_pb2"].Payload
+    driver = InMemoryBrokerDriver(latency=LATENCY)
+
+    async with serve(module, driver) as broker:
+        server_stats = driver.stats
+
+        start = time.perf_counter()
+        async with module.create_bench_client(Client(broker)) as client:
+            setup = time.perf_counter() - start
+
+            for i in range(used):
+                await getattr(client, f"method{i}")(payload_type(value=str(i)))
+
+        total = time.perf_counter() - start
+
+        stats = driver.stats
+
+    return SessionResult(
+        setup=setup,
+        total=total,
+        stats=BrokerStats(
+            publishers_opened=stats.publishers_opened - server_stats.publishers_opened,
+            consumers_bound=stats.consumers_bound - server_stats.consumers_bound,
+            messages_published=stats.messages_published - server_stats.messages_published,
+            max_open_resources=stats.max_open_resources - server_stats.max_open_resources,
+        ),
+    )
+
+
+async def run_publish(module: types.ModuleType, max_in_flight: int) -> t.Mapping[str, float]:
+    """Measure time to publish messages one by one and with `_many` method (from a list & from an async iterable)."""
+
+    payload_type = sys.modules["bench_pb2"].Payload
+    messages = [payload_type(value=str(i)) for i in range(MESSAGES)]
+    driver = InMemoryBrokerDriver(publish_latency=LATENCY)
+
+    async def iter_messages() -> t.AsyncIterator[object]:
+        for message in messages:
+            yield message
+
+    result: dict[str, float] = {}
+
+    async with serve(module, driver) as broker, module.create_bench_client(Client(broker)) as client:
+        start = time.perf_counter()
+        for message in messages:
+            await client.method0(message)
+        result["one_by_one"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        results = await client.method0_many(messages, max_in_flight=max_in_flight)
+        result["many"] = time.perf_counter() - start
+        assert list(results) == [True] * MESSAGES
+
+        start = time.perf_counter()
+        results = await client.method0_many(iter_messages(), max_in_flight=max_in_flight)
+        result["many_async"] = time.perf_counter() - start
+        assert list(results) == [True] * MESSAGES
+
+    assert driver.stats.messages_published == MESSAGES * 3
+
+    return result
+
+
+async def run_gather(module: types.ModuleType, max_concurrency: int) -> t.Mapping[str, float]:
+    """Measure time to invoke requests one by one, with `_gather` method and with `_as_completed` method."""
+
+    payload_type = sys.modules["bench_pb2"].Payload
+    requests = [payload_type(value=str(i)) for i in range(MESSAGES)]
+    expected = [request.value for request in requests]
+    driver = InMemoryBrokerDriver(publish_latency=LATENCY)
+
+    result: dict[str, float] = {}
+
+    async with serve(module, driver) as broker, module.create_bench_client(Client(broker)) as client:
+        start = time.perf_counter()
+        responses = [await client.method1(request) for request in requests]
+        result["one_by_one"] = time.perf_counter() - start
+        assert [response.body.value for response in responses] == expected
+
+        start = time.perf_counter()
+        responses = await client.method1_gather(requests, max_concurrency=max_concurrency)
+        result["gather"] = time.perf_counter() - start
+        assert [response.body.value for response in responses] == expected
+
+        start = time.perf_counter()
+        responses = [
+            response async for response in client.method1_as_completed(requests, max_concurrency=max_concurrency)
+        ]
+        result["as_completed"] = time.perf_counter() - start
+        assert sorted(response.body.value for response in responses) == sorted(expected)
+
+    return result
+
+
+async def run_loopback(module: types.ModuleType) -> t.Mapping[str, float]:
+    """Measure time to publish & call one by one with the loopback client and with in-memory broker client."""
+
+    payload_type = sys.modules["bench_pb2"].Payload
+    requests = [payload_type(value=str(i)) for i in range(MESSAGES)]
+    expected = [request.value for request in requests]
+
+    async def run(client: t.Any) -> float:
+        start = time.perf_counter()
+        for request in requests:
+            await client.method0(request)
+        responses = [await client.method1(request) for request in requests]
+        elapsed = time.perf_counter() - start
+
+        assert [response.body.value for response in responses] == expected
+
+        return elapsed
+
+    result: dict[str, float] = {}
+
+    async with module.create_bench_loopback_client(build_service(module)) as client:
+        result["loopback"] = await run(client)
+
+    async with (
+        serve(module, InMemoryBrokerDriver()) as broker,
+        module.create_bench_client(Client(broker)) as client,
+    ):
+        result["broker"] = await run(client)
+
+    return result
+
+
+async def run_batch(module: types.ModuleType) -> float:
+    """Measure time to publish messages & to write all of them to a storage (a single write at once) by the service."""
+
+    payload_type = sys.modules["bench_pb2"].Payload
+    messages = [payload_type(value=str(i)) for i in range(MESSAGES)]
+    lock = asyncio.Lock()
+    done = asyncio.Event()
+    written = 0
+
+    async def write(count: int) -> None:
+        nonlocal written
+
+        async with lock:
+            await asyncio.sleep(LATENCY)
+
+        written += count
+        if written >= MESSAGES:
+            done.set()
+
+    async def write_one(_: object, __: object) -> bool:
+        await write(1)
+        return True
+
+    async def write_batch(_: object, batch: t.Sequence[object]) -> t.Sequence[bool]:
+        await write(len(batch))
+        return [True] * len(batch)
+
+    service = build_service(module, {"method0": write_one, "method0_batch": write_batch})
+
+    async with (
+        Broker(InMemoryBrokerDriver().connect()) as broker,
+        module.create_bench_client(Client(broker)) as client,
+    ):
+        server = Server(broker)
+        module.add_bench_to_server(service, server)
+
+        async with server.run():
+            start = time.perf_counter()
+            await client.method0_many(messages)
+            await done.wait()
+            elapsed = time.perf_counter() - start
+
+    assert written == MESSAGES
+
+    return elapsed
+
+
+async def run_instrumented(
+    modules: t.Mapping[str, types.ModuleType],
+    observer: HistogramObserver,
+) -> t.Mapping[str, float]:
+    """Measure time to publish & call one by one with loopback clients (best of rounds).
+
+    Clients are generated without `instrument` option (plain), with it but without observer (disabled) and with it and
+    with the observer (enabled).
+    """
+
+    clients: t.Mapping[str, tuple[types.ModuleType, t.Mapping[str, object]]] = {
+        "plain": (modules["plain"], {}),
+        "disabled": (modules["instrument"], {}),
+        "enabled": (modules["instrument"], {"observer": observer}),
+    }
+    result = dict.fromkeys(clients, math.inf)
+
+    for _ in range(ROUNDS):
+        for name, (module, kwargs) in clients.items():
+            requests = [module.bench_pb2.Payload(value=str(i)) for i in range(MESSAGES)]
+
+            async with module.create_bench_loopback_client(build_service(module), **kwargs) as client:
+                start = time.perf_counter()
+                for request in requests:
+                    await client.method0(request)
+                    await client.method1(request)
+                result[name] = min(result[name], time.perf_counter() - start)
+
+    return result
+
+
+async def run_storm(module: types.ModuleType) -> t.Sequence[tuple[float, int]]:
+    """Measure time to gather two storms of requests with a few distinct keys with the loopback client.
+
+    The service handles one request at once, handler calls are counted for each storm.
+    """
+
+    requests = [module.bench_pb2.Payload(value=str(i % STORM_KEYS)) for i in range(MESSAGES)]
+    expected = [request.value for request in requests]
+    lock = asyncio.Lock()
+    calls = 0
+
+    async def handle(_: object, request: t.Any) -> object:
+        nonlocal calls
+
+        async with lock:
+            await asyncio.sleep(LATENCY)
+
+        calls += 1
+        return request.body
+
+    result: list[tuple[float, int]] = []
+
+    async with module.create_bench_loopback_client(build_service(module, {"method1": handle})) as client:
+        for _ in range(2):
+            calls = 0
+            start = time.perf_counter()
+            responses = await client.method1_gather(requests, max_concurrency=MESSAGES)
+            result.append((time.perf_counter() - start, calls))
+
+            assert [response.body.value for response in responses] == expected
+
+    return result
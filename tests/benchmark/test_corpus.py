@@ -0,0 +1,49 @@
+from dataclasses import replace
+
+import pytest
+from google.protobuf.descriptor_pool import DescriptorPool
+
+from pyprotostuben.codegen.mypy.plugin import MypyStubProtocPlugin
+from tests.corpus import CorpusConfig, build_request
+
+FULL_CONFIG = CorpusConfig(
+    files=4,
+    messages=3,
+    fields=6,
+    depth=2,
+    enums=2,
+    services=1,
+    methods=3,
+    imports=2,
+    map_ratio=0.2,
+    oneof_ratio=0.3,
+    enum_ratio=0.3,
+    message_ratio=0.3,
+    repeated_ratio=0.2,
+    comment_ratio=0.5,
+    parameter="no-parallel",
+)
+
+
+@pytest.mark.parametrize("config", [pytest.param(CorpusConfig(), id="default"), pytest.param(FULL_CONFIG, id="full")])
+def test_build_request_is_valid(config: CorpusConfig) -> None:
+    request = build_request(config)
+    pool = DescriptorPool()
+
+    for file in request.proto_file:
+        pool.Add(file)
+
+    assert len(request.file_to_generate) == config.files
+    assert not MypyStubProtocPlugin().run(request).error
+
+
+def test_build_request_is_deterministic() -> None:
+    assert build_request(FULL_CONFIG) == build_request(FULL_CONFIG)
+
+
+def test_scale() -> None:
+    assert FULL_CONFIG.scale(files=2, methods=3) == replace(
+        FULL_CONFIG,
+        files=FULL_CONFIG.files * 2,
+        methods=FULL_CONFIG.methods * 3,
+    )
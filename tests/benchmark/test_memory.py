@@ -0,0 +1,78 @@
+import json
+import typing as t
+from pathlib import Path
+
+import pytest
+
+from tests.benchmark.memory import MODES, format_diff, measure_in_subprocess
+from tests.integration.cases.case import skip_if_module_not_found
+
+BASELINE_PATH: t.Final[Path] = Path(__file__).parent / "baseline" / "memory.json"
+
+MAX_GROWTH: t.Final[float] = 1.1
+
+# NOTE: traced sizes are stable, whole process RSS depends on platform, python version & allocator state, so it is
+# only reported (see `--benchmark-output`), regressions are checked by traced sizes.
+GATED_MODES: t.Final[t.Collection[str]] = {"traced"}
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize(
+    "plugin_name",
+    [
+        pytest.param("mypy-stub"),
+        pytest.param("brokrpc", marks=skip_if_module_not_found("brokrpc")),
+    ],
+)
+@pytest.mark.parametrize("mode", MODES)
+def test_memory_footprint(
+    benchmark_output: t.Optional[Path],
+    benchmark_update_baseline: bool,  # noqa: FBT001
+    plugin_name: str,
+    mode: str,
+) -> None:
+    key = f"{plugin_name}/{mode}"
+    current = measure_in_subprocess(plugin_name, mode)
+    baselines = load_baselines()
+
+    if benchmark_output is not None:
+        with (benchmark_output / f"memory-{plugin_name}-{mode}.json").open("w") as fd:
+            json.dump(current, fd)
+
+    if benchmark_update_baseline:
+        baselines[key] = current
+        BASELINE_PATH.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n")
+        return
+
+    baseline = baselines.get(key)
+    if baseline is None:
+        pytest.skip(f"no baseline for {key}, run with --benchmark-update-baseline")
+
+    if benchmark_output is not None:
+        (benchmark_output / f"memory-{plugin_name}-{mode}.txt").write_text(format_diff(baseline, current) + "\n")
+
+    if mode not in GATED_MODES:
+        return
+
+    exceeded = [name for name, value in current.items() if value > baseline.get(name, value) * MAX_GROWTH]
+
+    assert not exceeded, f"memory footprint grew: {exceeded}\n{format_diff(baseline, current)}"
+
+
+def test_format_diff() -> None:
+    assert format_diff({"foo": 100, "bar": 10}, {"foo": 150, "baz": 1}).split("\n") == [
+        "metric                        baseline       current    change",
+        "bar                                 10             -       n/a",
+        "baz                                  -             1       n/a",
+        "foo                                100           150    +50.0%",
+    ]
+
+
+def load_baselines() -> dict[str, dict[str, int]]:
+    if not BASELINE_PATH.exists():
+        return {}
+
+    value = json.loads(BASELINE_PATH.read_text())
+    assert isinstance(value, dict)
+
+    return value
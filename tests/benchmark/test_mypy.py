@@ -0,0 +1,188 @@
+import json
+import subprocess
+import sys
+import typing as t
+from pathlib import Path
+
+import pytest
+from google.protobuf.compiler.plugin_pb2 import CodeGeneratorRequest
+
+from pyprotostuben.codegen.mypy.plugin import MypyStubProtocPlugin
+from pyprotostuben.protobuf.context import ContextBuilder
+from pyprotostuben.protobuf.file import ProtoFile
+from pyprotostuben.protobuf.registry import TypeRegistry
+from tests.corpus import CorpusConfig, build_request
+from tests.integration.cases.case import skip_if_module_not_found
+
+BASE_CONFIG = CorpusConfig(
+    files=4,
+    messages=4,
+    fields=6,
+    depth=1,
+    enums=1,
+    services=1,
+    methods=2,
+    imports=2,
+    map_ratio=0.1,
+    oneof_ratio=0.2,
+    enum_ratio=0.2,
+    message_ratio=0.3,
+    repeated_ratio=0.2,
+    comment_ratio=0.5,
+    parameter="no-parallel",
+)
+
+MAX_COMPACT_SIZE_RATIO: t.Final[float] = 0.75
+
+# NOTE: mypy runs in a separate process, so its peak RSS is not mixed with memory of the test process.
+MYPY_RUNNER: t.Final[str] = """
+import json, sys, time
+from mypy import api
+from pyprotostuben.stats import get_peak_rss
+
+start = time.perf_counter()
+stdout, stderr, status = api.run(sys.argv[1:])
+wall = time.perf_counter() - start
+
+json.dump(
+    {
+        "status": status,
+        "wall": wall,
+        "peak_rss": get_peak_rss(),
+        "output": stdout + stderr,
+    },
+    sys.stdout,
+)
+"""
+
+
+@pytest.mark.benchmark
+@skip_if_module_not_found("mypy")
+@pytest.mark.parametrize("scale", [1, 4])
+@pytest.mark.parametrize("mode", ["default", "stub-compact"])
+def test_mypy_type_check_cost(tmp_path: Path, benchmark_output: t.Optional[Path], scale: int, mode: str) -> None:
+    request = build_request(BASE_CONFIG.scale(files=scale))
+    request.parameter = build_parameter(mode)
+    src_dir = tmp_path / "src"
+    cache_dir = tmp_path / "mypy_cache"
+
+    stub_bytes = write_stubs(src_dir, request)
+    (src_dir / "client.py").write_text(build_client(request))
+
+    cold = run_mypy(src_dir, cache_dir)
+    warm = run_mypy(src_dir, cache_dir)
+
+    if benchmark_output is not None:
+        with (benchmark_output / f"mypy-{mode}-files-{len(request.file_to_generate)}.json").open("w") as fd:
+            json.dump(
+                {
+                    "mode": mode,
+                    "files": len(request.file_to_generate),
+                    "stub_bytes": stub_bytes,
+                    "cold": {"wall": cold["wall"], "peak_rss": cold["peak_rss"]},
+                    "warm": {"wall": warm["wall"], "peak_rss": warm["peak_rss"]},
+                },
+                fd,
+            )
+
+    assert cold["status"] == 0, cold["output"]
+    assert warm["status"] == 0, warm["output"]
+    assert warm["wall"] < cold["wall"]
+
+
+@pytest.mark.benchmark
+def test_stub_compact_mode_shrinks_output() -> None:
+    request = build_request(BASE_CONFIG)
+    compact_request = build_request(BASE_CONFIG)
+    compact_request.parameter = build_parameter("stub-compact")
+
+    default_size = sum(len(file.content) for file in MypyStubProtocPlugin().run(request).file)
+    compact_size = sum(len(file.content) for file in MypyStubProtocPlugin().run(compact_request).file)
+
+    assert compact_size < default_size * MAX_COMPACT_SIZE_RATIO, (compact_size, default_size)
+
+
+def build_parameter(mode: str) -> str:
+    return ",".join(flag for flag in (BASE_CONFIG.parameter, mode) if flag and flag != "default")
+
+
+def write_stubs(root: Path, request: CodeGeneratorRequest) -> int:
+    response = MypyStubProtocPlugin().run(request)
+    assert not response.error
+
+    for file in response.file:
+        path = root / file.name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(file.content)
+
+    return sum(len(file.content.encode()) for file in response.file)
+
+
+def run_mypy(root: Path, cache_dir: Path) -> dict[str, t.Any]:
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-c", MYPY_RUNNER, "--strict", "--cache-dir", str(cache_dir), "client.py"],
+        cwd=root,
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+
+    value = json.loads(result.stdout)
+    assert isinstance(value, dict)
+
+    return value
+
+
+def build_client(request: CodeGeneratorRequest) -> str:
+    """Build client code that uses all generated messages (fields & oneofs) and service stubs."""
+
+    registry = ContextBuilder().build(request).registry
+    imports: set[str] = set()
+    body: list[str] = []
+
+    for file in request.proto_file:
+        messages = [(f".{file.package}.{message.name}", message) for message in file.message_type]
+
+        while messages:
+            qualname, message = messages.pop()
+            if message.options.map_entry:
+                continue
+
+            messages.extend((f"{qualname}.{nested.name}", nested) for nested in message.nested_type)
+            body.extend(
+                [
+                    f"def use_{len(body)}(msg: {format_ref(registry, imports, qualname)}) -> list[object]:",
+                    "    return [",
+                    *(f"        msg.{field.name}," for field in message.field),
+                    *(f"        msg.WhichOneof({oneof.name!r})," for oneof in message.oneof_decl),
+                    "    ]",
+                    "",
+                ]
+            )
+
+        grpc_module = f"{ProtoFile(file).pb2_module.qualname}_grpc"
+        for service in file.service:
+            imports.add(grpc_module)
+
+            for method in service.method:
+                body.extend(
+                    [
+                        f"def call_{len(body)}(",
+                        f"    stub: {grpc_module}.{service.name}Stub,",
+                        f"    request: {format_ref(registry, imports, method.input_type)},",
+                        ") -> object:",
+                        f"    return stub.{method.name}(request)",
+                        "",
+                    ]
+                )
+
+    return "\n".join([*(f"import {name}" for name in sorted(imports)), "", *body])
+
+
+def format_ref(registry: TypeRegistry, imports: set[str], ref: str) -> str:
+    info = registry.resolve_proto_message(ref)
+    assert info.module is not None
+
+    imports.add(info.module.qualname)
+
+    return ".".join((info.module.qualname, *info.ns))
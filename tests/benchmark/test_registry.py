@@ -0,0 +1,54 @@
+import gc
+import time
+import typing as t
+
+import pytest
+from google.protobuf.compiler.plugin_pb2 import CodeGeneratorRequest
+
+from pyprotostuben.protobuf.context import ContextBuilder
+from tests.corpus import CorpusConfig, build_request
+
+REPEAT: t.Final[int] = 10
+
+# NOTE: the dependency index takes ~10% of registry build, some slack is left for measurement noise.
+MAX_INDEX_OVERHEAD: t.Final[float] = 1.25
+
+CONFIG = CorpusConfig(
+    files=64,
+    messages=8,
+    fields=8,
+    depth=1,
+    enums=2,
+    services=1,
+    methods=4,
+    imports=4,
+    map_ratio=0.1,
+    oneof_ratio=0.1,
+    enum_ratio=0.2,
+    message_ratio=0.3,
+    repeated_ratio=0.2,
+)
+
+
+@pytest.mark.benchmark
+def test_type_dependency_index_overhead() -> None:
+    request = build_request(CONFIG)
+
+    baseline, indexed = measure([ContextBuilder(index_dependents=False), ContextBuilder()], request)
+
+    assert indexed / baseline <= MAX_INDEX_OVERHEAD, (indexed, baseline)
+
+
+def measure(builders: t.Sequence[ContextBuilder], request: CodeGeneratorRequest) -> t.Sequence[float]:
+    """Return wall time of the fastest registry build for each builder, builds are interleaved to even out noise."""
+
+    best = [float("inf")] * len(builders)
+
+    for _ in range(REPEAT):
+        for i, builder in enumerate(builders):
+            gc.collect()
+            start = time.perf_counter()
+            builder.build(request)
+            best[i] = min(best[i], time.perf_counter() - start)
+
+    return best
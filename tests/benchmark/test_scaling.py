@@ -0,0 +1,108 @@
+import json
+import math
+import time
+import typing as t
+from pathlib import Path
+
+import pytest
+from google.protobuf.compiler.plugin_pb2 import CodeGeneratorRequest
+
+from pyprotostuben.codegen.abc import ProtocPlugin
+from pyprotostuben.codegen.brokrpc.plugin import BrokRPCProtocPlugin
+from pyprotostuben.codegen.mypy.plugin import MypyStubProtocPlugin
+from pyprotostuben.stats import PhaseStatsCollector, use_stats_collector
+from tests.corpus import CorpusConfig, build_request
+from tests.integration.cases.case import skip_if_module_not_found
+
+SCALES: t.Final[t.Sequence[int]] = (1, 2, 4, 8)
+REPEAT: t.Final[int] = 3
+
+# NOTE: codegen is expected to be linear in each dimension, some slack is left for measurement noise.
+MAX_EXPONENT: t.Final[float] = 1.3
+
+BASE_CONFIG = CorpusConfig(
+    files=4,
+    messages=4,
+    fields=4,
+    depth=1,
+    enums=1,
+    services=1,
+    methods=2,
+    imports=2,
+    map_ratio=0.1,
+    oneof_ratio=0.1,
+    enum_ratio=0.2,
+    message_ratio=0.3,
+    repeated_ratio=0.2,
+    comment_ratio=0.5,
+    parameter="no-parallel",
+)
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize(
+    "plugin_name",
+    [
+        pytest.param("mypy-stub"),
+        pytest.param("brokrpc", marks=skip_if_module_not_found("brokrpc")),
+    ],
+)
+@pytest.mark.parametrize(
+    "dimension",
+    ["files", "messages", "fields", "depth", "enums", "services", "methods"],
+)
+def test_codegen_scales_linearly(benchmark_output: t.Optional[Path], plugin_name: str, dimension: str) -> None:
+    plugin = create_plugin(plugin_name)
+    curve = [
+        {"scale": scale, **measure(plugin, build_request(BASE_CONFIG.scale(**{dimension: scale})))} for scale in SCALES
+    ]
+
+    exponent = fit_exponent([point["scale"] for point in curve], [point["wall"] for point in curve])
+
+    if benchmark_output is not None:
+        with (benchmark_output / f"scaling-{plugin_name}-{dimension}.json").open("w") as fd:
+            json.dump({"plugin": plugin_name, "dimension": dimension, "exponent": exponent, "curve": curve}, fd)
+
+    assert exponent <= MAX_EXPONENT, curve
+
+
+def create_plugin(name: str) -> ProtocPlugin:
+    if name == "mypy-stub":
+        return MypyStubProtocPlugin()
+
+    elif name == "brokrpc":
+        return BrokRPCProtocPlugin()
+
+    else:
+        raise ValueError(name)
+
+
+def measure(plugin: ProtocPlugin, request: CodeGeneratorRequest) -> dict[str, float]:
+    """Run plugin a few times and return timings of the fastest run."""
+
+    best: t.Optional[dict[str, float]] = None
+
+    for _ in range(REPEAT):
+        with use_stats_collector(PhaseStatsCollector()) as stats:
+            assert isinstance(stats, PhaseStatsCollector)
+
+            start = time.perf_counter()
+            plugin.run(request)
+            wall = time.perf_counter() - start
+
+        if best is None or wall < best["wall"]:
+            best = {"wall": wall, **{name: phase.wall for name, phase in stats.phases.items()}}
+
+    assert best is not None
+    return best
+
+
+def fit_exponent(xs: t.Sequence[float], ys: t.Sequence[float]) -> float:
+    """Fit `y = a * x ** k` with least squares on log-log scale and return `k`."""
+
+    log_xs = [math.log(x) for x in xs]
+    log_ys = [math.log(y) for y in ys]
+    mean_x = sum(log_xs) / len(log_xs)
+    mean_y = sum(log_ys) / len(log_ys)
+
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(log_xs, log_ys)) / sum((x - mean_x) ** 2 for x in log_xs)
@@ -0,0 +1,282 @@
+import random
+import typing as t
+from dataclasses import dataclass, replace
+
+from google.protobuf.compiler.plugin_pb2 import CodeGeneratorRequest
+from google.protobuf.descriptor_pb2 import (
+    DescriptorProto,
+    EnumDescriptorProto,
+    EnumValueDescriptorProto,
+    FieldDescriptorProto,
+    FileDescriptorProto,
+    MessageOptions,
+    MethodDescriptorProto,
+    OneofDescriptorProto,
+    ServiceDescriptorProto,
+    SourceCodeInfo,
+)
+
+_SCALAR_TYPES: t.Final[t.Sequence[FieldDescriptorProto.Type.ValueType]] = (
+    FieldDescriptorProto.Type.TYPE_STRING,
+    FieldDescriptorProto.Type.TYPE_INT64,
+    FieldDescriptorProto.Type.TYPE_BOOL,
+    FieldDescriptorProto.Type.TYPE_DOUBLE,
+    FieldDescriptorProto.Type.TYPE_BYTES,
+)
+
+
+@dataclass(frozen=True)
+class CorpusConfig:
+    """
+    Shape of a synthetic code generator request.
+
+    Counts are per parent (e.g. `fields` per message, `methods` per service), ratios are probabilities in [0, 1] that
+    a generated element gets the feature.
+    """
+
+    files: int = 1
+    messages: int = 1
+    fields: int = 1
+    depth: int = 0
+    enums: int = 0
+    enum_values: int = 3
+    services: int = 0
+    methods: int = 0
+    imports: int = 0
+    map_ratio: float = 0.0
+    oneof_ratio: float = 0.0
+    enum_ratio: float = 0.0
+    message_ratio: float = 0.0
+    repeated_ratio: float = 0.0
+    comment_ratio: float = 0.0
+    parameter: str = ""
+    seed: int = 0
+
+    def scale(self, **factors: int) -> "CorpusConfig":
+        return replace(self, **{name: getattr(self, name) * factor for name, factor in factors.items()})
+
+
+def build_request(config: CorpusConfig) -> CodeGeneratorRequest:
+    """Build a valid `CodeGeneratorRequest` with the given shape. The same config always gives the same request."""
+
+    files = _CorpusBuilder(config).build_files()
+
+    return CodeGeneratorRequest(
+        file_to_generate=[file.name for file in files],
+        parameter=config.parameter,
+        proto_file=files,
+    )
+
+
+class _CorpusBuilder:
+    def __init__(self, config: CorpusConfig) -> None:
+        self.__config = config
+        self.__rng = random.Random(config.seed)  # noqa: S311
+        # NOTE: full proto names of top level messages & enums of each built file, used for cross file references.
+        self.__file_messages: list[list[str]] = []
+        self.__file_enums: list[list[str]] = []
+
+    def build_files(self) -> list[FileDescriptorProto]:
+        return [self.__build_file(idx) for idx in range(self.__config.files)]
+
+    def __build_file(self, idx: int) -> FileDescriptorProto:
+        config = self.__config
+        package = f"corpus.pkg{idx}"
+        locations: list[SourceCodeInfo.Location] = []
+
+        deps = list(range(max(0, idx - config.imports), idx))
+        messages = [f".{package}.Message{i}" for i in range(config.messages)]
+        enums = [f".{package}.Enum{i}" for i in range(config.enums)]
+        ref_messages = [*messages, *(name for dep in deps for name in self.__file_messages[dep])]
+        ref_enums = [*enums, *(name for dep in deps for name in self.__file_enums[dep])]
+
+        file = FileDescriptorProto(
+            name=f"corpus/pkg{idx}/file{idx}.proto",
+            package=package,
+            syntax="proto3",
+            dependency=[f"corpus/pkg{dep}/file{dep}.proto" for dep in deps],
+            enum_type=[
+                self.__build_enum(f"Enum{i}", (FileDescriptorProto.ENUM_TYPE_FIELD_NUMBER, i), locations)
+                for i in range(config.enums)
+            ],
+            message_type=[
+                self.__build_message(
+                    name=f"Message{i}",
+                    qualname=f".{package}.Message{i}",
+                    path=(FileDescriptorProto.MESSAGE_TYPE_FIELD_NUMBER, i),
+                    depth=config.depth,
+                    ref_messages=ref_messages,
+                    ref_enums=ref_enums,
+                    locations=locations,
+                )
+                for i in range(config.messages)
+            ],
+            service=[
+                self.__build_service(
+                    f"Service{i}",
+                    (FileDescriptorProto.SERVICE_FIELD_NUMBER, i),
+                    ref_messages,
+                    locations,
+                )
+                for i in range(config.services if ref_messages else 0)
+            ],
+        )
+        file.source_code_info.location.extend(locations)
+
+        self.__file_messages.append(messages)
+        self.__file_enums.append(enums)
+
+        return file
+
+    def __build_enum(
+        self,
+        name: str,
+        path: tuple[int, ...],
+        locations: list[SourceCodeInfo.Location],
+    ) -> EnumDescriptorProto:
+        self.__add_comment(name, path, locations)
+
+        return EnumDescriptorProto(
+            name=name,
+            value=[
+                EnumValueDescriptorProto(name=f"{name.upper()}_VALUE{i}", number=i)
+                for i in range(max(1, self.__config.enum_values))
+            ],
+        )
+
+    # NOTE: message shape depends on many settings, no need to group them.
+    def __build_message(  # noqa: PLR0913
+        self,
+        name: str,
+        qualname: str,
+        path: tuple[int, ...],
+        depth: int,
+        ref_messages: t.Sequence[str],
+        ref_enums: t.Sequence[str],
+        locations: list[SourceCodeInfo.Location],
+    ) -> DescriptorProto:
+        config = self.__config
+        rng = self.__rng
+        self.__add_comment(name, path, locations)
+
+        message = DescriptorProto(name=name)
+
+        if depth > 0:
+            nested_path = (*path, DescriptorProto.NESTED_TYPE_FIELD_NUMBER, 0)
+            message.nested_type.append(
+                self.__build_message(
+                    name="Nested",
+                    qualname=f"{qualname}.Nested",
+                    path=nested_path,
+                    depth=depth - 1,
+                    ref_messages=ref_messages,
+                    ref_enums=ref_enums,
+                    locations=locations,
+                )
+            )
+
+        for i in range(config.fields):
+            field = FieldDescriptorProto(
+                name=f"field{i}",
+                number=i + 1,
+                label=FieldDescriptorProto.Label.LABEL_OPTIONAL,
+                json_name=f"field{i}",
+            )
+
+            if rng.random() < config.map_ratio:
+                entry_name = f"Field{i}Entry"
+                message.nested_type.append(self.__build_map_entry(entry_name, ref_messages))
+                field.label = FieldDescriptorProto.Label.LABEL_REPEATED
+                field.type = FieldDescriptorProto.Type.TYPE_MESSAGE
+                field.type_name = f"{qualname}.{entry_name}"
+
+            else:
+                self.__set_value_type(field, ref_messages, ref_enums)
+
+                if rng.random() < config.repeated_ratio:
+                    field.label = FieldDescriptorProto.Label.LABEL_REPEATED
+
+                elif rng.random() < config.oneof_ratio:
+                    if not message.oneof_decl:
+                        message.oneof_decl.append(OneofDescriptorProto(name="choice"))
+                    field.oneof_index = 0
+
+            self.__add_comment(
+                field.name,
+                (*path, DescriptorProto.FIELD_FIELD_NUMBER, i),
+                locations,
+            )
+            message.field.append(field)
+
+        return message
+
+    def __build_map_entry(self, name: str, ref_messages: t.Sequence[str]) -> DescriptorProto:
+        key = FieldDescriptorProto(
+            name="key",
+            number=1,
+            label=FieldDescriptorProto.Label.LABEL_OPTIONAL,
+            type=FieldDescriptorProto.Type.TYPE_STRING,
+            json_name="key",
+        )
+        value = FieldDescriptorProto(
+            name="value",
+            number=2,
+            label=FieldDescriptorProto.Label.LABEL_OPTIONAL,
+            json_name="value",
+        )
+        self.__set_value_type(value, ref_messages, ())
+
+        return DescriptorProto(name=name, field=[key, value], options=MessageOptions(map_entry=True))
+
+    def __set_value_type(
+        self,
+        field: FieldDescriptorProto,
+        ref_messages: t.Sequence[str],
+        ref_enums: t.Sequence[str],
+    ) -> None:
+        config = self.__config
+        rng = self.__rng
+
+        if ref_messages and rng.random() < config.message_ratio:
+            field.type = FieldDescriptorProto.Type.TYPE_MESSAGE
+            field.type_name = rng.choice(ref_messages)
+
+        elif ref_enums and rng.random() < config.enum_ratio:
+            field.type = FieldDescriptorProto.Type.TYPE_ENUM
+            field.type_name = rng.choice(ref_enums)
+
+        else:
+            field.type = rng.choice(_SCALAR_TYPES)
+
+    def __build_service(
+        self,
+        name: str,
+        path: tuple[int, ...],
+        ref_messages: t.Sequence[str],
+        locations: list[SourceCodeInfo.Location],
+    ) -> ServiceDescriptorProto:
+        rng = self.__rng
+        self.__add_comment(name, path, locations)
+
+        service = ServiceDescriptorProto(name=name)
+
+        for i in range(self.__config.methods):
+            method = MethodDescriptorProto(
+                name=f"Method{i}",
+                input_type=rng.choice(ref_messages),
+                output_type=rng.choice(ref_messages),
+            )
+            self.__add_comment(method.name, (*path, ServiceDescriptorProto.METHOD_FIELD_NUMBER, i), locations)
+            service.method.append(method)
+
+        return service
+
+    def __add_comment(self, name: str, path: tuple[int, ...], locations: list[SourceCodeInfo.Location]) -> None:
+        if self.__rng.random() < self.__config.comment_ratio:
+            locations.append(
+                SourceCodeInfo.Location(
+                    path=path,
+                    span=[0, 0, 0],
+                    leading_comments=f" Synthetic comment for {name}.\n It has a few lines of text.\n",
+                )
+            )
@@ -1,15 +1,65 @@
 """Source: greeting.proto"""
 import abc
+import asyncio
 import brokrpc.options
 import brokrpc.rpc.abc
 import brokrpc.rpc.client
 import brokrpc.rpc.model
 import brokrpc.rpc.server
 import brokrpc.serializer.protobuf
+import builtins
 import contextlib
 import greeting_pb2
 import typing
 
+async def _iterate(items: typing.Union[typing.Iterable[typing.Any], typing.AsyncIterable[typing.Any]]) -> typing.AsyncIterator[typing.Any]:
+    if builtins.isinstance(items, typing.AsyncIterable):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
+async def _gather(func: typing.Callable[[typing.Any], typing.Coroutine[typing.Any, typing.Any, typing.Any]], items: typing.Union[typing.Iterable[typing.Any], typing.AsyncIterable[typing.Any]], max_concurrency: builtins.int) -> typing.Sequence[typing.Any]:
+    """Call `func` for each item (up to `max_concurrency` at once), return results in items order, raise the error of the first failed call (exception group if several calls failed at once)."""
+    limit = asyncio.Semaphore(max_concurrency)
+    tasks: typing.MutableSequence[asyncio.Task[typing.Any]] = []
+
+    def release(_: asyncio.Task[typing.Any]) -> None:
+        limit.release()
+    try:
+        async with asyncio.TaskGroup() as group:
+            async for item in _iterate(items):
+                await limit.acquire()
+                task = group.create_task(func(item))
+                task.add_done_callback(release)
+                tasks.append(task)
+    except builtins.BaseExceptionGroup as err:
+        if builtins.len(err.exceptions) == 1:
+            raise err.exceptions[0] from None
+        raise
+    return await asyncio.gather(*tasks)
+
+async def _as_completed(func: typing.Callable[[typing.Any], typing.Coroutine[typing.Any, typing.Any, typing.Any]], items: typing.Union[typing.Iterable[typing.Any], typing.AsyncIterable[typing.Any]], max_concurrency: builtins.int) -> typing.AsyncIterator[typing.Any]:
+    """Call `func` for each item (up to `max_concurrency` at once), yield results as completed."""
+    pending: typing.Set[asyncio.Task[typing.Any]] = builtins.set()
+    try:
+        async for item in _iterate(items):
+            if builtins.len(pending) >= max_concurrency:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+            pending.add(asyncio.ensure_future(func(item)))
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+_GREET_REQUEST_GREET_RESPONSE_SERIALIZER = brokrpc.serializer.protobuf.RPCProtobufSerializer(greeting_pb2.GreetRequest, greeting_pb2.GreetResponse)
+_GREETER_GREET_QUEUE_OPTIONS = brokrpc.options.QueueOptions(name='/greeting/Greeter/Greet', durable=None, exclusive=None, auto_delete=None)
+
 class Greeter(metaclass=abc.ABCMeta):
 
     @abc.abstractmethod
@@ -17,7 +67,7 @@ class Greeter(metaclass=abc.ABCMeta):
         raise NotImplementedError
 
 def add_greeter_to_server(service: Greeter, server: brokrpc.rpc.server.Server) -> None:
-    server.register_unary_unary_handler(func=service.greet, routing_key='/greeting/Greeter/Greet', serializer=brokrpc.serializer.protobuf.RPCProtobufSerializer(greeting_pb2.GreetRequest, greeting_pb2.GreetResponse), exchange=None, queue=brokrpc.options.QueueOptions(name='/greeting/Greeter/Greet', durable=None, exclusive=None, auto_delete=None))
+    server.register_unary_unary_handler(func=service.greet, routing_key='/greeting/Greeter/Greet', serializer=_GREET_REQUEST_GREET_RESPONSE_SERIALIZER, exchange=None, queue=_GREETER_GREET_QUEUE_OPTIONS)
 
 class GreeterClient:
 
@@ -27,7 +77,14 @@ class GreeterClient:
     async def greet(self, request: greeting_pb2.GreetRequest) -> brokrpc.rpc.model.Response[greeting_pb2.GreetResponse]:
         return await self.__greet.invoke(request)
 
+    async def greet_gather(self, requests: typing.Union[typing.Iterable[greeting_pb2.GreetRequest], typing.AsyncIterable[greeting_pb2.GreetRequest]], *, max_concurrency: builtins.int=64) -> typing.Sequence[brokrpc.rpc.model.Response[greeting_pb2.GreetResponse]]:
+        return await _gather(self.__greet.invoke, requests, max_concurrency)
+
+    async def greet_as_completed(self, requests: typing.Union[typing.Iterable[greeting_pb2.GreetRequest], typing.AsyncIterable[greeting_pb2.GreetRequest]], *, max_concurrency: builtins.int=64) -> typing.AsyncIterator[brokrpc.rpc.model.Response[greeting_pb2.GreetResponse]]:
+        async for response in _as_completed(self.__greet.invoke, requests, max_concurrency):
+            yield response
+
 @contextlib.asynccontextmanager
 async def create_greeter_client(client: brokrpc.rpc.client.Client) -> typing.AsyncIterator[GreeterClient]:
-    async with client.unary_unary_caller(routing_key='/greeting/Greeter/Greet', serializer=brokrpc.serializer.protobuf.RPCProtobufSerializer(greeting_pb2.GreetRequest, greeting_pb2.GreetResponse), exchange=None) as greet:
+    async with client.unary_unary_caller(routing_key='/greeting/Greeter/Greet', serializer=_GREET_REQUEST_GREET_RESPONSE_SERIALIZER, exchange=None) as greet:
         yield GreeterClient(greet=greet)
\ No newline at end of file
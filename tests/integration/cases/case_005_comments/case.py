@@ -6,3 +6,10 @@ mypy_case = DirCaseProvider(
     plugin=MypyStubProtocPlugin(),
     parameter="no-parallel",
 )
+
+mypy_compact_case = DirCaseProvider(
+    filename=__file__,
+    plugin=MypyStubProtocPlugin(),
+    parameter="no-parallel,stub-compact",
+    expected_gen_source="expected_gen_compact",
+)
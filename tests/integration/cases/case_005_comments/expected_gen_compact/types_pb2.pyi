@@ -0,0 +1,37 @@
+import builtins
+import enum
+import google.protobuf.message
+import typing
+
+class MyEnum(enum.IntEnum):
+    MY_ENUM_VAL_ZERO = 0
+    MY_ENUM_VAL_FIRST = 1
+    MY_ENUM_VAL_SECOND = 2
+    MY_ENUM_VAL_THIRD = 3
+
+class Msg1(google.protobuf.message.Message):
+
+    def __init__(self, *, field1: builtins.int, field2: builtins.str) -> None:...
+    field1: typing.Final[builtins.int]
+    field2: typing.Final[builtins.str]
+
+    def HasField(self, field_name: typing.NoReturn) -> typing.NoReturn:...
+
+    def WhichOneof(self, oneof_group: typing.NoReturn) -> typing.NoReturn:...
+
+class Msg2(google.protobuf.message.Message):
+
+    def __init__(self, *, field3: builtins.str) -> None:...
+    field3: typing.Final[builtins.str]
+
+    def HasField(self, field_name: typing.NoReturn) -> typing.NoReturn:...
+
+    def WhichOneof(self, oneof_group: typing.NoReturn) -> typing.NoReturn:...
+
+class Msg3(google.protobuf.message.Message):
+
+    def __init__(self) -> None:...
+
+    def HasField(self, field_name: typing.NoReturn) -> typing.NoReturn:...
+
+    def WhichOneof(self, oneof_group: typing.NoReturn) -> typing.NoReturn:...
\ No newline at end of file
@@ -1,15 +1,66 @@
 """Source: bar.proto"""
 import abc
+import asyncio
 import brokrpc.options
 import brokrpc.rpc.abc
 import brokrpc.rpc.client
 import brokrpc.rpc.model
 import brokrpc.rpc.server
 import brokrpc.serializer.protobuf
+import builtins
 import contextlib
 import google.protobuf.empty_pb2
 import typing
 
+async def _iterate(items: typing.Union[typing.Iterable[typing.Any], typing.AsyncIterable[typing.Any]]) -> typing.AsyncIterator[typing.Any]:
+    if builtins.isinstance(items, typing.AsyncIterable):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
+async def _gather(func: typing.Callable[[typing.Any], typing.Coroutine[typing.Any, typing.Any, typing.Any]], items: typing.Union[typing.Iterable[typing.Any], typing.AsyncIterable[typing.Any]], max_concurrency: builtins.int) -> typing.Sequence[typing.Any]:
+    """Call `func` for each item (up to `max_concurrency` at once), return results in items order, raise the error of the first failed call (exception group if several calls failed at once)."""
+    limit = asyncio.Semaphore(max_concurrency)
+    tasks: typing.MutableSequence[asyncio.Task[typing.Any]] = []
+
+    def release(_: asyncio.Task[typing.Any]) -> None:
+        limit.release()
+    try:
+        async with asyncio.TaskGroup() as group:
+            async for item in _iterate(items):
+                await limit.acquire()
+                task = group.create_task(func(item))
+                task.add_done_callback(release)
+                tasks.append(task)
+    except builtins.BaseExceptionGroup as err:
+        if builtins.len(err.exceptions) == 1:
+            raise err.exceptions[0] from None
+        raise
+    return await asyncio.gather(*tasks)
+
+async def _as_completed(func: typing.Callable[[typing.Any], typing.Coroutine[typing.Any, typing.Any, typing.Any]], items: typing.Union[typing.Iterable[typing.Any], typing.AsyncIterable[typing.Any]], max_concurrency: builtins.int) -> typing.AsyncIterator[typing.Any]:
+    """Call `func` for each item (up to `max_concurrency` at once), yield results as completed."""
+    pending: typing.Set[asyncio.Task[typing.Any]] = builtins.set()
+    try:
+        async for item in _iterate(items):
+            if builtins.len(pending) >= max_concurrency:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+            pending.add(asyncio.ensure_future(func(item)))
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+_EMPTY_EMPTY_SERIALIZER = brokrpc.serializer.protobuf.RPCProtobufSerializer(google.protobuf.empty_pb2.Empty, google.protobuf.empty_pb2.Empty)
+_BAR_SERVICE_EXCHANGE_OPTIONS = brokrpc.options.ExchangeOptions(name='bar-exchange-name', type='topic', durable=None, auto_delete=True)
+_BAR_SERVICE_DO_BAR_QUEUE_OPTIONS = brokrpc.options.QueueOptions(name='bar-queue-name', durable=True, exclusive=None, auto_delete=None)
+
 class BarService(metaclass=abc.ABCMeta):
 
     @abc.abstractmethod
@@ -17,7 +68,7 @@ class BarService(metaclass=abc.ABCMeta):
         raise NotImplementedError
 
 def add_bar_service_to_server(service: BarService, server: brokrpc.rpc.server.Server) -> None:
-    server.register_unary_unary_handler(func=service.do_bar, routing_key='/bar/BarService/DoBar', serializer=brokrpc.serializer.protobuf.RPCProtobufSerializer(google.protobuf.empty_pb2.Empty, google.protobuf.empty_pb2.Empty), exchange=brokrpc.options.ExchangeOptions(name='bar-exchange-name', type='topic', durable=None, auto_delete=True), queue=brokrpc.options.QueueOptions(name='bar-queue-name', durable=True, exclusive=None, auto_delete=None))
+    server.register_unary_unary_handler(func=service.do_bar, routing_key='/bar/BarService/DoBar', serializer=_EMPTY_EMPTY_SERIALIZER, exchange=_BAR_SERVICE_EXCHANGE_OPTIONS, queue=_BAR_SERVICE_DO_BAR_QUEUE_OPTIONS)
 
 class BarServiceClient:
 
@@ -27,7 +78,14 @@ class BarServiceClient:
     async def do_bar(self, request: google.protobuf.empty_pb2.Empty) -> brokrpc.rpc.model.Response[google.protobuf.empty_pb2.Empty]:
         return await self.__do_bar.invoke(request)
 
+    async def do_bar_gather(self, requests: typing.Union[typing.Iterable[google.protobuf.empty_pb2.Empty], typing.AsyncIterable[google.protobuf.empty_pb2.Empty]], *, max_concurrency: builtins.int=64) -> typing.Sequence[brokrpc.rpc.model.Response[google.protobuf.empty_pb2.Empty]]:
+        return await _gather(self.__do_bar.invoke, requests, max_concurrency)
+
+    async def do_bar_as_completed(self, requests: typing.Union[typing.Iterable[google.protobuf.empty_pb2.Empty], typing.AsyncIterable[google.protobuf.empty_pb2.Empty]], *, max_concurrency: builtins.int=64) -> typing.AsyncIterator[brokrpc.rpc.model.Response[google.protobuf.empty_pb2.Empty]]:
+        async for response in _as_completed(self.__do_bar.invoke, requests, max_concurrency):
+            yield response
+
 @contextlib.asynccontextmanager
 async def create_bar_service_client(client: brokrpc.rpc.client.Client) -> typing.AsyncIterator[BarServiceClient]:
-    async with client.unary_unary_caller(routing_key='/bar/BarService/DoBar', serializer=brokrpc.serializer.protobuf.RPCProtobufSerializer(google.protobuf.empty_pb2.Empty, google.protobuf.empty_pb2.Empty), exchange=brokrpc.options.ExchangeOptions(name='bar-exchange-name', type='topic', durable=None, auto_delete=True)) as do_bar:
+    async with client.unary_unary_caller(routing_key='/bar/BarService/DoBar', serializer=_EMPTY_EMPTY_SERIALIZER, exchange=_BAR_SERVICE_EXCHANGE_OPTIONS) as do_bar:
         yield BarServiceClient(do_bar=do_bar)
\ No newline at end of file
@@ -1,5 +1,6 @@
 """Source: foo.proto"""
 import abc
+import asyncio
 import brokrpc.abc
 import brokrpc.message
 import brokrpc.model
@@ -7,10 +8,41 @@ import brokrpc.options
 import brokrpc.rpc.client
 import brokrpc.rpc.server
 import brokrpc.serializer.protobuf
+import builtins
 import contextlib
 import foo_pb2
 import typing
 
+async def _iterate(items: typing.Union[typing.Iterable[typing.Any], typing.AsyncIterable[typing.Any]]) -> typing.AsyncIterator[typing.Any]:
+    if builtins.isinstance(items, typing.AsyncIterable):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
+async def _gather(func: typing.Callable[[typing.Any], typing.Coroutine[typing.Any, typing.Any, typing.Any]], items: typing.Union[typing.Iterable[typing.Any], typing.AsyncIterable[typing.Any]], max_concurrency: builtins.int) -> typing.Sequence[typing.Any]:
+    """Call `func` for each item (up to `max_concurrency` at once), return results in items order, raise the error of the first failed call (exception group if several calls failed at once)."""
+    limit = asyncio.Semaphore(max_concurrency)
+    tasks: typing.MutableSequence[asyncio.Task[typing.Any]] = []
+
+    def release(_: asyncio.Task[typing.Any]) -> None:
+        limit.release()
+    try:
+        async with asyncio.TaskGroup() as group:
+            async for item in _iterate(items):
+                await limit.acquire()
+                task = group.create_task(func(item))
+                task.add_done_callback(release)
+                tasks.append(task)
+    except builtins.BaseExceptionGroup as err:
+        if builtins.len(err.exceptions) == 1:
+            raise err.exceptions[0] from None
+        raise
+    return await asyncio.gather(*tasks)
+_PAYLOAD_SERIALIZER = brokrpc.serializer.protobuf.ProtobufSerializer(foo_pb2.Payload)
+_FOO_SERVICE_NOTIFY_FOO_QUEUE_OPTIONS = brokrpc.options.QueueOptions(name='/foo/FooService/NotifyFoo', durable=None, exclusive=None, auto_delete=None)
+
 class FooService(metaclass=abc.ABCMeta):
 
     @abc.abstractmethod
@@ -19,7 +51,7 @@ class FooService(metaclass=abc.ABCMeta):
         raise NotImplementedError
 
 def add_foo_service_to_server(service: FooService, server: brokrpc.rpc.server.Server) -> None:
-    server.register_consumer(func=service.notify_foo, routing_key='/foo/FooService/NotifyFoo', serializer=brokrpc.serializer.protobuf.ProtobufSerializer(foo_pb2.Payload), exchange=None, queue=brokrpc.options.QueueOptions(name='/foo/FooService/NotifyFoo', durable=None, exclusive=None, auto_delete=None))
+    server.register_consumer(func=service.notify_foo, routing_key='/foo/FooService/NotifyFoo', serializer=_PAYLOAD_SERIALIZER, exchange=None, queue=_FOO_SERVICE_NOTIFY_FOO_QUEUE_OPTIONS)
 
 class FooServiceClient:
 
@@ -30,7 +62,11 @@ class FooServiceClient:
         """this is a definition of publisher / consumer method (no response)."""
         await self.__notify_foo.publish(message)
 
+    async def notify_foo_many(self, messages: typing.Union[typing.Iterable[foo_pb2.Payload], typing.AsyncIterable[foo_pb2.Payload]], *, max_in_flight: builtins.int=64) -> typing.Sequence[brokrpc.model.PublisherResult]:
+        """this is a definition of publisher / consumer method (no response)."""
+        return await _gather(self.__notify_foo.publish, messages, max_in_flight)
+
 @contextlib.asynccontextmanager
 async def create_foo_service_client(client: brokrpc.rpc.client.Client) -> typing.AsyncIterator[FooServiceClient]:
-    async with client.publisher(routing_key='/foo/FooService/NotifyFoo', serializer=brokrpc.serializer.protobuf.ProtobufSerializer(foo_pb2.Payload), exchange=None) as notify_foo:
+    async with client.publisher(routing_key='/foo/FooService/NotifyFoo', serializer=_PAYLOAD_SERIALIZER, exchange=None) as notify_foo:
         yield FooServiceClient(notify_foo=notify_foo)
\ No newline at end of file
@@ -0,0 +1,41 @@
+from pyprotostuben.codegen.brokrpc.plugin import BrokRPCProtocPlugin
+from tests.integration.cases.case import DirCaseProvider, skip_if_module_not_found
+
+brokrpc_case = DirCaseProvider(
+    filename=__file__,
+    plugin=BrokRPCProtocPlugin(),
+    marks=[skip_if_module_not_found("brokrpc")],
+    deps=["buf.build/zerlok/brokrpc:v0.2.3"],
+    parameter="no-parallel",
+    expected_gen_paths=["shop_brokrpc.py"],
+)
+
+brokrpc_lazy_client_case = DirCaseProvider(
+    filename=__file__,
+    plugin=BrokRPCProtocPlugin(),
+    marks=[skip_if_module_not_found("brokrpc")],
+    deps=["buf.build/zerlok/brokrpc:v0.2.3"],
+    parameter="no-parallel,lazy-client",
+    expected_gen_source="expected_gen_lazy",
+    expected_gen_paths=["shop_brokrpc.py"],
+)
+
+brokrpc_loopback_case = DirCaseProvider(
+    filename=__file__,
+    plugin=BrokRPCProtocPlugin(),
+    marks=[skip_if_module_not_found("brokrpc")],
+    deps=["buf.build/zerlok/brokrpc:v0.2.3"],
+    parameter="no-parallel,loopback",
+    expected_gen_source="expected_gen_loopback",
+    expected_gen_paths=["shop_brokrpc.py"],
+)
+
+brokrpc_instrument_case = DirCaseProvider(
+    filename=__file__,
+    plugin=BrokRPCProtocPlugin(),
+    marks=[skip_if_module_not_found("brokrpc")],
+    deps=["buf.build/zerlok/brokrpc:v0.2.3"],
+    parameter="no-parallel,instrument",
+    expected_gen_source="expected_gen_instrument",
+    expected_gen_paths=["shop_brokrpc.py"],
+)
@@ -0,0 +1,116 @@
+"""Source: shop.proto"""
+import abc
+import asyncio
+import brokrpc.abc
+import brokrpc.message
+import brokrpc.model
+import brokrpc.options
+import brokrpc.rpc.abc
+import brokrpc.rpc.client
+import brokrpc.rpc.model
+import brokrpc.rpc.server
+import brokrpc.serializer.protobuf
+import builtins
+import contextlib
+import shop_pb2
+import typing
+
+async def _iterate(items: typing.Union[typing.Iterable[typing.Any], typing.AsyncIterable[typing.Any]]) -> typing.AsyncIterator[typing.Any]:
+    if builtins.isinstance(items, typing.AsyncIterable):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
+async def _gather(func: typing.Callable[[typing.Any], typing.Coroutine[typing.Any, typing.Any, typing.Any]], items: typing.Union[typing.Iterable[typing.Any], typing.AsyncIterable[typing.Any]], max_concurrency: builtins.int) -> typing.Sequence[typing.Any]:
+    """Call `func` for each item (up to `max_concurrency` at once), return results in items order, raise the error of the first failed call (exception group if several calls failed at once)."""
+    limit = asyncio.Semaphore(max_concurrency)
+    tasks: typing.MutableSequence[asyncio.Task[typing.Any]] = []
+
+    def release(_: asyncio.Task[typing.Any]) -> None:
+        limit.release()
+    try:
+        async with asyncio.TaskGroup() as group:
+            async for item in _iterate(items):
+                await limit.acquire()
+                task = group.create_task(func(item))
+                task.add_done_callback(release)
+                tasks.append(task)
+    except builtins.BaseExceptionGroup as err:
+        if builtins.len(err.exceptions) == 1:
+            raise err.exceptions[0] from None
+        raise
+    return await asyncio.gather(*tasks)
+
+async def _as_completed(func: typing.Callable[[typing.Any], typing.Coroutine[typing.Any, typing.Any, typing.Any]], items: typing.Union[typing.Iterable[typing.Any], typing.AsyncIterable[typing.Any]], max_concurrency: builtins.int) -> typing.AsyncIterator[typing.Any]:
+    """Call `func` for each item (up to `max_concurrency` at once), yield results as completed."""
+    pending: typing.Set[asyncio.Task[typing.Any]] = builtins.set()
+    try:
+        async for item in _iterate(items):
+            if builtins.len(pending) >= max_concurrency:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+            pending.add(asyncio.ensure_future(func(item)))
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+_ORDER_SERIALIZER = brokrpc.serializer.protobuf.ProtobufSerializer(shop_pb2.Order)
+_SHOP_NOTIFY_ORDER_QUEUE_OPTIONS = brokrpc.options.QueueOptions(name='/shop/Shop/NotifyOrder', durable=None, exclusive=None, auto_delete=None)
+_ORDER_ORDER_STATUS_SERIALIZER = brokrpc.serializer.protobuf.RPCProtobufSerializer(shop_pb2.Order, shop_pb2.OrderStatus)
+_SHOP_GET_STATUS_QUEUE_OPTIONS = brokrpc.options.QueueOptions(name='/shop/Shop/GetStatus', durable=None, exclusive=None, auto_delete=None)
+
+class Shop(metaclass=abc.ABCMeta):
+    """Order processing service."""
+
+    @abc.abstractmethod
+    async def notify_order(self, message: brokrpc.message.Message[shop_pb2.Order]) -> brokrpc.model.ConsumerResult:
+        """Notify about a placed order (no response)."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def get_status(self, request: brokrpc.rpc.model.Request[shop_pb2.Order]) -> shop_pb2.OrderStatus:
+        """Get current status of the order."""
+        raise NotImplementedError
+
+def add_shop_to_server(service: Shop, server: brokrpc.rpc.server.Server) -> None:
+    server.register_consumer(func=service.notify_order, routing_key='/shop/Shop/NotifyOrder', serializer=_ORDER_SERIALIZER, exchange=None, queue=_SHOP_NOTIFY_ORDER_QUEUE_OPTIONS)
+    server.register_unary_unary_handler(func=service.get_status, routing_key='/shop/Shop/GetStatus', serializer=_ORDER_ORDER_STATUS_SERIALIZER, exchange=None, queue=_SHOP_GET_STATUS_QUEUE_OPTIONS)
+
+class ShopClient:
+    """Order processing service."""
+
+    def __init__(self, notify_order: brokrpc.abc.Publisher[shop_pb2.Order, brokrpc.model.PublisherResult], get_status: brokrpc.rpc.abc.Caller[shop_pb2.Order, shop_pb2.OrderStatus]) -> None:
+        self.__notify_order = notify_order
+        self.__get_status = get_status
+
+    async def notify_order(self, message: shop_pb2.Order) -> None:
+        """Notify about a placed order (no response)."""
+        await self.__notify_order.publish(message)
+
+    async def notify_order_many(self, messages: typing.Union[typing.Iterable[shop_pb2.Order], typing.AsyncIterable[shop_pb2.Order]], *, max_in_flight: builtins.int=64) -> typing.Sequence[brokrpc.model.PublisherResult]:
+        """Notify about a placed order (no response)."""
+        return await _gather(self.__notify_order.publish, messages, max_in_flight)
+
+    async def get_status(self, request: shop_pb2.Order) -> brokrpc.rpc.model.Response[shop_pb2.OrderStatus]:
+        """Get current status of the order."""
+        return await self.__get_status.invoke(request)
+
+    async def get_status_gather(self, requests: typing.Union[typing.Iterable[shop_pb2.Order], typing.AsyncIterable[shop_pb2.Order]], *, max_concurrency: builtins.int=64) -> typing.Sequence[brokrpc.rpc.model.Response[shop_pb2.OrderStatus]]:
+        """Get current status of the order."""
+        return await _gather(self.__get_status.invoke, requests, max_concurrency)
+
+    async def get_status_as_completed(self, requests: typing.Union[typing.Iterable[shop_pb2.Order], typing.AsyncIterable[shop_pb2.Order]], *, max_concurrency: builtins.int=64) -> typing.AsyncIterator[brokrpc.rpc.model.Response[shop_pb2.OrderStatus]]:
+        """Get current status of the order."""
+        async for response in _as_completed(self.__get_status.invoke, requests, max_concurrency):
+            yield response
+
+@contextlib.asynccontextmanager
+async def create_shop_client(client: brokrpc.rpc.client.Client) -> typing.AsyncIterator[ShopClient]:
+    async with client.publisher(routing_key='/shop/Shop/NotifyOrder', serializer=_ORDER_SERIALIZER, exchange=None) as notify_order, client.unary_unary_caller(routing_key='/shop/Shop/GetStatus', serializer=_ORDER_ORDER_STATUS_SERIALIZER, exchange=None) as get_status:
+        yield ShopClient(notify_order=notify_order, get_status=get_status)
\ No newline at end of file
@@ -0,0 +1,167 @@
+"""Source: shop.proto"""
+import abc
+import asyncio
+import brokrpc.abc
+import brokrpc.message
+import brokrpc.model
+import brokrpc.options
+import brokrpc.rpc.abc
+import brokrpc.rpc.client
+import brokrpc.rpc.model
+import brokrpc.rpc.server
+import brokrpc.serializer.protobuf
+import builtins
+import contextlib
+import shop_pb2
+import time
+import typing
+
+async def _iterate(items: typing.Union[typing.Iterable[typing.Any], typing.AsyncIterable[typing.Any]]) -> typing.AsyncIterator[typing.Any]:
+    if builtins.isinstance(items, typing.AsyncIterable):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
+async def _gather(func: typing.Callable[[typing.Any], typing.Coroutine[typing.Any, typing.Any, typing.Any]], items: typing.Union[typing.Iterable[typing.Any], typing.AsyncIterable[typing.Any]], max_concurrency: builtins.int) -> typing.Sequence[typing.Any]:
+    """Call `func` for each item (up to `max_concurrency` at once), return results in items order, raise the error of the first failed call (exception group if several calls failed at once)."""
+    limit = asyncio.Semaphore(max_concurrency)
+    tasks: typing.MutableSequence[asyncio.Task[typing.Any]] = []
+
+    def release(_: asyncio.Task[typing.Any]) -> None:
+        limit.release()
+    try:
+        async with asyncio.TaskGroup() as group:
+            async for item in _iterate(items):
+                await limit.acquire()
+                task = group.create_task(func(item))
+                task.add_done_callback(release)
+                tasks.append(task)
+    except builtins.BaseExceptionGroup as err:
+        if builtins.len(err.exceptions) == 1:
+            raise err.exceptions[0] from None
+        raise
+    return await asyncio.gather(*tasks)
+
+async def _as_completed(func: typing.Callable[[typing.Any], typing.Coroutine[typing.Any, typing.Any, typing.Any]], items: typing.Union[typing.Iterable[typing.Any], typing.AsyncIterable[typing.Any]], max_concurrency: builtins.int) -> typing.AsyncIterator[typing.Any]:
+    """Call `func` for each item (up to `max_concurrency` at once), yield results as completed."""
+    pending: typing.Set[asyncio.Task[typing.Any]] = builtins.set()
+    try:
+        async for item in _iterate(items):
+            if builtins.len(pending) >= max_concurrency:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+            pending.add(asyncio.ensure_future(func(item)))
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+
+class RPCObserver(typing.Protocol):
+    """Observer of client calls & server consumers / handlers, e.g. to measure latency & error rate."""
+
+    def on_start(self, qualname: builtins.str, size: builtins.int) -> None:
+        """Call is started, `size` is the serialized size of the payload."""
+        ...
+
+    def on_end(self, qualname: builtins.str, duration: builtins.float, error: typing.Optional[builtins.BaseException]) -> None:
+        """Call is ended in `duration` seconds, `error` is set if the call failed."""
+        ...
+
+async def _observe(observer: RPCObserver, qualname: builtins.str, func: typing.Callable[[typing.Any], typing.Awaitable[typing.Any]], payload: typing.Any, size: builtins.int) -> typing.Any:
+    """Call `func` with the payload & notify the observer when the call starts & ends."""
+    observer.on_start(qualname, size)
+    start = time.perf_counter()
+    try:
+        result = await func(payload)
+    except builtins.BaseException as err:
+        observer.on_end(qualname, time.perf_counter() - start, err)
+        raise
+    observer.on_end(qualname, time.perf_counter() - start, None)
+    return result
+
+def _observe_server(qualname: builtins.str, func: typing.Callable[[typing.Any], typing.Awaitable[typing.Any]], observer: typing.Optional[RPCObserver]) -> typing.Callable[[typing.Any], typing.Awaitable[typing.Any]]:
+    if observer is None:
+        return func
+
+    async def observed(message: typing.Any) -> typing.Any:
+        return await _observe(observer, qualname, func, message, message.body.ByteSize())
+    return observed
+
+class _ObservedClient(brokrpc.abc.Publisher[typing.Any, typing.Any], brokrpc.rpc.abc.Caller[typing.Any, typing.Any]):
+    """Publisher / caller that notifies the observer about each publish / call of the inner one."""
+
+    def __init__(self, qualname: builtins.str, inner: typing.Any, observer: RPCObserver) -> None:
+        self.__qualname = qualname
+        self.__inner = inner
+        self.__observer = observer
+
+    async def publish(self, message: typing.Any) -> typing.Any:
+        return await _observe(self.__observer, self.__qualname, self.__inner.publish, message, message.ByteSize())
+
+    async def invoke(self, request: typing.Any) -> typing.Any:
+        return await _observe(self.__observer, self.__qualname, self.__inner.invoke, request, request.ByteSize())
+
+def _observe_client(qualname: builtins.str, inner: typing.Any, observer: typing.Optional[RPCObserver]) -> typing.Any:
+    if observer is None:
+        return inner
+    return _ObservedClient(qualname, inner, observer)
+_ORDER_SERIALIZER = brokrpc.serializer.protobuf.ProtobufSerializer(shop_pb2.Order)
+_SHOP_NOTIFY_ORDER_QUEUE_OPTIONS = brokrpc.options.QueueOptions(name='/shop/Shop/NotifyOrder', durable=None, exclusive=None, auto_delete=None)
+_ORDER_ORDER_STATUS_SERIALIZER = brokrpc.serializer.protobuf.RPCProtobufSerializer(shop_pb2.Order, shop_pb2.OrderStatus)
+_SHOP_GET_STATUS_QUEUE_OPTIONS = brokrpc.options.QueueOptions(name='/shop/Shop/GetStatus', durable=None, exclusive=None, auto_delete=None)
+
+class Shop(metaclass=abc.ABCMeta):
+    """Order processing service."""
+
+    @abc.abstractmethod
+    async def notify_order(self, message: brokrpc.message.Message[shop_pb2.Order]) -> brokrpc.model.ConsumerResult:
+        """Notify about a placed order (no response)."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def get_status(self, request: brokrpc.rpc.model.Request[shop_pb2.Order]) -> shop_pb2.OrderStatus:
+        """Get current status of the order."""
+        raise NotImplementedError
+
+def add_shop_to_server(service: Shop, server: brokrpc.rpc.server.Server, *, observer: typing.Optional[RPCObserver]=None) -> None:
+    server.register_consumer(func=_observe_server('/shop/Shop/NotifyOrder', service.notify_order, observer), routing_key='/shop/Shop/NotifyOrder', serializer=_ORDER_SERIALIZER, exchange=None, queue=_SHOP_NOTIFY_ORDER_QUEUE_OPTIONS)
+    server.register_unary_unary_handler(func=_observe_server('/shop/Shop/GetStatus', service.get_status, observer), routing_key='/shop/Shop/GetStatus', serializer=_ORDER_ORDER_STATUS_SERIALIZER, exchange=None, queue=_SHOP_GET_STATUS_QUEUE_OPTIONS)
+
+class ShopClient:
+    """Order processing service."""
+
+    def __init__(self, notify_order: brokrpc.abc.Publisher[shop_pb2.Order, brokrpc.model.PublisherResult], get_status: brokrpc.rpc.abc.Caller[shop_pb2.Order, shop_pb2.OrderStatus]) -> None:
+        self.__notify_order = notify_order
+        self.__get_status = get_status
+
+    async def notify_order(self, message: shop_pb2.Order) -> None:
+        """Notify about a placed order (no response)."""
+        await self.__notify_order.publish(message)
+
+    async def notify_order_many(self, messages: typing.Union[typing.Iterable[shop_pb2.Order], typing.AsyncIterable[shop_pb2.Order]], *, max_in_flight: builtins.int=64) -> typing.Sequence[brokrpc.model.PublisherResult]:
+        """Notify about a placed order (no response)."""
+        return await _gather(self.__notify_order.publish, messages, max_in_flight)
+
+    async def get_status(self, request: shop_pb2.Order) -> brokrpc.rpc.model.Response[shop_pb2.OrderStatus]:
+        """Get current status of the order."""
+        return await self.__get_status.invoke(request)
+
+    async def get_status_gather(self, requests: typing.Union[typing.Iterable[shop_pb2.Order], typing.AsyncIterable[shop_pb2.Order]], *, max_concurrency: builtins.int=64) -> typing.Sequence[brokrpc.rpc.model.Response[shop_pb2.OrderStatus]]:
+        """Get current status of the order."""
+        return await _gather(self.__get_status.invoke, requests, max_concurrency)
+
+    async def get_status_as_completed(self, requests: typing.Union[typing.Iterable[shop_pb2.Order], typing.AsyncIterable[shop_pb2.Order]], *, max_concurrency: builtins.int=64) -> typing.AsyncIterator[brokrpc.rpc.model.Response[shop_pb2.OrderStatus]]:
+        """Get current status of the order."""
+        async for response in _as_completed(self.__get_status.invoke, requests, max_concurrency):
+            yield response
+
+@contextlib.asynccontextmanager
+async def create_shop_client(client: brokrpc.rpc.client.Client, *, observer: typing.Optional[RPCObserver]=None) -> typing.AsyncIterator[ShopClient]:
+    async with client.publisher(routing_key='/shop/Shop/NotifyOrder', serializer=_ORDER_SERIALIZER, exchange=None) as notify_order, client.unary_unary_caller(routing_key='/shop/Shop/GetStatus', serializer=_ORDER_ORDER_STATUS_SERIALIZER, exchange=None) as get_status:
+        yield ShopClient(notify_order=_observe_client('/shop/Shop/NotifyOrder', notify_order, observer), get_status=_observe_client('/shop/Shop/GetStatus', get_status, observer))
\ No newline at end of file
@@ -0,0 +1,117 @@
+"""Source: report.proto"""
+import abc
+import asyncio
+import brokrpc.abc
+import brokrpc.message
+import brokrpc.model
+import brokrpc.options
+import brokrpc.rpc.abc
+import brokrpc.rpc.client
+import brokrpc.rpc.model
+import brokrpc.rpc.server
+import brokrpc.serializer.protobuf
+import builtins
+import contextlib
+import report_pb2
+import typing
+
+async def _iterate(items: typing.Union[typing.Iterable[typing.Any], typing.AsyncIterable[typing.Any]]) -> typing.AsyncIterator[typing.Any]:
+    if builtins.isinstance(items, typing.AsyncIterable):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
+async def _gather(func: typing.Callable[[typing.Any], typing.Coroutine[typing.Any, typing.Any, typing.Any]], items: typing.Union[typing.Iterable[typing.Any], typing.AsyncIterable[typing.Any]], max_concurrency: builtins.int) -> typing.Sequence[typing.Any]:
+    """Call `func` for each item (up to `max_concurrency` at once), return results in items order, raise the error of the first failed call (exception group if several calls failed at once)."""
+    limit = asyncio.Semaphore(max_concurrency)
+    tasks: typing.MutableSequence[asyncio.Task[typing.Any]] = []
+
+    def release(_: asyncio.Task[typing.Any]) -> None:
+        limit.release()
+    try:
+        async with asyncio.TaskGroup() as group:
+            async for item in _iterate(items):
+                await limit.acquire()
+                task = group.create_task(func(item))
+                task.add_done_callback(release)
+                tasks.append(task)
+    except builtins.BaseExceptionGroup as err:
+        if builtins.len(err.exceptions) == 1:
+            raise err.exceptions[0] from None
+        raise
+    return await asyncio.gather(*tasks)
+
+async def _as_completed(func: typing.Callable[[typing.Any], typing.Coroutine[typing.Any, typing.Any, typing.Any]], items: typing.Union[typing.Iterable[typing.Any], typing.AsyncIterable[typing.Any]], max_concurrency: builtins.int) -> typing.AsyncIterator[typing.Any]:
+    """Call `func` for each item (up to `max_concurrency` at once), yield results as completed."""
+    pending: typing.Set[asyncio.Task[typing.Any]] = builtins.set()
+    try:
+        async for item in _iterate(items):
+            if builtins.len(pending) >= max_concurrency:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+            pending.add(asyncio.ensure_future(func(item)))
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+_REPORT_REQUEST_SERIALIZER = brokrpc.serializer.protobuf.ProtobufSerializer(report_pb2.ReportRequest)
+_REPORTING_EXCHANGE_OPTIONS = brokrpc.options.ExchangeOptions(name=None, type=None, durable=None, auto_delete=None)
+_REPORTING_LOG_ACCESS_QUEUE_OPTIONS = brokrpc.options.QueueOptions(name='/report/Reporting/LogAccess', durable=None, exclusive=None, auto_delete=None, prefetch_count=16)
+_REPORT_REQUEST_REPORT_SERIALIZER = brokrpc.serializer.protobuf.RPCProtobufSerializer(report_pb2.ReportRequest, report_pb2.Report)
+_REPORTING_BUILD_REPORT_QUEUE_OPTIONS = brokrpc.options.QueueOptions(name='/report/Reporting/BuildReport', durable=True, exclusive=None, auto_delete=None, prefetch_count=1, arguments={'x-message-ttl': 60000})
+
+class Reporting(metaclass=abc.ABCMeta):
+    """Reporting service, each method consumer takes up to 16 messages at once."""
+
+    @abc.abstractmethod
+    async def log_access(self, message: brokrpc.message.Message[report_pb2.ReportRequest]) -> brokrpc.model.ConsumerResult:
+        """Log report access (inherits service prefetch count)."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def build_report(self, request: brokrpc.rpc.model.Request[report_pb2.ReportRequest]) -> report_pb2.Report:
+        """Build a report, it's slow, so a single report is built at once (requests expire in a minute)."""
+        raise NotImplementedError
+
+def add_reporting_to_server(service: Reporting, server: brokrpc.rpc.server.Server) -> None:
+    server.register_consumer(func=service.log_access, routing_key='/report/Reporting/LogAccess', serializer=_REPORT_REQUEST_SERIALIZER, exchange=_REPORTING_EXCHANGE_OPTIONS, queue=_REPORTING_LOG_ACCESS_QUEUE_OPTIONS)
+    server.register_unary_unary_handler(func=service.build_report, routing_key='/report/Reporting/BuildReport', serializer=_REPORT_REQUEST_REPORT_SERIALIZER, exchange=_REPORTING_EXCHANGE_OPTIONS, queue=_REPORTING_BUILD_REPORT_QUEUE_OPTIONS)
+
+class ReportingClient:
+    """Reporting service, each method consumer takes up to 16 messages at once."""
+
+    def __init__(self, log_access: brokrpc.abc.Publisher[report_pb2.ReportRequest, brokrpc.model.PublisherResult], build_report: brokrpc.rpc.abc.Caller[report_pb2.ReportRequest, report_pb2.Report]) -> None:
+        self.__log_access = log_access
+        self.__build_report = build_report
+
+    async def log_access(self, message: report_pb2.ReportRequest) -> None:
+        """Log report access (inherits service prefetch count)."""
+        await self.__log_access.publish(message)
+
+    async def log_access_many(self, messages: typing.Union[typing.Iterable[report_pb2.ReportRequest], typing.AsyncIterable[report_pb2.ReportRequest]], *, max_in_flight: builtins.int=64) -> typing.Sequence[brokrpc.model.PublisherResult]:
+        """Log report access (inherits service prefetch count)."""
+        return await _gather(self.__log_access.publish, messages, max_in_flight)
+
+    async def build_report(self, request: report_pb2.ReportRequest) -> brokrpc.rpc.model.Response[report_pb2.Report]:
+        """Build a report, it's slow, so a single report is built at once (requests expire in a minute)."""
+        return await self.__build_report.invoke(request)
+
+    async def build_report_gather(self, requests: typing.Union[typing.Iterable[report_pb2.ReportRequest], typing.AsyncIterable[report_pb2.ReportRequest]], *, max_concurrency: builtins.int=64) -> typing.Sequence[brokrpc.rpc.model.Response[report_pb2.Report]]:
+        """Build a report, it's slow, so a single report is built at once (requests expire in a minute)."""
+        return await _gather(self.__build_report.invoke, requests, max_concurrency)
+
+    async def build_report_as_completed(self, requests: typing.Union[typing.Iterable[report_pb2.ReportRequest], typing.AsyncIterable[report_pb2.ReportRequest]], *, max_concurrency: builtins.int=64) -> typing.AsyncIterator[brokrpc.rpc.model.Response[report_pb2.Report]]:
+        """Build a report, it's slow, so a single report is built at once (requests expire in a minute)."""
+        async for response in _as_completed(self.__build_report.invoke, requests, max_concurrency):
+            yield response
+
+@contextlib.asynccontextmanager
+async def create_reporting_client(client: brokrpc.rpc.client.Client) -> typing.AsyncIterator[ReportingClient]:
+    async with client.publisher(routing_key='/report/Reporting/LogAccess', serializer=_REPORT_REQUEST_SERIALIZER, exchange=_REPORTING_EXCHANGE_OPTIONS) as log_access, client.unary_unary_caller(routing_key='/report/Reporting/BuildReport', serializer=_REPORT_REQUEST_REPORT_SERIALIZER, exchange=_REPORTING_EXCHANGE_OPTIONS) as build_report:
+        yield ReportingClient(log_access=log_access, build_report=build_report)
\ No newline at end of file
@@ -0,0 +1,150 @@
+"""Source: ingest.proto"""
+import abc
+import asyncio
+import brokrpc.abc
+import brokrpc.message
+import brokrpc.model
+import brokrpc.options
+import brokrpc.rpc.abc
+import brokrpc.rpc.client
+import brokrpc.rpc.model
+import brokrpc.rpc.server
+import brokrpc.serializer.protobuf
+import builtins
+import contextlib
+import ingest_pb2
+import typing
+
+async def _iterate(items: typing.Union[typing.Iterable[typing.Any], typing.AsyncIterable[typing.Any]]) -> typing.AsyncIterator[typing.Any]:
+    if builtins.isinstance(items, typing.AsyncIterable):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
+async def _gather(func: typing.Callable[[typing.Any], typing.Coroutine[typing.Any, typing.Any, typing.Any]], items: typing.Union[typing.Iterable[typing.Any], typing.AsyncIterable[typing.Any]], max_concurrency: builtins.int) -> typing.Sequence[typing.Any]:
+    """Call `func` for each item (up to `max_concurrency` at once), return results in items order, raise the error of the first failed call (exception group if several calls failed at once)."""
+    limit = asyncio.Semaphore(max_concurrency)
+    tasks: typing.MutableSequence[asyncio.Task[typing.Any]] = []
+
+    def release(_: asyncio.Task[typing.Any]) -> None:
+        limit.release()
+    try:
+        async with asyncio.TaskGroup() as group:
+            async for item in _iterate(items):
+                await limit.acquire()
+                task = group.create_task(func(item))
+                task.add_done_callback(release)
+                tasks.append(task)
+    except builtins.BaseExceptionGroup as err:
+        if builtins.len(err.exceptions) == 1:
+            raise err.exceptions[0] from None
+        raise
+    return await asyncio.gather(*tasks)
+
+async def _as_completed(func: typing.Callable[[typing.Any], typing.Coroutine[typing.Any, typing.Any, typing.Any]], items: typing.Union[typing.Iterable[typing.Any], typing.AsyncIterable[typing.Any]], max_concurrency: builtins.int) -> typing.AsyncIterator[typing.Any]:
+    """Call `func` for each item (up to `max_concurrency` at once), yield results as completed."""
+    pending: typing.Set[asyncio.Task[typing.Any]] = builtins.set()
+    try:
+        async for item in _iterate(items):
+            if builtins.len(pending) >= max_concurrency:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+            pending.add(asyncio.ensure_future(func(item)))
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+_RECORD_SERIALIZER = brokrpc.serializer.protobuf.ProtobufSerializer(ingest_pb2.Record)
+_INGEST_UPLOAD_QUEUE_OPTIONS = brokrpc.options.QueueOptions(name='/ingest/Ingest/Upload', durable=None, exclusive=None, auto_delete=None)
+_SUMMARY_RECORD_SERIALIZER = brokrpc.serializer.protobuf.RPCProtobufSerializer(ingest_pb2.Summary, ingest_pb2.Record)
+_INGEST_EXPORT_QUEUE_OPTIONS = brokrpc.options.QueueOptions(name='/ingest/Ingest/Export', durable=None, exclusive=None, auto_delete=None)
+_INGEST_INGEST_QUEUE_OPTIONS = brokrpc.options.QueueOptions(name='/ingest/Ingest/Ingest', durable=None, exclusive=None, auto_delete=None)
+_RECORD_SUMMARY_SERIALIZER = brokrpc.serializer.protobuf.RPCProtobufSerializer(ingest_pb2.Record, ingest_pb2.Summary)
+_INGEST_GET_SUMMARY_QUEUE_OPTIONS = brokrpc.options.QueueOptions(name='/ingest/Ingest/GetSummary', durable=None, exclusive=None, auto_delete=None)
+
+class Ingest(metaclass=abc.ABCMeta):
+    """Bulk data ingestion service."""
+
+    @abc.abstractmethod
+    async def upload(self, message: brokrpc.message.Message[ingest_pb2.Record]) -> brokrpc.model.ConsumerResult:
+        """Upload a stream of records (each record is published to the consumer)."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def export(self, request: brokrpc.rpc.model.Request[ingest_pb2.Summary]) -> ingest_pb2.Record:
+        """Export a stream of records (brokrpc has no response streams, generated as unary method)."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def ingest(self, message: brokrpc.message.Message[ingest_pb2.Record]) -> brokrpc.model.ConsumerResult:
+        """Ingest a record, use the client `ingest_many` method to publish many records."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def get_summary(self, request: brokrpc.rpc.model.Request[ingest_pb2.Record]) -> ingest_pb2.Summary:
+        """Get summary of uploaded records."""
+        raise NotImplementedError
+
+def add_ingest_to_server(service: Ingest, server: brokrpc.rpc.server.Server) -> None:
+    server.register_consumer(func=service.upload, routing_key='/ingest/Ingest/Upload', serializer=_RECORD_SERIALIZER, exchange=None, queue=_INGEST_UPLOAD_QUEUE_OPTIONS)
+    server.register_unary_unary_handler(func=service.export, routing_key='/ingest/Ingest/Export', serializer=_SUMMARY_RECORD_SERIALIZER, exchange=None, queue=_INGEST_EXPORT_QUEUE_OPTIONS)
+    server.register_consumer(func=service.ingest, routing_key='/ingest/Ingest/Ingest', serializer=_RECORD_SERIALIZER, exchange=None, queue=_INGEST_INGEST_QUEUE_OPTIONS)
+    server.register_unary_unary_handler(func=service.get_summary, routing_key='/ingest/Ingest/GetSummary', serializer=_RECORD_SUMMARY_SERIALIZER, exchange=None, queue=_INGEST_GET_SUMMARY_QUEUE_OPTIONS)
+
+class IngestClient:
+    """Bulk data ingestion service."""
+
+    def __init__(self, upload: brokrpc.abc.Publisher[ingest_pb2.Record, brokrpc.model.PublisherResult], export: brokrpc.rpc.abc.Caller[ingest_pb2.Summary, ingest_pb2.Record], ingest: brokrpc.abc.Publisher[ingest_pb2.Record, brokrpc.model.PublisherResult], get_summary: brokrpc.rpc.abc.Caller[ingest_pb2.Record, ingest_pb2.Summary]) -> None:
+        self.__upload = upload
+        self.__export = export
+        self.__ingest = ingest
+        self.__get_summary = get_summary
+
+    async def upload(self, messages: typing.Union[typing.Iterable[ingest_pb2.Record], typing.AsyncIterable[ingest_pb2.Record]], *, max_in_flight: builtins.int=64) -> typing.Sequence[brokrpc.model.PublisherResult]:
+        """Upload a stream of records (each record is published to the consumer)."""
+        return await _gather(self.__upload.publish, messages, max_in_flight)
+
+    async def export(self, request: ingest_pb2.Summary) -> brokrpc.rpc.model.Response[ingest_pb2.Record]:
+        """Export a stream of records (brokrpc has no response streams, generated as unary method)."""
+        return await self.__export.invoke(request)
+
+    async def export_gather(self, requests: typing.Union[typing.Iterable[ingest_pb2.Summary], typing.AsyncIterable[ingest_pb2.Summary]], *, max_concurrency: builtins.int=64) -> typing.Sequence[brokrpc.rpc.model.Response[ingest_pb2.Record]]:
+        """Export a stream of records (brokrpc has no response streams, generated as unary method)."""
+        return await _gather(self.__export.invoke, requests, max_concurrency)
+
+    async def export_as_completed(self, requests: typing.Union[typing.Iterable[ingest_pb2.Summary], typing.AsyncIterable[ingest_pb2.Summary]], *, max_concurrency: builtins.int=64) -> typing.AsyncIterator[brokrpc.rpc.model.Response[ingest_pb2.Record]]:
+        """Export a stream of records (brokrpc has no response streams, generated as unary method)."""
+        async for response in _as_completed(self.__export.invoke, requests, max_concurrency):
+            yield response
+
+    async def ingest(self, message: ingest_pb2.Record) -> None:
+        """Ingest a record, use the client `ingest_many` method to publish many records."""
+        await self.__ingest.publish(message)
+
+    async def ingest_many(self, messages: typing.Union[typing.Iterable[ingest_pb2.Record], typing.AsyncIterable[ingest_pb2.Record]], *, max_in_flight: builtins.int=64) -> typing.Sequence[brokrpc.model.PublisherResult]:
+        """Ingest a record, use the client `ingest_many` method to publish many records."""
+        return await _gather(self.__ingest.publish, messages, max_in_flight)
+
+    async def get_summary(self, request: ingest_pb2.Record) -> brokrpc.rpc.model.Response[ingest_pb2.Summary]:
+        """Get summary of uploaded records."""
+        return await self.__get_summary.invoke(request)
+
+    async def get_summary_gather(self, requests: typing.Union[typing.Iterable[ingest_pb2.Record], typing.AsyncIterable[ingest_pb2.Record]], *, max_concurrency: builtins.int=64) -> typing.Sequence[brokrpc.rpc.model.Response[ingest_pb2.Summary]]:
+        """Get summary of uploaded records."""
+        return await _gather(self.__get_summary.invoke, requests, max_concurrency)
+
+    async def get_summary_as_completed(self, requests: typing.Union[typing.Iterable[ingest_pb2.Record], typing.AsyncIterable[ingest_pb2.Record]], *, max_concurrency: builtins.int=64) -> typing.AsyncIterator[brokrpc.rpc.model.Response[ingest_pb2.Summary]]:
+        """Get summary of uploaded records."""
+        async for response in _as_completed(self.__get_summary.invoke, requests, max_concurrency):
+            yield response
+
+@contextlib.asynccontextmanager
+async def create_ingest_client(client: brokrpc.rpc.client.Client) -> typing.AsyncIterator[IngestClient]:
+    async with client.publisher(routing_key='/ingest/Ingest/Upload', serializer=_RECORD_SERIALIZER, exchange=None) as upload, client.unary_unary_caller(routing_key='/ingest/Ingest/Export', serializer=_SUMMARY_RECORD_SERIALIZER, exchange=None) as export, client.publisher(routing_key='/ingest/Ingest/Ingest', serializer=_RECORD_SERIALIZER, exchange=None) as ingest, client.unary_unary_caller(routing_key='/ingest/Ingest/GetSummary', serializer=_RECORD_SUMMARY_SERIALIZER, exchange=None) as get_summary:
+        yield IngestClient(upload=upload, export=export, ingest=ingest, get_summary=get_summary)
\ No newline at end of file
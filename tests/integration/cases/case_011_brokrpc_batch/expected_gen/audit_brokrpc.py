@@ -0,0 +1,142 @@
+"""Source: audit.proto"""
+import abc
+import asyncio
+import audit_pb2
+import brokrpc.abc
+import brokrpc.message
+import brokrpc.model
+import brokrpc.options
+import brokrpc.rpc.client
+import brokrpc.rpc.server
+import brokrpc.serializer.protobuf
+import builtins
+import contextlib
+import typing
+
+async def _iterate(items: typing.Union[typing.Iterable[typing.Any], typing.AsyncIterable[typing.Any]]) -> typing.AsyncIterator[typing.Any]:
+    if builtins.isinstance(items, typing.AsyncIterable):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
+async def _gather(func: typing.Callable[[typing.Any], typing.Coroutine[typing.Any, typing.Any, typing.Any]], items: typing.Union[typing.Iterable[typing.Any], typing.AsyncIterable[typing.Any]], max_concurrency: builtins.int) -> typing.Sequence[typing.Any]:
+    """Call `func` for each item (up to `max_concurrency` at once), return results in items order, raise the error of the first failed call (exception group if several calls failed at once)."""
+    limit = asyncio.Semaphore(max_concurrency)
+    tasks: typing.MutableSequence[asyncio.Task[typing.Any]] = []
+
+    def release(_: asyncio.Task[typing.Any]) -> None:
+        limit.release()
+    try:
+        async with asyncio.TaskGroup() as group:
+            async for item in _iterate(items):
+                await limit.acquire()
+                task = group.create_task(func(item))
+                task.add_done_callback(release)
+                tasks.append(task)
+    except builtins.BaseExceptionGroup as err:
+        if builtins.len(err.exceptions) == 1:
+            raise err.exceptions[0] from None
+        raise
+    return await asyncio.gather(*tasks)
+
+class _BatchConsumer(brokrpc.abc.Consumer[brokrpc.message.Message[typing.Any], brokrpc.model.ConsumerResult]):
+    """Consumer that passes messages to `func` in batches of up to `max_size` messages, a batch is passed when it's full or `max_delay` seconds passed since its first message. `func` must return a result for each message, its error is raised for each message of the batch."""
+
+    def __init__(self, func: typing.Callable[[typing.Sequence[brokrpc.message.Message[typing.Any]]], typing.Awaitable[typing.Sequence[brokrpc.model.ConsumerResult]]], *, max_size: builtins.int, max_delay: builtins.float) -> None:
+        self.__func = func
+        self.__max_size = max_size
+        self.__max_delay = max_delay
+        self.__messages: typing.MutableSequence[brokrpc.message.Message[typing.Any]] = []
+        self.__full = asyncio.Event()
+        self.__batch: typing.Optional[asyncio.Task[typing.Sequence[brokrpc.model.ConsumerResult]]] = None
+
+    async def consume(self, message: brokrpc.message.Message[typing.Any]) -> brokrpc.model.ConsumerResult:
+        if self.__batch is None:
+            self.__messages = []
+            self.__full = asyncio.Event()
+            self.__batch = asyncio.create_task(self.__flush(self.__messages, self.__full))
+        batch = self.__batch
+        index = builtins.len(self.__messages)
+        self.__messages.append(message)
+        if builtins.len(self.__messages) >= self.__max_size:
+            self.__full.set()
+            self.__batch = None
+        results = await asyncio.shield(batch)
+        return results[index]
+
+    async def __flush(self, messages: typing.Sequence[brokrpc.message.Message[typing.Any]], full: asyncio.Event) -> typing.Sequence[brokrpc.model.ConsumerResult]:
+        with contextlib.suppress(builtins.TimeoutError):
+            await asyncio.wait_for(full.wait(), self.__max_delay)
+        if self.__messages is messages:
+            self.__batch = None
+        results = await self.__func(messages)
+        if builtins.len(results) != builtins.len(messages):
+            raise builtins.ValueError('batch function must return a result for each message', builtins.len(messages), builtins.len(results))
+        return results
+_AUDIT_EVENT_SERIALIZER = brokrpc.serializer.protobuf.ProtobufSerializer(audit_pb2.AuditEvent)
+_AUDIT_LOG_RECORD_QUEUE_OPTIONS = brokrpc.options.QueueOptions(name='/audit/AuditLog/Record', durable=True, exclusive=None, auto_delete=None, prefetch_count=100)
+_AUDIT_LOG_LOAD_QUEUE_OPTIONS = brokrpc.options.QueueOptions(name='/audit/AuditLog/Load', durable=None, exclusive=None, auto_delete=None)
+_PURGE_REQUEST_SERIALIZER = brokrpc.serializer.protobuf.ProtobufSerializer(audit_pb2.PurgeRequest)
+_AUDIT_LOG_PURGE_QUEUE_OPTIONS = brokrpc.options.QueueOptions(name='/audit/AuditLog/Purge', durable=None, exclusive=None, auto_delete=None)
+
+class AuditLog(metaclass=abc.ABCMeta):
+    """Audit log service."""
+
+    @abc.abstractmethod
+    async def record_batch(self, messages: typing.Sequence[brokrpc.message.Message[audit_pb2.AuditEvent]]) -> typing.Sequence[brokrpc.model.ConsumerResult]:
+        """Record audit events, events are written to the storage in batches of up to 100 events."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def load_batch(self, messages: typing.Sequence[brokrpc.message.Message[audit_pb2.AuditEvent]]) -> typing.Sequence[brokrpc.model.ConsumerResult]:
+        """Load audit events (e.g. from another storage), events are written in batches (with default max delay)."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def purge(self, message: brokrpc.message.Message[audit_pb2.PurgeRequest]) -> brokrpc.model.ConsumerResult:
+        """Purge audit events of the actor."""
+        raise NotImplementedError
+
+def add_audit_log_to_server(service: AuditLog, server: brokrpc.rpc.server.Server) -> None:
+    server.register_consumer(func=_BatchConsumer(service.record_batch, max_size=100, max_delay=0.5), routing_key='/audit/AuditLog/Record', serializer=_AUDIT_EVENT_SERIALIZER, exchange=None, queue=_AUDIT_LOG_RECORD_QUEUE_OPTIONS)
+    server.register_consumer(func=_BatchConsumer(service.load_batch, max_size=10, max_delay=0.1), routing_key='/audit/AuditLog/Load', serializer=_AUDIT_EVENT_SERIALIZER, exchange=None, queue=_AUDIT_LOG_LOAD_QUEUE_OPTIONS)
+    server.register_consumer(func=service.purge, routing_key='/audit/AuditLog/Purge', serializer=_PURGE_REQUEST_SERIALIZER, exchange=None, queue=_AUDIT_LOG_PURGE_QUEUE_OPTIONS)
+
+class AuditLogClient:
+    """Audit log service."""
+
+    def __init__(self, record: brokrpc.abc.Publisher[audit_pb2.AuditEvent, brokrpc.model.PublisherResult], load: brokrpc.abc.Publisher[audit_pb2.AuditEvent, brokrpc.model.PublisherResult], purge: brokrpc.abc.Publisher[audit_pb2.PurgeRequest, brokrpc.model.PublisherResult]) -> None:
+        self.__record = record
+        self.__load = load
+        self.__purge = purge
+
+    async def record(self, message: audit_pb2.AuditEvent) -> None:
+        """Record audit events, events are written to the storage in batches of up to 100 events."""
+        await self.__record.publish(message)
+
+    async def record_many(self, messages: typing.Union[typing.Iterable[audit_pb2.AuditEvent], typing.AsyncIterable[audit_pb2.AuditEvent]], *, max_in_flight: builtins.int=64) -> typing.Sequence[brokrpc.model.PublisherResult]:
+        """Record audit events, events are written to the storage in batches of up to 100 events."""
+        return await _gather(self.__record.publish, messages, max_in_flight)
+
+    async def load(self, message: audit_pb2.AuditEvent) -> None:
+        """Load audit events (e.g. from another storage), events are written in batches (with default max delay)."""
+        await self.__load.publish(message)
+
+    async def load_many(self, messages: typing.Union[typing.Iterable[audit_pb2.AuditEvent], typing.AsyncIterable[audit_pb2.AuditEvent]], *, max_in_flight: builtins.int=64) -> typing.Sequence[brokrpc.model.PublisherResult]:
+        """Load audit events (e.g. from another storage), events are written in batches (with default max delay)."""
+        return await _gather(self.__load.publish, messages, max_in_flight)
+
+    async def purge(self, message: audit_pb2.PurgeRequest) -> None:
+        """Purge audit events of the actor."""
+        await self.__purge.publish(message)
+
+    async def purge_many(self, messages: typing.Union[typing.Iterable[audit_pb2.PurgeRequest], typing.AsyncIterable[audit_pb2.PurgeRequest]], *, max_in_flight: builtins.int=64) -> typing.Sequence[brokrpc.model.PublisherResult]:
+        """Purge audit events of the actor."""
+        return await _gather(self.__purge.publish, messages, max_in_flight)
+
+@contextlib.asynccontextmanager
+async def create_audit_log_client(client: brokrpc.rpc.client.Client) -> typing.AsyncIterator[AuditLogClient]:
+    async with client.publisher(routing_key='/audit/AuditLog/Record', serializer=_AUDIT_EVENT_SERIALIZER, exchange=None) as record, client.publisher(routing_key='/audit/AuditLog/Load', serializer=_AUDIT_EVENT_SERIALIZER, exchange=None) as load, client.publisher(routing_key='/audit/AuditLog/Purge', serializer=_PURGE_REQUEST_SERIALIZER, exchange=None) as purge:
+        yield AuditLogClient(record=record, load=load, purge=purge)
\ No newline at end of file
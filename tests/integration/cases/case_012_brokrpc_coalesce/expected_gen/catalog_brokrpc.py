@@ -0,0 +1,175 @@
+"""Source: catalog.proto"""
+import abc
+import asyncio
+import brokrpc.options
+import brokrpc.rpc.abc
+import brokrpc.rpc.client
+import brokrpc.rpc.model
+import brokrpc.rpc.server
+import brokrpc.serializer.protobuf
+import builtins
+import catalog_pb2
+import collections
+import contextlib
+import time
+import typing
+
+async def _iterate(items: typing.Union[typing.Iterable[typing.Any], typing.AsyncIterable[typing.Any]]) -> typing.AsyncIterator[typing.Any]:
+    if builtins.isinstance(items, typing.AsyncIterable):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
+async def _gather(func: typing.Callable[[typing.Any], typing.Coroutine[typing.Any, typing.Any, typing.Any]], items: typing.Union[typing.Iterable[typing.Any], typing.AsyncIterable[typing.Any]], max_concurrency: builtins.int) -> typing.Sequence[typing.Any]:
+    """Call `func` for each item (up to `max_concurrency` at once), return results in items order, raise the error of the first failed call (exception group if several calls failed at once)."""
+    limit = asyncio.Semaphore(max_concurrency)
+    tasks: typing.MutableSequence[asyncio.Task[typing.Any]] = []
+
+    def release(_: asyncio.Task[typing.Any]) -> None:
+        limit.release()
+    try:
+        async with asyncio.TaskGroup() as group:
+            async for item in _iterate(items):
+                await limit.acquire()
+                task = group.create_task(func(item))
+                task.add_done_callback(release)
+                tasks.append(task)
+    except builtins.BaseExceptionGroup as err:
+        if builtins.len(err.exceptions) == 1:
+            raise err.exceptions[0] from None
+        raise
+    return await asyncio.gather(*tasks)
+
+async def _as_completed(func: typing.Callable[[typing.Any], typing.Coroutine[typing.Any, typing.Any, typing.Any]], items: typing.Union[typing.Iterable[typing.Any], typing.AsyncIterable[typing.Any]], max_concurrency: builtins.int) -> typing.AsyncIterator[typing.Any]:
+    """Call `func` for each item (up to `max_concurrency` at once), yield results as completed."""
+    pending: typing.Set[asyncio.Task[typing.Any]] = builtins.set()
+    try:
+        async for item in _iterate(items):
+            if builtins.len(pending) >= max_concurrency:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+            pending.add(asyncio.ensure_future(func(item)))
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+
+class _CoalescingCaller(brokrpc.rpc.abc.Caller[typing.Any, typing.Any]):
+    """Caller that makes a single call for concurrent identical requests (by serialized request), responses are cached for `cache_ttl` seconds (up to `cache_max_size` least recently used ones)."""
+
+    def __init__(self, inner: brokrpc.rpc.abc.Caller[typing.Any, typing.Any], *, cache_ttl: builtins.float, cache_max_size: builtins.int) -> None:
+        self.__inner = inner
+        self.__cache_ttl = cache_ttl
+        self.__cache_max_size = cache_max_size
+        self.__calls: typing.MutableMapping[builtins.bytes, asyncio.Task[brokrpc.rpc.model.Response[typing.Any]]] = {}
+        self.__cache: collections.OrderedDict[builtins.bytes, typing.Tuple[builtins.float, brokrpc.rpc.model.Response[typing.Any]]] = collections.OrderedDict()
+
+    async def invoke(self, request: typing.Any) -> brokrpc.rpc.model.Response[typing.Any]:
+        key: builtins.bytes = request.SerializeToString(deterministic=True)
+        cached = self.__cache.get(key)
+        if cached is not None and cached[0] > time.monotonic():
+            self.__cache.move_to_end(key)
+            return cached[1]
+        call = self.__calls.get(key)
+        if call is None:
+            call = asyncio.create_task(self.__invoke(key, request))
+            self.__calls[key] = call
+        return await asyncio.shield(call)
+
+    async def __invoke(self, key: builtins.bytes, request: typing.Any) -> brokrpc.rpc.model.Response[typing.Any]:
+        try:
+            response = await self.__inner.invoke(request)
+        finally:
+            self.__calls.pop(key)
+        if self.__cache_max_size > 0:
+            self.__cache[key] = (time.monotonic() + self.__cache_ttl, response)
+            self.__cache.move_to_end(key)
+            if builtins.len(self.__cache) > self.__cache_max_size:
+                self.__cache.popitem(last=False)
+        return response
+_GET_PRODUCT_REQUEST_PRODUCT_SERIALIZER = brokrpc.serializer.protobuf.RPCProtobufSerializer(catalog_pb2.GetProductRequest, catalog_pb2.Product)
+_CATALOG_GET_PRODUCT_QUEUE_OPTIONS = brokrpc.options.QueueOptions(name='/catalog/Catalog/GetProduct', durable=None, exclusive=None, auto_delete=None)
+_CATALOG_GET_PRICE_QUEUE_OPTIONS = brokrpc.options.QueueOptions(name='/catalog/Catalog/GetPrice', durable=None, exclusive=None, auto_delete=None)
+_PRODUCT_PRODUCT_SERIALIZER = brokrpc.serializer.protobuf.RPCProtobufSerializer(catalog_pb2.Product, catalog_pb2.Product)
+_CATALOG_UPDATE_PRODUCT_QUEUE_OPTIONS = brokrpc.options.QueueOptions(name='/catalog/Catalog/UpdateProduct', durable=None, exclusive=None, auto_delete=None)
+
+class Catalog(metaclass=abc.ABCMeta):
+    """Product catalog service."""
+
+    @abc.abstractmethod
+    async def get_product(self, request: brokrpc.rpc.model.Request[catalog_pb2.GetProductRequest]) -> catalog_pb2.Product:
+        """Get product, concurrent identical requests make a single call, responses are cached for 30 seconds."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def get_price(self, request: brokrpc.rpc.model.Request[catalog_pb2.GetProductRequest]) -> catalog_pb2.Product:
+        """Get current product price, concurrent identical requests make a single call (without response cache)."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def update_product(self, request: brokrpc.rpc.model.Request[catalog_pb2.Product]) -> catalog_pb2.Product:
+        """Update product."""
+        raise NotImplementedError
+
+def add_catalog_to_server(service: Catalog, server: brokrpc.rpc.server.Server) -> None:
+    server.register_unary_unary_handler(func=service.get_product, routing_key='/catalog/Catalog/GetProduct', serializer=_GET_PRODUCT_REQUEST_PRODUCT_SERIALIZER, exchange=None, queue=_CATALOG_GET_PRODUCT_QUEUE_OPTIONS)
+    server.register_unary_unary_handler(func=service.get_price, routing_key='/catalog/Catalog/GetPrice', serializer=_GET_PRODUCT_REQUEST_PRODUCT_SERIALIZER, exchange=None, queue=_CATALOG_GET_PRICE_QUEUE_OPTIONS)
+    server.register_unary_unary_handler(func=service.update_product, routing_key='/catalog/Catalog/UpdateProduct', serializer=_PRODUCT_PRODUCT_SERIALIZER, exchange=None, queue=_CATALOG_UPDATE_PRODUCT_QUEUE_OPTIONS)
+
+class CatalogClient:
+    """Product catalog service."""
+
+    def __init__(self, get_product: brokrpc.rpc.abc.Caller[catalog_pb2.GetProductRequest, catalog_pb2.Product], get_price: brokrpc.rpc.abc.Caller[catalog_pb2.GetProductRequest, catalog_pb2.Product], update_product: brokrpc.rpc.abc.Caller[catalog_pb2.Product, catalog_pb2.Product]) -> None:
+        self.__get_product = get_product
+        self.__get_price = get_price
+        self.__update_product = update_product
+
+    async def get_product(self, request: catalog_pb2.GetProductRequest) -> brokrpc.rpc.model.Response[catalog_pb2.Product]:
+        """Get product, concurrent identical requests make a single call, responses are cached for 30 seconds."""
+        return await self.__get_product.invoke(request)
+
+    async def get_product_gather(self, requests: typing.Union[typing.Iterable[catalog_pb2.GetProductRequest], typing.AsyncIterable[catalog_pb2.GetProductRequest]], *, max_concurrency: builtins.int=64) -> typing.Sequence[brokrpc.rpc.model.Response[catalog_pb2.Product]]:
+        """Get product, concurrent identical requests make a single call, responses are cached for 30 seconds."""
+        return await _gather(self.__get_product.invoke, requests, max_concurrency)
+
+    async def get_product_as_completed(self, requests: typing.Union[typing.Iterable[catalog_pb2.GetProductRequest], typing.AsyncIterable[catalog_pb2.GetProductRequest]], *, max_concurrency: builtins.int=64) -> typing.AsyncIterator[brokrpc.rpc.model.Response[catalog_pb2.Product]]:
+        """Get product, concurrent identical requests make a single call, responses are cached for 30 seconds."""
+        async for response in _as_completed(self.__get_product.invoke, requests, max_concurrency):
+            yield response
+
+    async def get_price(self, request: catalog_pb2.GetProductRequest) -> brokrpc.rpc.model.Response[catalog_pb2.Product]:
+        """Get current product price, concurrent identical requests make a single call (without response cache)."""
+        return await self.__get_price.invoke(request)
+
+    async def get_price_gather(self, requests: typing.Union[typing.Iterable[catalog_pb2.GetProductRequest], typing.AsyncIterable[catalog_pb2.GetProductRequest]], *, max_concurrency: builtins.int=64) -> typing.Sequence[brokrpc.rpc.model.Response[catalog_pb2.Product]]:
+        """Get current product price, concurrent identical requests make a single call (without response cache)."""
+        return await _gather(self.__get_price.invoke, requests, max_concurrency)
+
+    async def get_price_as_completed(self, requests: typing.Union[typing.Iterable[catalog_pb2.GetProductRequest], typing.AsyncIterable[catalog_pb2.GetProductRequest]], *, max_concurrency: builtins.int=64) -> typing.AsyncIterator[brokrpc.rpc.model.Response[catalog_pb2.Product]]:
+        """Get current product price, concurrent identical requests make a single call (without response cache)."""
+        async for response in _as_completed(self.__get_price.invoke, requests, max_concurrency):
+            yield response
+
+    async def update_product(self, request: catalog_pb2.Product) -> brokrpc.rpc.model.Response[catalog_pb2.Product]:
+        """Update product."""
+        return await self.__update_product.invoke(request)
+
+    async def update_product_gather(self, requests: typing.Union[typing.Iterable[catalog_pb2.Product], typing.AsyncIterable[catalog_pb2.Product]], *, max_concurrency: builtins.int=64) -> typing.Sequence[brokrpc.rpc.model.Response[catalog_pb2.Product]]:
+        """Update product."""
+        return await _gather(self.__update_product.invoke, requests, max_concurrency)
+
+    async def update_product_as_completed(self, requests: typing.Union[typing.Iterable[catalog_pb2.Product], typing.AsyncIterable[catalog_pb2.Product]], *, max_concurrency: builtins.int=64) -> typing.AsyncIterator[brokrpc.rpc.model.Response[catalog_pb2.Product]]:
+        """Update product."""
+        async for response in _as_completed(self.__update_product.invoke, requests, max_concurrency):
+            yield response
+
+@contextlib.asynccontextmanager
+async def create_catalog_client(client: brokrpc.rpc.client.Client) -> typing.AsyncIterator[CatalogClient]:
+    async with client.unary_unary_caller(routing_key='/catalog/Catalog/GetProduct', serializer=_GET_PRODUCT_REQUEST_PRODUCT_SERIALIZER, exchange=None) as get_product, client.unary_unary_caller(routing_key='/catalog/Catalog/GetPrice', serializer=_GET_PRODUCT_REQUEST_PRODUCT_SERIALIZER, exchange=None) as get_price, client.unary_unary_caller(routing_key='/catalog/Catalog/UpdateProduct', serializer=_PRODUCT_PRODUCT_SERIALIZER, exchange=None) as update_product:
+        yield CatalogClient(get_product=_CoalescingCaller(get_product, cache_ttl=30.0, cache_max_size=500), get_price=_CoalescingCaller(get_price, cache_ttl=0.0, cache_max_size=0), update_product=update_product)
\ No newline at end of file
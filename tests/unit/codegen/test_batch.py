@@ -0,0 +1,125 @@
+from pathlib import Path
+
+import pytest
+from google.protobuf.compiler.plugin_pb2 import CodeGeneratorRequest, CodeGeneratorResponse
+from google.protobuf.descriptor_pb2 import DescriptorProto, FieldDescriptorProto, FileDescriptorProto, FileDescriptorSet
+
+from pyprotostuben.codegen.abc import ContextProtocPlugin
+from pyprotostuben.codegen.batch import BatchGenerationError, BatchGenerator, build_request, load_descriptor_sets, main
+from pyprotostuben.pool.abc import Pool
+from pyprotostuben.pool.process import SingleProcessPool
+from pyprotostuben.protobuf.context import CodeGeneratorContext
+
+
+def test_load_descriptor_sets_sorts_by_dependencies(tmp_path: Path) -> None:
+    foo, bar, baz = build_files()
+    first = tmp_path / "first.bin"
+    first.write_bytes(FileDescriptorSet(file=[baz, bar]).SerializeToString())
+    second = tmp_path / "second.bin"
+    second.write_bytes(FileDescriptorSet(file=[foo, bar]).SerializeToString())
+
+    assert [file.name for file in load_descriptor_sets([first, second])] == ["foo.proto", "bar.proto", "baz.proto"]
+
+
+@pytest.mark.parametrize(
+    ("file_to_generate", "expected"),
+    [
+        pytest.param(None, ["foo.proto", "bar.proto", "baz.proto"], id="all"),
+        pytest.param(["baz.proto"], ["baz.proto"], id="selected"),
+    ],
+)
+def test_build_request(file_to_generate: list[str], expected: list[str]) -> None:
+    request = build_request(build_files(), file_to_generate, "no-parallel")
+
+    assert list(request.file_to_generate) == expected
+    assert request.parameter == "no-parallel"
+
+
+def test_build_request_file_not_found() -> None:
+    with pytest.raises(BatchGenerationError):
+        build_request(build_files(), ["spam.proto"])
+
+
+def test_batch_generator_shares_context_and_pool(tmp_path: Path) -> None:
+    plugins = [ContextPluginStub("foo"), ContextPluginStub("bar")]
+    pool = SingleProcessPool()
+    generator = BatchGenerator(plugins, tmp_path, pool)
+
+    generator.run(build_request(build_files(), ["bar.proto"]))
+    generator.run(build_request(build_files(), ["baz.proto"]))
+
+    contexts = [[context for context, _ in plugin.calls] for plugin in plugins]
+    assert contexts[0] == contexts[1]
+    assert contexts[0][0] is not contexts[0][1]
+    assert all(call_pool is pool for plugin in plugins for _, call_pool in plugin.calls)
+    assert sorted(path.name for path in tmp_path.iterdir() if not path.name.startswith(".")) == [
+        "bar_bar.txt",
+        "bar_foo.txt",
+        "baz_bar.txt",
+        "baz_foo.txt",
+    ]
+
+
+def test_main_writes_generated_files(tmp_path: Path) -> None:
+    descriptor_set = tmp_path / "descriptors.bin"
+    descriptor_set.write_bytes(FileDescriptorSet(file=build_files()).SerializeToString())
+    out_dir = tmp_path / "out"
+
+    main([str(descriptor_set), "-f", "bar.proto", "-f", "baz.proto", "--parameter", "no-parallel", "-o", str(out_dir)])
+
+    assert sorted(path.name for path in out_dir.iterdir() if not path.name.startswith(".")) == [
+        "bar_pb2.pyi",
+        "baz_pb2.pyi",
+    ]
+    assert "foo_pb2.Foo" in (out_dir / "bar_pb2.pyi").read_text()
+
+
+class ContextPluginStub(ContextProtocPlugin):
+    def __init__(self, suffix: str) -> None:
+        self.calls: list[tuple[CodeGeneratorContext, Pool]] = []
+        self.__suffix = suffix
+
+    def run(self, request: CodeGeneratorRequest) -> CodeGeneratorResponse:
+        raise NotImplementedError
+
+    def generate(self, context: CodeGeneratorContext, pool: Pool) -> CodeGeneratorResponse:
+        self.calls.append((context, pool))
+
+        return CodeGeneratorResponse(
+            file=[
+                CodeGeneratorResponse.File(name=f"{file.name}_{self.__suffix}.txt", content=self.__suffix)
+                for file in context.files
+            ],
+        )
+
+
+def build_files() -> list[FileDescriptorProto]:
+    def message(name: str, type_name: str = "") -> DescriptorProto:
+        return DescriptorProto(
+            name=name,
+            field=[
+                FieldDescriptorProto(
+                    name="value",
+                    number=1,
+                    label=FieldDescriptorProto.Label.LABEL_OPTIONAL,
+                    type=FieldDescriptorProto.Type.TYPE_MESSAGE if type_name else FieldDescriptorProto.Type.TYPE_INT64,
+                    type_name=type_name,
+                ),
+            ],
+        )
+
+    return [
+        FileDescriptorProto(name="foo.proto", package="foo", message_type=[message("Foo")]),
+        FileDescriptorProto(
+            name="bar.proto",
+            package="bar",
+            dependency=["foo.proto"],
+            message_type=[message("Bar", ".foo.Foo")],
+        ),
+        FileDescriptorProto(
+            name="baz.proto",
+            package="baz",
+            dependency=["bar.proto"],
+            message_type=[message("Baz", ".bar.Bar")],
+        ),
+    ]
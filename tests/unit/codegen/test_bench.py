@@ -0,0 +1,100 @@
+import json
+from pathlib import Path
+
+import pytest
+from google.protobuf.compiler.plugin_pb2 import CodeGeneratorRequest
+from google.protobuf.descriptor_pb2 import DescriptorProto, FileDescriptorProto
+from google.protobuf.json_format import MessageToJson
+
+from pyprotostuben.codegen.bench import PluginBenchmark, load_request_content, main
+
+
+@pytest.mark.parametrize(
+    ("pool", "parameter", "expected"),
+    [
+        pytest.param("request", "debug,message-mutable", "debug,message-mutable", id="request"),
+        pytest.param("single", "message-mutable", "message-mutable,no-parallel", id="single"),
+        pytest.param("multi", "no-parallel,debug,message-mutable,x=1", "message-mutable,x=1", id="multi"),
+    ],
+)
+def test_build_parameter(pool: str, parameter: str, expected: str) -> None:
+    assert PluginBenchmark("mypy-stub", pool=pool).build_parameter(parameter) == expected
+
+
+def test_build_parameter_override() -> None:
+    assert PluginBenchmark("mypy-stub", parameter="grpc-sync", pool="single").build_parameter("debug") == (
+        "grpc-sync,no-parallel"
+    )
+
+
+@pytest.mark.parametrize("suffix", [".bin", ".json"])
+def test_load_request_content(tmp_path: Path, codegen_request: CodeGeneratorRequest, suffix: str) -> None:
+    path = tmp_path / f"request{suffix}"
+    if suffix == ".json":
+        path.write_text(MessageToJson(codegen_request))
+    else:
+        path.write_bytes(codegen_request.SerializeToString())
+
+    assert CodeGeneratorRequest.FromString(load_request_content(path)) == codegen_request
+
+
+@pytest.mark.parametrize("repeat", [1, 3])
+def test_plugin_benchmark_run(codegen_request: CodeGeneratorRequest, repeat: int) -> None:
+    result = PluginBenchmark("mypy-stub", pool="single").run([codegen_request.SerializeToString()], repeat=repeat)
+
+    assert result.runs == repeat
+    assert result.files == repeat
+    assert {"parse", "registry", "walk", "ast", "unparse", "run", "serialize"} <= set(result.phases)
+    assert result.phases["run"].calls == repeat
+    assert result.counters["files"] == repeat
+
+
+def test_plugin_benchmark_run_collects_worker_stats(codegen_request: CodeGeneratorRequest) -> None:
+    result = PluginBenchmark("mypy-stub", pool="multi").run([codegen_request.SerializeToString()], repeat=1)
+
+    assert {"walk", "unparse"} <= set(result.phases)
+    assert result.counters == {"files": 1, "types": 1, "fields": 0, "methods": 0, "modules": 1}
+
+
+@pytest.mark.parametrize("repeat", [2])
+def test_main_writes_output(
+    tmp_path: Path,
+    repeat: int,
+    capsys: pytest.CaptureFixture[str],
+    codegen_request: CodeGeneratorRequest,
+) -> None:
+    request_path = tmp_path / "request.bin"
+    request_path.write_bytes(codegen_request.SerializeToString())
+    output_path = tmp_path / "result.json"
+
+    main([str(request_path), "--pool", "single", "-n", str(repeat), "--output", str(output_path)])
+
+    assert "files/s" in capsys.readouterr().out
+    assert json.loads(output_path.read_text())["files"] == repeat
+
+
+@pytest.mark.parametrize("repeat", ["0", "-1", "x"])
+def test_main_rejects_invalid_repeat(tmp_path: Path, repeat: str, capsys: pytest.CaptureFixture[str]) -> None:
+    with pytest.raises(SystemExit):
+        main([str(tmp_path / "request.bin"), "-n", repeat])
+
+    assert "--repeat" in capsys.readouterr().err
+
+
+def test_plugin_benchmark_run_without_repeat_fails(codegen_request: CodeGeneratorRequest) -> None:
+    with pytest.raises(ValueError, match="repeat must be"):
+        PluginBenchmark("mypy-stub", pool="single").run([codegen_request.SerializeToString()], repeat=0)
+
+
+@pytest.fixture
+def codegen_request() -> CodeGeneratorRequest:
+    return CodeGeneratorRequest(
+        file_to_generate=["foo.proto"],
+        proto_file=[
+            FileDescriptorProto(
+                name="foo.proto",
+                package="foo",
+                message_type=[DescriptorProto(name="Foo")],
+            ),
+        ],
+    )
@@ -0,0 +1,317 @@
+import asyncio
+import contextlib
+import sys
+import types
+import typing as t
+
+import pytest
+from google.protobuf.compiler.plugin_pb2 import CodeGeneratorRequest
+from google.protobuf.descriptor_pb2 import (
+    DescriptorProto,
+    FileDescriptorProto,
+    MethodDescriptorProto,
+    MethodOptions,
+    ServiceDescriptorProto,
+)
+from google.protobuf.descriptor_pool import DescriptorPool
+from google.protobuf.message_factory import GetMessageClass
+
+# NOTE: brokrpc supports python 3.12 or higher
+pytest.importorskip("brokrpc")
+assert sys.version_info >= (3, 12)
+
+from brokrpc.spec.v1 import amqp_pb2, consumer_pb2  # noqa: E402
+from brokrpc.spec.v1.amqp_pb2 import ArgumentValue, QueueOptions  # noqa: E402
+
+from pyprotostuben.codegen.brokrpc.plugin import BrokRPCProtocPlugin  # noqa: E402
+
+VOID = ".brokrpc.spec.v1.Void"
+PAYLOAD = ".stream.Payload"
+
+
+@pytest.mark.parametrize(
+    ("method", "signature"),
+    [
+        pytest.param(
+            MethodDescriptorProto(name="Stream", input_type=PAYLOAD, output_type=VOID, server_streaming=True),
+            "def stream(self, message: stream_pb2.Payload)",
+            id="server-streaming-void",
+        ),
+        pytest.param(
+            MethodDescriptorProto(name="Stream", input_type=PAYLOAD, output_type=PAYLOAD, server_streaming=True),
+            "def stream(self, request: stream_pb2.Payload)",
+            id="server-streaming",
+        ),
+        pytest.param(
+            MethodDescriptorProto(name="Stream", input_type=PAYLOAD, output_type=PAYLOAD, client_streaming=True),
+            "def stream(self, request: stream_pb2.Payload)",
+            id="client-streaming",
+        ),
+        pytest.param(
+            MethodDescriptorProto(
+                name="Stream",
+                input_type=PAYLOAD,
+                output_type=PAYLOAD,
+                client_streaming=True,
+                server_streaming=True,
+            ),
+            "def stream(self, request: stream_pb2.Payload)",
+            id="bidi-streaming",
+        ),
+    ],
+)
+def test_streaming_method_is_generated_as_unary(method: MethodDescriptorProto, signature: str) -> None:
+    request = build_request(method, MethodDescriptorProto(name="Unary", input_type=PAYLOAD, output_type=PAYLOAD))
+
+    response = BrokRPCProtocPlugin().run(request)
+
+    assert [file.name for file in response.file] == ["stream_brokrpc.py"]
+    assert "def unary(" in response.file[0].content
+    assert signature in response.file[0].content
+
+
+def test_client_streaming_consumer_method_publishes_each_message(monkeypatch: pytest.MonkeyPatch) -> None:
+    request = build_request(
+        MethodDescriptorProto(name="Stream", input_type=PAYLOAD, output_type=VOID, client_streaming=True),
+    )
+    module = load_module(monkeypatch, request)
+    published: list[object] = []
+
+    class PublisherStub:
+        async def publish(self, message: object) -> object:
+            published.append(message)
+            return message
+
+    async def stream() -> t.AsyncIterator[int]:
+        for message in range(3):
+            yield message
+
+    results = asyncio.run(module.StreamerClient(stream=PublisherStub()).stream(stream()))
+
+    assert results == published == [0, 1, 2]
+    assert not hasattr(module.StreamerClient, "stream_many")
+
+
+def test_loopback_in_lazy_client_mode_fails() -> None:
+    request = build_request(MethodDescriptorProto(name="Unary", input_type=PAYLOAD, output_type=PAYLOAD))
+    request.parameter = "no-parallel,lazy-client,loopback"
+
+    with pytest.raises(ValueError, match="lazy client mode"):
+        BrokRPCProtocPlugin().run(request)
+
+
+def test_gather_raises_error_of_failed_call(monkeypatch: pytest.MonkeyPatch) -> None:
+    module = load_module(
+        monkeypatch,
+        build_request(MethodDescriptorProto(name="Unary", input_type=PAYLOAD, output_type=PAYLOAD)),
+    )
+    cancelled: list[int] = []
+
+    async def call(item: int) -> int:
+        try:
+            await asyncio.sleep(0 if item == 1 else 1)
+
+        except asyncio.CancelledError:
+            cancelled.append(item)
+            raise
+
+        if item == 1:
+            msg = "call failed"
+            raise ValueError(msg, item)
+
+        return item
+
+    with pytest.raises(ValueError, match="call failed"):
+        asyncio.run(module._gather(call, range(3), 3))  # noqa: SLF001
+
+    assert cancelled == [0, 2]
+
+
+def test_lazy_client_concurrent_first_calls_open_publisher_once(monkeypatch: pytest.MonkeyPatch) -> None:
+    request = build_request(MethodDescriptorProto(name="Publish", input_type=PAYLOAD, output_type=VOID))
+    request.parameter = "no-parallel,lazy-client"
+    module = load_module(monkeypatch, request)
+    publishers: list[list[object]] = []
+
+    class ClientStub:
+        @contextlib.asynccontextmanager
+        async def publisher(self, **_: object) -> t.AsyncIterator["ClientStub"]:
+            # NOTE: switch to the other calls while the publisher is opening.
+            await asyncio.sleep(0)
+            publishers.append([])
+            yield self
+
+        async def publish(self, message: object) -> None:
+            publishers[-1].append(message)
+
+    async def publish() -> None:
+        async with contextlib.AsyncExitStack() as stack:
+            client = module.StreamerClient(client=ClientStub(), stack=stack)
+            await asyncio.gather(*(client.publish(message) for message in range(3)))
+
+    asyncio.run(publish())
+
+    assert publishers == [[0, 1, 2]]
+
+
+@pytest.mark.parametrize(
+    "queue",
+    [
+        pytest.param(QueueOptions(arguments={"batch_max_size": ArgumentValue(int_value=0)}), id="zero-size"),
+        pytest.param(QueueOptions(arguments={"batch_max_size": ArgumentValue(str_value="10")}), id="str-size"),
+        pytest.param(
+            QueueOptions(
+                arguments={
+                    "batch_max_size": ArgumentValue(int_value=10),
+                    "batch_max_delay": ArgumentValue(float_value=-1.0),
+                },
+            ),
+            id="negative-delay",
+        ),
+        pytest.param(QueueOptions(arguments={"batch_max_delay": ArgumentValue(float_value=1.0)}), id="delay-only"),
+        pytest.param(
+            QueueOptions(
+                arguments={
+                    "prefetch_count": ArgumentValue(int_value=5),
+                    "batch_max_size": ArgumentValue(int_value=10),
+                },
+            ),
+            id="size-greater-than-prefetch",
+        ),
+    ],
+)
+def test_invalid_batch_options_fail(queue: QueueOptions) -> None:
+    with pytest.raises(ValueError, match="batch max"):
+        BrokRPCProtocPlugin().run(build_request(build_batch_method(queue, VOID)))
+
+
+def test_batch_replying_method_fails() -> None:
+    queue = QueueOptions(arguments={"batch_max_size": ArgumentValue(int_value=10)})
+
+    with pytest.raises(ValueError, match="batching is supported only"):
+        BrokRPCProtocPlugin().run(build_request(build_batch_method(queue, PAYLOAD)))
+
+
+@pytest.mark.parametrize("results", [[], [True], [True, True, True]])
+def test_batch_consumer_with_wrong_results_count_fails(monkeypatch: pytest.MonkeyPatch, results: list[bool]) -> None:
+    queue = QueueOptions(arguments={"batch_max_size": ArgumentValue(int_value=2)})
+    module = load_module(monkeypatch, build_request(build_batch_method(queue, VOID)))
+
+    async def consume_batch(_: t.Sequence[object]) -> t.Sequence[bool]:
+        return results
+
+    async def consume() -> t.Sequence[object]:
+        consumer = module._BatchConsumer(consume_batch, max_size=2, max_delay=1.0)  # noqa: SLF001
+        errors: t.Sequence[object] = await asyncio.gather(
+            consumer.consume(object()),
+            consumer.consume(object()),
+            return_exceptions=True,
+        )
+        return errors
+
+    errors = asyncio.run(consume())
+
+    assert [type(error) for error in errors] == [ValueError, ValueError]
+    assert "must return a result for each message" in str(errors[0])
+
+
+@pytest.mark.parametrize(
+    ("queue", "match"),
+    [
+        pytest.param(
+            QueueOptions(arguments={"coalesce": ArgumentValue(int_value=1)}),
+            "coalesce must be",
+            id="int-coalesce",
+        ),
+        pytest.param(
+            QueueOptions(
+                arguments={
+                    "coalesce": ArgumentValue(bool_value=False),
+                    "cache_ttl": ArgumentValue(float_value=1.0),
+                },
+            ),
+            "without coalescing",
+            id="cache-without-coalescing",
+        ),
+        pytest.param(
+            QueueOptions(arguments={"cache_max_size": ArgumentValue(int_value=10)}),
+            "cache max size can't",
+            id="size-only",
+        ),
+        pytest.param(
+            QueueOptions(arguments={"cache_ttl": ArgumentValue(float_value=0.0)}),
+            "cache ttl must be",
+            id="zero-ttl",
+        ),
+        pytest.param(
+            QueueOptions(
+                arguments={
+                    "cache_ttl": ArgumentValue(float_value=1.0),
+                    "cache_max_size": ArgumentValue(float_value=10.0),
+                },
+            ),
+            "cache max size must be",
+            id="float-size",
+        ),
+    ],
+)
+def test_invalid_coalesce_options_fail(queue: QueueOptions, match: str) -> None:
+    with pytest.raises(ValueError, match=match):
+        BrokRPCProtocPlugin().run(build_request(build_batch_method(queue, PAYLOAD)))
+
+
+def test_coalesce_void_method_fails() -> None:
+    queue = QueueOptions(arguments={"coalesce": ArgumentValue(bool_value=True)})
+
+    with pytest.raises(ValueError, match="coalescing is supported only"):
+        BrokRPCProtocPlugin().run(build_request(build_batch_method(queue, VOID)))
+
+
+def build_batch_method(queue: QueueOptions, output_type: str) -> MethodDescriptorProto:
+    options = MethodOptions()
+    options.Extensions[t.cast(t.Any, amqp_pb2.queue)].CopyFrom(queue)
+
+    return MethodDescriptorProto(name="Batch", input_type=PAYLOAD, output_type=output_type, options=options)
+
+
+def build_request(*methods: MethodDescriptorProto) -> CodeGeneratorRequest:
+    descriptor_file = FileDescriptorProto()
+    consumer_pb2.DESCRIPTOR.dependencies[0].CopyToProto(descriptor_file)
+
+    consumer_file = FileDescriptorProto()
+    consumer_pb2.DESCRIPTOR.CopyToProto(consumer_file)
+
+    amqp_file = FileDescriptorProto()
+    amqp_pb2.DESCRIPTOR.CopyToProto(amqp_file)
+
+    stream_file = FileDescriptorProto(
+        name="stream.proto",
+        package="stream",
+        syntax="proto3",
+        dependency=[consumer_file.name, amqp_file.name],
+        message_type=[DescriptorProto(name="Payload")],
+        service=[ServiceDescriptorProto(name="Streamer", method=methods)],
+    )
+
+    return CodeGeneratorRequest(
+        file_to_generate=[stream_file.name],
+        proto_file=[descriptor_file, consumer_file, amqp_file, stream_file],
+        parameter="no-parallel",
+    )
+
+
+def load_module(monkeypatch: pytest.MonkeyPatch, request: CodeGeneratorRequest) -> types.ModuleType:
+    pool = DescriptorPool()
+    for proto in request.proto_file:
+        pool.Add(proto)
+
+    pb2 = types.ModuleType("stream_pb2")
+    pb2.Payload = GetMessageClass(pool.FindMessageTypeByName("stream.Payload"))  # type: ignore[attr-defined]
+    monkeypatch.setitem(sys.modules, pb2.__name__, pb2)
+
+    (file,) = BrokRPCProtocPlugin().run(request).file
+
+    module = types.ModuleType("stream_brokrpc")
+    exec(compile(file.content, f"{module.__name__}.py", "exec"), module.__dict__)  # noqa: S102
+
+    return module
@@ -0,0 +1,52 @@
+import io
+import json
+from pathlib import Path
+
+import pytest
+from google.protobuf.compiler.plugin_pb2 import CodeGeneratorRequest, CodeGeneratorResponse
+from google.protobuf.descriptor_pb2 import FileDescriptorProto
+
+from pyprotostuben.codegen.echo import RequestEchoProtocPlugin
+
+
+@pytest.mark.parametrize("format_", ["raw", "binary", "json"])
+def test_echo_writes_request_to_dest(tmp_path: Path, format_: str) -> None:
+    dest = tmp_path / "request.out"
+    request = CodeGeneratorRequest(
+        file_to_generate=["foo.proto"],
+        parameter=f"format={format_},dest={dest}",
+        proto_file=[FileDescriptorProto(name="foo.proto", package="foo")],
+    )
+    output = io.BytesIO()
+
+    RequestEchoProtocPlugin().run(io.BytesIO(request.SerializeToString()), output)
+
+    if format_ == "json":
+        assert json.loads(dest.read_text())["file_to_generate"] == ["foo.proto"]
+    else:
+        assert CodeGeneratorRequest.FromString(dest.read_bytes()) == request
+
+    assert CodeGeneratorResponse.FromString(output.getvalue()) == CodeGeneratorResponse(
+        supported_features=CodeGeneratorResponse.Feature.FEATURE_PROTO3_OPTIONAL,
+    )
+
+
+def test_echo_raw_from_file_keeps_content(tmp_path: Path) -> None:
+    source = tmp_path / "source.bin"
+    dest = tmp_path / "dest.bin"
+    source.write_bytes(CodeGeneratorRequest(parameter=f"dest={dest}").SerializeToString())
+
+    with source.open("rb") as input_:
+        RequestEchoProtocPlugin().run(input_, io.BytesIO())
+
+    assert dest.read_bytes() == source.read_bytes()
+
+
+def test_echo_unsupported_format(tmp_path: Path) -> None:
+    dest = tmp_path / "request.out"
+    request = CodeGeneratorRequest(parameter=f"format=xml,dest={dest}")
+
+    with pytest.raises(ValueError, match="unsupported format"):
+        RequestEchoProtocPlugin().run(io.BytesIO(request.SerializeToString()), io.BytesIO())
+
+    assert not dest.exists()
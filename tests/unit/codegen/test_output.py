@@ -0,0 +1,123 @@
+import os
+import stat
+from pathlib import Path
+
+import pytest
+from google.protobuf.compiler.plugin_pb2 import CodeGeneratorResponse
+
+from pyprotostuben.codegen.output import DirectoryOutputWriter, OutputResult
+
+SOURCES = {"", "foo.proto", "bar.proto"}
+FILE_MODE = 0o644
+
+
+def test_write_new_files(writer: DirectoryOutputWriter, tmp_path: Path) -> None:
+    result = writer.write([build_file("foo/bar.py", "bar"), build_file("baz.py", "baz")], SOURCES)
+
+    assert result == OutputResult(written=["foo/bar.py", "baz.py"], unchanged=[], removed=[])
+    assert (tmp_path / "foo" / "bar.py").read_text() == "bar"
+    assert (tmp_path / "baz.py").read_text() == "baz"
+    assert stat.S_IMODE((tmp_path / "baz.py").stat().st_mode) == FILE_MODE
+
+
+def test_write_skips_unchanged_files(writer: DirectoryOutputWriter, tmp_path: Path) -> None:
+    writer.write([build_file("foo.py", "foo"), build_file("bar.py", "bar")], SOURCES)
+    path = tmp_path / "foo.py"
+    os.utime(path, ns=(0, 0))
+
+    result = writer.write([build_file("foo.py", "foo"), build_file("bar.py", "bar v2")], SOURCES)
+
+    assert result == OutputResult(written=["bar.py"], unchanged=["foo.py"], removed=[])
+    assert path.stat().st_mtime_ns == 0
+    assert (tmp_path / "bar.py").read_text() == "bar v2"
+
+
+def test_write_rewrites_modified_files(writer: DirectoryOutputWriter, tmp_path: Path) -> None:
+    writer.write([build_file("foo.py", "foo")], SOURCES)
+    (tmp_path / "foo.py").write_text("edited")
+
+    result = writer.write([build_file("foo.py", "foo")], SOURCES)
+
+    assert result.written == ["foo.py"]
+    assert (tmp_path / "foo.py").read_text() == "foo"
+
+
+def test_write_removes_stale_files(writer: DirectoryOutputWriter, tmp_path: Path) -> None:
+    (tmp_path / "user.py").write_text("not generated")
+    writer.write([build_file("foo.py", "foo"), build_file("bar.py", "bar")], SOURCES)
+
+    result = writer.write([build_file("foo.py", "foo")], SOURCES)
+
+    assert result == OutputResult(written=[], unchanged=["foo.py"], removed=["bar.py"])
+    assert sorted(path.name for path in tmp_path.iterdir() if not path.name.startswith(".")) == ["foo.py", "user.py"]
+
+
+def test_writers_with_different_names_do_not_remove_files_of_each_other(tmp_path: Path) -> None:
+    DirectoryOutputWriter(tmp_path, "foo").write([build_file("foo.py", "foo")], SOURCES)
+
+    result = DirectoryOutputWriter(tmp_path, "bar").write([build_file("bar.py", "bar")], SOURCES)
+
+    assert result.removed == []
+    assert (tmp_path / "foo.py").is_file()
+
+
+def test_write_replaces_files_of_sources_only(writer: DirectoryOutputWriter, tmp_path: Path) -> None:
+    writer.write([build_file("foo.py", "foo", "foo.proto"), build_file("bar.py", "bar", "bar.proto")], SOURCES)
+
+    result = writer.write([], sources={"bar.proto"})
+
+    assert result == OutputResult(written=[], unchanged=[], removed=["bar.py"])
+    assert (tmp_path / "foo.py").read_text() == "foo"
+    assert writer.write([build_file("foo.py", "foo", "foo.proto")], {"foo.proto"}).removed == []
+
+
+def test_runs_with_different_sources_do_not_remove_files_of_each_other(
+    writer: DirectoryOutputWriter,
+    tmp_path: Path,
+) -> None:
+    # NOTE: e.g. buf `strategy: directory` runs the plugin for each directory with the same out dir.
+    writer.write([build_file("a/foo.py", "foo", "a/foo.proto")], {"a/foo.proto"})
+
+    result = writer.write([build_file("b/bar.py", "bar", "b/bar.proto")], {"b/bar.proto"})
+
+    assert result == OutputResult(written=["b/bar.py"], unchanged=[], removed=[])
+    assert (tmp_path / "a" / "foo.py").read_text() == "foo"
+
+
+def test_write_removes_files_of_removed_sources(writer: DirectoryOutputWriter, tmp_path: Path) -> None:
+    writer.write([build_file("foo.py", "foo", "foo.proto"), build_file("bar.py", "bar", "bar.proto")], SOURCES)
+
+    result = writer.write([build_file("foo.py", "foo", "foo.proto")], {"foo.proto"}, removed_sources={"bar.proto"})
+
+    assert result == OutputResult(written=[], unchanged=["foo.py"], removed=["bar.py"])
+    assert not (tmp_path / "bar.py").exists()
+
+
+def test_write_removes_files_of_sources_missing_since_previous_run(
+    writer: DirectoryOutputWriter,
+    tmp_path: Path,
+) -> None:
+    writer.write(
+        [build_file("a/foo.py", "foo", "a/foo.proto"), build_file("a/bar.py", "bar", "a/bar.proto")],
+        {"a/foo.proto", "a/bar.proto"},
+        run="a",
+    )
+    writer.write([build_file("b/baz.py", "baz", "b/baz.proto")], {"b/baz.proto"}, run="b")
+
+    result = writer.write([build_file("a/foo.py", "foo", "a/foo.proto")], {"a/foo.proto"}, run="a")
+
+    assert result == OutputResult(written=[], unchanged=["a/foo.py"], removed=["a/bar.py"])
+    assert (tmp_path / "b" / "baz.py").read_text() == "baz"
+
+
+@pytest.fixture
+def writer(tmp_path: Path) -> DirectoryOutputWriter:
+    return DirectoryOutputWriter(tmp_path, "test")
+
+
+def build_file(name: str, content: str, source: str = "") -> CodeGeneratorResponse.File:
+    file = CodeGeneratorResponse.File(name=name, content=content)
+    if source:
+        file.generated_code_info.annotation.add(source_file=source)
+
+    return file
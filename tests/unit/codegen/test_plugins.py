@@ -0,0 +1,35 @@
+import pytest
+from google.protobuf.compiler.plugin_pb2 import CodeGeneratorRequest
+
+from pyprotostuben.codegen.plugins import PLUGINS
+from tests.corpus import CorpusConfig, build_request
+from tests.integration.cases.case import skip_if_module_not_found
+
+
+@pytest.mark.parametrize(
+    "plugin_name",
+    [
+        pytest.param("mypy-stub"),
+        pytest.param("brokrpc", marks=skip_if_module_not_found("brokrpc")),
+    ],
+)
+def test_parallel_plugin_response_is_reproducible(plugin_name: str, request_: CodeGeneratorRequest) -> None:
+    plugin = PLUGINS[plugin_name]()
+
+    responses = [plugin.run(request_).SerializeToString(deterministic=True) for _ in range(3)]
+
+    assert len(set(responses)) == 1
+
+
+def test_parallel_plugin_response_files_are_in_file_to_generate_order(request_: CodeGeneratorRequest) -> None:
+    response = PLUGINS["mypy-stub"]().run(request_)
+
+    assert [file.name for file in response.file] == [
+        name.replace(".proto", suffix) for name in request_.file_to_generate for suffix in ("_pb2.pyi", "_pb2_grpc.pyi")
+    ]
+
+
+@pytest.fixture
+def request_() -> CodeGeneratorRequest:
+    # NOTE: parallel mode (the default) is used, so results of the workers come in random order.
+    return build_request(CorpusConfig(files=16, messages=4, fields=4, services=1, methods=2, imports=2))
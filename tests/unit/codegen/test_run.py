@@ -1,11 +1,15 @@
 import io
+import json
+import os
 import typing as t
+from pathlib import Path
 
 import pytest
 from _pytest.fixtures import SubRequest
 from google.protobuf.compiler.plugin_pb2 import CodeGeneratorRequest, CodeGeneratorResponse
-from google.protobuf.descriptor_pb2 import FileDescriptorProto
+from google.protobuf.descriptor_pb2 import DescriptorProto, FileDescriptorProto
 
+from pyprotostuben.codegen.mypy.plugin import MypyStubProtocPlugin
 from pyprotostuben.codegen.run import run_codegen
 from tests.stub.plugin import CustomPluginError, ProtocPluginStub
 
@@ -54,6 +58,94 @@ def test_run_codegen_forwards_plugin_request_and_response_to_streams(
     assert read_response(codegen_output) == codegen_response
 
 
+def test_run_codegen_writes_stats_json(tmp_path: Path) -> None:
+    dest = tmp_path / "stats.json"
+    request = CodeGeneratorRequest(parameter=f"no-parallel,stats={dest}")
+    response = CodeGeneratorResponse(file=[CodeGeneratorResponse.File(name="test-file", content="test-content")])
+
+    with io.BytesIO(request.SerializeToString()) as input_, io.BytesIO() as output:
+        run_codegen(ProtocPluginStub(None, response), input_, output)
+
+        output_bytes = len(output.getvalue())
+
+    stats = json.loads(dest.read_text())
+
+    assert set(stats["phases"]) == {"parse", "run", "serialize", "write"}
+    assert stats["counters"] == {"output_bytes": output_bytes}
+
+
+def test_run_codegen_writes_stats_to_stderr(capsys: pytest.CaptureFixture[str]) -> None:
+    request = CodeGeneratorRequest(parameter="stats")
+
+    with io.BytesIO(request.SerializeToString()) as input_, io.BytesIO() as output:
+        run_codegen(ProtocPluginStub(None, CodeGeneratorResponse()), input_, output)
+
+    assert "serialize" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize("parallel", [False, True])
+def test_run_codegen_writes_trace(tmp_path: Path, *, parallel: bool) -> None:
+    dest = tmp_path / "trace.json"
+    request = CodeGeneratorRequest(
+        file_to_generate=["foo.proto", "bar.proto"],
+        parameter=f"trace={dest}" if parallel else f"no-parallel,trace={dest}",
+        proto_file=[
+            FileDescriptorProto(name="foo.proto", package="foo", message_type=[DescriptorProto(name="Foo")]),
+            FileDescriptorProto(name="bar.proto", package="bar", message_type=[DescriptorProto(name="Bar")]),
+        ],
+    )
+
+    with io.BytesIO(request.SerializeToString()) as input_, io.BytesIO() as output:
+        run_codegen(MypyStubProtocPlugin(), input_, output)
+
+    events = json.loads(dest.read_text())["traceEvents"]
+    spans = [event for event in events if event["ph"] == "X"]
+    generate_spans = [span for span in spans if span["name"] == "generate"]
+
+    assert {"parse", "registry", "run", "walk", "unparse", "serialize", "write"} <= {span["name"] for span in spans}
+    assert sorted(span["args"]["file"] for span in generate_spans) == ["bar.proto", "foo.proto"]
+    assert all((span["pid"] != os.getpid()) == parallel for span in generate_spans)
+
+
+def test_run_codegen_writes_files_to_out_dir(tmp_path: Path) -> None:
+    request = CodeGeneratorRequest(parameter=f"out-dir={tmp_path}")
+    response = CodeGeneratorResponse(
+        supported_features=CodeGeneratorResponse.Feature.FEATURE_PROTO3_OPTIONAL,
+        file=[CodeGeneratorResponse.File(name="foo/test-file", content="test-content")],
+    )
+
+    with io.BytesIO(request.SerializeToString()) as input_, io.BytesIO() as output:
+        run_codegen(ProtocPluginStub(None, response), input_, output)
+
+        assert read_response(output) == CodeGeneratorResponse(
+            supported_features=CodeGeneratorResponse.Feature.FEATURE_PROTO3_OPTIONAL,
+        )
+
+    assert (tmp_path / "foo" / "test-file").read_text() == "test-content"
+
+
+def test_run_codegen_removes_files_of_removed_protos_from_out_dir(tmp_path: Path) -> None:
+    run_codegen_to_out_dir(tmp_path, ["a/foo.proto", "a/bar.proto"])
+    run_codegen_to_out_dir(tmp_path, ["b/baz.proto"])
+
+    run_codegen_to_out_dir(tmp_path, ["a/foo.proto"])
+
+    assert (tmp_path / "a" / "foo.py").is_file()
+    assert not (tmp_path / "a" / "bar.py").exists()
+    assert (tmp_path / "b" / "baz.py").is_file()
+
+
+def run_codegen_to_out_dir(out_dir: Path, sources: t.Sequence[str]) -> None:
+    request = CodeGeneratorRequest(file_to_generate=sources, parameter=f"out-dir={out_dir}")
+    response = CodeGeneratorResponse()
+    for source in sources:
+        file = response.file.add(name=source.replace(".proto", ".py"), content=source)
+        file.generated_code_info.annotation.add(source_file=source)
+
+    with io.BytesIO(request.SerializeToString()) as input_, io.BytesIO() as output:
+        run_codegen(ProtocPluginStub(None, response), input_, output)
+
+
 def read_response(stream: t.IO[bytes]) -> t.Optional[CodeGeneratorResponse]:
     stream.seek(0, io.SEEK_SET)
     return CodeGeneratorResponse.FromString(stream.read())
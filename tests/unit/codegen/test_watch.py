@@ -0,0 +1,149 @@
+import threading
+from pathlib import Path
+
+import pytest
+from google.protobuf.compiler.plugin_pb2 import CodeGeneratorRequest
+from google.protobuf.descriptor_pb2 import DescriptorProto, FieldDescriptorProto, FileDescriptorProto, FileDescriptorSet
+
+from pyprotostuben.codegen.batch import BatchGenerator, load_descriptor_sets
+from pyprotostuben.codegen.mypy.plugin import MypyStubProtocPlugin
+from pyprotostuben.codegen.watch import IncrementalGenerator, PathWatcher, watch
+from pyprotostuben.protobuf.context import CodeGeneratorContext, ContextBuilder
+
+
+def test_incremental_generator_initial_update_generates_all(generator: IncrementalGenerator, out_dir: Path) -> None:
+    assert generator.update(build_files()) == ["foo.proto", "bar.proto", "baz.proto"]
+    assert list_files(out_dir) == ["bar_pb2.pyi", "baz_pb2.pyi", "foo_pb2.pyi"]
+
+
+def test_incremental_generator_skips_unchanged(generator: IncrementalGenerator) -> None:
+    generator.update(build_files())
+
+    assert generator.update(build_files()) == []
+
+
+def test_incremental_generator_regenerates_changed_file_only(generator: IncrementalGenerator, out_dir: Path) -> None:
+    generator.update(build_files())
+
+    assert generator.update(build_files(foo_field="renamed")) == ["foo.proto"]
+    assert "renamed" in (out_dir / "foo_pb2.pyi").read_text()
+    assert list_files(out_dir) == ["bar_pb2.pyi", "baz_pb2.pyi", "foo_pb2.pyi"]
+
+
+def test_incremental_generator_regenerates_dependents_of_moved_types(
+    generator: IncrementalGenerator,
+    out_dir: Path,
+) -> None:
+    files = build_reexported_files()
+    moved_files = build_reexported_files(foo_name="spam/foo.proto")
+    generator.update(files)
+
+    # NOTE: bar.proto imports foo.proto via public import of api.proto, so its descriptor is the same after foo move.
+    assert moved_files[-1].SerializeToString() == files[-1].SerializeToString()
+    assert generator.update(moved_files) == ["spam/foo.proto", "api.proto", "bar.proto"]
+    assert "spam.foo_pb2.Foo" in (out_dir / "bar_pb2.pyi").read_text()
+    assert list_files(out_dir) == ["bar_pb2.pyi", "spam/foo_pb2.pyi"]
+
+
+def test_incremental_generator_builds_registry_once_per_update(
+    monkeypatch: pytest.MonkeyPatch,
+    generator: IncrementalGenerator,
+) -> None:
+    requests: list[CodeGeneratorRequest] = []
+    build = ContextBuilder.build
+
+    def build_spy(self: ContextBuilder, request: CodeGeneratorRequest) -> CodeGeneratorContext:
+        requests.append(request)
+        return build(self, request)
+
+    monkeypatch.setattr(ContextBuilder, "build", build_spy)
+
+    generator.update(build_files())
+    generator.update(build_files(foo_field="renamed"))
+
+    assert [list(request.file_to_generate) for request in requests] == [
+        ["foo.proto", "bar.proto", "baz.proto"],
+        ["foo.proto", "bar.proto", "baz.proto"],
+    ]
+
+
+def test_path_watcher_poll(tmp_path: Path) -> None:
+    path = tmp_path / "foo.proto"
+    path.write_text("foo")
+    watcher = PathWatcher([tmp_path])
+
+    assert watcher.poll()
+    assert not watcher.poll()
+
+    path.write_text("foo changed")
+
+    assert watcher.poll()
+
+
+def test_watch_generates_on_start(tmp_path: Path, generator: IncrementalGenerator, out_dir: Path) -> None:
+    descriptor_set = tmp_path / "descriptors.bin"
+    descriptor_set.write_bytes(FileDescriptorSet(file=build_files()).SerializeToString())
+    stop = threading.Event()
+
+    def load() -> list[FileDescriptorProto]:
+        stop.set()
+        return list(load_descriptor_sets([descriptor_set]))
+
+    watch(load=load, generator=generator, descriptor_sets=[descriptor_set], interval=0.0, stop=stop)
+
+    assert list_files(out_dir) == ["bar_pb2.pyi", "baz_pb2.pyi", "foo_pb2.pyi"]
+
+
+@pytest.fixture
+def out_dir(tmp_path: Path) -> Path:
+    return tmp_path / "out"
+
+
+@pytest.fixture
+def generator(out_dir: Path) -> IncrementalGenerator:
+    return IncrementalGenerator(BatchGenerator([MypyStubProtocPlugin()], out_dir), parameter="no-parallel")
+
+
+def list_files(path: Path) -> list[str]:
+    return sorted(str(file.relative_to(path)) for file in path.rglob("*.pyi"))
+
+
+def build_files(foo_name: str = "foo.proto", foo_field: str = "value") -> list[FileDescriptorProto]:
+    return [
+        FileDescriptorProto(name=foo_name, package="foo", message_type=[build_message("Foo", foo_field)]),
+        FileDescriptorProto(
+            name="bar.proto",
+            package="bar",
+            dependency=[foo_name],
+            message_type=[build_message("Bar", type_name=".foo.Foo")],
+        ),
+        FileDescriptorProto(name="baz.proto", package="baz", message_type=[build_message("Baz")]),
+    ]
+
+
+def build_reexported_files(foo_name: str = "foo.proto") -> list[FileDescriptorProto]:
+    return [
+        FileDescriptorProto(name=foo_name, package="foo", message_type=[build_message("Foo")]),
+        FileDescriptorProto(name="api.proto", package="api", dependency=[foo_name], public_dependency=[0]),
+        FileDescriptorProto(
+            name="bar.proto",
+            package="bar",
+            dependency=["api.proto"],
+            message_type=[build_message("Bar", type_name=".foo.Foo")],
+        ),
+    ]
+
+
+def build_message(name: str, field_name: str = "value", type_name: str = "") -> DescriptorProto:
+    return DescriptorProto(
+        name=name,
+        field=[
+            FieldDescriptorProto(
+                name=field_name,
+                number=1,
+                label=FieldDescriptorProto.Label.LABEL_OPTIONAL,
+                type=FieldDescriptorProto.Type.TYPE_MESSAGE if type_name else FieldDescriptorProto.Type.TYPE_INT64,
+                type_name=type_name,
+            ),
+        ],
+    )
@@ -7,6 +7,7 @@ from datetime import timedelta
 import pytest
 
 from pyprotostuben.pool.process import MultiProcessPool
+from pyprotostuben.stats import PhaseStatsCollector, get_stats_collector, use_stats_collector
 
 
 @pytest.mark.parametrize(
@@ -41,12 +42,53 @@ def test_multi_process_pool_return_results_as_ready(
     assert list(pool.run(calc_stuff, delays)) == sorted(delays)
 
 
+@pytest.mark.parametrize(
+    "delays",
+    [
+        pytest.param(
+            [timedelta(milliseconds=i * 20) for i in reversed(range(os.cpu_count() or 0))],
+        ),
+    ],
+)
+def test_ordered_multi_process_pool_returns_results_in_args_order(
+    ordered_pool: MultiProcessPool,
+    delays: t.Sequence[timedelta],
+) -> None:
+    assert list(ordered_pool.run(calc_stuff, delays)) == delays
+
+
+def test_multi_process_pool_merges_worker_stats(pool: MultiProcessPool) -> None:
+    values = list(range(10))
+
+    with use_stats_collector(PhaseStatsCollector()) as stats:
+        assert isinstance(stats, PhaseStatsCollector)
+
+        assert Counter(pool.run(measure_str, values)) == Counter(str(value) for value in values)
+
+    assert stats.phases["str"].calls == len(values)
+    assert stats.counters == {"items": len(values)}
+
+
 @pytest.fixture
 def pool() -> t.Iterator[MultiProcessPool]:
     with MultiProcessPool.setup() as pool:
         yield pool
 
 
+@pytest.fixture
+def ordered_pool() -> t.Iterator[MultiProcessPool]:
+    with MultiProcessPool.setup(ordered=True) as pool:
+        yield pool
+
+
 def calc_stuff(delay: timedelta) -> timedelta:
     time.sleep(delay.total_seconds())  # simulate long CPU bound task
     return delay
+
+
+def measure_str(value: object) -> str:
+    stats = get_stats_collector()
+    stats.count("items")
+
+    with stats.measure("str"):
+        return str(value)
@@ -0,0 +1,117 @@
+import pytest
+from google.protobuf.compiler.plugin_pb2 import CodeGeneratorRequest
+from google.protobuf.descriptor_pb2 import (
+    DescriptorProto,
+    FieldDescriptorProto,
+    FileDescriptorProto,
+    MessageOptions,
+    MethodDescriptorProto,
+    ServiceDescriptorProto,
+)
+
+from pyprotostuben.protobuf.context import ContextBuilder
+from pyprotostuben.protobuf.registry import TypeRegistry
+
+
+@pytest.mark.parametrize(
+    ("ref", "expected_dependents"),
+    [
+        pytest.param(".foo.Foo", {"bar.proto", "baz.proto"}, id="map value & method"),
+        pytest.param(".foo.Foo.Nested", {"foo.proto"}, id="nested field"),
+        pytest.param(".bar.Bar", {"baz.proto"}, id="extendee & method"),
+        pytest.param(".bar.Bar.ItemsEntry", {"bar.proto"}, id="map entry"),
+        pytest.param(".baz.Baz", {"baz.proto"}, id="extension"),
+        pytest.param(".spam.Spam", set(), id="not referenced"),
+    ],
+)
+def test_registry_type_dependents(registry: TypeRegistry, ref: str, expected_dependents: set[str]) -> None:
+    assert set(registry.get_type_dependents(ref)) == expected_dependents
+
+
+@pytest.mark.parametrize(
+    ("name", "expected_dependents"),
+    [
+        pytest.param("foo.proto", {"bar.proto", "baz.proto"}),
+        pytest.param("bar.proto", {"baz.proto"}),
+        pytest.param("baz.proto", set()),
+    ],
+)
+def test_registry_file_dependents(registry: TypeRegistry, name: str, expected_dependents: set[str]) -> None:
+    assert set(registry.get_file_dependents(name)) == expected_dependents
+
+
+@pytest.fixture
+def registry() -> TypeRegistry:
+    files = [
+        FileDescriptorProto(
+            name="foo.proto",
+            package="foo",
+            message_type=[
+                DescriptorProto(
+                    name="Foo",
+                    field=[build_field("nested", ".foo.Foo.Nested")],
+                    nested_type=[DescriptorProto(name="Nested")],
+                ),
+            ],
+        ),
+        FileDescriptorProto(
+            name="bar.proto",
+            package="bar",
+            dependency=["foo.proto"],
+            message_type=[
+                DescriptorProto(
+                    name="Bar",
+                    field=[build_field("items", ".bar.Bar.ItemsEntry", repeated=True)],
+                    nested_type=[
+                        DescriptorProto(
+                            name="ItemsEntry",
+                            field=[
+                                FieldDescriptorProto(
+                                    name="key",
+                                    number=1,
+                                    type=FieldDescriptorProto.Type.TYPE_STRING,
+                                ),
+                                build_field("value", ".foo.Foo", number=2),
+                            ],
+                            options=MessageOptions(map_entry=True),
+                        ),
+                    ],
+                    extension_range=[DescriptorProto.ExtensionRange(start=100, end=200)],
+                ),
+            ],
+        ),
+        FileDescriptorProto(
+            name="baz.proto",
+            package="baz",
+            dependency=["foo.proto", "bar.proto"],
+            message_type=[DescriptorProto(name="Baz")],
+            extension=[build_field("baz", ".baz.Baz", number=100, extendee=".bar.Bar")],
+            service=[
+                ServiceDescriptorProto(
+                    name="Service",
+                    method=[MethodDescriptorProto(name="Do", input_type=".bar.Bar", output_type=".foo.Foo")],
+                ),
+            ],
+        ),
+        FileDescriptorProto(name="spam.proto", package="spam", message_type=[DescriptorProto(name="Spam")]),
+    ]
+
+    return ContextBuilder().build(CodeGeneratorRequest(proto_file=files)).registry
+
+
+def build_field(
+    name: str,
+    type_name: str,
+    number: int = 1,
+    extendee: str = "",
+    *,
+    repeated: bool = False,
+) -> FieldDescriptorProto:
+    return FieldDescriptorProto(
+        name=name,
+        number=number,
+        label=FieldDescriptorProto.Label.LABEL_REPEATED if repeated else FieldDescriptorProto.Label.LABEL_OPTIONAL,
+        type=FieldDescriptorProto.Type.TYPE_MESSAGE,
+        type_name=type_name,
+        extendee=extendee,
+    )
@@ -0,0 +1,208 @@
+import struct
+import typing as t
+from pathlib import Path
+
+import pytest
+from google.protobuf.compiler.plugin_pb2 import CodeGeneratorRequest
+from google.protobuf.descriptor_pb2 import (
+    DescriptorProto,
+    EnumDescriptorProto,
+    FieldDescriptorProto,
+    FileDescriptorProto,
+    MessageOptions,
+)
+
+from pyprotostuben.protobuf.context import ContextBuilder
+from pyprotostuben.protobuf.registry import (
+    EnumInfo,
+    MapEntryPlaceholder,
+    MessageInfo,
+    TypeRegistry,
+)
+from pyprotostuben.protobuf.registry_format import (
+    VERSION,
+    InvalidRegistryFormatError,
+    dump,
+    dumps,
+    load,
+    load_path,
+)
+from pyprotostuben.python.info import ModuleInfo, PackageInfo
+
+
+@pytest.mark.parametrize(
+    ("user_types", "map_entries"),
+    [
+        pytest.param({}, {}, id="empty"),
+        pytest.param(
+            {
+                ".foo.Foo": MessageInfo(ModuleInfo(None, "foo_pb2"), ["Foo"]),
+                ".foo.Foo.Kind": EnumInfo(ModuleInfo(None, "foo_pb2"), ["Foo", "Kind"]),
+                ".bar.Bar": MessageInfo(ModuleInfo(PackageInfo.build("spam", "eggs"), "bar_pb2"), ["Bar"]),
+                ".tést.Týpe": MessageInfo(ModuleInfo(None, "tést_pb2"), ["Týpe"]),
+            },
+            {
+                ".foo.Foo.ItemsEntry": MapEntryPlaceholder(
+                    ModuleInfo(None, "foo_pb2"),
+                    FieldDescriptorProto(
+                        name="key",
+                        number=1,
+                        label=FieldDescriptorProto.Label.LABEL_OPTIONAL,
+                        type=FieldDescriptorProto.Type.TYPE_STRING,
+                    ),
+                    FieldDescriptorProto(
+                        name="value",
+                        number=2,
+                        label=FieldDescriptorProto.Label.LABEL_OPTIONAL,
+                        type=FieldDescriptorProto.Type.TYPE_MESSAGE,
+                        type_name=".bar.Bar",
+                    ),
+                ),
+            },
+            id="types",
+        ),
+    ],
+)
+def test_dumps_load_round_trip(
+    user_types: t.Mapping[str, t.Union[EnumInfo, MessageInfo]],
+    map_entries: t.Mapping[str, MapEntryPlaceholder],
+) -> None:
+    loaded = load(dumps(TypeRegistry(user_types, map_entries)))
+
+    assert loaded.get_user_types() == user_types
+    assert loaded.get_map_entries() == map_entries
+
+
+def test_dump_load_path_round_trip(tmp_path: Path, codegen_request: CodeGeneratorRequest) -> None:
+    registry = ContextBuilder().build(codegen_request).registry
+    path = tmp_path / "registry.bin"
+
+    with path.open("wb") as fd:
+        dump(registry, fd)
+
+    loaded = load_path(path)
+
+    assert loaded.get_user_types() == registry.get_user_types()
+    assert loaded.resolve_proto_map_entry(".foo.Foo.ItemsEntry") == registry.resolve_proto_map_entry(
+        ".foo.Foo.ItemsEntry"
+    )
+
+
+def test_dumps_load_dependents_round_trip(codegen_request: CodeGeneratorRequest) -> None:
+    codegen_request.proto_file.append(
+        FileDescriptorProto(
+            name="bar.proto",
+            package="bar",
+            dependency=["spam/foo.proto"],
+            message_type=[
+                DescriptorProto(
+                    name="Bar",
+                    field=[
+                        FieldDescriptorProto(
+                            name="foo",
+                            number=1,
+                            type=FieldDescriptorProto.Type.TYPE_MESSAGE,
+                            type_name=".foo.Foo",
+                        ),
+                    ],
+                ),
+            ],
+        ),
+    )
+    registry = ContextBuilder().build(codegen_request).registry
+
+    loaded = load(dumps(registry))
+
+    assert set(loaded.get_type_dependents(".foo.Foo")) == {"bar.proto"}
+    assert set(loaded.get_type_dependents(".foo.Kind")) == {"spam/foo.proto"}
+    assert set(loaded.get_file_dependents("spam/foo.proto")) == {"bar.proto"}
+    assert {ref: set(names) for ref, names in loaded.get_all_type_dependents().items()} == {
+        ref: set(names) for ref, names in registry.get_all_type_dependents().items()
+    }
+
+
+def test_load_shares_module_infos(codegen_request: CodeGeneratorRequest) -> None:
+    loaded = load(dumps(ContextBuilder().build(codegen_request).registry))
+
+    user_types = loaded.get_user_types()
+
+    assert user_types[".foo.Foo"].module is user_types[".foo.Kind"].module
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        pytest.param(b"", id="empty"),
+        pytest.param(b"XXXX" + dumps(TypeRegistry({}, {}))[4:], id="magic"),
+        pytest.param(
+            b"PPSR" + struct.pack("<H", VERSION - 1) + dumps(TypeRegistry({}, {}))[6:],
+            id="version",
+        ),
+        pytest.param(dumps(TypeRegistry({".foo.Foo": MessageInfo.build(None, "Foo")}, {}))[:-4], id="truncated"),
+    ],
+)
+def test_load_error(content: bytes) -> None:
+    with pytest.raises(InvalidRegistryFormatError):
+        load(content)
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        pytest.param(b"", id="empty"),
+        pytest.param(dumps(TypeRegistry({".foo.Foo": MessageInfo.build(None, "Foo")}, {}))[:-4], id="truncated"),
+    ],
+)
+def test_load_path_error(tmp_path: Path, content: bytes) -> None:
+    path = tmp_path / "registry.bin"
+    path.write_bytes(content)
+
+    with pytest.raises(InvalidRegistryFormatError):
+        load_path(path)
+
+
+@pytest.fixture
+def codegen_request() -> CodeGeneratorRequest:
+    return CodeGeneratorRequest(
+        file_to_generate=["spam/foo.proto"],
+        proto_file=[
+            FileDescriptorProto(
+                name="spam/foo.proto",
+                package="foo",
+                enum_type=[EnumDescriptorProto(name="Kind")],
+                message_type=[
+                    DescriptorProto(
+                        name="Foo",
+                        field=[
+                            FieldDescriptorProto(
+                                name="items",
+                                number=1,
+                                label=FieldDescriptorProto.Label.LABEL_REPEATED,
+                                type=FieldDescriptorProto.Type.TYPE_MESSAGE,
+                                type_name=".foo.Foo.ItemsEntry",
+                            ),
+                        ],
+                        nested_type=[
+                            DescriptorProto(
+                                name="ItemsEntry",
+                                field=[
+                                    FieldDescriptorProto(
+                                        name="key",
+                                        number=1,
+                                        type=FieldDescriptorProto.Type.TYPE_INT64,
+                                    ),
+                                    FieldDescriptorProto(
+                                        name="value",
+                                        number=2,
+                                        type=FieldDescriptorProto.Type.TYPE_ENUM,
+                                        type_name=".foo.Kind",
+                                    ),
+                                ],
+                                options=MessageOptions(map_entry=True),
+                            ),
+                        ],
+                    ),
+                ],
+            ),
+        ],
+    )
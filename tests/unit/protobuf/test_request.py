@@ -0,0 +1,99 @@
+import io
+import typing as t
+from pathlib import Path
+
+import pytest
+from google.protobuf.compiler.plugin_pb2 import CodeGeneratorRequest, Version
+from google.protobuf.descriptor_pb2 import FileDescriptorProto
+
+from pyprotostuben.protobuf.request import (
+    InvalidRequestBufferError,
+    map_stream,
+    read_request,
+    read_request_parameter,
+)
+
+REQUESTS = [
+    pytest.param(CodeGeneratorRequest(), id="empty"),
+    pytest.param(
+        CodeGeneratorRequest(
+            file_to_generate=["foo.proto"],
+            parameter="no-parallel,format=json",
+            compiler_version=Version(major=26, minor=1, patch=0),
+            proto_file=[FileDescriptorProto(name="foo.proto", package="foo")],
+        ),
+        id="full",
+    ),
+]
+
+
+@pytest.mark.parametrize("codegen_request", REQUESTS)
+@pytest.mark.parametrize("spool", [False, True])
+def test_read_request_from_stream(codegen_request: CodeGeneratorRequest, *, spool: bool) -> None:
+    content = codegen_request.SerializeToString()
+
+    with map_stream(io.BytesIO(content), spool=spool) as buffer:
+        assert bytes(buffer) == content
+
+    assert read_request(io.BytesIO(content)) == codegen_request
+
+
+@pytest.mark.parametrize("codegen_request", REQUESTS)
+def test_read_request_from_file(tmp_path: Path, codegen_request: CodeGeneratorRequest) -> None:
+    path = tmp_path / "request.bin"
+    path.write_bytes(codegen_request.SerializeToString())
+
+    with path.open("rb") as fd:
+        assert read_request(fd) == codegen_request
+
+
+@pytest.mark.parametrize(
+    ("content", "expected"),
+    [
+        pytest.param(b"", "", id="empty"),
+        pytest.param(CodeGeneratorRequest(parameter="a=b,c").SerializeToString(), "a=b,c", id="parameter"),
+        pytest.param(
+            CodeGeneratorRequest(
+                file_to_generate=["foo.proto"],
+                compiler_version=Version(major=3),
+                proto_file=[FileDescriptorProto(name="foo.proto")],
+                parameter="debug",
+            ).SerializeToString(),
+            "debug",
+            id="fields",
+        ),
+        pytest.param(
+            CodeGeneratorRequest(parameter="first").SerializeToString()
+            + CodeGeneratorRequest(parameter="last").SerializeToString(),
+            "last",
+            id="last-wins",
+        ),
+    ],
+)
+def test_read_request_parameter_ok(content: bytes, expected: str) -> None:
+    assert read_request_parameter(memoryview(content)) == expected
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        pytest.param(b"\x12", id="no-size"),
+        pytest.param(b"\x12\x05abc", id="truncated"),
+        pytest.param(b"\x13", id="wire-type"),
+    ],
+)
+def test_read_request_parameter_error(content: bytes) -> None:
+    with pytest.raises(InvalidRequestBufferError):
+        read_request_parameter(memoryview(content))
+
+
+def test_map_stream_reads_from_current_position(tmp_path: Path) -> None:
+    path = tmp_path / "content.bin"
+    path.write_bytes(b"skip-content")
+
+    fd: t.IO[bytes]
+    with path.open("rb") as fd:
+        fd.read(5)
+
+        with map_stream(fd) as buffer:
+            assert bytes(buffer) == b"content"
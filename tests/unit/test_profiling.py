@@ -0,0 +1,89 @@
+import io
+import os
+from pathlib import Path
+
+import pytest
+from google.protobuf.compiler.plugin_pb2 import CodeGeneratorRequest
+from google.protobuf.descriptor_pb2 import DescriptorProto, FileDescriptorProto
+
+from pyprotostuben.codegen.mypy.plugin import MypyStubProtocPlugin
+from pyprotostuben.codegen.run import run_codegen
+from pyprotostuben.profiling import (
+    PROFILE_ENV,
+    SUMMARY_NAME,
+    TRACEMALLOC_ENV,
+    ProfilingOptions,
+    get_profiling_options,
+    profile_process,
+)
+from pyprotostuben.protobuf.parser import ParameterParser
+
+
+@pytest.mark.parametrize(
+    ("parameter", "env", "expected"),
+    [
+        pytest.param("", {}, ProfilingOptions(), id="disabled"),
+        pytest.param(
+            "profile=prof,tracemalloc=mem",
+            {},
+            ProfilingOptions(profile_dir=Path("prof"), tracemalloc_dir=Path("mem")),
+            id="params",
+        ),
+        pytest.param(
+            "profile=prof",
+            {PROFILE_ENV: "env-prof", TRACEMALLOC_ENV: "env-mem"},
+            ProfilingOptions(profile_dir=Path("prof"), tracemalloc_dir=Path("env-mem")),
+            id="env",
+        ),
+    ],
+)
+def test_profiling_options_from_params(
+    monkeypatch: pytest.MonkeyPatch,
+    parameter: str,
+    env: dict[str, str],
+    expected: ProfilingOptions,
+) -> None:
+    monkeypatch.delenv(PROFILE_ENV, raising=False)
+    monkeypatch.delenv(TRACEMALLOC_ENV, raising=False)
+    for key, value in env.items():
+        monkeypatch.setenv(key, value)
+
+    assert ProfilingOptions.from_params(ParameterParser().parse(parameter)) == expected
+
+
+def test_profile_process_provides_options_while_active(tmp_path: Path) -> None:
+    options = ProfilingOptions(profile_dir=tmp_path)
+
+    with profile_process(options):
+        assert get_profiling_options() == options
+
+    assert get_profiling_options() is None
+    assert (tmp_path / f"{os.getpid()}-main-{os.getpid()}.prof").is_file()
+
+
+@pytest.mark.parametrize("parallel", [False, True])
+def test_run_codegen_writes_profiles(tmp_path: Path, *, parallel: bool) -> None:
+    profile_dir = tmp_path / "profile"
+    tracemalloc_dir = tmp_path / "tracemalloc"
+    request = CodeGeneratorRequest(
+        file_to_generate=["foo.proto", "bar.proto"],
+        parameter=",".join(
+            [f"profile={profile_dir}", f"tracemalloc={tracemalloc_dir}", *(() if parallel else ("no-parallel",))]
+        ),
+        proto_file=[
+            FileDescriptorProto(name="foo.proto", package="foo", message_type=[DescriptorProto(name="Foo")]),
+            FileDescriptorProto(name="bar.proto", package="bar", message_type=[DescriptorProto(name="Bar")]),
+        ],
+    )
+
+    with io.BytesIO(request.SerializeToString()) as input_, io.BytesIO() as output:
+        run_codegen(MypyStubProtocPlugin(), input_, output)
+
+    run_id = os.getpid()
+    profiles = {path.name for path in profile_dir.glob(f"{run_id}-*.prof")}
+
+    assert f"{run_id}-main-{run_id}.prof" in profiles
+    assert any("-worker-" in name for name in profiles) == parallel
+    assert "module_ast.py" in (profile_dir / SUMMARY_NAME).read_text()
+    assert (tracemalloc_dir / f"{run_id}-main-{run_id}.txt").is_file()
+    assert (tracemalloc_dir / SUMMARY_NAME).read_text()
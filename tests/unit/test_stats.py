@@ -0,0 +1,162 @@
+import io
+import json
+
+import pytest
+
+from pyprotostuben.stats import (
+    MeasuredFunc,
+    NoStatsCollector,
+    PhaseStats,
+    PhaseStatsCollector,
+    Span,
+    StatsSnapshot,
+    dump_stats,
+    dump_trace,
+    format_stats,
+    get_peak_rss,
+    get_stats_collector,
+    use_stats_collector,
+)
+
+
+def test_default_stats_collector_measures_nothing() -> None:
+    collector = get_stats_collector()
+
+    with collector.measure("foo"):
+        pass
+
+    assert isinstance(collector, NoStatsCollector)
+    assert not collector.enabled
+
+
+def test_phase_stats_collector_accumulates_calls() -> None:
+    collector = PhaseStatsCollector()
+
+    for _ in range(3):
+        with collector.measure("foo"):
+            pass
+
+    with pytest.raises(RuntimeError), collector.measure("bar"):
+        raise RuntimeError
+
+    assert {name: stats.calls for name, stats in collector.phases.items()} == {"foo": 3, "bar": 1}
+    assert all(stats.wall >= 0.0 and stats.cpu >= 0.0 for stats in collector.phases.values())
+
+
+def test_use_stats_collector_restores_previous() -> None:
+    prev = get_stats_collector()
+
+    with use_stats_collector(PhaseStatsCollector()) as collector:
+        assert get_stats_collector() is collector
+
+    assert get_stats_collector() is prev
+
+
+def test_phase_stats_collector_merges_snapshot() -> None:
+    collector = PhaseStatsCollector()
+    collector.count("files")
+
+    collector.merge(
+        StatsSnapshot(
+            phases={"foo": PhaseStats(calls=2, wall=1.0, cpu=0.5)},
+            counters={"files": 3, "types": 4},
+        )
+    )
+
+    assert collector.snapshot() == StatsSnapshot(
+        phases={"foo": PhaseStats(calls=2, wall=1.0, cpu=0.5)},
+        counters={"files": 4, "types": 4},
+    )
+
+
+def test_measured_func_returns_collected_stats() -> None:
+    result, snapshot = MeasuredFunc(measure_str)(42)
+
+    assert result == "42"
+    assert snapshot.phases["str"].calls == 1
+    assert snapshot.counters == {"items": 1}
+
+
+def test_phase_stats_collector_records_spans_when_tracing() -> None:
+    collector = PhaseStatsCollector(tracing=True)
+
+    with collector.measure("foo", file="foo.proto"), collector.measure("bar"):
+        pass
+
+    assert [(span.name, span.details) for span in collector.spans] == [("bar", {}), ("foo", {"file": "foo.proto"})]
+    assert collector.snapshot().spans == tuple(collector.spans)
+
+
+def test_phase_stats_collector_records_no_spans_by_default() -> None:
+    collector = PhaseStatsCollector()
+
+    with collector.measure("foo"):
+        pass
+
+    collector.merge(StatsSnapshot(spans=[Span("bar", 1.0, 2.0, 3, 4, "worker", {})]))
+
+    assert not collector.tracing
+    assert collector.spans == ()
+
+
+def test_dump_trace() -> None:
+    snapshot = StatsSnapshot(spans=[Span("foo", 1.0, 0.5, 42, 7, "Worker-1", {"file": "foo.proto"})])
+
+    with io.StringIO() as fd:
+        dump_trace(snapshot, fd)
+
+        assert json.loads(fd.getvalue()) == {
+            "traceEvents": [
+                {"name": "process_name", "ph": "M", "pid": 42, "args": {"name": "Worker-1"}},
+                {
+                    "name": "foo",
+                    "cat": "phase",
+                    "ph": "X",
+                    "ts": 1_000_000.0,
+                    "dur": 500_000.0,
+                    "pid": 42,
+                    "tid": 7,
+                    "args": {"worker": "Worker-1", "file": "foo.proto"},
+                },
+            ],
+            "displayTimeUnit": "ms",
+        }
+
+
+def test_dump_stats() -> None:
+    snapshot = StatsSnapshot(phases={"foo": PhaseStats(calls=1, wall=2.0, cpu=3.0)}, counters={"files": 5})
+
+    with io.StringIO() as fd:
+        dump_stats(snapshot, fd)
+
+        assert json.loads(fd.getvalue()) == {
+            "phases": {"foo": {"calls": 1, "wall": 2.0, "cpu": 3.0}},
+            "counters": {"files": 5},
+        }
+
+
+def test_format_stats() -> None:
+    lines = format_stats(
+        StatsSnapshot(phases={"foo": PhaseStats(calls=1, wall=2.0, cpu=3.0)}, counters={"files": 5})
+    ).split("\n")
+
+    assert lines[1].split() == ["foo", "1", "2.0000", "3.0000"]
+    assert lines[2] == "files: 5"
+
+
+def measure_str(value: object) -> str:
+    stats = get_stats_collector()
+    stats.count("items")
+
+    with stats.measure("str"):
+        return str(value)
+
+
+def test_get_peak_rss_is_in_bytes() -> None:
+    pytest.importorskip("resource")
+
+    peak_rss = get_peak_rss()
+
+    # NOTE: python interpreter takes a few megabytes at least.
+    assert peak_rss is not None
+    assert peak_rss > 1 << 20